@@ -0,0 +1,378 @@
+"""Benchmarks for the py_utils math primitives.
+
+Each benchmark draws a fixed, seeded set of inputs (including extreme ticks and
+u128-sized liquidity) and reports calls per second and the peak memory a single
+call allocates. Results are written as JSON; when a baseline file is given, any
+benchmark whose ops/sec fell by more than the threshold fails the run:
+
+    python -m py_utils.bench --save-baseline
+    python -m py_utils.bench --threshold 10 --output bench.json
+
+Batched functions count one op per row.
+
+Memory is reported as tracemalloc's peak: the most bytes a call holds at once on
+top of what was allocated before it. CPython keeps no count of the allocations a
+call makes (tracemalloc only tracks the blocks still alive), so the peak stands in
+for an allocation count; a call that builds big temporaries shows up either way.
+"""
+import argparse
+import decimal
+import fnmatch
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from py_utils import (
+    fixed_point,
+    fullmath,
+    liquidity_math,
+    memo_cache,
+    sqrtprice_math,
+    swap_math,
+    tick_bitmap,
+    tick_math,
+    uniswap_v3_math,
+)
+from py_utils.tick_math import MAX_SQRT_RATIO, MAX_TICK, MIN_SQRT_RATIO, MIN_TICK
+
+# Tracked next to this file; data/ only holds generated files and is ignored
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+DEFAULT_THRESHOLD = 10.0
+SAMPLES = 2000
+MIN_RUN_TIME = 0.2
+MAX_U128 = 2**128 - 1
+# What the test generators computed sqrt prices with before py_utils.fixed_point
+DECIMAL_CONTEXT = decimal.Context(prec=40)
+
+
+def _tick(rng):
+    """Mostly ticks around realistic prices, with a share near both ends of the range"""
+    regime = rng.random()
+    if regime < 0.1:
+        return rng.randint(MIN_TICK, MIN_TICK + 1000)
+    if regime < 0.2:
+        return rng.randint(MAX_TICK - 1000, MAX_TICK)
+    return rng.randint(-120000, 120000)
+
+
+def _liquidity(rng):
+    """Liquidity spread over every magnitude up to u128"""
+    return rng.randint(1, 2**rng.randint(1, 128) - 1) if rng.random() < 0.9 else MAX_U128
+
+
+def _sqrt_pair(rng):
+    a, b = tick_math.tick_to_sqrt_ratio(_tick(rng)), tick_math.tick_to_sqrt_ratio(_tick(rng))
+    return (a, b) if a != b else (a, a + 1)
+
+
+def _swap_step_inputs(rng):
+    while True:
+        zero_for_one = rng.random() < 0.5
+        current, target = sorted(_sqrt_pair(rng), reverse=zero_for_one)
+        liquidity = _liquidity(rng)
+        amount = rng.randint(1, 2**rng.randint(1, 126))
+        try:
+            swap_math.compute_swap_step(current, target, liquidity, amount, zero_for_one)
+        except (ValueError, ArithmeticError):
+            continue
+        return current, target, liquidity, amount, zero_for_one
+
+
+def _next_price_inputs(rng, amount0):
+    while True:
+        sqrt_price = tick_math.tick_to_sqrt_ratio(_tick(rng))
+        liquidity = _liquidity(rng)
+        amount = rng.randint(1, 2**rng.randint(1, 128))
+        add = rng.random() < 0.5
+        function = (sqrtprice_math.get_next_sqrt_price_from_amount0_rounding_up if amount0
+                    else sqrtprice_math.get_next_sqrt_price_from_amount1_rounding_down)
+        try:
+            function(sqrt_price, liquidity, amount, add)
+        except (ValueError, ArithmeticError):
+            continue
+        return sqrt_price, liquidity, amount, add
+
+
+def _mul_div_inputs(rng):
+    """u256 operands of the sizes the price math uses, for which neither mul_div overflows"""
+    while True:
+        a = rng.randint(0, 2**rng.randint(1, 224))
+        b = rng.choice((2**96, rng.randint(1, 2**rng.randint(1, 160))))
+        denominator = rng.randint(1, 2**rng.randint(1, 160))
+        try:
+            fullmath.mul_div(a, b, denominator)
+            fullmath.mul_div_rounding_up(a, b, denominator)
+        except OverflowError:
+            continue
+        return a, b, denominator
+
+
+def _decimal_price_to_sqrt_price(price):
+    """Reference for fixed_point.price_to_sqrt_price_x96, the way the generators used to do it"""
+    return int(DECIMAL_CONTEXT.multiply(DECIMAL_CONTEXT.sqrt(decimal.Decimal(price)), 2**96))
+
+
+def _decimal_sqrt(value):
+    """Reference for FixedQ64x96.sqrt in Decimal"""
+    return int(DECIMAL_CONTEXT.multiply(DECIMAL_CONTEXT.sqrt(decimal.Decimal(value)), 2**48))
+
+
+def _price(rng):
+    return rng.random() * 10 ** rng.randint(-12, 12)
+
+
+def _memo_hits(memoized, make_args):
+    """Inputs for `memoized` that are all in its cache already"""
+    def make_inputs(rng):
+        inputs = [make_args(rng) for _ in range(SAMPLES)]
+        for args in inputs:
+            memoized(*args)
+        return inputs
+    return make_inputs
+
+
+def _bitmap(rng):
+    bitmap = tick_bitmap.TickBitmap()
+    for _ in range(SAMPLES):
+        tick = _tick(rng)
+        if not bitmap.is_initialized(tick):
+            bitmap.flip_tick(tick)
+    return bitmap
+
+
+class Benchmark:
+    """A function and a seeded input generator; `batch` calls take all inputs at once."""
+
+    def __init__(self, name, function, make_inputs, batch=False):
+        self.name = name
+        self.function = function
+        self.make_inputs = make_inputs
+        self.batch = batch
+
+
+def _scalar(make_args):
+    return lambda rng: [make_args(rng) for _ in range(SAMPLES)]
+
+
+def _benchmarks(seed):
+    bitmap = _bitmap(random.Random(f"{seed}:bitmap"))
+
+    def amount_columns(rng):
+        rows = [(_liquidity(rng),) + _sqrt_pair(rng) for _ in range(SAMPLES * 10)]
+        return [tuple(zip(*rows))]
+
+    def amount_limb_columns(rng):
+        from py_utils import limbs
+
+        liquidity, sqrt_price_a, sqrt_price_b = amount_columns(rng)[0]
+        return [(limbs.from_ints(liquidity, liquidity_math.LIQUIDITY_LIMBS)[0],
+                 limbs.from_ints(sqrt_price_a, liquidity_math.SQRT_PRICE_LIMBS)[0],
+                 limbs.from_ints(sqrt_price_b, liquidity_math.SQRT_PRICE_LIMBS)[0])]
+
+    def mul_div_columns(rng):
+        return [tuple(zip(*(_mul_div_inputs(rng) for _ in range(SAMPLES * 10))))]
+
+    memo = memo_cache.MemoCache(":memory:")
+    memoized_swap_step = memo.memoize(swap_math.compute_swap_step)
+
+    return [
+        Benchmark("tick_math.tick_to_sqrt_ratio", tick_math.tick_to_sqrt_ratio,
+                  _scalar(lambda rng: (_tick(rng),))),
+        Benchmark("tick_math.get_sqrt_ratio_at_tick", tick_math.get_sqrt_ratio_at_tick,
+                  _scalar(lambda rng: (_tick(rng),))),
+        Benchmark("tick_math.get_tick_at_sqrt_ratio", tick_math.get_tick_at_sqrt_ratio,
+                  _scalar(lambda rng: (rng.randint(MIN_SQRT_RATIO, MAX_SQRT_RATIO - 1) if rng.random() < 0.2
+                                       else tick_math.tick_to_sqrt_ratio(min(_tick(rng), MAX_TICK - 1)),))),
+        Benchmark("fullmath.mul_div", fullmath.mul_div, _scalar(_mul_div_inputs)),
+        Benchmark("fullmath.mul_div_rounding_up", fullmath.mul_div_rounding_up, _scalar(_mul_div_inputs)),
+        Benchmark("fullmath.mul_div_rounding_up_batch", fullmath.mul_div_rounding_up_batch, mul_div_columns,
+                  batch=True),
+        Benchmark("sqrtprice_math.get_next_sqrt_price_from_amount0_rounding_up",
+                  sqrtprice_math.get_next_sqrt_price_from_amount0_rounding_up,
+                  _scalar(lambda rng: _next_price_inputs(rng, True))),
+        Benchmark("sqrtprice_math.get_next_sqrt_price_from_amount1_rounding_down",
+                  sqrtprice_math.get_next_sqrt_price_from_amount1_rounding_down,
+                  _scalar(lambda rng: _next_price_inputs(rng, False))),
+        Benchmark("swap_math.compute_swap_step", swap_math.compute_swap_step,
+                  _scalar(_swap_step_inputs)),
+        Benchmark("memo_cache.compute_swap_step_hit", memoized_swap_step,
+                  _memo_hits(memoized_swap_step, _swap_step_inputs)),
+        Benchmark("liquidity_math.calc_amount0_delta", liquidity_math.calc_amount0_delta,
+                  _scalar(lambda rng: _sqrt_pair(rng) + (_liquidity(rng),))),
+        Benchmark("liquidity_math.calc_amount1_delta", liquidity_math.calc_amount1_delta,
+                  _scalar(lambda rng: _sqrt_pair(rng) + (_liquidity(rng),))),
+        Benchmark("liquidity_math.calc_amount0_batch", liquidity_math.calc_amount0_batch, amount_columns,
+                  batch=True),
+        Benchmark("liquidity_math.calc_amount1_batch", liquidity_math.calc_amount1_batch, amount_columns,
+                  batch=True),
+        Benchmark("liquidity_math.calc_amount0_limbs", liquidity_math.calc_amount0_limbs, amount_limb_columns,
+                  batch=True),
+        Benchmark("liquidity_math.calc_amount1_limbs", liquidity_math.calc_amount1_limbs, amount_limb_columns,
+                  batch=True),
+        Benchmark("uniswap_v3_math.calc_amount0", uniswap_v3_math.calc_amount0,
+                  _scalar(lambda rng: (_liquidity(rng),) + _sqrt_pair(rng))),
+        Benchmark("uniswap_v3_math.calc_amount1", uniswap_v3_math.calc_amount1,
+                  _scalar(lambda rng: (_liquidity(rng),) + _sqrt_pair(rng))),
+        Benchmark("uniswap_v3_math.price_to_tick", uniswap_v3_math.price_to_tick,
+                  _scalar(lambda rng: (1.0001 ** _tick(rng),))),
+        Benchmark("fixed_point.price_to_sqrt_price_x96", fixed_point.price_to_sqrt_price_x96,
+                  _scalar(lambda rng: (_price(rng),))),
+        Benchmark("fixed_point.decimal_price_to_sqrt_price", _decimal_price_to_sqrt_price,
+                  _scalar(lambda rng: (_price(rng),))),
+        Benchmark("fixed_point.sqrt_raw", fixed_point.sqrt_raw,
+                  _scalar(lambda rng: (rng.randint(0, 2**rng.randint(1, 255)),))),
+        Benchmark("fixed_point.decimal_sqrt", _decimal_sqrt,
+                  _scalar(lambda rng: (rng.randint(0, 2**rng.randint(1, 255)),))),
+        Benchmark("fixed_point.sqrt_batch", fixed_point.sqrt_batch,
+                  lambda rng: [([rng.randint(0, 2**rng.randint(1, 255)) for _ in range(SAMPLES * 10)],)],
+                  batch=True),
+        Benchmark("tick_bitmap.position", tick_bitmap.position,
+                  _scalar(lambda rng: (_tick(rng),))),
+        Benchmark("tick_bitmap.next_initialized_tick_within_one_word",
+                  bitmap.next_initialized_tick_within_one_word,
+                  _scalar(lambda rng: (_tick(rng), 1, rng.random() < 0.5))),
+        Benchmark("tick_bitmap.next_initialized_tick",
+                  bitmap.next_initialized_tick,
+                  _scalar(lambda rng: (_tick(rng), 1, rng.random() < 0.5))),
+    ]
+
+
+def _ops(benchmark, inputs):
+    if benchmark.batch:
+        # Limb columns hold their rows along the last axis
+        return sum(args[0].shape[-1] if hasattr(args[0], "shape") else len(args[0]) for args in inputs)
+    return len(inputs)
+
+
+def _time(benchmark, inputs, min_run_time):
+    """Best per-op time over repeated passes lasting at least `min_run_time` in total"""
+    function = benchmark.function
+    best = float("inf")
+    elapsed = 0.0
+    passes = 0
+    while elapsed < min_run_time or passes < 3:
+        start = time.perf_counter()
+        for args in inputs:
+            function(*args)
+        duration = time.perf_counter() - start
+        best = min(best, duration)
+        elapsed += duration
+        passes += 1
+    return best / _ops(benchmark, inputs)
+
+
+def _peak_allocation(benchmark, inputs, calls=200):
+    """Largest number of bytes held at once during a single call, over a sample of calls"""
+    function = benchmark.function
+    peak = 0
+    tracemalloc.start()
+    try:
+        for args in inputs[:calls]:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            function(*args)
+            _, call_peak = tracemalloc.get_traced_memory()
+            peak = max(peak, call_peak - before)
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_benchmarks(pattern="*", seed=0, min_run_time=MIN_RUN_TIME):
+    """Run every benchmark whose name matches `pattern`; returns the JSON-ready report"""
+    results = {}
+    for benchmark in _benchmarks(seed):
+        if not fnmatch.fnmatch(benchmark.name, pattern):
+            continue
+        inputs = benchmark.make_inputs(random.Random(f"{seed}:{benchmark.name}"))
+        seconds_per_op = _time(benchmark, inputs, min_run_time)
+        results[benchmark.name] = {
+            "ops_per_sec": 1.0 / seconds_per_op,
+            "ns_per_op": seconds_per_op * 1e9,
+            "peak_alloc_bytes_per_call": _peak_allocation(benchmark, inputs),
+            "ops_per_call": _ops(benchmark, inputs) // len(inputs),
+        }
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "seed": seed,
+        "tick_table": tick_math.default_table() is not None,
+        "results": results,
+    }
+
+
+def find_regressions(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """(name, baseline ops/sec, current ops/sec, % change) for every benchmark slower than the threshold"""
+    regressions = []
+    for name, result in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        change = (result["ops_per_sec"] / previous["ops_per_sec"] - 1.0) * 100.0
+        if change < -threshold:
+            regressions.append((name, previous["ops_per_sec"], result["ops_per_sec"], change))
+    return regressions
+
+
+def _write_json(path, data):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the py_utils math primitives")
+    parser.add_argument("--filter", default="*", help="glob over benchmark names")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-time", type=float, default=MIN_RUN_TIME,
+                        help="minimum seconds spent timing each benchmark")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="fail when ops/sec drops by more than this many percent")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store this run as the baseline instead of comparing against it")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.filter, seed=args.seed, min_run_time=args.min_time)
+    for name, result in report["results"].items():
+        print(f"{name:<66} {result['ops_per_sec']:>14,.0f} ops/s {result['peak_alloc_bytes_per_call']:>10,} B")
+
+    if args.output:
+        _write_json(args.output, report)
+    if args.save_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            baseline["results"].update(report["results"])
+            report = dict(report, results=baseline["results"])
+        _write_json(args.baseline, report)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --save-baseline to create one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = find_regressions(report, baseline, args.threshold)
+    for name, before, after, change in regressions:
+        print(f"REGRESSION {name}: {before:,.0f} -> {after:,.0f} ops/s ({change:+.1f}%)")
+    if regressions:
+        print(f"{len(regressions)} benchmarks regressed by more than {args.threshold}%")
+        return 1
+    print(f"No regressions beyond {args.threshold}% against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""Streaming output for the Cairo test generators.
+
+Generators produce their Cairo file as an iterable of chunks (usually one test
+function each) instead of concatenating one big string, and `emit` drains it
+into a buffered sink. Memory stays bounded by the buffer size whatever the
+number of tests, and every character is copied once:
+
+    def generate_cairo_tests(test_cases):
+        yield HEADER
+        for case in test_cases:
+            yield f"fn test_{case['name']}() {{ ... }}\\n"
+
+    emit(generate_cairo_tests(cases))                  # to stdout
+    emit(generate_cairo_tests(cases), "out.cairo")     # atomically to a file
+
+Generated modules are compiled once they are declared in the test crate's
+lib.cairo; `declare_module` adds the `mod` line there:
+
+    declare_module("tests/lib.cairo", ("math_tests",), "swap_step_vectors")
+"""
+import os
+import re
+import sys
+
+BUFFER_SIZE = 1 << 16
+
+
+class CairoWriter:
+    """Collects chunks and writes them to `stream` in blocks of about `buffer_size` characters."""
+
+    def __init__(self, stream, buffer_size=BUFFER_SIZE):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.written = 0
+        self._chunks = []
+        self._buffered = 0
+
+    def write(self, chunk):
+        self._chunks.append(chunk)
+        self._buffered += len(chunk)
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def write_all(self, chunks):
+        for chunk in chunks:
+            self.write(chunk)
+
+    def flush(self):
+        if self._chunks:
+            self.stream.write("".join(self._chunks))
+            self.written += self._buffered
+            self._chunks = []
+            self._buffered = 0
+        self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+
+def emit(chunks, path=None, buffer_size=BUFFER_SIZE):
+    """Write `chunks` to `path`, or to stdout when None; returns the number of characters written
+
+    A file is written to a temporary name and renamed into place, so a generator that
+    fails halfway leaves the previous file untouched.
+    """
+    if path is None:
+        with CairoWriter(sys.stdout, buffer_size) as writer:
+            writer.write_all(chunks)
+        return writer.written
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w") as f, CairoWriter(f, buffer_size) as writer:
+            writer.write_all(chunks)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return writer.written
+
+
+_MOD_LINE = re.compile(r"^(\s*)mod (\w+);\s*$")
+_MOD_BLOCK = re.compile(r"^\s*mod (\w+) \{\s*$")
+
+
+def declare_module(lib_path, parents, name):
+    """Add `mod name;` inside the nested `mod parent { ... }` blocks of `lib_path`
+
+    The line goes among the block's other `mod x;` lines in alphabetical order.
+    Returns False when it was already there. The file is rewritten like `emit` writes.
+    """
+    with open(lib_path) as f:
+        lines = f.read().splitlines(keepends=True)
+
+    # Find the line that opens each parent block in turn, then the block's end
+    start, depth = 0, 0
+    for parent in parents:
+        for index in range(start, len(lines)):
+            match = _MOD_BLOCK.match(lines[index])
+            if match and match.group(1) == parent and _depth(lines[:index]) == depth:
+                start, depth = index + 1, depth + 1
+                break
+        else:
+            raise ValueError(f"{lib_path} has no `mod {' { mod '.join(parents)} {{` block")
+    end = start
+    while end < len(lines) and _depth(lines[start:end + 1]) >= 0:
+        end += 1
+
+    indent = "    " * depth
+    insert_at = None
+    for index in range(start, end):
+        match = _MOD_LINE.match(lines[index])
+        if match is None or len(match.group(1)) != len(indent):
+            continue
+        if match.group(2) == name:
+            return False
+        if insert_at is None and match.group(2) > name:
+            insert_at = index
+    if insert_at is None:
+        # After the last `mod x;` of the block, before any nested block
+        insert_at = max([index + 1 for index in range(start, end) if _MOD_LINE.match(lines[index])], default=start)
+    lines.insert(insert_at, f"{indent}mod {name};\n")
+    emit(lines, lib_path)
+    return True
+
+
+def _depth(lines):
+    """Braces opened minus braces closed over `lines`"""
+    return sum(line.count("{") - line.count("}") for line in lines)
@@ -0,0 +1,288 @@
+"""Estimated Cairo cost of swaps, from the swap loop's counters and no Cairo run.
+
+`UniswapV3Pool::swap` pays a fixed amount per swap (slot0 and liquidity reads and
+writes, the token transfers, the callback) and, per loop step, one
+`next_initialized_tick_within_one_word` call to the TickBitmap contract (a
+dispatcher call and a storage read), one `get_sqrt_ratio_at_tick` and the four
+mul_divs of `compute_swap_step`; a crossing adds a `cross` call to the Tick
+contract (a dispatcher call, a storage read and a write) and a step that stops
+inside a word a `get_tick_at_sqrt_ratio`. `operations` turns `SwapCounters` into
+those operation counts, and a `CostModel` weighs them into Cairo steps and gas.
+
+The weights are fitted by least squares against `snforge test` reports. Every test
+of the report is described by a scenario: the pool it starts from, its mints and
+its swaps, which `Pool` replays to count their operations:
+
+    [{"test": "test_swap_exact_input_0_to_1", "sqrt_price_x96": "79228162514264337593543950336",
+      "tick": 0, "mints": [[-600, 600, "1000000000000000000"]],
+      "swaps": [[true, "1000000000000000", "4295128740"]]}]
+
+The per-step and per-crossing costs are only told apart by tests whose swaps take
+several steps and cross initialized ticks, so the scenarios need some of those next
+to single-step swaps.
+
+Every test also pays for its own setup (deploying the contracts), which the fit
+takes as a separate per-test weight and predictions leave out; tests without swaps,
+the mint tests, pin it down. Swaps always take as many dispatcher calls as steps
+plus crossings, and four mul_divs per step, so the fit cannot tell those operations
+apart: it takes the least-norm split of their cost, which predicts the same totals
+but leaves the individual weights of those operations only indicative.
+
+    snforge test --include-ignored --detailed-resources > gas.txt
+    python -m py_utils.cost_model fit gas.txt scenarios.json --out model.json
+    python -m py_utils.cost_model predict model.json pool_a.snap pool_b.snap --amount -1000000000000000000 \\
+        --sqrt-price-limit-x96 4295128740
+"""
+import argparse
+import json
+import os
+import re
+import sys
+
+import numpy as np
+
+from py_utils.pool import Pool, SwapCounters
+from py_utils.pool_snapshot import PoolSnapshot
+from py_utils.tick_math import MAX_SQRT_RATIO, MIN_SQRT_RATIO
+
+OPERATIONS = ("swaps", "storage_reads", "storage_writes", "dispatcher_calls", "mul_div_calls",
+              "sqrt_ratio_computations", "tick_computations")
+# Per-test columns of the fit that predictions leave out
+SETUP_COLUMNS = ("tests", "mints")
+# slot0 twice, liquidity, bitmap_address and tick_address
+SWAP_STORAGE_READS = 5
+# slot0 and liquidity
+SWAP_STORAGE_WRITES = 2
+# get_next_sqrt_price_from_input, calc_amount0_delta (two) and calc_amount1_delta
+MUL_DIVS_PER_STEP = 4
+MODEL_VERSION = 1
+
+_PASS_LINE = re.compile(r"^\[PASS\]\s+(\S+)\s+\((.*)\)\s*$")
+_RESOURCE = re.compile(r"(\w+):\s*~?(\d+)")
+_STEPS_LINE = re.compile(r"^\s*steps:\s*(\d+)\s*$")
+
+
+def operations(counters):
+    """Operation counts of the swaps `counters` recorded, as a dict keyed by OPERATIONS"""
+    return {
+        "swaps": counters.swaps,
+        "storage_reads": SWAP_STORAGE_READS * counters.swaps + counters.bitmap_reads + counters.crossings,
+        "storage_writes": SWAP_STORAGE_WRITES * counters.swaps + counters.crossings,
+        "dispatcher_calls": counters.bitmap_reads + counters.crossings,
+        "mul_div_calls": MUL_DIVS_PER_STEP * counters.steps,
+        "sqrt_ratio_computations": counters.sqrt_ratio_computations,
+        "tick_computations": counters.tick_computations,
+    }
+
+
+def parse_gas_report(text):
+    """{test name: {"gas": ..., "steps": ... or None}} of the passed tests of a `snforge test` output
+
+    Names are the last `::` component. The gas is l2_gas where the report splits it
+    (snforge 0.35 and later), the single `gas` figure otherwise; steps are only
+    reported with --detailed-resources.
+    """
+    report = {}
+    current = None
+    for line in text.splitlines():
+        match = _PASS_LINE.match(line)
+        if match:
+            resources = {name: int(value) for name, value in _RESOURCE.findall(match.group(2))}
+            gas = resources.get("l2_gas", resources.get("gas"))
+            if gas is None:
+                current = None
+                continue
+            current = match.group(1).rsplit("::", 1)[-1]
+            report[current] = {"gas": gas, "steps": None}
+            continue
+        match = _STEPS_LINE.match(line)
+        if match and current is not None:
+            report[current]["steps"] = int(match.group(1))
+        elif line.startswith("["):
+            current = None
+    return report
+
+
+def _int(value):
+    return value if isinstance(value, int) else int(value, 0)
+
+
+def scenario_counts(scenario):
+    """Setup and operation counts of one test scenario (see the module docstring)"""
+    pool = Pool(_int(scenario["sqrt_price_x96"]), _int(scenario["tick"]), tick_spacing=scenario.get("tick_spacing", 1))
+    mints = scenario.get("mints", [])
+    for lower_tick, upper_tick, amount in mints:
+        pool.mint(_int(lower_tick), _int(upper_tick), _int(amount))
+    counters = SwapCounters()
+    for zero_for_one, amount_specified, sqrt_price_limit_x96 in scenario.get("swaps", []):
+        pool.swap(zero_for_one, _int(amount_specified), _int(sqrt_price_limit_x96), counters)
+    counts = {"tests": 1, "mints": len(mints)}
+    counts.update(operations(counters))
+    return counts
+
+
+class CostModel:
+    """Weights of each operation in Cairo steps and in gas, and the per-test setup cost"""
+
+    def __init__(self, gas, steps=None, setup=None, tests=0, rank=None):
+        # operation -> weight; `steps` is None when the reports carried no step counts
+        self.gas = gas
+        self.steps = steps
+        self.setup = setup or {}
+        self.tests = tests
+        self.rank = rank
+
+    @classmethod
+    def fit(cls, report, scenarios):
+        """Least-squares weights over the tests that are both in `report` and in `scenarios`"""
+        rows, gas, steps = [], [], []
+        for scenario in scenarios:
+            measured = report.get(scenario["test"])
+            if measured is None:
+                continue
+            counts = scenario_counts(scenario)
+            rows.append([counts[column] for column in SETUP_COLUMNS + OPERATIONS])
+            gas.append(measured["gas"])
+            steps.append(measured["steps"])
+        if not rows:
+            raise ValueError("no scenario matches a passed test of the report")
+
+        matrix = np.array(rows, dtype=np.float64)
+        columns = SETUP_COLUMNS + OPERATIONS
+        gas_weights, _, rank, _ = np.linalg.lstsq(matrix, np.array(gas, dtype=np.float64), rcond=None)
+        step_weights = None
+        if all(value is not None for value in steps):
+            step_weights, _, _, _ = np.linalg.lstsq(matrix, np.array(steps, dtype=np.float64), rcond=None)
+
+        def split(weights):
+            weights = dict(zip(columns, weights.tolist()))
+            return {name: weights[name] for name in OPERATIONS}, {name: weights[name] for name in SETUP_COLUMNS}
+
+        gas_operations, gas_setup = split(gas_weights)
+        setup = {f"{name}_gas": weight for name, weight in gas_setup.items()}
+        step_operations = None
+        if step_weights is not None:
+            step_operations, step_setup = split(step_weights)
+            setup.update({f"{name}_steps": weight for name, weight in step_setup.items()})
+        return cls(gas_operations, step_operations, setup, len(rows), int(rank))
+
+    def predict_operations(self, rows):
+        """(gas, steps) arrays for a sequence of operation dicts; steps is None without step weights"""
+        matrix = np.array([[row[name] for name in OPERATIONS] for row in rows], dtype=np.float64)
+        matrix = matrix.reshape(-1, len(OPERATIONS))
+        gas = matrix @ np.array([self.gas[name] for name in OPERATIONS])
+        steps = None if self.steps is None else matrix @ np.array([self.steps[name] for name in OPERATIONS])
+        return gas, steps
+
+    def predict(self, counters):
+        """(gas, steps) of the swaps `counters` recorded; steps is None without step weights"""
+        gas, steps = self.predict_operations([operations(counters)])
+        return float(gas[0]), None if steps is None else float(steps[0])
+
+    def to_dict(self):
+        return {"version": MODEL_VERSION, "gas": self.gas, "steps": self.steps, "setup": self.setup,
+                "tests": self.tests, "rank": self.rank}
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != MODEL_VERSION:
+            raise ValueError(f"not a version {MODEL_VERSION} cost model")
+        return cls(data["gas"], data["steps"], data["setup"], data["tests"], data["rank"])
+
+    def save(self, path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write("\n")
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def __repr__(self):
+        return f"CostModel({self.tests} tests, rank {self.rank}, gas={self.gas})"
+
+
+def snapshot_operations(paths, amounts, zero_for_one, sqrt_price_limit_x96=None):
+    """Operation counts of a swap of each of `amounts` on each snapshot
+
+    Amounts are signed as in `Pool.swap`: positive for an exact input, negative for an
+    exact output. Without `sqrt_price_limit_x96` the swaps run up to the end of the
+    price range. Returns [(path, amount, operations dict or the exception the swap raised)].
+    """
+    if sqrt_price_limit_x96 is None:
+        sqrt_price_limit_x96 = MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+    results = []
+    for path in paths:
+        with PoolSnapshot(path) as snapshot:
+            pool = snapshot.to_pool()
+        for amount in amounts:
+            counters = SwapCounters()
+            try:
+                pool.simulate_swap(zero_for_one, amount, sqrt_price_limit_x96, counters)
+            except (ValueError, ArithmeticError) as e:
+                results.append((path, amount, e))
+                continue
+            results.append((path, amount, operations(counters)))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit and apply a cost model of the Cairo swap loop")
+    commands = parser.add_subparsers(dest="command", required=True)
+    fit = commands.add_parser("fit", help="fit the model against a snforge gas report")
+    fit.add_argument("report", help="output of `snforge test`, with --detailed-resources for step counts")
+    fit.add_argument("scenarios", help="JSON list of test scenarios")
+    fit.add_argument("--out", default="cost_model.json")
+    predict = commands.add_parser("predict", help="predict the cost of swaps on pool snapshots")
+    predict.add_argument("model")
+    predict.add_argument("snapshots", nargs="+")
+    predict.add_argument("--amount", type=int, action="append", required=True,
+                         help="amount specified: positive for an exact input, negative for an exact output; repeatable")
+    predict.add_argument("--one-for-zero", action="store_true", help="swap token1 in instead of token0")
+    predict.add_argument("--sqrt-price-limit-x96", type=int, default=None,
+                         help="price limit of the swaps (default: the end of the price range)")
+    args = parser.parse_args(argv)
+
+    if args.command == "fit":
+        try:
+            with open(args.report) as f:
+                report = parse_gas_report(f.read())
+            with open(args.scenarios) as f:
+                scenarios = json.load(f)
+            model = CostModel.fit(report, scenarios)
+        except (OSError, KeyError, ValueError, ArithmeticError) as e:
+            print(f"fit failed: {type(e).__name__}: {e}")
+            return 1
+        model.save(args.out)
+        print(f"fitted on {model.tests} tests (rank {model.rank} of {len(SETUP_COLUMNS) + len(OPERATIONS)}), "
+              f"written to {args.out}")
+        for name in OPERATIONS:
+            steps = "" if model.steps is None else f", {model.steps[name]:.1f} steps"
+            print(f"  {name}: {model.gas[name]:.1f} gas{steps}")
+        return 0
+
+    try:
+        model = CostModel.load(args.model)
+        results = snapshot_operations(args.snapshots, args.amount, not args.one_for_zero, args.sqrt_price_limit_x96)
+    except (OSError, KeyError, ValueError) as e:
+        print(e)
+        return 1
+    counted = [row for _, _, row in results if isinstance(row, dict)]
+    gas, steps = model.predict_operations(counted)
+    predictions = iter(range(len(counted)))
+    for path, amount, row in results:
+        if not isinstance(row, dict):
+            print(f"{path} {amount}: {type(row).__name__}: {row}")
+            continue
+        i = next(predictions)
+        cost = f"{gas[i]:.0f} gas" + ("" if steps is None else f", {steps[i]:.0f} steps")
+        print(f"{path} {amount}: {cost} ({row['dispatcher_calls']} dispatcher calls, "
+              f"{row['storage_reads']} storage reads, {row['mul_div_calls']} mul_divs)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
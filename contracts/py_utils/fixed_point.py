@@ -0,0 +1,168 @@
+"""Q64.96 fixed point numbers mirroring `FixedQ64x96` in fixed_point.cairo.
+
+`FixedQ64x96` holds the raw u256 `value` (the number times 2**96) and does what
+the Cairo impl does with it, in integer arithmetic only: `mul` and `div` are a
+u256 product and a floor division, `floor`/`ceil` work on multiples of ONE, and
+`sqrt` is `u256_sqrt` of the raw value scaled by ONE / u256_sqrt(ONE), that is
+`math.isqrt(value) << 48`, clamped up to MIN_SQRT_RATIO as the contract does. The
+Cairo asserts raise ValueError with the Cairo message, u256 overflows raise
+OverflowError and division by zero raises ZeroDivisionError.
+
+    price = FixedQ64x96.new_unscaled(2000)
+    sqrt_price = price.sqrt()
+    (sqrt_price * sqrt_price).value
+
+`price_to_sqrt_price_x96` and `sqrt_price_x96_to_price` convert between human
+prices (ints, floats, Fractions or Decimals, taken at their exact value) and X96 sqrt prices
+without rounding anywhere but in the final floor, which is what the test
+generators used Decimal with a 40-digit context for. Given token decimals, the price
+is scaled the way `scale_amount` in utils/math.cairo scales amounts, to
+price * 10**decimals1 / 10**decimals0, before the square root.
+
+The `*_batch` functions take equally long columns of raw values (sequences of
+ints or integer NumPy arrays) and return a list of raw values, running the
+scalar code per row, as the `fullmath` batches do.
+"""
+import math
+from fractions import Fraction
+
+from py_utils.fullmath import checked_add, checked_mul, zip_columns
+from py_utils.tick_math import MAX_SQRT_RATIO, MIN_SQRT_RATIO
+
+ONE = 2**96
+HALF = 2**95
+# u256_sqrt(ONE)
+SCALE_ROOT_BITS = 48
+
+
+class FixedQ64x96:
+    """A Q64.96 number; `value` is the raw u256, as in the Cairo struct"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        # The struct literal: no range check, like `FixedQ64x96 { value }`
+        self.value = value
+
+    @classmethod
+    def new(cls, value):
+        """`IFixedQ64x96Impl::new`: a raw value within the sqrt ratio range"""
+        if value >= MAX_SQRT_RATIO:
+            raise ValueError("sqrt ratio overflow")
+        if value < MIN_SQRT_RATIO:
+            raise ValueError("sqrt ratio underflow")
+        return cls(value)
+
+    @classmethod
+    def new_unscaled(cls, value):
+        """`IFixedQ64x96Impl::new_unscaled`: an integer, scaled by ONE"""
+        return cls(checked_mul(value, ONE))
+
+    def add(self, other):
+        return FixedQ64x96(checked_add(self.value, other.value))
+
+    def sub(self, other):
+        if self.value < other.value:
+            raise ValueError("sqrt price underflow")
+        return FixedQ64x96(self.value - other.value)
+
+    def mul(self, other):
+        return FixedQ64x96(checked_mul(self.value, other.value) // ONE)
+
+    def div(self, other):
+        if other.value == 0:
+            raise ZeroDivisionError("division by zero")
+        return FixedQ64x96(checked_mul(self.value, ONE) // other.value)
+
+    def floor(self):
+        return FixedQ64x96(self.value // ONE * ONE)
+
+    def ceil(self):
+        integer_part, fractional_part = divmod(self.value, ONE)
+        if fractional_part == 0:
+            return self
+        return FixedQ64x96(checked_mul(integer_part + 1, ONE))
+
+    def sqrt(self):
+        return FixedQ64x96(sqrt_raw(self.value))
+
+    __add__ = add
+    __sub__ = sub
+    __mul__ = mul
+    __truediv__ = div
+
+    def __eq__(self, other):
+        if not isinstance(other, FixedQ64x96):
+            return NotImplemented
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return self.value < other.value
+
+    def __le__(self, other):
+        return self.value <= other.value
+
+    def __gt__(self, other):
+        return self.value > other.value
+
+    def __ge__(self, other):
+        return self.value >= other.value
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __repr__(self):
+        return f"FixedQ64x96({self.value})"
+
+
+def sqrt_raw(value):
+    """Raw value of `FixedQ64x96 { value }.sqrt()`"""
+    if value == 0:
+        return 0
+    # root * ONE / u256_sqrt(ONE), exactly, since ONE is a power of four
+    result = math.isqrt(value) << SCALE_ROOT_BITS
+    return MIN_SQRT_RATIO if result < MIN_SQRT_RATIO else result
+
+
+def price_to_sqrt_price_x96(price, decimals0=0, decimals1=0):
+    """floor(sqrt(price * 10**decimals1 / 10**decimals0) * 2**96) for an int, float, Fraction or Decimal price"""
+    numerator, denominator = (price, 1) if isinstance(price, int) else price.as_integer_ratio()
+    if numerator < 0:
+        raise ValueError("negative price")
+    # floor(sqrt(floor(x))) == floor(sqrt(x)), so one integer square root is exact
+    return math.isqrt((numerator * 10**decimals1 << 192) // (denominator * 10**decimals0))
+
+
+def sqrt_price_x96_to_price(sqrt_price_x96):
+    """The price (sqrt_price_x96 / 2**96) ** 2, as an exact Fraction"""
+    return Fraction(sqrt_price_x96 * sqrt_price_x96, 2**192)
+
+
+def mul_batch(a, b):
+    """Raw values of `a * b` for every row of two columns of raw values"""
+    return [checked_mul(x, y) // ONE for x, y in zip_columns(a, b)]
+
+
+def div_batch(a, b):
+    """Raw values of `a / b` for every row of two columns of raw values"""
+    return [FixedQ64x96(x).div(FixedQ64x96(y)).value for x, y in zip_columns(a, b)]
+
+
+def sqrt_batch(values):
+    """Raw values of `sqrt` for a column of raw values"""
+    return [sqrt_raw(value) for (value,) in zip_columns(values)]
+
+
+def floor_batch(values):
+    """Raw values of `floor` for a column of raw values"""
+    return [value // ONE * ONE for (value,) in zip_columns(values)]
+
+
+def ceil_batch(values):
+    """Raw values of `ceil` for a column of raw values"""
+    return [FixedQ64x96(value).ceil().value for (value,) in zip_columns(values)]
+
+
+def price_to_sqrt_price_x96_batch(prices, decimals0=0, decimals1=0):
+    """`price_to_sqrt_price_x96` for a column of prices"""
+    return [price_to_sqrt_price_x96(price, decimals0, decimals1) for (price,) in zip_columns(prices)]
@@ -0,0 +1,115 @@
+"""u256 arithmetic mirroring `full_math` in fullmath.cairo.
+
+The scalar functions follow the Cairo code branch for branch, so they return the
+same value whenever the Cairo call succeeds, including the shortcut
+`mul_div_rounding_up` takes when `remainder * (b % denominator)` would overflow.
+Where Cairo panics they raise: ZeroDivisionError for the 'division by zero'
+assert and OverflowError, with the Cairo panic message, for a u256 operation
+that overflows. `checked_add` / `checked_sub` / `checked_mul` are those u256
+operations, for models built on top of this module.
+
+The `*_batch` variants take equally long columns of operands (sequences of ints
+or integer NumPy arrays) and return a list of ints. They run the scalar code per
+row: with u256 operands, converting to and from limbs.py columns costs more than
+the Python big-int arithmetic it would replace.
+"""
+MAX_U256 = 2**256 - 1
+
+
+def checked_add(a, b):
+    result = a + b
+    if result > MAX_U256:
+        raise OverflowError("u256_add Overflow")
+    return result
+
+
+def checked_sub(a, b):
+    if b > a:
+        raise OverflowError("u256_sub Overflow")
+    return a - b
+
+
+def checked_mul(a, b):
+    result = a * b
+    if result > MAX_U256:
+        raise OverflowError("u256_mul Overflow")
+    return result
+
+
+def mul_div(a, b, denominator):
+    """floor(a * b / denominator)"""
+    if denominator == 0:
+        raise ZeroDivisionError("division by zero")
+    if a == 0 or b == 0:
+        return 0
+    if a % denominator == 0:
+        return checked_mul(a // denominator, b)
+    if b % denominator == 0:
+        return checked_mul(a, b // denominator)
+
+    quotient, remainder = divmod(a, denominator)
+    return checked_add(checked_mul(quotient, b), checked_mul(remainder, b) // denominator)
+
+
+def mul_div_rounding_up(a, b, denominator):
+    """ceil(a * b / denominator), except where the Cairo code approximates (see module docstring)"""
+    if denominator == 0:
+        raise ZeroDivisionError("division by zero")
+    if a == 0 or b == 0:
+        return 0
+
+    if a <= 0xffffffff and b <= 0xffffffff:
+        result, remainder = divmod(a * b, denominator)
+        return result + 1 if remainder else result
+
+    quotient, remainder = divmod(a, denominator)
+    result = checked_mul(quotient, b)
+    if remainder == 0:
+        return result
+
+    if b < MAX_U256 // remainder:
+        rem_term, rem_remainder = divmod(remainder * b, denominator)
+        result = checked_add(result, rem_term)
+        return checked_add(result, 1) if rem_remainder else result
+
+    partial_b, b_remainder = divmod(b, denominator)
+    result = checked_add(result, checked_mul(remainder, partial_b))
+    if b_remainder == 0:
+        return result
+    if remainder <= MAX_U256 // b_remainder:
+        rem_term, rem_remainder = divmod(remainder * b_remainder, denominator)
+        result = checked_add(result, rem_term)
+        return checked_add(result, 1) if rem_remainder else result
+    # The Cairo code adds 1 instead of the overflowing remainder term
+    return checked_add(result, 1)
+
+
+def div_rounding_up(numerator, denominator):
+    """ceil(numerator / denominator)"""
+    if denominator == 0:
+        raise ZeroDivisionError("division by zero")
+    result, remainder = divmod(numerator, denominator)
+    return result + 1 if remainder else result
+
+
+def zip_columns(*columns):
+    """Rows of equally long columns, as tuples of Python ints"""
+    columns = [values.tolist() if hasattr(values, "tolist") else values for values in columns]
+    if len({len(values) for values in columns}) > 1:
+        raise ValueError("operand arrays must have the same length")
+    return zip(*columns)
+
+
+def mul_div_batch(a, b, denominator):
+    """`mul_div` for every row of three equally long columns; returns a list of ints"""
+    return [mul_div(*row) for row in zip_columns(a, b, denominator)]
+
+
+def mul_div_rounding_up_batch(a, b, denominator):
+    """`mul_div_rounding_up` for every row of three equally long columns; returns a list of ints"""
+    return [mul_div_rounding_up(*row) for row in zip_columns(a, b, denominator)]
+
+
+def div_rounding_up_batch(numerator, denominator):
+    """`div_rounding_up` for every row of two equally long columns; returns a list of ints"""
+    return [div_rounding_up(*row) for row in zip_columns(numerator, denominator)]
@@ -1,8 +1,12 @@
-from py_utils.uniswap_v3_math import price_to_tick, price_to_sqrtp, calc_amount0, calc_amount1, q96
+from py_utils.cairo_writer import emit
+from py_utils.uniswap_v3_math import TICK_SPACING, price_to_tick, price_to_sqrtp, calc_amount0, calc_amount1, q96
 
-def generate_mint_test_values(current_price, lower_price, upper_price, liquidity_amount):
+CAIRO_OUTPUT = "contract_tests/pool_contract_tests/mint_test_values.cairo"
+
+def generate_mint_test_values(current_price, lower_price, upper_price, liquidity_amount, tick_spacing=TICK_SPACING):
     """
     Generates expected values for mint test from given parameters.
+    The range ticks are rounded down to multiples of `tick_spacing`.
     Returns a dictionary with all necessary test values.
     """
     # Convert prices to ticks and sqrt prices
@@ -10,9 +14,7 @@ def generate_mint_test_values(current_price, lower_price, upper_price, liquidity
     lower_tick = price_to_tick(lower_price)
     upper_tick = price_to_tick(upper_price)
     
-    # Ensure ticks are on spacing boundaries (assuming tick spacing of 1 for simplicity)
-    # If using other tick spacing, adjust accordingly
-    tick_spacing = 1
+    # Ensure ticks are on spacing boundaries
     lower_tick = (lower_tick // tick_spacing) * tick_spacing
     upper_tick = (upper_tick // tick_spacing) * tick_spacing
     
@@ -53,13 +55,13 @@ def generate_mint_test_values(current_price, lower_price, upper_price, liquidity
         "amount1": amount1
     }
 
-def print_test_case(name, values):
-    """Pretty prints a test case in a Cairo-friendly format"""
-    print(f"// Test case: {name}")
-    print(f"// Price range: {values['lower_price']} - {values['upper_price']}, " 
-          f"current: {values['current_price']}")
-    print(f"// Expected token amounts: {values['amount0']} token0, {values['amount1']} token1")
-    print(f"""
+def cairo_test_case(name, values):
+    """A test case in a Cairo-friendly format"""
+    yield f"// Test case: {name}\n"
+    yield (f"// Price range: {values['lower_price']} - {values['upper_price']}, " 
+           f"current: {values['current_price']}\n")
+    yield f"// Expected token amounts: {values['amount0']} token0, {values['amount1']} token1\n"
+    yield f"""
 fn {name}_test_values() -> (TestParams, u256, u256) {{
     let params = TestParams {{
         strk_balance: {int(values['amount0'] * 1.1)}, // 10% buffer
@@ -78,7 +80,8 @@ fn {name}_test_values() -> (TestParams, u256, u256) {{
     
     (params, expected_amount0, expected_amount1)
 }}
-""")
+
+"""
 
 # Generate test cases
 test_cases = [
@@ -123,6 +126,5 @@ test_cases = [
     ))
 ]
 
-# Print all test cases
-for name, values in test_cases:
-    print_test_case(name, values)
+# Stream all test cases
+emit(chunk for name, values in test_cases for chunk in cairo_test_case(name, values))
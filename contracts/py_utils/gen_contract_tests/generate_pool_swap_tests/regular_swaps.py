@@ -1,6 +1,9 @@
-from py_utils.uniswap_v3_math import price_to_tick, price_to_sqrtp, calc_amount0, calc_amount1, q96
+from py_utils.cairo_writer import emit
+from py_utils.uniswap_v3_math import TICK_SPACING, price_to_tick, price_to_sqrtp, calc_amount0, calc_amount1, q96
 import math
 
+CAIRO_OUTPUT = "contract_tests/pool_contract_tests/swap_test_values.cairo"
+
 def generate_swap_test_values(
     current_price,
     lower_price,
@@ -8,10 +11,12 @@ def generate_swap_test_values(
     liquidity_amount,
     amount_in,
     zero_for_one,
-    expected_price_after=None
+    expected_price_after=None,
+    tick_spacing=TICK_SPACING
 ):
     """
     Generate test parameters for a swap with pre-computed expected values.
+    The range ticks are rounded down to multiples of `tick_spacing`.
     """
     # Convert prices to ticks and sqrt prices
     current_tick = price_to_tick(current_price)
@@ -19,7 +24,6 @@ def generate_swap_test_values(
     upper_tick = price_to_tick(upper_price)
     
     # Ensure ticks are on spacing boundaries
-    tick_spacing = 1
     lower_tick = (lower_tick // tick_spacing) * tick_spacing
     upper_tick = (upper_tick // tick_spacing) * tick_spacing
     
@@ -100,18 +104,18 @@ def generate_swap_test_values(
         "amount1_delta": amount1_delta
     }
 
-def print_swap_test_case(name, values):
-    """Pretty print a swap test case in Cairo-friendly format"""
+def cairo_swap_test_case(name, values):
+    """A swap test case in Cairo-friendly format"""
     direction = "token0_to_token1" if values["zero_for_one"] else "token1_to_token0"
     
-    print(f"// Test case: {name}")
-    print(f"// Direction: {direction}")
-    print(f"// Price range: {values['lower_price']} - {values['upper_price']}")
-    print(f"// Current price: {values['current_price']}, Expected after swap: {values['expected_price_after']}")
-    print(f"// Swap amount specified: {values['amount_specified']}")
-    print(f"// Expected token deltas: {values['amount0_delta']} token0, {values['amount1_delta']} token1")
+    yield f"// Test case: {name}\n"
+    yield f"// Direction: {direction}\n"
+    yield f"// Price range: {values['lower_price']} - {values['upper_price']}\n"
+    yield f"// Current price: {values['current_price']}, Expected after swap: {values['expected_price_after']}\n"
+    yield f"// Swap amount specified: {values['amount_specified']}\n"
+    yield f"// Expected token deltas: {values['amount0_delta']} token0, {values['amount1_delta']} token1\n"
     
-    print(f"""
+    yield f"""
 fn {name}_swap_test_values() -> (SwapTestParams, i128, i128) {{
     let params = SwapTestParams {{
         // Initial setup - price and liquidity
@@ -137,10 +141,11 @@ fn {name}_swap_test_values() -> (SwapTestParams, i128, i128) {{
     
     (params, expected_amount0, expected_amount1)
 }}
-""")
+
+"""
 
 # Define a new struct type for swap tests
-print("""
+SWAP_TEST_PARAMS_STRUCT = """
 #[derive(Copy, Drop, Serde)]
 struct SwapTestParams {
     // Initial setup - price and liquidity
@@ -159,7 +164,8 @@ struct SwapTestParams {
     mint_amount0: u256,
     mint_amount1: u256,
 }
-""")
+
+"""
 
 # Generate test cases covering essential scenarios
 test_cases = [
@@ -230,6 +236,10 @@ test_cases = [
     ))
 ]
 
-# Print all test cases
-for name, values in test_cases:
-    print_swap_test_case(name, values)
+def generate_cairo_tests():
+    yield SWAP_TEST_PARAMS_STRUCT
+    for name, values in test_cases:
+        yield from cairo_swap_test_case(name, values)
+
+# Stream the struct and all test cases
+emit(generate_cairo_tests())
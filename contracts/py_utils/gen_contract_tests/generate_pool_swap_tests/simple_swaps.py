@@ -1,6 +1,9 @@
+from py_utils.cairo_writer import emit
 from py_utils.uniswap_v3_math import price_to_tick, price_to_sqrtp, calc_amount0, calc_amount1, q96
 import math
 
+CAIRO_OUTPUT = "contract_tests/pool_contract_tests/simple_swap_test_values.cairo"
+
 def generate_simple_swap_tests():
     """Generate simplified swap test cases that minimize loop iterations for easier debugging"""
     
@@ -130,20 +133,20 @@ def generate_simple_swap_tests():
     
     return test_cases
 
-def print_swap_test_case(values):
-    """Print a swap test case in Cairo-friendly format"""
+def cairo_swap_test_case(values):
+    """A swap test case in Cairo-friendly format"""
     name = values["name"]
     direction = "token0_to_token1" if values["zero_for_one"] else "token1_to_token0"
     
-    print(f"// Test case: {name}")
-    print(f"// Description: {values['description']}")
-    print(f"// Direction: {direction}")
-    print(f"// Current tick: {values['current_tick']}")
-    print(f"// Current price: {values['current_price']}")
-    print(f"// Swap amount specified: {values['amount_specified']}")
-    print(f"// Expected token deltas: {values['amount0_delta']} token0, {values['amount1_delta']} token1")
+    yield f"// Test case: {name}\n"
+    yield f"// Description: {values['description']}\n"
+    yield f"// Direction: {direction}\n"
+    yield f"// Current tick: {values['current_tick']}\n"
+    yield f"// Current price: {values['current_price']}\n"
+    yield f"// Swap amount specified: {values['amount_specified']}\n"
+    yield f"// Expected token deltas: {values['amount0_delta']} token0, {values['amount1_delta']} token1\n"
     
-    print(f"""
+    yield f"""
 fn {name}_swap_test_values() -> (SwapTestParams, i128, i128) {{
     let params = SwapTestParams {{
         // Initial setup - price and liquidity
@@ -169,12 +172,12 @@ fn {name}_swap_test_values() -> (SwapTestParams, i128, i128) {{
     
     (params, expected_amount0, expected_amount1)
 }}
-""")
 
-def main():
-    
+"""
+
+def generate_cairo_tests():
     # Define the SwapTestParams struct
-    print("""
+    yield """
 #[derive(Copy, Drop, Serde)]
 struct SwapTestParams {
     // Initial setup - price and liquidity
@@ -193,15 +196,18 @@ struct SwapTestParams {
     mint_amount0: u256,
     mint_amount1: u256,
 }
-""")
+
+"""
     
     # Generate simplified test cases
     test_cases = generate_simple_swap_tests()
     
-    # Print each test case
+    # Stream each test case
     for case in test_cases:
-        print_swap_test_case(case)
-    
+        yield from cairo_swap_test_case(case)
+
+def main():
+    emit(generate_cairo_tests())
 
 if __name__ == "__main__":
     main()
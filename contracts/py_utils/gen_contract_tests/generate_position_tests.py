@@ -1,7 +1,11 @@
+from py_utils.cairo_writer import emit
+
+CAIRO_OUTPUT = "contract_tests/position_tests.cairo"
+
 def generate_position_tests():
     """Generate Cairo test code for the Position contract"""
     
-    code = """
+    yield """
 // Position Contract Tests - Auto-generated
 
 use contracts::contract::interface::IPositionTrait;
@@ -56,7 +60,7 @@ mod position_tests {
     
     # Test cases for basic position operations
     
-    code += """
+    yield """
     #[test]
     fn test_create_single_position() {
         // Test creating a single position
@@ -129,7 +133,7 @@ mod position_tests {
     
     # Test cases for multiple positions
     
-    code += """
+    yield """
     #[test]
     fn test_multiple_positions_different_owners() {
         // Test multiple positions with different owners
@@ -207,7 +211,7 @@ mod position_tests {
     
     # Test cases for edge cases and limits
     
-    code += """
+    yield """
     #[test]
     fn test_update_to_zero() {
         // Test updating a position to exactly zero liquidity
@@ -282,7 +286,7 @@ mod position_tests {
     
     # Test cases for boundary tick values
     
-    code += """
+    yield """
     #[test]
     fn test_min_max_ticks() {
         // Test with minimum and maximum tick values
@@ -324,7 +328,7 @@ mod position_tests {
     
     # Test cases for complex update patterns
     
-    code += """
+    yield """
     #[test]
     fn test_multiple_updates_same_position() {
         // Test multiple updates to the same position
@@ -371,12 +375,10 @@ mod position_tests {
     """
     
     # Close the module
-    code += """
+    yield """
 }  // End of position_tests module
+
 """
-    
-    return code
 
 if __name__ == "__main__":
-    test_code = generate_position_tests()
-    print(test_code)
+    emit(generate_position_tests())
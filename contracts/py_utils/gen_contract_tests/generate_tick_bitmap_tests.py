@@ -1,14 +1,7 @@
-def position(tick):
-    """Calculate the position in the bitmap from a tick index"""
-    word_pos = tick // 256
-    bit_pos = tick % 256
-    
-    # Handle negative ticks that aren't multiples of 256
-    if tick < 0 and tick % 256 != 0:
-        word_pos -= 1
-        bit_pos = 255 - (((-tick) % 256) - 1)
-    
-    return (word_pos, bit_pos)
+from py_utils.cairo_writer import emit
+from py_utils.tick_bitmap import position, most_significant_bit, least_significant_bit
+
+CAIRO_OUTPUT = "contract_tests/tick_bitmap_tests.cairo"
 
 def calculate_mask(bit_pos):
     """Calculate a mask with a 1 at the bit position"""
@@ -22,43 +15,23 @@ def flip_bit(word, bit_pos):
 def find_next_initialized_tick(word, bit_pos, lte):
     """Find the next initialized tick within a word"""
     if lte:  # Less than or equal (searching right to left)
-        if bit_pos == 255:
-            mask = 2**256 - 1  # All bits set
-        else:
-            mask = (1 << (bit_pos + 1)) - 1
-        
-        masked_word = word & mask
+        masked_word = word & ((1 << (bit_pos + 1)) - 1)
         
         if masked_word != 0:
-            # Find most significant bit
-            msb = 0
-            for i in range(256):
-                if (masked_word >> i) & 1:
-                    msb = i
-            return (msb, True)
+            return (most_significant_bit(masked_word), True)
         return (255, False)  # No initialized tick found
     else:  # Greater than (searching left to right)
-        if bit_pos == 255:
-            mask = 0
-        else:
-            mask = (2**256 - 1) - ((1 << (bit_pos + 1)) - 1)
+        masked_word = word & ~((1 << (bit_pos + 1)) - 1)
             
-        masked_word = word & mask
-        
         if masked_word != 0:
-            # Find least significant bit
-            lsb = 255
-            for i in range(255, -1, -1):
-                if (masked_word >> i) & 1:
-                    lsb = i
-            return (lsb, True)
+            return (least_significant_bit(masked_word), True)
         return (0, False)  # No initialized tick found
 
 def generate_cairo_tests():
     """Generate Cairo test code for TickBitmap contract testing"""
     
     # Start with test code boilerplate
-    code = """
+    yield """
 #[test]
 mod tick_bitmap_tests {
     
@@ -99,7 +72,7 @@ mod tick_bitmap_tests {
     for name, tick, tick_spacing, word_before, word_after in test_cases_flip:
         word_pos, bit_pos = position(tick // tick_spacing)
         
-        code += f"""
+        yield f"""
     #[test]
     fn test_flip_tick_{name}() {{
         let dispatcher = deploy_tick_bitmap();
@@ -159,13 +132,11 @@ mod tick_bitmap_tests {
     
     # Generate test functions for next_initialized_tick_within_one_word
     for name, initial_ticks, test_tick, lte, expected_tick, expected_initialized in test_cases_next:
-        setup_code = ""
-        for tick in initial_ticks:
-            setup_code += f"""
-        dispatcher.flip_tick({tick}, {tick_spacing});"""
+        setup_code = "".join(f"""
+        dispatcher.flip_tick({tick}, {tick_spacing});""" for tick in initial_ticks)
         
         direction = "lte" if lte else "gt"
-        code += f"""
+        yield f"""
     #[test]
     fn test_next_tick_{name}() {{
         let dispatcher = deploy_tick_bitmap();
@@ -184,7 +155,7 @@ mod tick_bitmap_tests {
 """
     
     # Special test cases for complex scenarios
-    code += """
+    yield """
     #[test]
     fn test_complex_bitmap() {
         let dispatcher = deploy_tick_bitmap();
@@ -222,9 +193,8 @@ mod tick_bitmap_tests {
     }
     """
     
-    # Close the module and return the full code
-    code += "\n}\n"
-    return code
+    # Close the module
+    yield "\n}\n\n"
 
 if __name__ == "__main__":
-    print(generate_cairo_tests())
+    emit(generate_cairo_tests())
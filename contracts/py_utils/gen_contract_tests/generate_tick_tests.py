@@ -1,10 +1,14 @@
+from py_utils.cairo_writer import emit
+
+CAIRO_OUTPUT = "contract_tests/tick_tests.cairo"
+
 def generate_tick_tests():
     """
     Generate Cairo test code for testing the Tick contract
     """
     
     # Start with the test file boilerplate
-    code = """
+    yield """
 // TickTests - Auto-generated tests for the Tick contract
 
 
@@ -34,7 +38,7 @@ mod tick_tests {
     
     # Test cases for update() function
     
-    code += """
+    yield """
     #[test]
     fn test_update_initialize_lower_tick() {
         // Test initializing a tick as a lower tick (not upper)
@@ -158,7 +162,7 @@ mod tick_tests {
     
     # Test cases for cross() function
     
-    code += """
+    yield """
     #[test]
     fn test_cross_uninitialized_tick() {
         // Test crossing a tick that hasn't been initialized
@@ -206,7 +210,7 @@ mod tick_tests {
     
     # Test cases for is_init() function
     
-    code += """
+    yield """
     #[test]
     fn test_is_init_lifecycle() {
         // Test the is_init function through a tick's lifecycle
@@ -235,7 +239,7 @@ mod tick_tests {
     
     # Complex test cases with multiple ticks
     
-    code += """
+    yield """
     #[test]
     fn test_multiple_ticks_scenario() {
         // Comprehensive test with multiple ticks in a realistic scenario
@@ -319,7 +323,7 @@ mod tick_tests {
     
     # Edge cases and boundary tests
     
-    code += """
+    yield """
     #[test]
     fn test_zero_liquidity_delta() {
         // Test with a zero liquidity delta
@@ -360,12 +364,10 @@ mod tick_tests {
     """
     
     # Close the module
-    code += """
+    yield """
 }  // End of tick_tests module
+
 """
-    
-    return code
 
 if __name__ == "__main__":
-    test_code = generate_tick_tests()
-    print(test_code)
+    emit(generate_tick_tests())
@@ -1,39 +1,31 @@
-from decimal import Decimal, getcontext
-import math
+from py_utils.cairo_writer import emit
+from py_utils.fixed_point import ONE, FixedQ64x96, price_to_sqrt_price_x96, sqrt_price_x96_to_price
+from py_utils.tick_math import MAX_SQRT_RATIO, MIN_SQRT_RATIO
 
-# Set high precision for calculations
-getcontext().prec = 40
-
-# Constants
-Q96 = Decimal(2) ** 96
-MIN_SQRT_RATIO = Decimal('4295128739')
-MAX_SQRT_RATIO = Decimal('1461446703485210103287273052203988822378723970342')
-ONE = int(Q96)
+CAIRO_OUTPUT = "math_tests/number/fixed_point_test.cairo"
 
 def price_to_sqrtp(price):
     """Convert a price to its sqrt representation * 2^96"""
-    return int(Decimal(price).sqrt() * Q96)
+    return price_to_sqrt_price_x96(price)
 
 def sqrtp_to_price(sqrtp):
-    """Convert a sqrt price * 2^96 to regular price"""
-    return (Decimal(sqrtp) / Q96) ** 2
+    """Convert a sqrt price * 2^96 to regular price, as an exact Fraction"""
+    return sqrt_price_x96_to_price(sqrtp)
 
 def calc_liquidity_from_token0(amount, sqrt_price_current, sqrt_price_upper):
     """Calculate liquidity from token0 amount"""
-    price_diff = Decimal(sqrt_price_upper) - Decimal(sqrt_price_current)
-    return int(Decimal(amount) * Decimal(sqrt_price_current) * Decimal(sqrt_price_upper) / price_diff)
+    return amount * sqrt_price_current * sqrt_price_upper // (sqrt_price_upper - sqrt_price_current)
 
 def calc_liquidity_from_token1(amount, sqrt_price_lower, sqrt_price_current):
     """Calculate liquidity from token1 amount"""
-    price_diff = Decimal(sqrt_price_current) - Decimal(sqrt_price_lower)
-    return int(Decimal(amount) / price_diff)
+    return amount // (sqrt_price_current - sqrt_price_lower)
 
 def generate_cairo_tests():
     # Generate test_uniswap_specific_operations
-    price_2000 = 2000 * ONE
+    price_2000 = FixedQ64x96.new_unscaled(2000)
     sqrt_price_2000 = price_to_sqrtp(2000)
-    tick_23028_value = 79228162514264337593543950336  # From your test
-    price_from_tick = int((Decimal(tick_23028_value) / Q96) ** 2 * Q96)
+    tick_23028 = FixedQ64x96.new(79228162514264337593543950336)  # From your test
+    price_from_tick = (tick_23028 * tick_23028).value
     
     # For test_uniswap_liquidity_calculations
     sqrt_price_1500 = price_to_sqrtp(1500)
@@ -43,28 +35,23 @@ def generate_cairo_tests():
     token0_amount = ONE  # 1 ETH
     token1_amount = ONE * 2000  # 2000 USDC
     
-    # Split calculation to avoid overflow
-    numerator = Decimal(token0_amount) * Decimal(sqrt_price_2000) 
-    numerator = numerator * Decimal(sqrt_price_2500)
-    denominator = Decimal(sqrt_price_2500) - Decimal(sqrt_price_2000)
-    liquidity_from_token0 = int(numerator / denominator)
-    
-    liquidity_from_token1 = int(Decimal(token1_amount) / (Decimal(sqrt_price_2000) - Decimal(sqrt_price_1500)))
+    liquidity_from_token0 = calc_liquidity_from_token0(token0_amount, sqrt_price_2000, sqrt_price_2500)
+    liquidity_from_token1 = calc_liquidity_from_token1(token1_amount, sqrt_price_1500, sqrt_price_2000)
     
-    # For test_edge_case_sqrt_price_calculations
-    near_min = MIN_SQRT_RATIO + 100
-    near_min_squared = int((Decimal(near_min) / Q96) ** 2 * Q96)
-    sqrt_result_near_min = int(Decimal(near_min_squared).sqrt() * Q96)
+    # For test_edge_case_sqrt_price_calculations, the operations the Cairo test runs
+    near_min = FixedQ64x96.new(MIN_SQRT_RATIO + 100)
+    near_min_squared = near_min * near_min
+    sqrt_result_near_min = near_min_squared.sqrt()
     
-    near_max = MAX_SQRT_RATIO - 1000
-    half_max = int(near_max / 2)
-    twice_half = int(half_max * 2)
+    near_max = FixedQ64x96.new(MAX_SQRT_RATIO - 1000)
+    half_max = near_max / FixedQ64x96.new_unscaled(2)
+    twice_half = half_max * FixedQ64x96.new_unscaled(2)
     
-    # Output generated Cairo tests
-    print("// Generated Cairo test code with precomputed values\n")
+    # Stream the generated Cairo tests
+    yield "// Generated Cairo test code with precomputed values\n\n"
     
     # Generate test_uniswap_specific_operations
-    print("""#[test]
+    yield """#[test]
 fn test_uniswap_specific_operations() {
     // Precomputed values
     let ONE = 79228162514264337593543950336_u256; // 2^96
@@ -96,10 +83,11 @@ fn test_uniswap_specific_operations() {
         'Tick to price conversion failed'
     );
 }
-""")
+
+"""
 
     # Generate test_uniswap_liquidity_calculations
-    print("""#[test]
+    yield """#[test]
 fn test_uniswap_liquidity_calculations() {
     // Precomputed values for sqrt prices
     let sqrt_price_1500 = IFixedQ64x96Impl::new(3068493539683605256287027819677_u256);
@@ -148,13 +136,11 @@ fn test_uniswap_liquidity_calculations() {
     
     assert(min_liquidity > 0_u256, 'Invalid minimum liquidity');
 }
-""")
+
+"""
 
     # Generate test_edge_case_sqrt_price_calculations
-    # Format the near_max value explicitly as a decimal integer
-    near_max_str = str(near_max).split('.')[0]  # Just the integer part
-    
-    print("""#[test]
+    yield """#[test]
 fn test_edge_case_sqrt_price_calculations() {
     // Test with values near MIN_SQRT_RATIO
     let near_min_value = 4295128839_u256; // MIN_SQRT_RATIO + 100
@@ -174,7 +160,7 @@ fn test_edge_case_sqrt_price_calculations() {
     );
     
     // Test with values near MAX_SQRT_RATIO
-    let near_max_value = """ + near_max_str + """_u256; // MAX_SQRT_RATIO - 1000
+    let near_max_value = """ + str(near_max.value) + """_u256; // MAX_SQRT_RATIO - 1000
     let near_max = IFixedQ64x96Impl::new(near_max_value);
     
     // Test dividing by 2 and multiplying by 2 should return approximately the original
@@ -189,7 +175,8 @@ fn test_edge_case_sqrt_price_calculations() {
         'Edge case multiplication failed'
     );
 }
-""")
+
+"""
 
 if __name__ == "__main__":
-    generate_cairo_tests()
+    emit(generate_cairo_tests())
@@ -1,26 +1,32 @@
+from py_utils.cairo_writer import emit
 from utils import (
     generate_calc_amount0_test_cases,
     generate_calc_amount1_test_cases,
-    print_cairo_test_code,
+    cairo_test_code,
     generate_swap_test_case,
-    print_test_values
+    exact_test_values
 )
 
-def main():
-    # Print exact values for test cases
-    print(" // --- Exact Test Values --- //")
-    print_test_values()
-    print("// --- END --- //")
+CAIRO_OUTPUT = "math_tests/liquidity_math_test.cairo"
+
+def generate_cairo_tests():
+    # Exact values for test cases
+    yield " // --- Exact Test Values --- //\n"
+    yield from exact_test_values()
+    yield "// --- END --- //\n"
 
-    # Generate and print Cairo test code
-    print("\n // --- Cairo Test Code for calc_amount0_delta --- // ")
-    print_cairo_test_code(generate_calc_amount0_test_cases(), "calc_amount0_delta")
+    # Cairo test code
+    yield "\n // --- Cairo Test Code for calc_amount0_delta --- // \n"
+    yield from cairo_test_code(generate_calc_amount0_test_cases(), "calc_amount0_delta")
     
-    print("\n // --- Cairo Test Code for calc_amount1_delta --- // ")
-    print_cairo_test_code(generate_calc_amount1_test_cases(), "calc_amount1_delta")
+    yield "\n // --- Cairo Test Code for calc_amount1_delta --- // \n"
+    yield from cairo_test_code(generate_calc_amount1_test_cases(), "calc_amount1_delta")
     
-    print("\n // --- Cairo Test Code for swap calculation --- // ")
-    generate_swap_test_case()
+    yield "\n // --- Cairo Test Code for swap calculation --- // \n"
+    yield from generate_swap_test_case()
+
+def main():
+    emit(generate_cairo_tests())
 
 if __name__ == "__main__":
     main()
@@ -1,64 +1,15 @@
-from utils import q96
-import math
+import sys
 
-def next_sqrt_price_from_amount0(sqrt_price_x96, liquidity, amount, add):
-    """
-    Python implementation of getNextSqrtPriceFromAmount0RoundingUp
-    Based on Uniswap v3 SqrtPriceMath.sol
-    """
-    if amount == 0:
-        return sqrt_price_x96
-    
-    numerator1 = liquidity * (1 << 96)
-    
-    if add:
-        product = amount * sqrt_price_x96
-        denominator = numerator1 + product
-        
-        if denominator >= numerator1:
-            # First formula: numerator1 * sqrtPX96 / (numerator1 + amount * sqrtPX96)
-            return (numerator1 * sqrt_price_x96) // denominator
-        else:
-            # Alternative formula for large numbers
-            return numerator1 // ((numerator1 // sqrt_price_x96) + amount)
-    else:
-        # Removing token0 increases price
-        product = amount * sqrt_price_x96
-        
-        # Ensure we're not removing more than available (this check is in the actual contract)
-        if product >= numerator1:
-            # For test purposes, adjust to a safe value
-            safe_amount = (numerator1 * 80 // 100) // sqrt_price_x96  # 80% of max as safety margin
-            product = safe_amount * sqrt_price_x96
-            amount = safe_amount
-            
-        denominator = numerator1 - product
-        return (numerator1 * sqrt_price_x96) // denominator
+from py_utils.cairo_writer import emit
+from py_utils.sqrtprice_math import (
+    get_next_sqrt_price_from_amount0_rounding_up,
+    get_next_sqrt_price_from_amount1_rounding_down,
+    get_next_sqrt_price_from_input,
+    get_next_sqrt_price_from_output,
+)
+from utils import q96
 
-def next_sqrt_price_from_amount1(sqrt_price_x96, liquidity, amount, add):
-    """
-    Python implementation of getNextSqrtPriceFromAmount1RoundingDown
-    Based on Uniswap v3 SqrtPriceMath.sol
-    """
-    if amount == 0:
-        return sqrt_price_x96
-    
-    if add:
-        # Adding token1 increases price
-        quotient = (amount << 96) // liquidity
-        return sqrt_price_x96 + quotient
-    else:
-        # Removing token1 decreases price
-        quotient = (amount << 96) // liquidity
-        
-        # Ensure we're not removing more than available
-        if quotient >= sqrt_price_x96:
-            # For test purposes, adjust to a safe value
-            safe_amount = (sqrt_price_x96 * 80 // 100) * liquidity // (1 << 96)  # 80% of max
-            quotient = (safe_amount << 96) // liquidity
-            amount = safe_amount
-            
-        return sqrt_price_x96 - quotient
+CAIRO_OUTPUT = "math_tests/sqrtprice_math_test.cairo"
 
 def generate_amount0_test_cases():
     """Generate test cases for get_next_sqrt_price_from_amount0_rounding_up"""
@@ -84,7 +35,7 @@ def generate_amount0_test_cases():
     amount = 100000000000000000  # 0.1 ETH
     add = True
     try:
-        expected = next_sqrt_price_from_amount0(sqrt_price, liquidity, amount, add)
+        expected = get_next_sqrt_price_from_amount0_rounding_up(sqrt_price, liquidity, amount, add)
         test_cases.append({
             'name': 'adding_token0',
             'sqrt_price_x96': sqrt_price,
@@ -93,8 +44,8 @@ def generate_amount0_test_cases():
             'add': add,
             'expected': expected
         })
-    except Exception as e:
-        print(f"Skipping test case due to: {e}")
+    except (ValueError, ArithmeticError) as e:
+        print(f"Skipping test case due to: {e}", file=sys.stderr)
     
     # Case 3: Removing token0 (price increases)
     # Calculate a safe amount that won't underflow
@@ -102,7 +53,7 @@ def generate_amount0_test_cases():
     amount = min(50000000000000000, max_safe_amount)  # 0.05 ETH or less if needed
     add = False
     try:
-        expected = next_sqrt_price_from_amount0(sqrt_price, liquidity, amount, add)
+        expected = get_next_sqrt_price_from_amount0_rounding_up(sqrt_price, liquidity, amount, add)
         test_cases.append({
             'name': 'removing_token0',
             'sqrt_price_x96': sqrt_price,
@@ -111,8 +62,8 @@ def generate_amount0_test_cases():
             'add': add,
             'expected': expected
         })
-    except Exception as e:
-        print(f"Skipping test case due to: {e}")
+    except (ValueError, ArithmeticError) as e:
+        print(f"Skipping test case due to: {e}", file=sys.stderr)
     
     # Case 4: Real-world example from ETH/USDC pool
     sqrt_price = 2505414483750479311864138015198786
@@ -120,7 +71,7 @@ def generate_amount0_test_cases():
     amount = 1000000000000000000  # 1 ETH
     add = True
     try:
-        expected = next_sqrt_price_from_amount0(sqrt_price, liquidity, amount, add)
+        expected = get_next_sqrt_price_from_amount0_rounding_up(sqrt_price, liquidity, amount, add)
         test_cases.append({
             'name': 'real_example',
             'sqrt_price_x96': sqrt_price,
@@ -129,8 +80,8 @@ def generate_amount0_test_cases():
             'add': add,
             'expected': expected
         })
-    except Exception as e:
-        print(f"Skipping test case due to: {e}")
+    except (ValueError, ArithmeticError) as e:
+        print(f"Skipping test case due to: {e}", file=sys.stderr)
     
     return test_cases
 
@@ -158,7 +109,7 @@ def generate_amount1_test_cases():
     amount = 100000000000000000  # 0.1 ETH worth of token1
     add = True
     try:
-        expected = next_sqrt_price_from_amount1(sqrt_price, liquidity, amount, add)
+        expected = get_next_sqrt_price_from_amount1_rounding_down(sqrt_price, liquidity, amount, add)
         test_cases.append({
             'name': 'adding_token1',
             'sqrt_price_x96': sqrt_price,
@@ -167,15 +118,15 @@ def generate_amount1_test_cases():
             'add': add,
             'expected': expected
         })
-    except Exception as e:
-        print(f"Skipping test case due to: {e}")
+    except (ValueError, ArithmeticError) as e:
+        print(f"Skipping test case due to: {e}", file=sys.stderr)
     
     # Case 3: Removing token1 (price decreases)
     max_safe_amount = (sqrt_price * 80 // 100) * liquidity // (1 << 96)
     amount = min(50000000000000000, max_safe_amount)
     add = False
     try:
-        expected = next_sqrt_price_from_amount1(sqrt_price, liquidity, amount, add)
+        expected = get_next_sqrt_price_from_amount1_rounding_down(sqrt_price, liquidity, amount, add)
         test_cases.append({
             'name': 'removing_token1',
             'sqrt_price_x96': sqrt_price,
@@ -184,8 +135,8 @@ def generate_amount1_test_cases():
             'add': add,
             'expected': expected
         })
-    except Exception as e:
-        print(f"Skipping test case due to: {e}")
+    except (ValueError, ArithmeticError) as e:
+        print(f"Skipping test case due to: {e}", file=sys.stderr)
     
     # Case 4: Real-world example from ETH/USDC pool
     sqrt_price = 2505414483750479311864138015198786
@@ -193,7 +144,7 @@ def generate_amount1_test_cases():
     amount = 2000000000  # 2000 USDC
     add = True
     try:
-        expected = next_sqrt_price_from_amount1(sqrt_price, liquidity, amount, add)
+        expected = get_next_sqrt_price_from_amount1_rounding_down(sqrt_price, liquidity, amount, add)
         test_cases.append({
             'name': 'real_example',
             'sqrt_price_x96': sqrt_price,
@@ -202,8 +153,8 @@ def generate_amount1_test_cases():
             'add': add,
             'expected': expected
         })
-    except Exception as e:
-        print(f"Skipping test case due to: {e}")
+    except (ValueError, ArithmeticError) as e:
+        print(f"Skipping test case due to: {e}", file=sys.stderr)
     
     return test_cases
 
@@ -217,7 +168,7 @@ def generate_input_test_cases():
     amount = 100000000000000000  # 0.1 ETH
     zero_for_one = True
     try:
-        expected = next_sqrt_price_from_amount0(sqrt_price, liquidity, amount, True)
+        expected = get_next_sqrt_price_from_input(sqrt_price, liquidity, amount, zero_for_one)
         test_cases.append({
             'name': 'token0',
             'sqrt_price_x96': sqrt_price,
@@ -226,13 +177,13 @@ def generate_input_test_cases():
             'zero_for_one': zero_for_one,
             'expected': expected
         })
-    except Exception as e:
-        print(f"Skipping test case due to: {e}")
+    except (ValueError, ArithmeticError) as e:
+        print(f"Skipping test case due to: {e}", file=sys.stderr)
     
     # Case 2: Input token1 (price increases)
     zero_for_one = False
     try:
-        expected = next_sqrt_price_from_amount1(sqrt_price, liquidity, amount, True)
+        expected = get_next_sqrt_price_from_input(sqrt_price, liquidity, amount, zero_for_one)
         test_cases.append({
             'name': 'token1',
             'sqrt_price_x96': sqrt_price,
@@ -241,8 +192,8 @@ def generate_input_test_cases():
             'zero_for_one': zero_for_one,
             'expected': expected
         })
-    except Exception as e:
-        print(f"Skipping test case due to: {e}")
+    except (ValueError, ArithmeticError) as e:
+        print(f"Skipping test case due to: {e}", file=sys.stderr)
     
     # Case 3: ETH/USDC swap example - selling ETH for USDC
     sqrt_price = 2505414483750479311864138015198786  # ~2000 USDC per ETH
@@ -250,7 +201,7 @@ def generate_input_test_cases():
     amount = 500000000000000000  # 0.5 ETH
     zero_for_one = True
     try:
-        expected = next_sqrt_price_from_amount0(sqrt_price, liquidity, amount, True)
+        expected = get_next_sqrt_price_from_input(sqrt_price, liquidity, amount, zero_for_one)
         test_cases.append({
             'name': 'eth_to_usdc',
             'sqrt_price_x96': sqrt_price,
@@ -259,14 +210,14 @@ def generate_input_test_cases():
             'zero_for_one': zero_for_one,
             'expected': expected
         })
-    except Exception as e:
-        print(f"Skipping test case due to: {e}")
+    except (ValueError, ArithmeticError) as e:
+        print(f"Skipping test case due to: {e}", file=sys.stderr)
     
     # Case 4: ETH/USDC swap example - buying ETH with USDC
     amount = 1000000000  # 1000 USDC
     zero_for_one = False
     try:
-        expected = next_sqrt_price_from_amount1(sqrt_price, liquidity, amount, True)
+        expected = get_next_sqrt_price_from_input(sqrt_price, liquidity, amount, zero_for_one)
         test_cases.append({
             'name': 'usdc_to_eth',
             'sqrt_price_x96': sqrt_price,
@@ -275,8 +226,8 @@ def generate_input_test_cases():
             'zero_for_one': zero_for_one,
             'expected': expected
         })
-    except Exception as e:
-        print(f"Skipping test case due to: {e}")
+    except (ValueError, ArithmeticError) as e:
+        print(f"Skipping test case due to: {e}", file=sys.stderr)
     
     return test_cases
 
@@ -291,7 +242,7 @@ def generate_output_test_cases():
     amount = (sqrt_price * 10 // 100) * liquidity // (1 << 96)  # 10% of available token1
     zero_for_one = True  # We're swapping token0 for token1
     try:
-        expected = next_sqrt_price_from_amount1(sqrt_price, liquidity, amount, False)
+        expected = get_next_sqrt_price_from_output(sqrt_price, liquidity, amount, zero_for_one)
         test_cases.append({
             'name': 'token1_out',
             'sqrt_price_x96': sqrt_price,
@@ -300,15 +251,15 @@ def generate_output_test_cases():
             'zero_for_one': zero_for_one,
             'expected': expected
         })
-    except Exception as e:
-        print(f"Skipping test case due to: {e}")
+    except (ValueError, ArithmeticError) as e:
+        print(f"Skipping test case due to: {e}", file=sys.stderr)
     
     # Case 2: Output token0 (selling token1, price increases)
     # Safe amount for token0 output
     amount = (liquidity * q96 * 10 // 100) // sqrt_price  # 10% of available token0
     zero_for_one = False  # We're swapping token1 for token0
     try:
-        expected = next_sqrt_price_from_amount0(sqrt_price, liquidity, amount, False)
+        expected = get_next_sqrt_price_from_output(sqrt_price, liquidity, amount, zero_for_one)
         test_cases.append({
             'name': 'token0_out',
             'sqrt_price_x96': sqrt_price,
@@ -317,8 +268,8 @@ def generate_output_test_cases():
             'zero_for_one': zero_for_one,
             'expected': expected
         })
-    except Exception as e:
-        print(f"Skipping test case due to: {e}")
+    except (ValueError, ArithmeticError) as e:
+        print(f"Skipping test case due to: {e}", file=sys.stderr)
     
     # Case 3: ETH/USDC swap example - buying ETH with USDC (exact output)
     sqrt_price = 2505414483750479311864138015198786  # ~2000 USDC per ETH
@@ -328,7 +279,7 @@ def generate_output_test_cases():
     amount = min(100000000000000000, max_safe_amount)  # Max 0.1 ETH
     zero_for_one = False  # Swapping USDC for ETH
     try:
-        expected = next_sqrt_price_from_amount0(sqrt_price, liquidity, amount, False)
+        expected = get_next_sqrt_price_from_output(sqrt_price, liquidity, amount, zero_for_one)
         test_cases.append({
             'name': 'exact_eth_out',
             'sqrt_price_x96': sqrt_price,
@@ -337,8 +288,8 @@ def generate_output_test_cases():
             'zero_for_one': zero_for_one,
             'expected': expected
         })
-    except Exception as e:
-        print(f"Skipping test case due to: {e}")
+    except (ValueError, ArithmeticError) as e:
+        print(f"Skipping test case due to: {e}", file=sys.stderr)
     
     # Case 4: ETH/USDC swap example - selling ETH for USDC (exact output)
     # Safe amount for USDC output (token1)
@@ -346,7 +297,7 @@ def generate_output_test_cases():
     amount = min(500000000, max_safe_amount)  # Max 500 USDC
     zero_for_one = True  # Swapping ETH for USDC
     try:
-        expected = next_sqrt_price_from_amount1(sqrt_price, liquidity, amount, False)
+        expected = get_next_sqrt_price_from_output(sqrt_price, liquidity, amount, zero_for_one)
         test_cases.append({
             'name': 'exact_usdc_out',
             'sqrt_price_x96': sqrt_price,
@@ -355,118 +306,78 @@ def generate_output_test_cases():
             'zero_for_one': zero_for_one,
             'expected': expected
         })
-    except Exception as e:
-        print(f"Skipping test case due to: {e}")
+    except (ValueError, ArithmeticError) as e:
+        print(f"Skipping test case due to: {e}", file=sys.stderr)
     
     return test_cases
 
-def print_amount0_test_code(test_cases):
+def cairo_test(function, test_prefix, comment, case, amount_name, flag_name):
+    """One Cairo test asserting that `SqrtPriceMath::function` returns exactly the expected price"""
+    yield f"#[test]\n"
+    yield f"fn test_{test_prefix}_{case['name']}() {{\n"
+    yield f"    // {comment}\n"
+    yield f"    let sqrt_price_x96 = FixedQ64x96 {{ value: {case['sqrt_price_x96']}_u256 }};\n"
+    yield f"    let liquidity = {case['liquidity']}_u128;\n"
+    yield f"    let {amount_name} = {case['amount']}_u256;\n"
+    yield f"    let {flag_name} = {str(case[flag_name]).lower()};\n"
+    yield f"\n"
+    yield f"    let result = SqrtPriceMath::{function}(\n"
+    yield f"        sqrt_price_x96.clone(), liquidity, {amount_name}, {flag_name},\n"
+    yield f"    );\n"
+    yield f"\n"
+    yield f"    assert(result.value == {case['expected']}_u256, 'Price calculation incorrect');\n"
+    yield f"}}\n\n"
+
+def amount0_test_code(test_cases):
     """Generate Cairo test code for get_next_sqrt_price_from_amount0_rounding_up"""
     for case in test_cases:
-        print(f"#[test]")
-        print(f"fn test_get_next_sqrt_price_from_amount0_{case['name']}() {{")
-        print(f"    // Test price calculation when {'adding' if case['add'] else 'removing'} token0")
-        print(f"    let sqrt_price_x96 = FixedQ64x96 {{ value: {case['sqrt_price_x96']}_u256 }};")
-        print(f"    let liquidity = {case['liquidity']}_u128;")
-        print(f"    let amount = {case['amount']}_u256;")
-        print(f"    let add = {str(case['add']).lower()};")
-        print(f"")
-        print(f"    let result = SqrtPriceMath::get_next_sqrt_price_from_amount0_rounding_up(")
-        print(f"        sqrt_price_x96.clone(), liquidity, amount, add")
-        print(f"    );")
-        print(f"")
-        print(f"    println!(\"Initial price: {{}}, Result price: {{}}\", sqrt_price_x96.value, result.value);")
-        print(f"    let expected = {case['expected']}_u256;")
-        print(f"    let tolerance = expected / 10000_u256; // 0.01% tolerance")
-        print(f"    assert(result.value >= expected - tolerance && result.value <= expected + tolerance, ")
-        print(f"        'Price calculation incorrect');")
-        print(f"}}\n")
+        yield from cairo_test("get_next_sqrt_price_from_amount0_rounding_up", "get_next_sqrt_price_from_amount0",
+                             f"Test price calculation when {'adding' if case['add'] else 'removing'} token0",
+                             case, "amount", "add")
 
-def print_amount1_test_code(test_cases):
+def amount1_test_code(test_cases):
     """Generate Cairo test code for get_next_sqrt_price_from_amount1_rounding_down"""
     for case in test_cases:
-        print(f"#[test]")
-        print(f"fn test_get_next_sqrt_price_from_amount1_{case['name']}() {{")
-        print(f"    // Test price calculation when {'adding' if case['add'] else 'removing'} token1")
-        print(f"    let sqrt_price_x96 = FixedQ64x96 {{ value: {case['sqrt_price_x96']}_u256 }};")
-        print(f"    let liquidity = {case['liquidity']}_u128;")
-        print(f"    let amount = {case['amount']}_u256;")
-        print(f"    let add = {str(case['add']).lower()};")
-        print(f"")
-        print(f"    let result = SqrtPriceMath::get_next_sqrt_price_from_amount1_rounding_down(")
-        print(f"        sqrt_price_x96.clone(), liquidity, amount, add")
-        print(f"    );")
-        print(f"")
-        print(f"    println!(\"Initial price: {{}}, Result price: {{}}\", sqrt_price_x96.value, result.value);")
-        print(f"    let expected = {case['expected']}_u256;")
-        print(f"    let tolerance = expected / 10000_u256; // 0.01% tolerance")
-        print(f"    assert(result.value >= expected - tolerance && result.value <= expected + tolerance, ")
-        print(f"        'Price calculation incorrect');")
-        print(f"}}\n")
+        yield from cairo_test("get_next_sqrt_price_from_amount1_rounding_down", "get_next_sqrt_price_from_amount1",
+                             f"Test price calculation when {'adding' if case['add'] else 'removing'} token1",
+                             case, "amount", "add")
 
-def print_input_test_code(test_cases):
+def input_test_code(test_cases):
     """Generate Cairo test code for get_next_sqrt_price_from_input"""
     for case in test_cases:
-        print(f"#[test]")
-        print(f"fn test_get_next_sqrt_price_from_input_{case['name']}() {{")
-        print(f"    // Test price calculation for {'token0' if case['zero_for_one'] else 'token1'} input")
-        print(f"    let sqrt_price_x96 = FixedQ64x96 {{ value: {case['sqrt_price_x96']}_u256 }};")
-        print(f"    let liquidity = {case['liquidity']}_u128;")
-        print(f"    let amount_in = {case['amount']}_u256;")
-        print(f"    let zero_for_one = {str(case['zero_for_one']).lower()};")
-        print(f"")
-        print(f"    let result = SqrtPriceMath::get_next_sqrt_price_from_input(")
-        print(f"        sqrt_price_x96.clone(), liquidity, amount_in, zero_for_one")
-        print(f"    );")
-        print(f"")
-        print(f"    println!(\"Initial price: {{}}, Result price: {{}}\", sqrt_price_x96.value, result.value);")
-        print(f"    let expected = {case['expected']}_u256;")
-        print(f"    let tolerance = expected / 10000_u256; // 0.01% tolerance")
-        print(f"    assert(result.value >= expected - tolerance && result.value <= expected + tolerance, ")
-        print(f"        'Price calculation incorrect');")
-        print(f"}}\n")
+        yield from cairo_test("get_next_sqrt_price_from_input", "get_next_sqrt_price_from_input",
+                             f"Test price calculation for {'token0' if case['zero_for_one'] else 'token1'} input",
+                             case, "amount_in", "zero_for_one")
 
-def print_output_test_code(test_cases):
+def output_test_code(test_cases):
     """Generate Cairo test code for get_next_sqrt_price_from_output"""
     for case in test_cases:
-        print(f"#[test]")
-        print(f"fn test_get_next_sqrt_price_from_output_{case['name']}() {{")
-        print(f"    // Test price calculation for {'token1' if case['zero_for_one'] else 'token0'} output")
-        print(f"    let sqrt_price_x96 = FixedQ64x96 {{ value: {case['sqrt_price_x96']}_u256 }};")
-        print(f"    let liquidity = {case['liquidity']}_u128;")
-        print(f"    let amount_out = {case['amount']}_u256;")
-        print(f"    let zero_for_one = {str(case['zero_for_one']).lower()};")
-        print(f"")
-        print(f"    let result = SqrtPriceMath::get_next_sqrt_price_from_output(")
-        print(f"        sqrt_price_x96.clone(), liquidity, amount_out, zero_for_one")
-        print(f"    );")
-        print(f"")
-        print(f"    println!(\"Initial price: {{}}, Result price: {{}}\", sqrt_price_x96.value, result.value);")
-        print(f"    let expected = {case['expected']}_u256;")
-        print(f"    let tolerance = expected / 10000_u256; // 0.01% tolerance")
-        print(f"    assert(result.value >= expected - tolerance && result.value <= expected + tolerance, ")
-        print(f"        'Price calculation incorrect');")
-        print(f"}}\n")
+        yield from cairo_test("get_next_sqrt_price_from_output", "get_next_sqrt_price_from_output",
+                             f"Test price calculation for {'token1' if case['zero_for_one'] else 'token0'} output",
+                             case, "amount_out", "zero_for_one")
 
-def main():
-    print("use contracts::libraries::math::sqrtprice_math::SqrtPriceMath;")
-    print("use contracts::libraries::math::numbers::fixed_point::{FixedQ64x96, IFixedQ64x96Impl};\n\n")
+def generate_cairo_tests():
+    yield "use contracts::libraries::math::numbers::fixed_point::{FixedQ64x96, IFixedQ64x96Impl};\n"
+    yield "use contracts::libraries::math::sqrtprice_math::SqrtPriceMath;\n\n\n"
     
-    print("// --- Cairo Test Code for get_next_sqrt_price_from_amount0_rounding_up --- //")
+    yield "// --- Cairo Test Code for get_next_sqrt_price_from_amount0_rounding_up --- //\n"
     amount0_cases = generate_amount0_test_cases()
-    print_amount0_test_code(amount0_cases)
+    yield from amount0_test_code(amount0_cases)
     
-    print("// --- Cairo Test Code for get_next_sqrt_price_from_amount1_rounding_down --- //")
+    yield "// --- Cairo Test Code for get_next_sqrt_price_from_amount1_rounding_down --- //\n"
     amount1_cases = generate_amount1_test_cases()
-    print_amount1_test_code(amount1_cases)
+    yield from amount1_test_code(amount1_cases)
     
-    print("// --- Cairo Test Code for get_next_sqrt_price_from_input --- //")
+    yield "// --- Cairo Test Code for get_next_sqrt_price_from_input --- //\n"
     input_cases = generate_input_test_cases()
-    print_input_test_code(input_cases)
+    yield from input_test_code(input_cases)
     
-    print("// --- Cairo Test Code for get_next_sqrt_price_from_output --- //")
+    yield "// --- Cairo Test Code for get_next_sqrt_price_from_output --- //\n"
     output_cases = generate_output_test_cases()
-    print_output_test_code(output_cases)
+    yield from output_test_code(output_cases)
+
+def main():
+    emit(generate_cairo_tests())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,24 @@
+"""Randomized compute_swap_step vectors (`py_utils.swap_step_vectors`) for the driver.
+
+Prints the module file and writes its shards next to it, under the directory the
+driver passes in GENERATED_TESTS_DIR (the default output directory when run alone).
+"""
+import os
+
+from py_utils.cairo_writer import emit
+from py_utils.paths import DEFAULT_OUT_DIR, OUT_DIR_VARIABLE
+from py_utils.swap_step_vectors import DRIVER_COUNT, MODULE_NAME, declare_in_crate, module_source, write_shards
+
+CAIRO_OUTPUT = "math_tests/swap_step_vectors.cairo"
+SEED = 0
+
+
+def main():
+    out_dir = os.environ.get(OUT_DIR_VARIABLE, DEFAULT_OUT_DIR)
+    shards = write_shards(os.path.join(out_dir, "math_tests", MODULE_NAME), DRIVER_COUNT, SEED, jobs=1)
+    emit(module_source(SEED, DRIVER_COUNT, len(shards)))
+    declare_in_crate(out_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""Run every Cairo test generator and write its output file.
+
+Generators are the `generate_*.py` scripts under `gen_math_tests/` and
+`gen_contract_tests/`. Each declares where its output goes, relative to the
+output directory, with a module-level constant:
+
+    CAIRO_OUTPUT = "math_tests/tick_math_test.cairo"
+
+The constant is read from the source without importing the script. Generators
+run in a process pool as `__main__`, with stdout going to a temporary file that is
+renamed over the output once the script finishes, so an interrupted or failing run
+never leaves a half-written file behind. A generator that writes more files than
+the one it prints (generate_swap_step_vectors.py writes its shards) finds the
+output directory in the GENERATED_TESTS_DIR environment variable.
+
+A generator is skipped when nothing it depends on has changed: its own source, the
+py_utils modules it imports (followed transitively) and the output file it wrote
+last time. Hashes live in `.generated_tests.json` in the output directory.
+
+Generators that do run call the memoized py_utils math (`memo_cache.MEMOIZED`),
+backed by one SQLite file shared by the workers, so a rerun after a change that
+leaves the math alone reads the results back instead of computing them. The
+hits and misses per function are printed at the end of the run.
+
+    python -m py_utils.generate_tests                  # into target/generated_tests
+    python -m py_utils.generate_tests --out-dir tests  # regenerate the suite in place
+    python -m py_utils.generate_tests --list
+    python -m py_utils.generate_tests --force --no-memo-cache
+"""
+import argparse
+import ast
+import contextlib
+import hashlib
+import json
+import os
+import runpy
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from py_utils.memo_cache import MemoCache
+from py_utils.paths import CONTRACTS_DIR, DEFAULT_MEMO_PATH, DEFAULT_OUT_DIR, OUT_DIR_VARIABLE, PY_UTILS_DIR
+
+GENERATOR_DIRS = ("gen_math_tests", "gen_contract_tests")
+CACHE_FILE = ".generated_tests.json"
+# Bump to invalidate every cache entry, e.g. when the way generators are run changes
+CACHE_VERSION = 1
+
+
+class Generator:
+    """A generator script: its module name, source path and declared output"""
+
+    def __init__(self, module, path, output):
+        self.module = module
+        self.path = path
+        self.output = output
+
+    @property
+    def name(self):
+        return self.module.rsplit(".", 1)[-1]
+
+
+def _module_name(path):
+    relative = os.path.relpath(path, CONTRACTS_DIR)
+    return relative[:-len(".py")].replace(os.sep, ".")
+
+
+def _declared_output(tree):
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id == "CAIRO_OUTPUT" for target in node.targets
+        ):
+            return ast.literal_eval(node.value)
+    return None
+
+
+def discover_generators():
+    """(generators, scripts without CAIRO_OUTPUT) under the generator directories"""
+    generators = []
+    undeclared = []
+    for directory in GENERATOR_DIRS:
+        for root, dirs, files in os.walk(os.path.join(PY_UTILS_DIR, directory)):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("__"))
+            for filename in sorted(files):
+                if not filename.endswith(".py") or filename.startswith("__"):
+                    continue
+                path = os.path.join(root, filename)
+                with open(path) as f:
+                    output = _declared_output(ast.parse(f.read(), path))
+                if output is None:
+                    undeclared.append(path)
+                else:
+                    generators.append(Generator(_module_name(path), path, output))
+    return generators, undeclared
+
+
+def _local_module_path(name):
+    """Source file of a py_utils module imported as `py_utils.x` or plain `x`, or None"""
+    parts = name.split(".")
+    if parts[0] == "py_utils":
+        parts = parts[1:]
+    if not parts:
+        return None
+    path = os.path.join(PY_UTILS_DIR, *parts) + ".py"
+    return path if os.path.exists(path) else None
+
+
+def _dependencies(path, seen=None):
+    """`path` and every py_utils source file it imports, transitively"""
+    if seen is None:
+        seen = set()
+    if path in seen:
+        return seen
+    seen.add(path)
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+        else:
+            continue
+        for name in names:
+            dependency = _local_module_path(name)
+            if dependency is not None:
+                _dependencies(dependency, seen)
+    return seen
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def input_hash(generator):
+    """Hash of the generator's source, its py_utils dependencies and its declared output"""
+    digest = hashlib.sha256(f"{CACHE_VERSION}\0{generator.output}\0".encode())
+    for path in sorted(_dependencies(generator.path)):
+        digest.update(os.path.relpath(path, PY_UTILS_DIR).encode() + b"\0")
+        digest.update(_file_hash(path).encode())
+    return digest.hexdigest()
+
+
+def run_generator(module, output_path, memo_path=None, out_dir=None):
+    """Run `module` as __main__ and atomically write what it prints to `output_path`
+
+    With a `memo_path`, the memoized math is served from the `MemoCache` there.
+    `out_dir` is handed to the generator in the OUT_DIR_VARIABLE environment variable.
+    Returns (hash of the output, memo cache stats).
+    """
+    for path in (CONTRACTS_DIR, PY_UTILS_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    stats = {}
+    try:
+        with contextlib.ExitStack() as stack:
+            if out_dir is not None:
+                previous = os.environ.get(OUT_DIR_VARIABLE)
+                os.environ[OUT_DIR_VARIABLE] = out_dir
+                stack.callback(_restore_variable, OUT_DIR_VARIABLE, previous)
+            if memo_path is not None:
+                os.makedirs(os.path.dirname(os.path.abspath(memo_path)), exist_ok=True)
+                cache = stack.enter_context(MemoCache(memo_path))
+                stack.enter_context(cache.install())
+            with open(tmp_path, "w") as f, contextlib.redirect_stdout(f):
+                runpy.run_module(module, run_name="__main__", alter_sys=True)
+            if memo_path is not None:
+                stats = cache.stats()
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return _file_hash(output_path), stats
+
+
+def _restore_variable(name, value):
+    if value is None:
+        os.environ.pop(name, None)
+    else:
+        os.environ[name] = value
+
+
+def _load_cache(out_dir):
+    try:
+        with open(os.path.join(out_dir, CACHE_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(out_dir, cache):
+    path = os.path.join(out_dir, CACHE_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def _up_to_date(entry, key, output_path):
+    if entry is None or entry.get("input") != key or not os.path.exists(output_path):
+        return False
+    return entry.get("output") == _file_hash(output_path)
+
+
+def _log_memo_stats(stats, log):
+    for name, counts in sorted(stats.items()):
+        calls = counts["hits"] + counts["misses"]
+        if calls:
+            log(f"memo cache: {name}: {counts['hits']} hits, {counts['misses']} misses "
+                f"({counts['hits'] / calls:.0%} hit rate)")
+
+
+def generate_all(out_dir=DEFAULT_OUT_DIR, names=None, jobs=None, force=False, log=print, memo_path=DEFAULT_MEMO_PATH):
+    """Regenerate stale outputs; returns (written, skipped, failed) lists of generator names
+
+    `memo_path=None` runs the generators without the memo cache.
+    """
+    generators, _ = discover_generators()
+    if names:
+        unknown = set(names) - {generator.name for generator in generators}
+        if unknown:
+            raise ValueError(f"unknown generators: {', '.join(sorted(unknown))}")
+        generators = [generator for generator in generators if generator.name in names]
+
+    os.makedirs(out_dir, exist_ok=True)
+    cache = _load_cache(out_dir)
+    written, skipped, failed = [], [], []
+    memo_stats = {}
+
+    stale = []
+    for generator in generators:
+        key = input_hash(generator)
+        output_path = os.path.join(out_dir, generator.output)
+        if not force and _up_to_date(cache.get(generator.module), key, output_path):
+            skipped.append(generator.name)
+        else:
+            stale.append((generator, key, output_path))
+
+    if stale:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {
+                pool.submit(run_generator, generator.module, output_path, memo_path, out_dir): (generator, key)
+                for generator, key, output_path in stale
+            }
+            for future in as_completed(futures):
+                generator, key = futures[future]
+                try:
+                    output_hash, stats = future.result()
+                except (Exception, SystemExit) as e:  # generators may call sys.exit or assert
+                    cache.pop(generator.module, None)
+                    failed.append(generator.name)
+                    log(f"FAILED {generator.name}: {type(e).__name__}: {e}")
+                    continue
+                for name, counts in stats.items():
+                    total = memo_stats.setdefault(name, {"hits": 0, "misses": 0})
+                    total["hits"] += counts["hits"]
+                    total["misses"] += counts["misses"]
+                cache[generator.module] = {"input": key, "output": output_hash}
+                written.append(generator.name)
+                log(f"wrote {generator.output}")
+
+    _save_cache(out_dir, cache)
+    _log_memo_stats(memo_stats, log)
+    return written, skipped, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regenerate the Cairo test files from the py_utils generators")
+    parser.add_argument("names", nargs="*", help="only these generators (script names without .py)")
+    parser.add_argument("--out-dir", default=DEFAULT_OUT_DIR)
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="ignore the cache and rerun every generator")
+    parser.add_argument("--memo-cache", default=DEFAULT_MEMO_PATH, metavar="PATH",
+                        help="SQLite file memoizing the generators' math (default: %(default)s)")
+    parser.add_argument("--no-memo-cache", dest="memo_cache", action="store_const", const=None,
+                        help="compute everything, without the memo cache")
+    parser.add_argument("--list", action="store_true", help="list generators and their outputs, then exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        generators, undeclared = discover_generators()
+        for generator in generators:
+            print(f"{generator.name:<36} -> {generator.output}")
+        for path in undeclared:
+            print(f"{os.path.relpath(path, PY_UTILS_DIR)} has no CAIRO_OUTPUT, not run")
+        return 0
+
+    written, skipped, failed = generate_all(args.out_dir, args.names, args.jobs, args.force,
+                                           memo_path=args.memo_cache)
+    print(f"{len(written)} written, {len(skipped)} up to date, {len(failed)} failed ({args.out_dir})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
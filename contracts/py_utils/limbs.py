@@ -0,0 +1,293 @@
+"""Vectorized fixed-width unsigned integers for batch math.
+
+A column of big integers is stored as base 2**32 limbs in a uint64 array shaped
+(n_limbs, n_rows), least significant limb first. Keeping limbs at 32 bits lets a
+limb-by-limb product fit in 64 bits, so multiplication, division and comparison
+run as a handful of NumPy operations per limb instead of one Python big-int
+operation per row.
+
+Helpers here assume their inputs are normalized (every limb < 2**32) and produce
+normalized outputs. Callers own the widths: results that need more limbs than
+they were given are the caller's overflow to detect.
+"""
+import numpy as np
+
+LIMB_BITS = 32
+LIMB_MASK = np.uint64(0xffffffff)
+_SHIFT = np.uint64(LIMB_BITS)
+_RADIX = 2.0 ** LIMB_BITS
+
+# q = floor(estimate * (1 - 2**-46)) never overshoots the true quotient: float64 sums
+# of up to 16 limbs and one division stay well inside that margin.
+_DIV_SAFETY = 1.0 - 2.0 ** -46
+
+
+def zeros(n_limbs, n_rows):
+    return np.zeros((n_limbs, n_rows), dtype=np.uint64)
+
+
+def from_ints(values, n_limbs):
+    """Convert a sequence of ints into limbs.
+
+    Returns (limbs, overflow) where overflow marks rows that are negative or do not fit
+    in `n_limbs` limbs; those rows are left as zero.
+    """
+    width = n_limbs * LIMB_BITS // 8
+    values = list(values)
+    overflow = np.zeros(len(values), dtype=bool)
+    try:
+        packed = b"".join([value.to_bytes(width, "little") for value in values])
+    except (OverflowError, AttributeError):
+        chunks = []
+        blank = bytes(width)
+        for row, value in enumerate(values):
+            try:
+                chunks.append(int(value).to_bytes(width, "little"))
+            except OverflowError:
+                chunks.append(blank)
+                overflow[row] = True
+        packed = b"".join(chunks)
+    words = np.frombuffer(packed, dtype="<u4").reshape(len(values), n_limbs)
+    return words.T.astype(np.uint64), overflow
+
+
+def from_uint64(values, n_limbs):
+    """Convert an array of non-negative integers below 2**64 into limbs"""
+    values = np.asarray(values).astype(np.uint64)
+    limbs = zeros(n_limbs, len(values))
+    limbs[0] = values & LIMB_MASK
+    if n_limbs > 1:
+        limbs[1] = values >> _SHIFT
+    elif (values >> _SHIFT).any():
+        raise OverflowError(f"values do not fit in {n_limbs} limbs")
+    return limbs
+
+
+def from_signed(values, bits):
+    """(negative, magnitudes): the sign of every int and its absolute value in bits // 32 limbs.
+
+    Raises OverflowError if a value lies outside [-2**(bits - 1), 2**(bits - 1)).
+    """
+    n_limbs = bits // LIMB_BITS
+    values = np.asarray(values)
+    if values.dtype.kind in "iu" and values.dtype.itemsize * 8 < bits:
+        values = values.reshape(-1)
+        negative = values < 0
+        # -(v + 1) + 1 keeps the most negative int64 in range
+        magnitudes = np.where(negative, -(values + 1), values).astype(np.uint64) + negative
+        return negative, from_uint64(magnitudes, n_limbs)
+
+    values = [int(value) for value in values.reshape(-1)]
+    if any(not -2**(bits - 1) <= value < 2**(bits - 1) for value in values):
+        raise OverflowError(f"value out of i{bits} range")
+    magnitudes, _ = from_ints([abs(value) for value in values], n_limbs)
+    return np.array([value < 0 for value in values], dtype=bool), magnitudes
+
+
+def from_halves(low, high):
+    """Limbs of u128s given as their low and high uint64 halves"""
+    return np.stack([low & LIMB_MASK, low >> _SHIFT, high & LIMB_MASK, high >> _SHIFT])
+
+
+def to_halves(limbs):
+    """(low, high): the uint64 halves of 4-limb rows"""
+    return limbs[0] | (limbs[1] << _SHIFT), limbs[2] | (limbs[3] << _SHIFT)
+
+
+def from_big_endian(records, n_limbs):
+    """Convert fixed-width big-endian byte records (numpy 'S' dtype) into limbs"""
+    size = records.dtype.itemsize
+    if size % 4:
+        raise ValueError("record size must be a multiple of 4 bytes")
+    words = np.frombuffer(records.tobytes(), dtype=">u4").reshape(len(records), size // 4)
+    limbs = zeros(n_limbs, len(records))
+    used = min(n_limbs, size // 4)
+    limbs[:used] = words[:, ::-1].T[:used]
+    if size // 4 > n_limbs and words[:, :size // 4 - n_limbs].any():
+        raise OverflowError(f"records do not fit in {n_limbs} limbs")
+    return limbs
+
+
+def to_ints(limbs):
+    """Convert limbs back into a list of Python ints"""
+    n_limbs, n_rows = limbs.shape
+    width = n_limbs * LIMB_BITS // 8
+    packed = np.ascontiguousarray(limbs.T.astype("<u4")).tobytes()
+    return [int.from_bytes(packed[row * width:(row + 1) * width], "little") for row in range(n_rows)]
+
+
+def to_float(limbs):
+    """Nearest-ish float64 of each row (relative error below n_limbs * 2**-53)"""
+    result = np.zeros(limbs.shape[1], dtype=np.float64)
+    for limb in limbs[::-1]:
+        result = result * _RADIX + limb
+    return result
+
+
+def from_float(values, n_limbs):
+    """Convert non-negative, integer-valued float64s into limbs exactly"""
+    limbs = zeros(n_limbs, len(values))
+    scale = _RADIX ** (n_limbs - 1)
+    remaining = values.copy()
+    for i in range(n_limbs - 1, -1, -1):
+        digit = np.floor(remaining / scale)
+        limbs[i] = digit.astype(np.uint64)
+        remaining -= digit * scale
+        scale /= _RADIX
+    return limbs
+
+
+def normalize(limbs):
+    """Propagate carries so that every limb is < 2**32. Carries out of the top limb are dropped."""
+    for i in range(len(limbs) - 1):
+        limbs[i + 1] += limbs[i] >> _SHIFT
+        limbs[i] &= LIMB_MASK
+    limbs[-1] &= LIMB_MASK
+    return limbs
+
+
+def trim(limbs):
+    """Drop top limbs that are zero in every row, keeping at least one"""
+    top = len(limbs)
+    while top > 1 and not limbs[top - 1].any():
+        top -= 1
+    return limbs[:top]
+
+
+def _limbs_for(value):
+    """Number of limbs needed to hold the non-negative integer-valued float `value`"""
+    return max(1, -(-int(value).bit_length() // LIMB_BITS))
+
+
+def resize(limbs, n_limbs):
+    """Zero-extend or truncate to `n_limbs` limbs"""
+    if len(limbs) >= n_limbs:
+        return limbs[:n_limbs]
+    out = zeros(n_limbs, limbs.shape[1])
+    out[:len(limbs)] = limbs
+    return out
+
+
+def is_zero(limbs):
+    return ~limbs.any(axis=0)
+
+
+def compare(a, b):
+    """-1, 0 or 1 per row for a < b, a == b, a > b"""
+    n_limbs = max(len(a), len(b))
+    a, b = resize(a, n_limbs), resize(b, n_limbs)
+    result = np.zeros(a.shape[1], dtype=np.int8)
+    # Walk up from the least significant limb: a higher limb that differs overrides
+    for i in range(n_limbs):
+        result = np.where(a[i] > b[i], np.int8(1), np.where(a[i] < b[i], np.int8(-1), result))
+    return result
+
+
+def select(mask, a, b):
+    """Rows of `a` where mask is set, rows of `b` elsewhere"""
+    return np.where(mask, a, b)
+
+
+def add(a, b):
+    """a + b, one limb wider than the widest input"""
+    n_limbs = max(len(a), len(b)) + 1
+    out = resize(a, n_limbs).copy()
+    out[:len(b)] += b
+    return normalize(out)
+
+
+def add_small(a, values):
+    """a + values for a uint64 array of values < 2**32, in the width of `a`"""
+    out = a.copy()
+    out[0] += values
+    return normalize(out)
+
+
+def sub(a, b):
+    """a - b for rows where a >= b, in the width of `a`"""
+    out = a.copy()
+    borrow = np.zeros(a.shape[1], dtype=np.uint64)
+    b = resize(b, len(a))
+    for i in range(len(a)):
+        subtrahend = b[i] + borrow
+        borrow = (out[i] < subtrahend).astype(np.uint64)
+        out[i] = (out[i] + (borrow << _SHIFT) - subtrahend) & LIMB_MASK
+    return out
+
+
+def shift_left_limbs(a, n):
+    """a * 2**(32 * n)"""
+    out = zeros(len(a) + n, a.shape[1])
+    out[n:] = a
+    return out
+
+
+def shift_right(a, bits):
+    """floor(a / 2**bits) and whether any of the shifted-out bits were set"""
+    whole, part = divmod(bits, LIMB_BITS)
+    dropped = a[:whole].any(axis=0)
+    out = a[whole:].copy()
+    if part:
+        part_mask = np.uint64((1 << part) - 1)
+        dropped |= (out[0] & part_mask) != 0
+        out >>= np.uint64(part)
+        out[:-1] |= (a[whole + 1:] << np.uint64(LIMB_BITS - part)) & LIMB_MASK
+    return out, dropped
+
+
+def mul(a, b):
+    """a * b, len(a) + len(b) limbs wide"""
+    if len(a) < len(b):
+        a, b = b, a
+    out = zeros(len(a) + len(b), a.shape[1])
+    product = np.empty_like(a)
+    part = np.empty_like(a)
+    for i, limb in enumerate(b):
+        np.multiply(a, limb, out=product)
+        out[i:i + len(a)] += np.bitwise_and(product, LIMB_MASK, out=part)
+        out[i + 1:i + len(a) + 1] += np.right_shift(product, _SHIFT, out=part)
+        # Each accumulator takes at most 2 * len(b) terms below 2**32
+    return normalize(out)
+
+
+def divmod_limbs(numerator, denominator):
+    """floor(numerator / denominator) and the remainder, rows with a non-zero denominator.
+
+    The quotient keeps the numerator's width, the remainder the denominator's.
+    A float64 estimate of each quotient, scaled down so it never overshoots, is
+    subtracted exactly; every pass removes ~46 bits of the remaining quotient and a
+    last pass settles the off-by-one rows. Limbs that are zero in every row are
+    trimmed between passes, so later passes work on narrower arrays.
+    """
+    if is_zero(denominator).any():
+        raise ZeroDivisionError("division by zero")
+    n_limbs, width = len(numerator), len(denominator)
+    quotient = zeros(n_limbs, numerator.shape[1])
+    remainder = trim(numerator.copy())
+    denominator = trim(denominator)
+    denominator_float = to_float(denominator)
+
+    while True:
+        estimate = np.floor(to_float(remainder) / denominator_float * _DIV_SAFETY)
+        largest = estimate.max(initial=0.0)
+        if not largest:
+            break
+        step = from_float(estimate, _limbs_for(largest))
+        remainder = trim(sub(remainder, resize(mul(step, denominator), len(remainder))))
+        quotient = resize(add(quotient, step), n_limbs)
+
+    remainder = resize(remainder, max(len(remainder), len(denominator)))
+    while True:
+        over = compare(remainder, denominator) >= 0
+        if not over.any():
+            break
+        remainder[:, over] = sub(remainder[:, over], resize(denominator[:, over], len(remainder)))
+        quotient[:, over] = add_small(quotient[:, over], np.uint64(1))
+
+    return quotient, resize(remainder, width)
+
+
+def div_rounding_up(numerator, denominator):
+    """ceil(numerator / denominator), in the numerator's width"""
+    quotient, remainder = divmod_limbs(numerator, denominator)
+    return add_small(quotient, (~is_zero(remainder)).astype(np.uint64))
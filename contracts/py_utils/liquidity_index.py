@@ -0,0 +1,235 @@
+"""Prefix sums over a pool's liquidity, for "how much to move the price" queries.
+
+The initialized ticks cut the price range into segments of constant liquidity.
+`LiquidityIndex` keeps, for every segment, its liquidity and the token amounts it
+holds between its two boundary prices (`calc_amount0_delta` / `calc_amount1_delta`
+over the whole segment). The amounts also go into two Fenwick trees indexed by the
+segment's lower tick, which give the running sum below any boundary in O(log) steps.
+The amount of token0 or token1 between two prices is then a binary search for each
+end, a subtraction of running sums and the two partial segments at the ends; the
+price a given input reaches is a descent of the tree to the segment it runs out in
+plus one `get_next_sqrt_price_from_input` within it.
+
+Amounts are summed segment by segment, each rounded up as `calc_amount*_delta`
+rounds, so they match a swap that stops at every initialized tick, not the extra
+rounding of the bitmap word edges `Pool.swap` also stops at. The liquidity of a
+segment is the running sum of liquidity_net from MIN_TICK, which is the pool's
+active liquidity as long as slot0 agrees with its ticks (`Pool.mint` stores the
+position's liquidity in slot0, as the contract does).
+
+`mint` updates the index in place: it splits the segments at the position's ticks
+and recomputes the segments inside it, each an O(log) update of the trees, so a
+query after a mint costs no more than one before it.
+
+    index = LiquidityIndex.from_pool(pool)
+    amount0, amount1 = index.amounts_between(pool.sqrt_price_x96, target_sqrt_price_x96)
+    sqrt_price_x96 = index.sqrt_price_after_input(pool.sqrt_price_x96, amount_in, zero_for_one)
+    index.mint(lower_tick, upper_tick, amount)
+"""
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+from py_utils.liquidity_math import (
+    calc_amount0_batch,
+    calc_amount0_delta,
+    calc_amount1_batch,
+    calc_amount1_delta,
+)
+from py_utils.sqrtprice_math import get_next_sqrt_price_from_input
+from py_utils.tick_math import MAX_SQRT_RATIO, MAX_TICK, MIN_SQRT_RATIO, MIN_TICK, get_sqrt_ratio_at_tick
+
+
+class _FenwickTree:
+    """Prefix sums over positions [0, size) with O(log size) point updates
+
+    Only the nodes that were ever updated are stored, so a tree over the whole tick
+    range costs memory in proportion to the segments in it. `search` needs the values
+    to be non-negative.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.nodes = {}
+        self._top = 1 << (size.bit_length() - 1)
+
+    def add(self, position, delta):
+        nodes = self.nodes
+        node = position + 1
+        while node <= self.size:
+            nodes[node] = nodes.get(node, 0) + delta
+            node += node & -node
+
+    def prefix(self, count):
+        """Sum of the first `count` positions"""
+        nodes = self.nodes
+        total = 0
+        while count > 0:
+            total += nodes.get(count, 0)
+            count &= count - 1
+        return total
+
+    def search(self, target):
+        """The largest count whose prefix sum is at most `target` (0 if there is none)"""
+        nodes = self.nodes
+        count = 0
+        step = self._top
+        while step:
+            node = count + step
+            if node <= self.size and nodes.get(node, 0) <= target:
+                count = node
+                target -= nodes.get(node, 0)
+            step >>= 1
+        return count
+
+
+class LiquidityIndex:
+    """Liquidity segments between initialized ticks with running sums of their token amounts.
+
+    `ticks` maps initialized ticks to their liquidity_net.
+    """
+
+    def __init__(self, ticks=None):
+        ticks = ticks or {}
+        # Segment i spans [boundaries[i], boundaries[i + 1])
+        self.boundaries = [MIN_TICK] + sorted(tick for tick in ticks if MIN_TICK < tick < MAX_TICK) + [MAX_TICK]
+        self.sqrt_prices = [get_sqrt_ratio_at_tick(tick) for tick in self.boundaries]
+        net = [ticks.get(tick, 0) for tick in self.boundaries[:-1]]
+        self.liquidity = list(accumulate(net))
+        if any(liquidity < 0 for liquidity in self.liquidity):
+            raise ValueError("liquidity_net sums to a negative liquidity")
+
+        lower, upper = self.sqrt_prices[:-1], self.sqrt_prices[1:]
+        self.amounts0 = calc_amount0_batch(self.liquidity, lower, upper)
+        self.amounts1 = calc_amount1_batch(self.liquidity, lower, upper)
+        # Segment amounts by lower tick, so the running sum below boundary k is a prefix sum
+        self._sums0 = _FenwickTree(MAX_TICK - MIN_TICK)
+        self._sums1 = _FenwickTree(MAX_TICK - MIN_TICK)
+        for tick, amount0, amount1 in zip(self.boundaries, self.amounts0, self.amounts1):
+            self._sums0.add(tick - MIN_TICK, amount0)
+            self._sums1.add(tick - MIN_TICK, amount1)
+
+    @classmethod
+    def from_pool(cls, pool):
+        return cls({tick: pool.ticks[tick][1] for tick in pool.initialized_ticks})
+
+    def __len__(self):
+        return len(self.liquidity)
+
+    def _cumulative(self, sums, index):
+        """Total amount of the segments below boundary `index`"""
+        return sums.prefix(self.boundaries[index] - MIN_TICK)
+
+    def _segment_amounts(self, index):
+        lower, upper, liquidity = self.sqrt_prices[index], self.sqrt_prices[index + 1], self.liquidity[index]
+        amount0 = calc_amount0_delta(lower, upper, liquidity)
+        amount1 = calc_amount1_delta(lower, upper, liquidity)
+        position = self.boundaries[index] - MIN_TICK
+        self._sums0.add(position, amount0 - self.amounts0[index])
+        self._sums1.add(position, amount1 - self.amounts1[index])
+        self.amounts0[index] = amount0
+        self.amounts1[index] = amount1
+
+    def _boundary(self, tick):
+        """Index of the boundary at `tick`, splitting the segment around it if there is none"""
+        index = bisect_left(self.boundaries, tick)
+        if self.boundaries[index] == tick:
+            return index
+        self.boundaries.insert(index, tick)
+        self.sqrt_prices.insert(index, get_sqrt_ratio_at_tick(tick))
+        self.liquidity.insert(index, self.liquidity[index - 1])
+        self.amounts0.insert(index, 0)
+        self.amounts1.insert(index, 0)
+        self._segment_amounts(index - 1)
+        self._segment_amounts(index)
+        return index
+
+    def mint(self, lower_tick, upper_tick, amount):
+        """Add `amount` of liquidity between two ticks, as `Pool.mint` does to their liquidity_net"""
+        if not MIN_TICK < lower_tick <= upper_tick < MAX_TICK:
+            raise ValueError(f"invalid tick range [{lower_tick}, {upper_tick}]")
+        if amount <= 0:
+            raise ValueError("liq amount must be > 0")
+        start = self._boundary(lower_tick)
+        end = self._boundary(upper_tick)
+        for index in range(start, end):
+            self.liquidity[index] += amount
+            self._segment_amounts(index)
+
+    def _segment(self, sqrt_price_x96):
+        if not MIN_SQRT_RATIO <= sqrt_price_x96 <= MAX_SQRT_RATIO:
+            raise ValueError(f"sqrt price {sqrt_price_x96} out of range")
+        return min(bisect_right(self.sqrt_prices, sqrt_price_x96), len(self.liquidity)) - 1
+
+    def liquidity_at(self, sqrt_price_x96):
+        """Liquidity of the segment `sqrt_price_x96` lies in (the upper one on a boundary)"""
+        return self.liquidity[self._segment(sqrt_price_x96)]
+
+    def amounts_between(self, sqrt_price_a_x96, sqrt_price_b_x96):
+        """(amount0, amount1) of the liquidity between two sqrt prices, in either order
+
+        Moving the price from one to the other takes one of them in and gives the other out.
+        """
+        lower, upper = sorted((sqrt_price_a_x96, sqrt_price_b_x96))
+        first, last = self._segment(lower), self._segment(upper)
+        if first == last:
+            liquidity = self.liquidity[first]
+            return calc_amount0_delta(lower, upper, liquidity), calc_amount1_delta(lower, upper, liquidity)
+
+        sqrt_prices, liquidity = self.sqrt_prices, self.liquidity
+        amount0 = (calc_amount0_delta(lower, sqrt_prices[first + 1], liquidity[first])
+                   + self._cumulative(self._sums0, last) - self._cumulative(self._sums0, first + 1)
+                   + calc_amount0_delta(sqrt_prices[last], upper, liquidity[last]))
+        amount1 = (calc_amount1_delta(lower, sqrt_prices[first + 1], liquidity[first])
+                   + self._cumulative(self._sums1, last) - self._cumulative(self._sums1, first + 1)
+                   + calc_amount1_delta(sqrt_prices[last], upper, liquidity[last]))
+        return amount0, amount1
+
+    def sqrt_price_after_input(self, sqrt_price_x96, amount_in, zero_for_one):
+        """The sqrt price reached by putting `amount_in` of token0 (zero_for_one) or token1 in
+
+        Raises ValueError when all the liquidity up to the end of the price range takes
+        less than `amount_in`. The price moves through zero-liquidity gaps on the way, but
+        stops short of a gap when the input runs out right before it.
+        """
+        if amount_in < 0:
+            raise ValueError("amount_in must not be negative")
+        if amount_in == 0:
+            return sqrt_price_x96
+        segment = self._segment(sqrt_price_x96)
+        sqrt_prices, liquidity = self.sqrt_prices, self.liquidity
+
+        if zero_for_one:
+            available = calc_amount0_delta(sqrt_prices[segment], sqrt_price_x96, liquidity[segment])
+        else:
+            available = calc_amount1_delta(sqrt_price_x96, sqrt_prices[segment + 1], liquidity[segment])
+        if amount_in < available:
+            return get_next_sqrt_price_from_input(sqrt_price_x96, liquidity[segment], amount_in, zero_for_one)
+
+        remaining = amount_in - available
+        if zero_for_one:
+            # Lowest boundary m <= segment with cumulative[segment] - cumulative[m] <= remaining
+            sums = self._sums0
+            target = self._cumulative(sums, segment) - remaining
+            if target < 0:
+                raise ValueError("not enough liquidity to take the input")
+            # The highest boundary with cumulative[boundary] <= target: where the input runs
+            # out exactly, or the top of the segment it runs out in
+            below = min(bisect_right(self.boundaries, MIN_TICK + sums.search(target)) - 1, segment)
+            cumulative = self._cumulative(sums, below)
+            if cumulative == target:
+                return sqrt_prices[below]
+            rest = cumulative + self.amounts0[below] - target
+            return get_next_sqrt_price_from_input(sqrt_prices[below + 1], liquidity[below], rest, True)
+
+        sums = self._sums1
+        target = self._cumulative(sums, segment + 1) + remaining
+        if target > sums.prefix(sums.size):
+            raise ValueError("not enough liquidity to take the input")
+        # The lowest boundary with cumulative[boundary] >= target, likewise
+        boundary = max(bisect_right(self.boundaries, MIN_TICK + sums.search(target - 1)), segment + 1)
+        above = boundary - 1
+        cumulative = self._cumulative(sums, above)
+        if cumulative + self.amounts1[above] == target:
+            return sqrt_prices[boundary]
+        rest = target - cumulative
+        return get_next_sqrt_price_from_input(sqrt_prices[above], liquidity[above], rest, False)
@@ -0,0 +1,176 @@
+"""Exact token amounts for a liquidity range, mirroring `LiquidityMath` in liquidity_math.cairo.
+
+The scalar functions take the same arguments as the Cairo ones. The `*_batch`
+variants take arrays of (liquidity, sqrt_price_a, sqrt_price_b) in the order of
+`calc_amount0` / `calc_amount1` in uniswap_v3_math.py and compute every row with
+multi-limb NumPy arithmetic (see limbs.py), in chunks small enough for the
+temporaries to stay in cache. Rows outside the u128 liquidity / 160-bit sqrt price
+domain fall back to the scalar Python-int path.
+
+Columns can be sequences of ints, integer NumPy arrays (values below 2**64) or
+sqrt price records from `tick_math.to_records` / `TickTable.records`; the last two
+skip the per-row int conversion on the way in, but the results still come back as
+a list of ints. `calc_amount0_limbs` / `calc_amount1_limbs` take and return limb
+columns (limbs.py) and convert nothing, which is what callers that keep u128
+liquidity and u160 sqrt prices in limbs end to end should use:
+
+    liquidity, _ = limbs.from_ints(liquidity_values, LIQUIDITY_LIMBS)
+    lower, _ = limbs.from_ints(lower_sqrt_prices, SQRT_PRICE_LIMBS)
+    upper, _ = limbs.from_ints(upper_sqrt_prices, SQRT_PRICE_LIMBS)
+    amounts0 = calc_amount0_limbs(liquidity, lower, upper)   # (AMOUNT_LIMBS, rows)
+
+Only the batch variants need NumPy, and they import it (with limbs.py) when called.
+"""
+from py_utils.fullmath import mul_div_rounding_up
+
+Q96 = 2**96
+
+# Limb widths of the fast path: u128 liquidity, sqrt prices below 2**160
+LIQUIDITY_LIMBS = 4
+SQRT_PRICE_LIMBS = 5
+# Both amounts are below 2**128 * 2**160 / 2**96 = 2**192
+AMOUNT_LIMBS = 6
+CHUNK_ROWS = 1 << 14
+
+
+def calc_amount0_delta(sqrt_price_a_x96, sqrt_price_b_x96, liquidity):
+    """Amount of token0 for `liquidity` between two sqrt prices, rounded up like the Cairo version"""
+    lower, upper = sorted((sqrt_price_a_x96, sqrt_price_b_x96))
+    price_diff_div = mul_div_rounding_up(upper - lower, Q96, upper)
+    return mul_div_rounding_up(liquidity, price_diff_div, lower)
+
+
+def calc_amount1_delta(sqrt_price_a_x96, sqrt_price_b_x96, liquidity):
+    """Amount of token1 for `liquidity` between two sqrt prices, rounded up like the Cairo version"""
+    lower, upper = sorted((sqrt_price_a_x96, sqrt_price_b_x96))
+    return mul_div_rounding_up(liquidity, upper - lower, Q96)
+
+
+def _column(values, n_limbs):
+    """Limbs of one input column and the rows that do not fit in `n_limbs` limbs"""
+    import numpy as np
+
+    from py_utils import limbs
+
+    if isinstance(values, np.ndarray) and values.dtype.kind == "S":
+        return limbs.from_big_endian(values, n_limbs), np.zeros(len(values), dtype=bool)
+    if isinstance(values, np.ndarray) and values.dtype.kind in "iu":
+        negative = values < 0 if values.dtype.kind == "i" else np.zeros(len(values), dtype=bool)
+        return limbs.from_uint64(np.where(negative, 0, values), n_limbs), negative
+    return limbs.from_ints(values, n_limbs)
+
+
+def _value(column, row):
+    value = column[row]
+    if isinstance(value, bytes):
+        return int.from_bytes(value, "big")
+    return int(value)
+
+
+def _ordered(a, b):
+    """(lower, upper) limb columns of two sqrt price columns"""
+    from py_utils import limbs
+
+    swap = limbs.compare(a, b) > 0
+    return limbs.select(swap, b, a), limbs.select(swap, a, b)
+
+
+def _batch(liquidity, sqrt_price_a, sqrt_price_b, kernel, scalar):
+    """Run `kernel(liq, lower, upper, slow)` chunk by chunk and patch the slow rows with `scalar`"""
+    import numpy as np
+
+    from py_utils import limbs
+
+    columns = [values if isinstance(values, np.ndarray) else list(values)
+               for values in (liquidity, sqrt_price_a, sqrt_price_b)]
+    liquidity, sqrt_price_a, sqrt_price_b = columns
+    if not len(liquidity) == len(sqrt_price_a) == len(sqrt_price_b):
+        raise ValueError("liquidity and sqrt price arrays must have the same length")
+
+    values = []
+    for start in range(0, len(liquidity), CHUNK_ROWS):
+        chunk = slice(start, start + CHUNK_ROWS)
+        liq, liq_overflow = _column(liquidity[chunk], LIQUIDITY_LIMBS)
+        a, a_overflow = _column(sqrt_price_a[chunk], SQRT_PRICE_LIMBS)
+        b, b_overflow = _column(sqrt_price_b[chunk], SQRT_PRICE_LIMBS)
+
+        lower, upper = _ordered(a, b)
+        slow = liq_overflow | a_overflow | b_overflow
+
+        result = kernel(liq, lower, upper, slow)
+        chunk_values = limbs.to_ints(result)
+        for row in np.flatnonzero(slow):
+            index = start + row
+            chunk_values[row] = scalar(_value(sqrt_price_a, index), _value(sqrt_price_b, index),
+                                       _value(liquidity, index))
+        values += chunk_values
+    return values
+
+
+def _amount0_kernel(liq, lower, upper, slow):
+    from py_utils import limbs
+
+    # The scalar path raises ZeroDivisionError for these rows, as the Cairo asserts do
+    slow |= limbs.is_zero(lower)
+    lower[0, slow] = 1
+    upper[0, slow] = 1
+
+    diff = limbs.sub(upper, lower)
+    # ceil(diff * 2**96 / upper) <= 2**96 because diff < upper
+    price_diff_div = limbs.div_rounding_up(limbs.shift_left_limbs(diff, 3), upper)[:4]
+    return limbs.div_rounding_up(limbs.mul(liq, price_diff_div), lower)
+
+
+def _amount1_kernel(liq, lower, upper, slow):
+    import numpy as np
+
+    from py_utils import limbs
+
+    product = limbs.mul(liq, limbs.sub(upper, lower))
+    quotient, inexact = limbs.shift_right(product, 96)
+    return limbs.add_small(quotient, inexact.astype(np.uint64))
+
+
+def calc_amount0_batch(liquidity, sqrt_price_a, sqrt_price_b):
+    """`calc_amount0_delta` for every row of three equally long columns; returns a list of ints"""
+    return _batch(liquidity, sqrt_price_a, sqrt_price_b, _amount0_kernel, calc_amount0_delta)
+
+
+def calc_amount1_batch(liquidity, sqrt_price_a, sqrt_price_b):
+    """`calc_amount1_delta` for every row of three equally long columns; returns a list of ints"""
+    return _batch(liquidity, sqrt_price_a, sqrt_price_b, _amount1_kernel, calc_amount1_delta)
+
+
+def _limb_batch(liquidity, sqrt_price_a, sqrt_price_b, kernel):
+    import numpy as np
+
+    from py_utils import limbs
+
+    rows = liquidity.shape[1]
+    if liquidity.shape[0] != LIQUIDITY_LIMBS or \
+            sqrt_price_a.shape != (SQRT_PRICE_LIMBS, rows) or sqrt_price_b.shape != (SQRT_PRICE_LIMBS, rows):
+        raise ValueError(f"expected ({LIQUIDITY_LIMBS}, n) liquidity and ({SQRT_PRICE_LIMBS}, n) sqrt price limbs")
+    amounts = limbs.zeros(AMOUNT_LIMBS, rows)
+    for start in range(0, rows, CHUNK_ROWS):
+        chunk = slice(start, start + CHUNK_ROWS)
+        lower, upper = _ordered(sqrt_price_a[:, chunk], sqrt_price_b[:, chunk])
+        slow = np.zeros(lower.shape[1], dtype=bool)
+        amounts[:, chunk] = limbs.resize(kernel(liquidity[:, chunk], lower, upper, slow), AMOUNT_LIMBS)
+    return amounts
+
+
+def calc_amount0_limbs(liquidity, sqrt_price_a, sqrt_price_b):
+    """`calc_amount0_delta` of every row of limb columns; returns (AMOUNT_LIMBS, rows) limbs
+
+    Raises ZeroDivisionError for a zero sqrt price, as the scalar function does.
+    """
+    from py_utils import limbs
+
+    if limbs.is_zero(sqrt_price_a).any() or limbs.is_zero(sqrt_price_b).any():
+        raise ZeroDivisionError("division by zero")
+    return _limb_batch(liquidity, sqrt_price_a, sqrt_price_b, _amount0_kernel)
+
+
+def calc_amount1_limbs(liquidity, sqrt_price_a, sqrt_price_b):
+    """`calc_amount1_delta` of every row of limb columns; returns (AMOUNT_LIMBS, rows) limbs"""
+    return _limb_batch(liquidity, sqrt_price_a, sqrt_price_b, _amount1_kernel)
@@ -0,0 +1,304 @@
+"""Persistent memoization of the pure py_utils math functions, in SQLite.
+
+The test generators call the same few functions (`tick_to_sqrt_ratio`,
+`compute_swap_step`, the `get_next_sqrt_price_from_amount*` pair) with the same
+inputs on every run. `MemoCache` keeps their results in a SQLite file, keyed by
+
+    (function name, model version, canonical inputs)
+
+where the canonical inputs are the argument tuple (ints and bools, which `marshal`
+writes exactly) and the model version is a hash of the marshal format and of the
+source of the function's module and every py_utils module it uses, followed
+through their globals. Editing any of those sources changes the version, so stale
+results are never served; `memoize` also deletes them from the file. The
+Cairo-style failures the functions raise (ValueError and the ArithmeticErrors)
+are cached too and raised again on a hit.
+
+A row of the file is a chunk: the results one process computed between two
+flushes (up to FLUSH_ROWS of them), marshalled together. A row per result would
+cost an index insert per miss and an index update per hit, as much as the
+`compute_swap_step` it saves; a chunk costs a `marshal` of the results. `memoize`
+loads the most recently used chunks of the function, up to MEMORY_ENTRIES
+results, into a dict keyed by the argument tuples, so a hit is a dict lookup.
+Flushes write the new results as a chunk and mark the chunks that were hit as
+used; the least recently used chunks are then evicted until the file holds at
+most `max_entries` results. Results of chunks that were not loaded are computed
+again and land in a new chunk.
+
+    with MemoCache(path) as cache, cache.install():
+        ...  # every py_utils module now calls the memoized functions
+    print(cache.stats())
+
+`generate_tests` runs every generator this way and reports the hits and misses
+per function at the end of the run. `python -m py_utils.bench --filter '*swap_step*'`
+compares a hit with the computation.
+"""
+import contextlib
+import functools
+import hashlib
+import importlib
+import marshal
+import sqlite3
+import sys
+import time
+import types
+
+# (module, function) pairs `install` memoizes
+MEMOIZED = (
+    ("py_utils.tick_math", "tick_to_sqrt_ratio"),
+    ("py_utils.swap_math", "compute_swap_step"),
+    ("py_utils.sqrtprice_math", "get_next_sqrt_price_from_amount0_rounding_up"),
+    ("py_utils.sqrtprice_math", "get_next_sqrt_price_from_amount1_rounding_down"),
+)
+DEFAULT_MAX_ENTRIES = 1_000_000
+# Results loaded into memory per memoized function; the rest stay in the file
+MEMORY_ENTRIES = 200_000
+FLUSH_ROWS = 10_000
+# Failures that are part of the functions' contract, cached like results and raised
+# again as the first of these classes they are an instance of
+CACHED_ERRORS = (ValueError, ZeroDivisionError, OverflowError, ArithmeticError)
+_ERRORS_BY_NAME = {error.__name__: error for error in CACHED_ERRORS}
+_MISSING = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY,
+    function TEXT NOT NULL,
+    version TEXT NOT NULL,
+    entries INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    last_used INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chunks_function ON chunks (function, version, last_used);
+CREATE INDEX IF NOT EXISTS chunks_last_used ON chunks (last_used);
+"""
+
+
+def _model_sources(module, sources):
+    """Source files of `module` and of the py_utils modules it uses, by module name"""
+    path = getattr(module, "__file__", None)
+    if module.__name__ in sources or path is None:
+        return sources
+    sources[module.__name__] = path
+    for value in vars(module).values():
+        if isinstance(value, types.ModuleType):
+            dependency = value
+        else:
+            dependency = sys.modules.get(getattr(value, "__module__", None) or "")
+        if dependency is not None and dependency.__name__.startswith("py_utils."):
+            _model_sources(dependency, sources)
+    return sources
+
+
+def model_version(function):
+    """Hash of the source of `function`'s module and every py_utils module it depends on"""
+    digest = hashlib.sha256(f"marshal {marshal.version}\0".encode())
+    for name, path in sorted(_model_sources(sys.modules[function.__module__], {}).items()):
+        with open(path, "rb") as f:
+            digest.update(name.encode() + b"\0" + hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()[:32]
+
+
+class _Failure:
+    """A cached exception: raised again instead of returned"""
+
+    __slots__ = ("error", "message")
+
+    def __init__(self, error, message):
+        self.error = error
+        self.message = message
+
+
+def _dump_chunk(results):
+    """Chunk data of {key: result or _Failure}: marshalled (results, {key: (error name, message)})"""
+    values, failures = {}, {}
+    for key, result in results.items():
+        if type(result) is _Failure:
+            failures[key] = (result.error.__name__, result.message)
+        else:
+            values[key] = result
+    return marshal.dumps((values, failures))
+
+
+def _load_chunk(data):
+    values, failures = marshal.loads(data)
+    for key, (error, message) in failures.items():
+        values[key] = _Failure(_ERRORS_BY_NAME[error], message)
+    return values
+
+
+class _Memo:
+    """What a `MemoCache` holds for one memoized function"""
+
+    def __init__(self, name, version):
+        self.name = name
+        self.version = version
+        # Argument tuple -> result or _Failure. 1 and True are the same key, which is
+        # harmless: the memoized functions treat them alike
+        self.memory = {}
+        # Argument tuple -> id of the chunk it was loaded from
+        self.origin = {}
+        # Results computed since the last flush
+        self.pending = {}
+        # Keys loaded from a chunk and hit since the last flush
+        self.touched = set()
+        self.hits = 0
+        self.misses = 0
+
+
+class MemoCache:
+    """Memoized results in the SQLite file at `path` (":memory:" for a throwaway cache)"""
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        # Several generator processes share the file; WAL lets readers carry on while one writes
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._memos = {}
+        self._buffered = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+    def __len__(self):
+        """Results stored in the file"""
+        self.flush()
+        return self._db.execute("SELECT COALESCE(SUM(entries), 0) FROM chunks").fetchone()[0]
+
+    def memoize(self, function, name=None):
+        """`function` with its results looked up in and stored into this cache"""
+        name = name or function.__name__
+        memo = _Memo(name, model_version(function))
+        self.flush()
+        # Results of an older model are never served again
+        self._db.execute("DELETE FROM chunks WHERE function = ? AND version != ?", (name, memo.version))
+        rows = self._db.execute(
+            "SELECT id, data FROM chunks WHERE function = ? AND version = ? ORDER BY last_used DESC",
+            (name, memo.version),
+        )
+        for chunk_id, data in rows:
+            results = _load_chunk(data)
+            # Older chunks may hold the same keys; the newer result wins
+            for key in memo.memory.keys() & results.keys():
+                del results[key]
+            memo.memory.update(results)
+            memo.origin.update(dict.fromkeys(results, chunk_id))
+            if len(memo.memory) >= MEMORY_ENTRIES:
+                break
+        self._memos[name] = memo
+        memory, pending, touched = memo.memory, memo.pending, memo.touched
+
+        @functools.wraps(function)
+        def memoized(*args, **kwargs):
+            key = args if not kwargs else args + tuple(sorted(kwargs.items()))
+            result = memory.get(key, _MISSING)
+            if result is _MISSING:
+                memo.misses += 1
+                try:
+                    result = function(*args, **kwargs)
+                except CACHED_ERRORS as e:
+                    result = _Failure(next(error for error in CACHED_ERRORS if isinstance(e, error)), str(e))
+                memory[key] = pending[key] = result
+                self._buffered += 1
+                if self._buffered >= FLUSH_ROWS:
+                    self.flush()
+            else:
+                memo.hits += 1
+                touched.add(key)
+            if type(result) is _Failure:
+                raise result.error(result.message)
+            return result
+
+        memoized.__wrapped__ = function
+        return memoized
+
+    def flush(self):
+        """Write buffered results, mark the chunks that were hit, then evict beyond `max_entries`"""
+        self._buffered = 0
+        memos = [memo for memo in self._memos.values() if memo.pending or memo.touched]
+        if not memos:
+            return
+        now = time.time_ns()
+        with self._transaction():
+            for memo in memos:
+                if memo.pending:
+                    chunk_id = self._db.execute(
+                        "INSERT INTO chunks (function, version, entries, data, last_used) VALUES (?, ?, ?, ?, ?)",
+                        (memo.name, memo.version, len(memo.pending), _dump_chunk(memo.pending), now),
+                    ).lastrowid
+                    memo.origin.update(dict.fromkeys(memo.pending, chunk_id))
+                used = {memo.origin[key] for key in memo.touched if key in memo.origin}
+                self._db.executemany("UPDATE chunks SET last_used = ? WHERE id = ?", [(now, i) for i in used])
+            self._evict()
+        for memo in memos:
+            memo.pending.clear()
+            memo.touched.clear()
+        self._trim_memory()
+
+    def _evict(self):
+        excess = self._db.execute("SELECT COALESCE(SUM(entries), 0) FROM chunks").fetchone()[0] - self.max_entries
+        if excess <= 0:
+            return
+        evicted = []
+        for chunk_id, entries in self._db.execute("SELECT id, entries FROM chunks ORDER BY last_used, id"):
+            if excess <= 0:
+                break
+            evicted.append((chunk_id,))
+            excess -= entries
+        self._db.executemany("DELETE FROM chunks WHERE id = ?", evicted)
+
+    def _trim_memory(self):
+        for memo in self._memos.values():
+            if len(memo.memory) > MEMORY_ENTRIES:
+                # Drop the oldest results; the file keeps them until they are evicted
+                for key in list(memo.memory)[:len(memo.memory) - MEMORY_ENTRIES // 2]:
+                    del memo.memory[key]
+                    memo.origin.pop(key, None)
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def stats(self):
+        """{function name: {"hits": ..., "misses": ...}} since the cache was opened"""
+        return {name: {"hits": memo.hits, "misses": memo.misses} for name, memo in self._memos.items()}
+
+    @contextlib.contextmanager
+    def install(self, targets=MEMOIZED):
+        """Memoize `targets` in every loaded py_utils module while the block runs
+
+        Modules that imported a function by name get the memoized version too.
+        Everything is restored on exit.
+        """
+        replaced = []
+        for module_name, function_name in targets:
+            module = importlib.import_module(module_name)
+            function = getattr(module, function_name)
+            memoized = self.memoize(function)
+            for loaded in list(sys.modules.values()):
+                if getattr(loaded, "__name__", "").startswith("py_utils") and \
+                        getattr(loaded, function_name, None) is function:
+                    setattr(loaded, function_name, memoized)
+                    replaced.append((loaded, function_name, function))
+        try:
+            yield self
+        finally:
+            for loaded, function_name, function in replaced:
+                setattr(loaded, function_name, function)
+            self.flush()
@@ -0,0 +1,12 @@
+"""Locations shared by the test generator driver, the generators and the tools around them."""
+import os
+
+PY_UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+CONTRACTS_DIR = os.path.dirname(PY_UTILS_DIR)
+# The snforge test crate: generated modules compile once its lib.cairo declares them
+TESTS_DIR = os.path.join(CONTRACTS_DIR, "tests")
+DEFAULT_OUT_DIR = os.path.join(CONTRACTS_DIR, "target", "generated_tests")
+DEFAULT_MEMO_PATH = os.path.join(CONTRACTS_DIR, "target", "memo_cache.sqlite")
+# Set by the driver while a generator runs, to the directory its CAIRO_OUTPUT is relative
+# to, for generators that write files besides the one they print
+OUT_DIR_VARIABLE = "GENERATED_TESTS_DIR"
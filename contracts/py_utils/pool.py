@@ -0,0 +1,541 @@
+"""Python model of `UniswapV3Pool` in univ3pool.cairo.
+
+`Pool` keeps slot0, the active liquidity and the per-tick (liquidity_gross,
+liquidity_net) of the Tick contract. Initialized ticks are flipped in a
+`tick_bitmap.TickBitmap`, compressed by the tick spacing as the TickBitmap
+contract does, and the swap loop asks it for the next one. The tick spacing is a
+constructor argument; univ3pool.cairo still hard-codes 1, which is the default.
+Positions must start and end on multiples of it.
+
+`swap` runs the same loop as the Cairo contract, step for step: each step stops
+at the next initialized tick or at the edge of the current 256-tick bitmap word,
+whichever comes first, exactly where `next_initialized_tick_within_one_word` would
+stop. The model finds the next initialized tick with `TickBitmap.next_initialized_tick`,
+in any word, and keeps the answer until the swap reaches that tick, so the steps to the
+empty word edges in between only work the edge out from the tick. They still each
+run `compute_swap_step`: every step rounds, and the Cairo step ends past its target
+when the input reaches further, so how far a step goes depends on what is left. The
+results (amounts, final price, tick and liquidity) are the ones the contract returns.
+
+That loop is what a swap costs on chain, so `swap` and `simulate_swap` take an
+optional `SwapCounters` that they fill in with what each iteration did. Without
+one, the loop only pays a `None` check per iteration.
+
+Where the contract would loop until it runs out of gas, the model raises
+ValueError instead: after `max_steps` steps, or as soon as a step moves neither the
+price nor the amounts.
+
+univ3pool.cairo charges no swap fee, and neither does a pool with the default
+`fee_pips` of 0. With a fee (one of FEE_TIERS, say) every step pays it on top of its
+input, as in Uniswap v3, and the pool keeps the Uniswap fee accounting: the global
+fee growth per unit of liquidity (X128), the fee growth outside every initialized
+tick, flipped when a swap crosses it, and for every position the fee growth inside
+its range when it last changed and the fees it had earned by then. What a position
+is owed is then `fees_owed`, O(1) whatever the number of swaps since, and
+`position_fees.uncollected_fees` does the same for arrays of positions.
+"""
+from bisect import bisect_left
+
+from py_utils.liquidity_math import calc_amount0_delta, calc_amount1_delta
+from py_utils.swap_math import FEE_PIPS_DENOMINATOR, compute_swap_step
+from py_utils.tick_bitmap import TickBitmap, compress, word_edge
+from py_utils.tick_math import (
+    MAX_SQRT_RATIO,
+    MAX_TICK,
+    MIN_SQRT_RATIO,
+    MIN_TICK,
+    get_sqrt_ratio_at_tick,
+    get_tick_at_sqrt_ratio,
+)
+
+MAX_I128 = 2**127 - 1
+MIN_I128 = -MAX_I128
+MAX_U128 = 2**128 - 1
+# Swaps that need this many steps would run out of gas long before; without a bound,
+# exact output swaps that only stop when amount_specified_remaining reaches MIN_I128
+# would keep the model busy for practically ever
+DEFAULT_MAX_STEPS = 100000
+Q128 = 2**128
+MAX_U256 = 2**256 - 1
+# Uniswap v3's fee tiers: fee in hundredths of a basis point -> tick spacing
+FEE_TIERS = {100: 1, 500: 10, 3000: 60, 10000: 200}
+
+
+class SwapCounters:
+    """What the swap loop did, summed over every swap it is passed to
+
+    Each iteration reads one bitmap word (`next_initialized_tick_within_one_word`) and
+    computes one `get_sqrt_ratio_at_tick`; it then either ends on the boundary, crossing
+    an initialized tick or hopping past an empty word edge, or stops short of it and
+    computes `get_tick_at_sqrt_ratio` (unless the price did not move).
+    """
+
+    FIELDS = ("swaps", "steps", "bitmap_reads", "sqrt_ratio_computations", "crossings", "empty_word_hops",
+              "tick_computations")
+
+    __slots__ = FIELDS
+
+    def __init__(self):
+        for name in self.FIELDS:
+            setattr(self, name, 0)
+
+    def count_step(self, reached_boundary, initialized, moved):
+        self.steps += 1
+        self.bitmap_reads += 1
+        self.sqrt_ratio_computations += 1
+        if reached_boundary:
+            if initialized:
+                self.crossings += 1
+            else:
+                self.empty_word_hops += 1
+        elif moved:
+            self.tick_computations += 1
+
+    def __iadd__(self, other):
+        for name in self.FIELDS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        return self
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __repr__(self):
+        return "SwapCounters(" + ", ".join(f"{name}={getattr(self, name)}" for name in self.FIELDS) + ")"
+
+
+class SwapView:
+    """The swap loop, over what it reads of a pool
+
+    Subclasses provide slot0 (`sqrt_price_x96`, `tick`), `liquidity`, `tick_spacing`,
+    `fee_pips` and the fee growth globals as attributes, `tick_info`, and
+    `_find_initialized_tick`, the search behind `next_initialized_tick`; they set
+    `_next_initialized` to [None, None] whenever the initialized ticks change. `Pool`
+    is one; `pool_snapshot.PoolSnapshot` another, which simulates swaps on its mapped
+    columns.
+    """
+
+    def next_initialized_tick(self, tick, lte):
+        """`TickBitmap.next_initialized_tick` with the pool's tick spacing
+
+        The answer holds for every tick between the one asked about and the one found, so
+        the last one in each direction is kept and a swap walking towards it looks it up once.
+        """
+        compressed = compress(tick, self.tick_spacing)
+        cached = self._next_initialized[lte]
+        if cached is not None:
+            start, found, answer = cached
+            if (found <= compressed <= start) if lte else (start <= compressed < found):
+                return answer
+        answer = self._find_initialized_tick(tick, lte)
+        if answer[1]:
+            found = compress(answer[0], self.tick_spacing)
+        else:
+            found = -float("inf") if lte else float("inf")
+        self._next_initialized[lte] = (compressed, found, answer)
+        return answer
+
+    def simulate_swap(self, zero_for_one, amount_specified, sqrt_price_limit_x96, counters=None,
+                      max_steps=DEFAULT_MAX_STEPS):
+        """`UniswapV3Pool::simulate_swap`: (amount0, amount1, sqrt_price_x96, tick), pool unchanged"""
+        if amount_specified == 0:
+            raise ValueError("AS")
+        check_sqrt_price_limit(self.sqrt_price_x96, sqrt_price_limit_x96, zero_for_one, "SPL_underflow", "SPL_overflow")
+        return self._swap(zero_for_one, amount_specified, sqrt_price_limit_x96, counters, max_steps)[:4]
+
+    def next_boundary(self, tick, zero_for_one):
+        """(next_tick, initialized, next_sqrt_price_x96): where a swap step from `tick` stops at the latest"""
+        next_tick, initialized = self.next_initialized_tick(tick, zero_for_one)
+        edge = word_edge(tick, self.tick_spacing, zero_for_one)
+        # Initialized ticks past the edge of the word are the concern of later steps
+        if not initialized or (next_tick <= edge if zero_for_one else next_tick >= edge):
+            next_tick, initialized = edge, False
+        next_tick = min(max(next_tick, MIN_TICK), MAX_TICK)
+        return next_tick, initialized, get_sqrt_ratio_at_tick(next_tick)
+
+    def cross(self, tick, liquidity, zero_for_one):
+        """Active liquidity after the swap crosses the initialized `tick`"""
+        info = self.tick_info(tick)
+        liquidity_net = info[1] if info is not None else 0
+        liquidity += -liquidity_net if zero_for_one else liquidity_net
+        if not 0 <= liquidity <= MAX_U128:
+            raise OverflowError(f"liquidity out of u128 range after crossing tick {tick}")
+        return liquidity
+
+    def _swap(self, zero_for_one, amount_specified, sqrt_price_limit_x96, counters=None, max_steps=DEFAULT_MAX_STEPS):
+        if amount_specified == 0:
+            raise ValueError("AS")
+        check_sqrt_price_limit(self.sqrt_price_x96, sqrt_price_limit_x96, zero_for_one, "SPL", "SPL")
+        if counters is not None:
+            counters.swaps += 1
+
+        exact_input = amount_specified > 0
+        amount_specified_remaining = amount_specified
+        amount_calculated = 0
+        sqrt_price_x96 = self.sqrt_price_x96
+        tick = self.tick
+        liquidity = self.liquidity
+        steps = 0
+        fee_growth_global_x128 = self.fee_growth_global0_x128 if zero_for_one else self.fee_growth_global1_x128
+        # (tick, fee_growth_global_x128 of the input token) of every crossing, for `swap` to flip
+        crossings = []
+
+        while amount_specified_remaining != 0 and sqrt_price_x96 != sqrt_price_limit_x96:
+            steps += 1
+            if steps > max_steps:
+                raise ValueError(f"swap takes more than {max_steps} swap steps")
+            step_sqrt_price_start_x96 = sqrt_price_x96
+
+            next_tick, initialized, next_sqrt_price_x96 = self.next_boundary(tick, zero_for_one)
+            if beyond_limit(next_sqrt_price_x96, sqrt_price_limit_x96, zero_for_one):
+                target_sqrt_price_x96 = sqrt_price_limit_x96
+            else:
+                target_sqrt_price_x96 = next_sqrt_price_x96
+            sqrt_price_x96, amount_in, amount_out, fee_amount = process_swap_step(
+                sqrt_price_x96, target_sqrt_price_x96, liquidity, amount_specified_remaining, zero_for_one,
+                self.fee_pips
+            )
+            if fee_amount and liquidity:
+                fee_growth_global_x128 = (fee_growth_global_x128 + fee_amount * Q128 // liquidity) & MAX_U256
+            amount_specified_remaining, amount_calculated, clamped = accumulate_swap_step(
+                exact_input, amount_specified_remaining, amount_calculated, amount_in, amount_out
+            )
+
+            if sqrt_price_x96 == next_sqrt_price_x96:
+                if initialized:
+                    liquidity = self.cross(next_tick, liquidity, zero_for_one)
+                    if self.fee_pips:
+                        crossings.append((next_tick, fee_growth_global_x128))
+                tick = next_tick - 1 if zero_for_one else next_tick
+            elif sqrt_price_x96 != step_sqrt_price_start_x96:
+                tick = get_tick_at_sqrt_ratio(sqrt_price_x96)
+            elif amount_in == 0 and amount_out == 0:
+                # Nothing changed, so every following step would be the same one
+                raise ValueError("swap step makes no progress")
+
+            if counters is not None:
+                counters.count_step(sqrt_price_x96 == next_sqrt_price_x96, initialized,
+                                    sqrt_price_x96 != step_sqrt_price_start_x96)
+            if clamped:
+                break
+
+        amount0, amount1 = swap_amounts(
+            zero_for_one, exact_input, amount_specified, amount_specified_remaining, amount_calculated
+        )
+        return amount0, amount1, sqrt_price_x96, tick, liquidity, fee_growth_global_x128, crossings
+
+
+class Pool(SwapView):
+    """State of one pool: slot0, active liquidity, ticks and positions."""
+
+    def __init__(self, sqrt_price_x96, tick, liquidity=0, tick_spacing=1, fee_pips=0):
+        if not MIN_TICK < tick < MAX_TICK:
+            raise ValueError(f"Tick {tick} out of bounds")
+        if tick_spacing <= 0:
+            raise ValueError("tick_spacing must be positive")
+        if not 0 <= fee_pips < FEE_PIPS_DENOMINATOR:
+            raise ValueError("fee_pips out of range")
+        self.sqrt_price_x96 = sqrt_price_x96
+        self.tick = tick
+        self.liquidity = liquidity
+        self.tick_spacing = tick_spacing
+        # tick -> [liquidity_gross, liquidity_net]
+        self.ticks = {}
+        # The ticks with liquidity_gross > 0
+        self.bitmap = TickBitmap()
+        self._reset_tick_index()
+        # (owner, lower_tick, upper_tick) -> liquidity
+        self.positions = {}
+        self.fee_pips = fee_pips
+        self.fee_growth_global0_x128 = 0
+        self.fee_growth_global1_x128 = 0
+        # Initialized tick -> [fee_growth_outside0_x128, fee_growth_outside1_x128]
+        self.fee_growth_outside = {}
+        # Position key -> [fee_growth_inside0_last_x128, fee_growth_inside1_last_x128, tokens_owed0, tokens_owed1]
+        self.position_fees = {}
+
+    def copy(self):
+        pool = Pool.__new__(Pool)
+        pool.sqrt_price_x96 = self.sqrt_price_x96
+        pool.tick = self.tick
+        pool.liquidity = self.liquidity
+        pool.tick_spacing = self.tick_spacing
+        pool.ticks = {tick: list(info) for tick, info in self.ticks.items()}
+        pool.bitmap = self.bitmap.copy()
+        pool._reset_tick_index()
+        pool.positions = dict(self.positions)
+        pool.fee_pips = self.fee_pips
+        pool.fee_growth_global0_x128 = self.fee_growth_global0_x128
+        pool.fee_growth_global1_x128 = self.fee_growth_global1_x128
+        pool.fee_growth_outside = {tick: list(outside) for tick, outside in self.fee_growth_outside.items()}
+        pool.position_fees = {key: list(fees) for key, fees in self.position_fees.items()}
+        return pool
+
+    def update_tick(self, tick, liquidity_delta, upper):
+        """`Tick::update`: returns whether the tick flipped between initialized and not"""
+        info = self.ticks.setdefault(tick, [0, 0])
+        liquidity_before = info[0]
+        liquidity_after = liquidity_before + liquidity_delta
+        if liquidity_after < 0:
+            raise ValueError(f"liquidity_gross underflow at tick {tick}")
+
+        info[0] = liquidity_after
+        info[1] += -liquidity_delta if upper else liquidity_delta
+
+        flipped = (liquidity_after == 0) != (liquidity_before == 0)
+        if flipped:
+            self._flip_tick(tick)
+            if liquidity_after == 0:
+                self.fee_growth_outside.pop(tick, None)
+            elif tick <= self.tick:
+                # By convention all the growth so far happened below the tick
+                self.fee_growth_outside[tick] = [self.fee_growth_global0_x128, self.fee_growth_global1_x128]
+            else:
+                self.fee_growth_outside[tick] = [0, 0]
+        if liquidity_after == 0 and info[1] == 0:
+            del self.ticks[tick]
+        return flipped
+
+    def _flip_tick(self, tick):
+        self.bitmap.flip_tick(tick, self.tick_spacing)
+        self._next_initialized = [None, None]
+        if self._initialized_ticks is not None:
+            ticks = self._initialized_ticks
+            index = bisect_left(ticks, tick)
+            if index < len(ticks) and ticks[index] == tick:
+                del ticks[index]
+            else:
+                ticks.insert(index, tick)
+
+    def _reset_tick_index(self):
+        # Sorted initialized ticks, built on first use and then kept up to date by `_flip_tick`
+        self._initialized_ticks = None
+        # Per direction (gt, lte): (compressed tick, compressed answer, answer) of the last
+        # `next_initialized_tick` lookup
+        self._next_initialized = [None, None]
+
+    @property
+    def initialized_ticks(self):
+        """The initialized ticks, sorted (the pool's own list: do not modify it)"""
+        if self._initialized_ticks is None:
+            self._initialized_ticks = sorted(tick for tick, info in self.ticks.items() if info[0] > 0)
+        return self._initialized_ticks
+
+    def is_initialized(self, tick):
+        info = self.ticks.get(tick)
+        return info is not None and info[0] > 0
+
+    def tick_info(self, tick):
+        """(liquidity_gross, liquidity_net) of `tick`, or None if the Tick contract has no entry"""
+        info = self.ticks.get(tick)
+        return tuple(info) if info is not None else None
+
+    def liquidity_net(self, tick):
+        """`Tick::cross`: the liquidity_net of `tick` (0 for ticks never touched)"""
+        info = self.ticks.get(tick)
+        return info[1] if info is not None else 0
+
+    def next_initialized_tick_within_one_word(self, tick, lte):
+        """`TickBitmap::next_initialized_tick_within_one_word` with the pool's tick spacing"""
+        return self.bitmap.next_initialized_tick_within_one_word(tick, self.tick_spacing, lte)
+
+    def _find_initialized_tick(self, tick, lte):
+        return self.bitmap.next_initialized_tick(tick, self.tick_spacing, lte)
+
+    def mint(self, lower_tick, upper_tick, amount, owner=0):
+        """`UniswapV3Pool::mint`: returns (amount0, amount1) owed by the minter"""
+        self.add_liquidity(lower_tick, upper_tick, amount, owner)
+
+        sqrt_price_lower_x96 = get_sqrt_ratio_at_tick(lower_tick)
+        sqrt_price_upper_x96 = get_sqrt_ratio_at_tick(upper_tick)
+
+        if self.tick < lower_tick:
+            amount0 = calc_amount0_delta(sqrt_price_lower_x96, sqrt_price_upper_x96, amount)
+            amount1 = 0
+        elif self.tick < upper_tick:
+            amount0 = calc_amount0_delta(self.sqrt_price_x96, sqrt_price_upper_x96, amount)
+            amount1 = calc_amount1_delta(sqrt_price_lower_x96, self.sqrt_price_x96, amount)
+        else:
+            amount0 = 0
+            amount1 = calc_amount1_delta(sqrt_price_lower_x96, sqrt_price_upper_x96, amount)
+        return amount0, amount1
+
+    def add_liquidity(self, lower_tick, upper_tick, amount, owner=0):
+        """What `mint` does to the pool, without working out the amounts owed (for replaying mints)"""
+        if not lower_tick > MIN_TICK:
+            raise ValueError("lower tick too low")
+        if not upper_tick < MAX_TICK:
+            raise ValueError("upper tick too high")
+        if not lower_tick <= upper_tick:
+            raise ValueError("lower tick must be lower or equal to upper tick")
+        if amount == 0:
+            raise ValueError("liq amount must be > 0")
+        # The check univ3pool.cairo has commented out until its spacing is configurable
+        if lower_tick % self.tick_spacing or upper_tick % self.tick_spacing:
+            raise ValueError("tick not divisible by spacing")
+
+        self.update_tick(lower_tick, amount, False)
+        self.update_tick(upper_tick, amount, True)
+
+        key = (owner, lower_tick, upper_tick)
+        self._accrue_fees(key)
+        self.positions[key] = self.positions.get(key, 0) + amount
+
+        # The contract stores the position's liquidity, not the pool's running total
+        if lower_tick <= self.tick < upper_tick:
+            self.liquidity = self.positions[key]
+
+    def fee_growth_inside(self, lower_tick, upper_tick):
+        """(fee_growth_inside0_x128, fee_growth_inside1_x128) of a range, as Uniswap's `getFeeGrowthInside`"""
+        if not self.fee_pips:
+            # Without a fee nothing ever grows
+            return 0, 0
+        inside = []
+        for token, fee_growth_global in enumerate((self.fee_growth_global0_x128, self.fee_growth_global1_x128)):
+            lower_outside = self.fee_growth_outside.get(lower_tick, (0, 0))[token]
+            upper_outside = self.fee_growth_outside.get(upper_tick, (0, 0))[token]
+            below = lower_outside if self.tick >= lower_tick else fee_growth_global - lower_outside
+            above = upper_outside if self.tick < upper_tick else fee_growth_global - upper_outside
+            inside.append((fee_growth_global - below - above) & MAX_U256)
+        return tuple(inside)
+
+    def _accrue_fees(self, key):
+        """Add what the position earned since it last changed to its tokens owed"""
+        inside = self.fee_growth_inside(key[1], key[2])
+        fees = self.position_fees.get(key)
+        if fees is None:
+            self.position_fees[key] = [inside[0], inside[1], 0, 0]
+            return
+        owed = self.fees_owed(*key)
+        fees[:] = [inside[0], inside[1], owed[0], owed[1]]
+
+    def fees_owed(self, owner, lower_tick, upper_tick):
+        """(tokens_owed0, tokens_owed1) of a position, counting the fees it has not been credited yet"""
+        key = (owner, lower_tick, upper_tick)
+        fees = self.position_fees.get(key)
+        if fees is None:
+            return 0, 0
+        liquidity = self.positions.get(key, 0)
+        owed = []
+        for token, fee_growth_inside in enumerate(self.fee_growth_inside(lower_tick, upper_tick)):
+            earned = (fee_growth_inside - fees[token]) & MAX_U256
+            # Truncated to u128 like Uniswap's Position.update, which lets tokens owed overflow
+            owed.append((fees[2 + token] + (earned * liquidity >> 128)) & MAX_U128)
+        return tuple(owed)
+
+    def swap(self, zero_for_one, amount_specified, sqrt_price_limit_x96, counters=None,
+             max_steps=DEFAULT_MAX_STEPS):
+        """`UniswapV3Pool::swap`: returns (amount0, amount1) and updates the pool"""
+        amount0, amount1, sqrt_price_x96, tick, liquidity, fee_growth_global_x128, crossings = self._swap(
+            zero_for_one, amount_specified, sqrt_price_limit_x96, counters, max_steps
+        )
+        self.sqrt_price_x96 = sqrt_price_x96
+        self.tick = tick
+        self.liquidity = liquidity
+        if self.fee_pips:
+            # Crossed ticks flip with the growth of the input token at the time of the crossing
+            for crossed_tick, fee_growth_at_crossing in crossings:
+                if zero_for_one:
+                    self._cross_fees(crossed_tick, fee_growth_at_crossing, self.fee_growth_global1_x128)
+                else:
+                    self._cross_fees(crossed_tick, self.fee_growth_global0_x128, fee_growth_at_crossing)
+            if zero_for_one:
+                self.fee_growth_global0_x128 = fee_growth_global_x128
+            else:
+                self.fee_growth_global1_x128 = fee_growth_global_x128
+        return amount0, amount1
+
+    def _cross_fees(self, tick, fee_growth_global0_x128, fee_growth_global1_x128):
+        """The fee growth outside `tick` switches sides as the price crosses it"""
+        outside = self.fee_growth_outside.get(tick)
+        if outside is not None:
+            outside[0] = (fee_growth_global0_x128 - outside[0]) & MAX_U256
+            outside[1] = (fee_growth_global1_x128 - outside[1]) & MAX_U256
+
+
+def check_sqrt_price_limit(sqrt_price_x96, sqrt_price_limit_x96, zero_for_one, below_message, above_message):
+    """The price limit assert of `swap` / `simulate_swap` (they differ only in the messages)"""
+    if zero_for_one:
+        if not MIN_SQRT_RATIO < sqrt_price_limit_x96 < sqrt_price_x96:
+            raise ValueError(below_message)
+    elif not sqrt_price_x96 < sqrt_price_limit_x96 < MAX_SQRT_RATIO:
+        raise ValueError(above_message)
+
+
+def beyond_limit(sqrt_price_x96, sqrt_price_limit_x96, zero_for_one):
+    """Whether a swap in this direction would have to pass the price limit to reach `sqrt_price_x96`"""
+    return sqrt_price_x96 < sqrt_price_limit_x96 if zero_for_one else sqrt_price_x96 > sqrt_price_limit_x96
+
+
+def process_swap_step(sqrt_price_x96, target_sqrt_price_x96, liquidity, amount_remaining, zero_for_one, fee_pips=0):
+    """`process_swap_step`: (sqrt_price_next_x96, amount_in, -amount_out, fee_amount)
+
+    `amount_in` includes the fee; both amounts fit in i128.
+    """
+    sqrt_price_x96, amount_in, amount_out, fee_amount = compute_swap_step(
+        sqrt_price_x96, target_sqrt_price_x96, liquidity, amount_remaining, zero_for_one, fee_pips
+    )
+    return (sqrt_price_x96,) + signed_step_amounts(amount_in + fee_amount, amount_out) + (fee_amount,)
+
+
+def signed_step_amounts(amount_in, amount_out):
+    """The i128 conversions of `process_swap_step`: (amount_in, -amount_out)"""
+    if amount_in > MAX_I128 or amount_out > MAX_I128:
+        raise OverflowError("swap step amount does not fit in i128")
+    return amount_in, -amount_out
+
+
+def accumulate_swap_step(exact_input, amount_specified_remaining, amount_calculated, amount_in, amount_out):
+    """Add one step to the swap state: (amount_specified_remaining, amount_calculated, clamped)
+
+    `amount_out` is the negative amount `process_swap_step` returns. Sums that would leave
+    the i128 range are clamped to MIN_I128 or MAX_I128, which ends the swap. The MAX_I128
+    branches need a positive `amount_out`, which `process_swap_step` never returns; they
+    are here because the contract has them.
+    """
+    clamped = False
+    if exact_input:
+        if amount_in > 0 and amount_specified_remaining < MIN_I128 + amount_in:
+            amount_specified_remaining = MIN_I128
+            clamped = True
+        else:
+            amount_specified_remaining -= amount_in
+
+        if amount_out < 0 and amount_calculated < MIN_I128 - amount_out:
+            amount_calculated = MIN_I128
+            clamped = True
+        elif amount_out > 0 and amount_calculated > MAX_I128 - amount_out:
+            amount_calculated = MAX_I128
+            clamped = True
+        else:
+            amount_calculated += amount_out
+    else:
+        if amount_out < 0 and amount_specified_remaining < MIN_I128 - amount_out:
+            amount_specified_remaining = MIN_I128
+            clamped = True
+        elif amount_out > 0 and amount_specified_remaining > MAX_I128 - amount_out:
+            amount_specified_remaining = MAX_I128
+            clamped = True
+        else:
+            amount_specified_remaining += amount_out
+
+        if amount_in > 0 and amount_calculated < MIN_I128 + amount_in:
+            amount_calculated = MIN_I128
+            clamped = True
+        else:
+            amount_calculated -= amount_in
+    return amount_specified_remaining, amount_calculated, clamped
+
+
+def swap_amounts(zero_for_one, exact_input, amount_specified, amount_specified_remaining, amount_calculated):
+    """(amount0, amount1) a swap returns from its final state"""
+    if zero_for_one == exact_input:
+        return _amount_specified_used(amount_specified, amount_specified_remaining), amount_calculated
+    return amount_calculated, _amount_specified_used(amount_specified, amount_specified_remaining)
+
+
+def _amount_specified_used(amount_specified, amount_specified_remaining):
+    if amount_specified_remaining == MIN_I128:
+        return amount_specified
+    if amount_specified < amount_specified_remaining:
+        return 0
+    return amount_specified - amount_specified_remaining
@@ -0,0 +1,312 @@
+"""Binary snapshots of a `Pool`, memory-mapped for reading.
+
+A snapshot holds slot0 (sqrt_pricex96, tick), the active liquidity, every tick the
+Tick contract stores with its (liquidity_gross, liquidity_net), the non-empty
+TickBitmap words and the positions keyed like `position.cairo`'s `Key`
+(owner, lower_tick, upper_tick). It also holds the pool's fee state: fee_pips and
+the global fee growth of both tokens in the header, the fee growth outside every
+tick (0 for ticks that are not initialized) and, per position, the fee growth
+inside at its last update and the tokens owed then. After the fixed header come
+fixed-width columns, each starting on a 16-byte boundary:
+
+    ticks                        i32       sorted
+    liquidity_gross              u128      two little-endian u64 per row, low half first
+    liquidity_net                i128      same, two's complement
+    fee_growth_outside0          u256      four little-endian u64 per row
+    fee_growth_outside1          u256
+    word_positions               i32       sorted
+    words                        u256
+    position_owners              u256      rows sorted by (owner, lower_tick, upper_tick)
+    position_lower               i32
+    position_upper               i32
+    position_liquidity           u128
+    position_fee_growth_inside0  u256
+    position_fee_growth_inside1  u256
+    position_tokens_owed0        u128
+    position_tokens_owed1        u128
+
+`PoolSnapshot` maps the file read-only and exposes every column as a zero-copy
+NumPy view, so opening it costs the same for ten ticks as for a million, and
+processes that open the same file share its pages. Single lookups binary-search
+the columns. A snapshot is a `pool.SwapView`: `simulate_swap` runs the swap loop of
+`Pool` with the next initialized tick and the crossed ticks searched in the columns,
+so quoting needs no `Pool`. `to_pool` builds a mutable one when it is needed.
+
+    write_snapshot(pool, "pool.snap")
+    with PoolSnapshot("pool.snap") as snapshot:
+        gross, net = snapshot.tick_info(tick)
+        amount0, amount1, sqrt_price_x96, tick = snapshot.simulate_swap(True, amount_in, sqrt_price_limit_x96)
+        pool = snapshot.to_pool()
+"""
+import mmap
+import os
+import struct
+from bisect import bisect_left
+
+import numpy as np
+
+from py_utils.pool import Pool, SwapView
+from py_utils.tick_bitmap import compress
+from py_utils.tick_math import MAX_TICK, MIN_TICK
+
+SNAPSHOT_MAGIC = b"UV3POOL\0"
+SNAPSHOT_VERSION = 2
+# Header: magic, format version, tick spacing, tick, tick count, bitmap word count,
+# position count, fee_pips, sqrt_price_x96 (32 bytes), liquidity (16 bytes) and the
+# fee growth global of token0 and token1 (32 bytes each), little-endian
+SNAPSHOT_HEADER = struct.Struct("<8sIiiIIII32s16s32s32s")
+ALIGNMENT = 16
+
+# (column, dtype, u64 words per row or None for scalar columns, count field)
+COLUMNS = (
+    ("ticks", "<i4", None, "ticks"),
+    ("liquidity_gross", "<u8", 2, "ticks"),
+    ("liquidity_net", "<u8", 2, "ticks"),
+    ("fee_growth_outside0", "<u8", 4, "ticks"),
+    ("fee_growth_outside1", "<u8", 4, "ticks"),
+    ("word_positions", "<i4", None, "words"),
+    ("words", "<u8", 4, "words"),
+    ("position_owners", "<u8", 4, "positions"),
+    ("position_lower", "<i4", None, "positions"),
+    ("position_upper", "<i4", None, "positions"),
+    ("position_liquidity", "<u8", 2, "positions"),
+    ("position_fee_growth_inside0", "<u8", 4, "positions"),
+    ("position_fee_growth_inside1", "<u8", 4, "positions"),
+    ("position_tokens_owed0", "<u8", 2, "positions"),
+    ("position_tokens_owed1", "<u8", 2, "positions"),
+)
+
+
+def _layout(counts):
+    """[(column, dtype, shape, offset)] and the file size for the given row counts"""
+    layout = []
+    offset = SNAPSHOT_HEADER.size
+    for name, dtype, width, count_field in COLUMNS:
+        offset += -offset % ALIGNMENT
+        rows = counts[count_field]
+        shape = (rows,) if width is None else (rows, width)
+        layout.append((name, dtype, shape, offset))
+        offset += int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return layout, offset
+
+
+def _wide_column(values, width, signed=False):
+    """Ints as rows of `width` little-endian u64 words (two's complement when signed)"""
+    size = 8 * width
+    try:
+        packed = b"".join([value.to_bytes(size, "little", signed=signed) for value in values])
+    except OverflowError:
+        raise ValueError(f"value does not fit in {8 * size} bits") from None
+    return np.frombuffer(packed, dtype="<u8").reshape(-1, width)
+
+
+def _wide_ints(column, signed=False):
+    """Rows of little-endian u64 words back to Python ints"""
+    width = column.shape[1]
+    values = column[:, width - 1].tolist()
+    for k in range(width - 2, -1, -1):
+        values = [high << 64 | low for high, low in zip(values, column[:, k].tolist())]
+    if signed:
+        bits = 64 * width
+        values = [value - (1 << bits) if value >> (bits - 1) else value for value in values]
+    return values
+
+
+def write_snapshot(pool, path):
+    """Write the state of `pool` to `path`; returns the path
+
+    Like the tick table, the file is written next to its destination and renamed into
+    place, so processes that mapped an older snapshot keep a consistent view.
+    """
+    ticks = sorted(pool.ticks)
+    bitmap = pool.bitmap
+    word_positions = sorted(bitmap.words)
+    positions = sorted(pool.positions.items())
+    outside = [pool.fee_growth_outside.get(tick, (0, 0)) for tick in ticks]
+    # Every minted position has its fee entry; zeros stand for one that would not
+    fees = [pool.position_fees.get(key, (0, 0, 0, 0)) for key, _ in positions]
+
+    columns = {
+        "ticks": np.array(ticks, dtype="<i4"),
+        "liquidity_gross": _wide_column([pool.ticks[tick][0] for tick in ticks], 2),
+        "liquidity_net": _wide_column([pool.ticks[tick][1] for tick in ticks], 2, signed=True),
+        "fee_growth_outside0": _wide_column([row[0] for row in outside], 4),
+        "fee_growth_outside1": _wide_column([row[1] for row in outside], 4),
+        "word_positions": np.array(word_positions, dtype="<i4"),
+        "words": _wide_column([bitmap.words[word_pos] for word_pos in word_positions], 4),
+        "position_owners": _wide_column([owner for (owner, _, _), _ in positions], 4),
+        "position_lower": np.array([lower for (_, lower, _), _ in positions], dtype="<i4"),
+        "position_upper": np.array([upper for (_, _, upper), _ in positions], dtype="<i4"),
+        "position_liquidity": _wide_column([liquidity for _, liquidity in positions], 2),
+        "position_fee_growth_inside0": _wide_column([row[0] for row in fees], 4),
+        "position_fee_growth_inside1": _wide_column([row[1] for row in fees], 4),
+        "position_tokens_owed0": _wide_column([row[2] for row in fees], 2),
+        "position_tokens_owed1": _wide_column([row[3] for row in fees], 2),
+    }
+    counts = {"ticks": len(ticks), "words": len(word_positions), "positions": len(positions)}
+    layout, size = _layout(counts)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC, SNAPSHOT_VERSION, pool.tick_spacing, pool.tick,
+                counts["ticks"], counts["words"], counts["positions"], pool.fee_pips,
+                pool.sqrt_price_x96.to_bytes(32, "little"), pool.liquidity.to_bytes(16, "little"),
+                pool.fee_growth_global0_x128.to_bytes(32, "little"),
+                pool.fee_growth_global1_x128.to_bytes(32, "little"),
+            ))
+            for name, dtype, shape, offset in layout:
+                f.write(bytes(offset - f.tell()))
+                f.write(columns[name].astype(dtype, copy=False).tobytes())
+            f.write(bytes(size - f.tell()))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+class PoolSnapshot(SwapView):
+    """Read-only, memory-mapped view of a snapshot written by `write_snapshot`.
+
+    Pickling a snapshot only sends its path; the receiving process maps the file itself.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mm) < SNAPSHOT_HEADER.size:
+            self._mm.close()
+            raise ValueError(f"{path} is truncated")
+        (magic, version, tick_spacing, tick, tick_count, word_count, position_count, fee_pips,
+         sqrt_price_x96, liquidity, fee_growth_global0_x128,
+         fee_growth_global1_x128) = SNAPSHOT_HEADER.unpack_from(self._mm, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {SNAPSHOT_VERSION} pool snapshot")
+        layout, size = _layout({"ticks": tick_count, "words": word_count, "positions": position_count})
+        if len(self._mm) != size:
+            self._mm.close()
+            raise ValueError(f"{path} does not have the size its header gives")
+
+        self.tick_spacing = tick_spacing
+        self.tick = tick
+        self.sqrt_price_x96 = int.from_bytes(sqrt_price_x96, "little")
+        self.liquidity = int.from_bytes(liquidity, "little")
+        self.fee_pips = fee_pips
+        self.fee_growth_global0_x128 = int.from_bytes(fee_growth_global0_x128, "little")
+        self.fee_growth_global1_x128 = int.from_bytes(fee_growth_global1_x128, "little")
+        self._layout = layout
+        self._map_columns()
+
+    def _map_columns(self):
+        for name, dtype, shape, offset in self._layout:
+            count = int(np.prod(shape))
+            setattr(self, name, np.frombuffer(self._mm, dtype=dtype, count=count, offset=offset).reshape(shape))
+        self._initialized_ticks = None
+        self._next_initialized = [None, None]
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __reduce__(self):
+        return PoolSnapshot, (self.path,)
+
+    def close(self):
+        """Unmap the file
+
+        The columns are views of the mapping, so it can only be closed once they and any
+        array taken from them are gone. While such an array is alive this raises
+        BufferError and the snapshot stays open with its columns in place.
+        """
+        for name, _, _, _ in COLUMNS:
+            setattr(self, name, None)
+        self._initialized_ticks = None
+        try:
+            self._mm.close()
+        except BufferError:
+            self._map_columns()
+            raise
+
+    def tick_info(self, tick):
+        """(liquidity_gross, liquidity_net) of `tick`, or None if the Tick contract has no entry"""
+        index = int(np.searchsorted(self.ticks, tick))
+        if index == len(self.ticks) or self.ticks[index] != tick:
+            return None
+        gross = _wide_ints(self.liquidity_gross[index:index + 1])[0]
+        net = _wide_ints(self.liquidity_net[index:index + 1], signed=True)[0]
+        return gross, net
+
+    def is_initialized(self, tick):
+        info = self.tick_info(tick)
+        return info is not None and info[0] > 0
+
+    @property
+    def initialized_ticks(self):
+        """The initialized ticks, sorted: the ticks column itself unless some tick has no liquidity_gross"""
+        if self._initialized_ticks is None:
+            empty = (self.liquidity_gross == 0).all(axis=1)
+            self._initialized_ticks = self.ticks[~empty] if empty.any() else self.ticks
+        return self._initialized_ticks
+
+    def _find_initialized_tick(self, tick, lte):
+        ticks = self.initialized_ticks
+        # Initialized ticks are multiples of the spacing, so comparing them with the compressed
+        # tick scaled back up compares them the way the bitmap does
+        index = int(np.searchsorted(ticks, compress(tick, self.tick_spacing) * self.tick_spacing, side="right"))
+        if lte:
+            return (int(ticks[index - 1]), True) if index else (MIN_TICK, False)
+        return (int(ticks[index]), True) if index < len(ticks) else (MAX_TICK, False)
+
+    def bitmap_word(self, word_pos):
+        """The TickBitmap word at `word_pos` (0 when empty)"""
+        index = int(np.searchsorted(self.word_positions, word_pos))
+        if index == len(self.word_positions) or self.word_positions[index] != word_pos:
+            return 0
+        return _wide_ints(self.words[index:index + 1])[0]
+
+    def _position_key(self, index):
+        owner = _wide_ints(self.position_owners[index:index + 1])[0]
+        return owner, int(self.position_lower[index]), int(self.position_upper[index])
+
+    def position(self, owner, lower_tick, upper_tick):
+        """`Position::get`: liquidity of the position with this `Key` (0 when there is none)"""
+        key = (owner, lower_tick, upper_tick)
+        rows = len(self.position_lower)
+        index = bisect_left(range(rows), key, key=self._position_key)
+        if index == rows or self._position_key(index) != key:
+            return 0
+        return _wide_ints(self.position_liquidity[index:index + 1])[0]
+
+    def to_pool(self):
+        """A `Pool` with the snapshot's state"""
+        pool = Pool(self.sqrt_price_x96, self.tick, self.liquidity, self.tick_spacing, self.fee_pips)
+        pool.fee_growth_global0_x128 = self.fee_growth_global0_x128
+        pool.fee_growth_global1_x128 = self.fee_growth_global1_x128
+        ticks = self.ticks.tolist()
+        gross = _wide_ints(self.liquidity_gross)
+        net = _wide_ints(self.liquidity_net, signed=True)
+        pool.ticks = {tick: [g, n] for tick, g, n in zip(ticks, gross, net)}
+        outside = zip(_wide_ints(self.fee_growth_outside0), _wide_ints(self.fee_growth_outside1))
+        for tick, g, (outside0, outside1) in zip(ticks, gross, outside):
+            if g > 0:
+                pool.bitmap.flip_tick(tick, self.tick_spacing)
+                pool.fee_growth_outside[tick] = [outside0, outside1]
+        keys = list(zip(_wide_ints(self.position_owners), self.position_lower.tolist(),
+                        self.position_upper.tolist()))
+        pool.positions = dict(zip(keys, _wide_ints(self.position_liquidity)))
+        fees = zip(_wide_ints(self.position_fee_growth_inside0), _wide_ints(self.position_fee_growth_inside1),
+                   _wide_ints(self.position_tokens_owed0), _wide_ints(self.position_tokens_owed1))
+        pool.position_fees = {key: list(row) for key, row in zip(keys, fees)}
+        return pool
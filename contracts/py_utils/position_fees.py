@@ -0,0 +1,79 @@
+"""Uncollected swap fees of many positions at once.
+
+A position earns liquidity * (fee growth inside its range now - the fee growth
+inside it when it last changed) / 2**128 of each token, which `Pool.fees_owed`
+works out for one position at a time. `uncollected_fees` does it for arrays of
+positions, such as the rows of a `position_ledger.PositionLedger` with the
+`fee_growth_inside*_last` values an indexer kept for them: the fee growth below
+and above every tick the positions use is read from the pool once, and the
+u256 arithmetic for the positions runs on limb columns (`py_utils.limbs`), in
+chunks of CHUNK_ROWS so that memory stays bounded.
+
+As in `Pool.fees_owed`, growth differences wrap modulo 2**256 and the result is
+truncated to u128 the way Uniswap's Position.update truncates it.
+
+    fees0, fees1 = uncollected_fees(pool, lower_ticks, upper_ticks, liquidity,
+                                    fee_growth_inside0_last_x128, fee_growth_inside1_last_x128)
+"""
+import numpy as np
+
+from py_utils import limbs
+from py_utils.pool import MAX_U256
+
+CHUNK_ROWS = 1 << 18
+GROWTH_LIMBS = 8
+
+
+def _column(values, n_limbs):
+    values = np.asarray(values)
+    if values.dtype.kind in "iu" and values.dtype.itemsize <= 8:
+        if (values < 0).any():
+            raise ValueError("negative value")
+        return limbs.from_uint64(values.reshape(-1), n_limbs)
+    column, overflow = limbs.from_ints(values.reshape(-1).tolist(), n_limbs)
+    if overflow.any():
+        raise OverflowError(f"value does not fit in {n_limbs * limbs.LIMB_BITS} bits")
+    return column
+
+
+def _growth_outside_ranges(pool, ticks, token):
+    """(below, above): limbs of the fee growth below each tick as a lower tick and above it as an upper tick"""
+    fee_growth_global = (pool.fee_growth_global0_x128, pool.fee_growth_global1_x128)[token]
+    below, above = [], []
+    for tick in ticks:
+        outside = pool.fee_growth_outside.get(tick, (0, 0))[token]
+        rest = (fee_growth_global - outside) & MAX_U256
+        below.append(outside if pool.tick >= tick else rest)
+        above.append(outside if pool.tick < tick else rest)
+    return _column(below, GROWTH_LIMBS), _column(above, GROWTH_LIMBS)
+
+
+def uncollected_fees(pool, lower_ticks, upper_ticks, liquidity, fee_growth_inside0_last_x128,
+                     fee_growth_inside1_last_x128):
+    """(fees0, fees1): lists of what every position has earned in `pool` since its last update"""
+    lower_ticks = np.asarray(lower_ticks, dtype=np.int64).reshape(-1)
+    upper_ticks = np.asarray(upper_ticks, dtype=np.int64).reshape(-1)
+    rows = len(lower_ticks)
+    liquidity = _column(liquidity, 4)
+    last = (_column(fee_growth_inside0_last_x128, GROWTH_LIMBS), _column(fee_growth_inside1_last_x128, GROWTH_LIMBS))
+    if not len(upper_ticks) == liquidity.shape[1] == last[0].shape[1] == last[1].shape[1] == rows:
+        raise ValueError("position columns have different lengths")
+
+    ticks, tick_index = np.unique(np.concatenate([lower_ticks, upper_ticks]), return_inverse=True)
+    tick_index = tick_index.reshape(-1)
+    lower_index, upper_index = tick_index[:rows], tick_index[rows:]
+    fees = ([], [])
+    for token in (0, 1):
+        below, above = _growth_outside_ranges(pool, ticks.tolist(), token)
+        fee_growth_global = (pool.fee_growth_global0_x128, pool.fee_growth_global1_x128)[token]
+        global_column = _column([fee_growth_global], GROWTH_LIMBS)
+        for start in range(0, rows, CHUNK_ROWS):
+            chunk = slice(start, start + CHUNK_ROWS)
+            size = len(lower_index[chunk])
+            # limbs.sub wraps modulo 2**256, like the growth arithmetic
+            inside = limbs.sub(np.repeat(global_column, size, axis=1), below[:, lower_index[chunk]])
+            inside = limbs.sub(inside, above[:, upper_index[chunk]])
+            earned = limbs.sub(inside, last[token][:, chunk])
+            # Bits 128 to 255 of the product: the fees, truncated to u128
+            fees[token].extend(limbs.to_ints(limbs.mul(earned, liquidity[:, chunk])[4:8]))
+    return fees
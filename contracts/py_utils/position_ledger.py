@@ -0,0 +1,374 @@
+"""A columnar store of positions with the update semantics of `position.cairo`.
+
+Positions are keyed like the contract's `Key` (owner, lower_tick, upper_tick) and
+hold a u128 liquidity. `update` adds a signed delta the way `Position::update`
+does: a positive delta that takes the liquidity past u128 panics (OverflowError
+here), a negative one larger than the liquidity floors it at 0. `get` of a key
+that was never updated returns 0.
+
+Each position is one row of five NumPy columns: an owner id (u32, into a table of
+the distinct owners), lower and upper tick (i32) and the liquidity as two u64
+halves, 28 bytes in all. Keys find their row through an open-addressing hash
+table of i32 row numbers kept at most half full, 8 to 16 bytes more per position,
+where a dict of dicts costs several hundred. Nothing is ever deleted, as in the
+contract's storage: a position brought down to 0 keeps its row.
+
+`update_many` takes arrays of keys and deltas and applies them in order, so a key
+that appears several times ends where the same scalar updates would leave it.
+Probing and inserting go through the hash table a whole batch at a time, and the
+liquidity arithmetic runs on 32-bit limbs (`py_utils.limbs`). A batch that would
+overflow raises before anything is written.
+
+    ledger = PositionLedger()
+    ledger.update(owner, -600, 600, 10**18)
+    ledger.update_many(owners, lower_ticks, upper_ticks, deltas)
+    ledger.get(owner, -600, 600)
+    totals = ledger.liquidity_by_owner()
+    rows = ledger.rows_active_at(tick)
+    keys, liquidity = ledger.keys(rows), ledger.liquidity(rows)
+"""
+import numpy as np
+
+from py_utils import limbs
+
+MAX_LIQUIDITY = 2**128 - 1
+MIN_DELTA = -2**127
+MAX_DELTA = 2**127 - 1
+
+_EMPTY = -1
+_MIN_CAPACITY = 16
+_HALF_SHIFT = np.uint64(32)
+# Multipliers of the key hash (from splitmix64 and the golden ratio)
+_MIX = (np.uint64(0x9e3779b97f4a7c15), np.uint64(0xbf58476d1ce4e5b9), np.uint64(0x94d049bb133111eb))
+_MIX_SHIFT = np.uint64(31)
+_U32 = 2**32 - 1
+_U64 = 2**64 - 1
+
+
+def _hash(owner_ids, lower_ticks, upper_ticks):
+    """uint64 hash of each key"""
+    h = owner_ids.astype(np.uint64) * _MIX[0]
+    h ^= lower_ticks.astype(np.uint32).astype(np.uint64) * _MIX[1]
+    h ^= (upper_ticks.astype(np.uint32).astype(np.uint64) << _HALF_SHIFT) * _MIX[2]
+    h ^= h >> _MIX_SHIFT
+    h *= _MIX[1]
+    h ^= h >> _MIX_SHIFT
+    return h
+
+
+def _hash_one(owner_id, lower_tick, upper_tick):
+    """`_hash` of one key, in Python ints"""
+    h = owner_id * int(_MIX[0]) & _U64
+    h ^= (lower_tick & _U32) * int(_MIX[1]) & _U64
+    h ^= ((upper_tick & _U32) << 32) * int(_MIX[2]) & _U64
+    h ^= h >> int(_MIX_SHIFT)
+    h = h * int(_MIX[1]) & _U64
+    return h ^ h >> int(_MIX_SHIFT)
+
+
+def _group_keys(owner_ids, lower_ticks, upper_ticks):
+    """(first, key_index): one item of every distinct key, and the key of every item"""
+    _, first, key_index = np.unique(_hash(owner_ids, lower_ticks, upper_ticks), return_index=True,
+                                    return_inverse=True)
+    key_index = key_index.reshape(-1)
+    same = ((owner_ids[first][key_index] == owner_ids) & (lower_ticks[first][key_index] == lower_ticks)
+            & (upper_ticks[first][key_index] == upper_ticks))
+    if not same.all():
+        # Two keys share a hash: group on the keys themselves
+        _, first, key_index = np.unique(np.stack([owner_ids, lower_ticks, upper_ticks], axis=1), axis=0,
+                                        return_index=True, return_inverse=True)
+    return first, key_index.reshape(-1)
+
+
+def _ticks(values):
+    values = np.asarray(values, dtype=np.int64).reshape(-1)
+    if len(values) and (values.min() < -2**31 or values.max() >= 2**31):
+        raise OverflowError("tick out of i32 range")
+    return values.astype(np.int32)
+
+
+class PositionLedger:
+    """Positions keyed by (owner, lower_tick, upper_tick), one row each in NumPy columns."""
+
+    def __init__(self):
+        # owner id -> owner, and back
+        self._owners = []
+        self._owner_index = {}
+        self._size = 0
+        self._owner_ids = np.zeros(0, dtype=np.uint32)
+        self._lower_ticks = np.zeros(0, dtype=np.int32)
+        self._upper_ticks = np.zeros(0, dtype=np.int32)
+        self._liquidity_low = np.zeros(0, dtype=np.uint64)
+        self._liquidity_high = np.zeros(0, dtype=np.uint64)
+        # Slot -> row, _EMPTY for a free slot
+        self._table = np.full(_MIN_CAPACITY, _EMPTY, dtype=np.int32)
+
+    def __len__(self):
+        return self._size
+
+    def __repr__(self):
+        return f"PositionLedger({self._size} positions, {len(self._owners)} owners, {self.nbytes} bytes)"
+
+    @property
+    def nbytes(self):
+        """Bytes held by the columns and the hash table"""
+        columns = (self._owner_ids, self._lower_ticks, self._upper_ticks, self._liquidity_low, self._liquidity_high)
+        return sum(column.nbytes for column in columns) + self._table.nbytes
+
+    # Keys
+
+    def _owner_ids_for(self, owners, create):
+        """Owner id of every owner; -1 for owners the ledger has not seen unless `create`"""
+        owners = np.asarray(owners).reshape(-1)
+        unique, inverse = np.unique(owners, return_inverse=True)
+        ids = np.empty(len(unique), dtype=np.int64)
+        for i, owner in enumerate(unique):
+            owner = int(owner)
+            owner_id = self._owner_index.get(owner)
+            if owner_id is None:
+                if not create:
+                    owner_id = -1
+                elif owner < 0:
+                    raise ValueError("owner must be a contract address")
+                else:
+                    owner_id = self._owner_index[owner] = len(self._owners)
+                    self._owners.append(owner)
+            ids[i] = owner_id
+        return ids[inverse.reshape(-1)]
+
+    def _find(self, owner_ids, lower_ticks, upper_ticks):
+        """Row of every key, -1 for keys without one"""
+        rows = np.full(len(owner_ids), -1, dtype=np.int64)
+        if not self._size:
+            return rows
+        mask = np.uint64(len(self._table) - 1)
+        slots = (_hash(owner_ids, lower_ticks, upper_ticks) & mask).astype(np.int64)
+        pending = np.flatnonzero(owner_ids >= 0)
+        slots = slots[pending]
+        while len(pending):
+            row = self._table[slots]
+            occupied = row != _EMPTY
+            candidate = np.where(occupied, row, 0)
+            match = (occupied & (self._owner_ids[candidate] == owner_ids[pending])
+                     & (self._lower_ticks[candidate] == lower_ticks[pending])
+                     & (self._upper_ticks[candidate] == upper_ticks[pending]))
+            rows[pending[match]] = row[match]
+            # Linear probing: a key is absent once its run of occupied slots ends
+            more = occupied & ~match
+            pending = pending[more]
+            slots = (slots[more] + 1) & int(mask)
+        return rows
+
+    def _find_one(self, owner, lower_tick, upper_tick):
+        """`_find` for one key, without building arrays"""
+        owner_id = self._owner_index.get(owner)
+        if owner_id is None or not self._size:
+            return -1
+        mask = len(self._table) - 1
+        slot = _hash_one(owner_id, lower_tick, upper_tick) & mask
+        while True:
+            row = int(self._table[slot])
+            if row == _EMPTY:
+                return -1
+            if (self._owner_ids[row] == owner_id and self._lower_ticks[row] == lower_tick
+                    and self._upper_ticks[row] == upper_tick):
+                return row
+            slot = (slot + 1) & mask
+
+    def _insert(self, rows):
+        """Put `rows`, whose keys are not in the table yet, into the table"""
+        mask = len(self._table) - 1
+        slots = (_hash(self._owner_ids[rows], self._lower_ticks[rows], self._upper_ticks[rows])
+                 & np.uint64(mask)).astype(np.int64)
+        while len(rows):
+            free = np.flatnonzero(self._table[slots] == _EMPTY)
+            # Rows that want the same free slot: the first one takes it, the others probe on
+            taken, first = np.unique(slots[free], return_index=True)
+            self._table[taken] = rows[free[first]]
+            placed = np.zeros(len(rows), dtype=bool)
+            placed[free[first]] = True
+            rows = rows[~placed]
+            slots = (slots[~placed] + 1) & mask
+
+    def _reserve(self, size):
+        """Make room for `size` rows, keeping the hash table at most half full"""
+        capacity = len(self._owner_ids)
+        if size > capacity:
+            capacity = max(size, capacity + capacity // 2, _MIN_CAPACITY)
+            for name in ("_owner_ids", "_lower_ticks", "_upper_ticks", "_liquidity_low", "_liquidity_high"):
+                column = getattr(self, name)
+                grown = np.zeros(capacity, dtype=column.dtype)
+                grown[:self._size] = column[:self._size]
+                setattr(self, name, grown)
+
+        slots = len(self._table)
+        if 2 * size > slots:
+            while 2 * size > slots:
+                slots *= 2
+            self._table = np.full(slots, _EMPTY, dtype=np.int32)
+            self._insert(np.arange(self._size))
+
+    def _append(self, owner_ids, lower_ticks, upper_ticks):
+        """Rows for new keys, with zero liquidity"""
+        start, end = self._size, self._size + len(owner_ids)
+        if end >= 2**31:
+            raise OverflowError("too many positions")
+        self._reserve(end)
+        self._owner_ids[start:end] = owner_ids
+        self._lower_ticks[start:end] = lower_ticks
+        self._upper_ticks[start:end] = upper_ticks
+        self._liquidity_low[start:end] = 0
+        self._liquidity_high[start:end] = 0
+        self._size = end
+        rows = np.arange(start, end)
+        self._insert(rows)
+        return rows
+
+    # Liquidity as limbs
+
+    def _liquidity_limbs(self, rows):
+        return limbs.from_halves(self._liquidity_low[rows], self._liquidity_high[rows])
+
+    def _store_liquidity(self, rows, liquidity):
+        self._liquidity_low[rows], self._liquidity_high[rows] = limbs.to_halves(liquidity)
+
+    # Contract API
+
+    def get(self, owner, lower_tick, upper_tick):
+        """`Position::get`: the liquidity of the position, 0 for one never updated"""
+        if not (-2**31 <= lower_tick < 2**31 and -2**31 <= upper_tick < 2**31):
+            raise OverflowError("tick out of i32 range")
+        row = self._find_one(owner, lower_tick, upper_tick)
+        return int(self._liquidity_low[row]) | int(self._liquidity_high[row]) << 64 if row >= 0 else 0
+
+    def get_many(self, owners, lower_ticks, upper_ticks):
+        """`get` for arrays of keys: a list of ints"""
+        lower_ticks, upper_ticks = _ticks(lower_ticks), _ticks(upper_ticks)
+        rows = self._find(self._owner_ids_for(owners, False), lower_ticks, upper_ticks)
+        found = rows >= 0
+        liquidity = limbs.zeros(4, len(rows))
+        liquidity[:, found] = self._liquidity_limbs(rows[found])
+        return limbs.to_ints(liquidity)
+
+    def update(self, owner, lower_tick, upper_tick, liquidity_delta):
+        """`Position::update`: add `liquidity_delta`, flooring the liquidity at 0"""
+        if not MIN_DELTA <= liquidity_delta <= MAX_DELTA:
+            raise OverflowError("liquidity delta out of i128 range")
+        if not (-2**31 <= lower_tick < 2**31 and -2**31 <= upper_tick < 2**31):
+            raise OverflowError("tick out of i32 range")
+        row = self._find_one(owner, lower_tick, upper_tick)
+        if row < 0:
+            self.update_many([owner], [lower_tick], [upper_tick], [liquidity_delta])
+            return
+        liquidity = int(self._liquidity_low[row]) | int(self._liquidity_high[row]) << 64
+        liquidity = max(liquidity + liquidity_delta, 0)
+        if liquidity > MAX_LIQUIDITY:
+            raise OverflowError("liquidity out of u128 range")
+        self._liquidity_low[row] = liquidity & _U64
+        self._liquidity_high[row] = liquidity >> 64
+
+    def update_many(self, owners, lower_ticks, upper_ticks, liquidity_deltas):
+        """`update` for every (owner, lower_tick, upper_tick, liquidity_delta), in order.
+
+        Raises OverflowError, and changes nothing, if any update would take a liquidity past u128.
+        """
+        owners = np.asarray(owners).reshape(-1)
+        lower_ticks, upper_ticks = _ticks(lower_ticks), _ticks(upper_ticks)
+        negative, magnitudes = limbs.from_signed(liquidity_deltas, 128)
+        if not len(owners) == len(lower_ticks) == len(upper_ticks) == len(negative):
+            raise ValueError("keys and deltas have different lengths")
+        if not len(owners):
+            return
+
+        known_owners = len(self._owners)
+        try:
+            self._apply(self._owner_ids_for(owners, True), lower_ticks, upper_ticks, negative, magnitudes)
+        except OverflowError:
+            for owner in self._owners[known_owners:]:
+                del self._owner_index[owner]
+            del self._owners[known_owners:]
+            raise
+
+    def _apply(self, owner_ids, lower_ticks, upper_ticks, negative, magnitudes):
+        first, key_index = _group_keys(owner_ids, lower_ticks, upper_ticks)
+        owner_ids, lower_ticks, upper_ticks = owner_ids[first], lower_ticks[first], upper_ticks[first]
+        rows = self._find(owner_ids, lower_ticks, upper_ticks)
+        existing = rows >= 0
+        liquidity = limbs.zeros(4, len(first))
+        liquidity[:, existing] = self._liquidity_limbs(rows[existing])
+
+        # Round r applies the r-th update of every key, so each round touches a key once
+        order = np.argsort(key_index, kind="stable")
+        sorted_keys = key_index[order]
+        group_start = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        group_sizes = np.diff(np.r_[group_start, len(order)])
+        occurrence = np.arange(len(order)) - np.repeat(group_start, group_sizes)
+        for round_ in range(int(group_sizes.max())):
+            updates = order[occurrence == round_]
+            targets = key_index[updates]
+            current, delta, down = liquidity[:, targets], magnitudes[:, updates], negative[updates]
+            added = limbs.add(current, delta)
+            if added[4][~down].any():
+                raise OverflowError("liquidity out of u128 range")
+            floored = limbs.compare(delta, current) >= 0
+            lowered = np.where(floored, np.uint64(0), limbs.sub(current, delta))
+            liquidity[:, targets] = np.where(down, lowered, added[:4])
+
+        new = np.flatnonzero(~existing)
+        if len(new):
+            rows[new] = self._append(owner_ids[new], lower_ticks[new], upper_ticks[new])
+        self._store_liquidity(rows, liquidity)
+
+    # Queries
+
+    def keys(self, rows=None):
+        """(owner, lower_tick, upper_tick) of `rows`, all rows by default"""
+        rows = np.arange(self._size) if rows is None else np.asarray(rows)
+        owners = [self._owners[owner_id] for owner_id in self._owner_ids[rows].tolist()]
+        return list(zip(owners, self._lower_ticks[rows].tolist(), self._upper_ticks[rows].tolist()))
+
+    def liquidity(self, rows=None):
+        """Liquidity of `rows` as a list of ints, all rows by default"""
+        rows = np.arange(self._size) if rows is None else np.asarray(rows)
+        return limbs.to_ints(self._liquidity_limbs(rows))
+
+    def rows_for_owner(self, owner):
+        """Rows of the positions `owner` holds"""
+        owner_id = self._owner_index.get(owner)
+        if owner_id is None:
+            return np.zeros(0, dtype=np.int64)
+        return np.flatnonzero(self._owner_ids[:self._size] == owner_id)
+
+    def rows_for_range(self, lower_tick, upper_tick):
+        """Rows of the positions over exactly [lower_tick, upper_tick], whoever holds them"""
+        return np.flatnonzero((self._lower_ticks[:self._size] == lower_tick)
+                              & (self._upper_ticks[:self._size] == upper_tick))
+
+    def rows_active_at(self, tick):
+        """Rows of the positions whose range holds `tick` (lower_tick <= tick < upper_tick)"""
+        return np.flatnonzero((self._lower_ticks[:self._size] <= tick) & (tick < self._upper_ticks[:self._size]))
+
+    def _group_sums(self, groups, n_groups):
+        """Exact total liquidity of every group of rows, as a list of ints"""
+        order = np.argsort(groups, kind="stable")
+        starts = np.searchsorted(groups[order], np.arange(n_groups))
+        if not len(order):
+            return []
+        # Each limb is below 2**32, so a u64 sum is exact for up to 2**32 rows
+        sums = [np.add.reduceat(part, starts).tolist() for part in self._liquidity_limbs(order)]
+        return [a + (b << 32) + (c << 64) + (d << 96) for a, b, c, d in zip(*sums)]
+
+    def liquidity_by_owner(self):
+        """{owner: total liquidity of the owner's positions}"""
+        owner_ids = self._owner_ids[:self._size].astype(np.int64)
+        present = np.unique(owner_ids)
+        totals = self._group_sums(np.searchsorted(present, owner_ids), len(present))
+        return {self._owners[owner_id]: total for owner_id, total in zip(present.tolist(), totals)}
+
+    def liquidity_by_range(self):
+        """{(lower_tick, upper_tick): total liquidity over the range, whoever holds it}"""
+        lower_ticks, upper_ticks = self._lower_ticks[:self._size], self._upper_ticks[:self._size]
+        first, groups = _group_keys(np.zeros(self._size, dtype=np.int64), lower_ticks, upper_ticks)
+        totals = self._group_sums(groups, len(first))
+        ranges = zip(lower_ticks[first].tolist(), upper_ticks[first].tolist())
+        return dict(zip(ranges, totals))
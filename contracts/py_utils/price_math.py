@@ -0,0 +1,89 @@
+"""Exact conversions from human prices to ticks, one or many at a time.
+
+A human price is how many whole token1 one whole token0 is worth. The pool prices
+raw amounts, so the price is first scaled by the token decimals the way
+`scale_amount` in utils/math.cairo scales amounts (times 10**decimals):
+
+    raw price = price * 10**decimals1 / 10**decimals0
+
+`fixed_point.price_to_sqrt_price_x96` takes the sqrt price of that without rounding
+anywhere but at the end, floor(sqrt(raw price) * 2**96), and `price_to_tick` is the
+tick of it, `get_tick_at_sqrt_ratio`: the tick a pool initialized at the price would
+report. The float formulas in uniswap_v3_math are off for prices that sit near a
+tick boundary or need more than 53 bits.
+
+`prices_to_ticks` takes arrays of prices and estimates every tick in one vectorized
+float pass, log(raw price) / log(1.0001) from the float prices. The estimate is
+within a small fraction of a tick of the exact value, so a row whose estimate is
+not within TICK_MARGIN of a tick boundary (or of the ends of the tick range) already
+has its tick. Only the other rows get their exact sqrt price, and their estimates
+are corrected against the tick table (`TickTable.ticks_at_sqrt_ratios`), so the
+table needs to be built:
+
+    python -m py_utils.tick_math build
+
+    ticks = prices_to_ticks(np.array([1850.75, 2000.0]), decimals0=18, decimals1=6)
+"""
+import math
+
+from py_utils.fixed_point import price_to_sqrt_price_x96, price_to_sqrt_price_x96_batch
+from py_utils.tick_math import (
+    MAX_SQRT_RATIO,
+    MAX_TICK,
+    MIN_SQRT_RATIO,
+    MIN_TICK,
+    get_tick_at_sqrt_ratio,
+    sqrt_ratios_to_ticks,
+)
+
+LOG_TICK_BASE = math.log(1.0001)
+LOG_10 = math.log(10)
+# Float logs put the estimates within about 1e-9 ticks of the exact ones, and the
+# table's sqrt ratios differ from sqrt(1.0001**tick) * 2**96 by less than 1e-5 ticks
+# (their rounding, at the low end of the range); rows closer than this to a tick
+# boundary are settled exactly
+TICK_MARGIN = 1e-3
+
+
+def price_to_tick(price, decimals0=0, decimals1=0):
+    """The tick of a pool whose price is the human `price`"""
+    return get_tick_at_sqrt_ratio(price_to_sqrt_price_x96(price, decimals0, decimals1))
+
+
+def _float_prices(prices):
+    import numpy as np
+
+    try:
+        return np.asarray(prices, dtype=np.float64).reshape(-1)
+    except OverflowError:
+        # Ints beyond the float range; their rows are settled exactly
+        return np.array([float(price) if abs(price) < 2**1023 else math.inf for price in prices])
+
+
+def prices_to_ticks(prices, decimals0=0, decimals1=0):
+    """`price_to_tick` of every price in a sequence or array; returns an int32 array
+
+    Raises ValueError for a price whose sqrt price is outside [MIN_SQRT_RATIO, MAX_SQRT_RATIO).
+    """
+    import numpy as np
+
+    if not hasattr(prices, "__len__"):
+        prices = list(prices)
+    floats = _float_prices(prices)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        estimates = (np.log(floats) + (decimals1 - decimals0) * LOG_10) / LOG_TICK_BASE
+        ticks = np.floor(estimates)
+        settled = ((np.abs(estimates - np.rint(estimates)) > TICK_MARGIN)
+                   & (ticks >= MIN_TICK) & (ticks < MAX_TICK))
+
+    rows = np.flatnonzero(~settled)
+    if len(rows):
+        exact = np.asarray(prices, dtype=object).reshape(-1)[rows].tolist()
+        sqrt_prices = price_to_sqrt_price_x96_batch(exact, decimals0, decimals1)
+        for row, sqrt_price in zip(rows.tolist(), sqrt_prices):
+            if not MIN_SQRT_RATIO <= sqrt_price < MAX_SQRT_RATIO:
+                raise ValueError(f"Sqrt ratio {sqrt_price} of the price at index {row} out of bounds")
+        # Estimated again from the exact sqrt prices, which are in range even where the floats were not
+        logs = 2 * (np.log(np.array(sqrt_prices, dtype=np.float64)) - 96 * math.log(2))
+        ticks[rows] = sqrt_ratios_to_ticks(sqrt_prices, np.floor(logs / LOG_TICK_BASE).astype(np.int64))
+    return ticks.astype(np.int32)
@@ -0,0 +1,448 @@
+"""Python model of `UniswapV3Quoter` in univ3quoter.cairo, for quoting in bulk.
+
+`Quoter` holds snapshots of pools keyed by address and answers `QuoteParams` with
+the tuple `quote` returns, (amount0, amount1, sqrt_price_after, tick_after), equal
+to what `simulate_swap` on the snapshot returns. As in the contract,
+`sqrt_price_limit` is unscaled and multiplied by 2**96 before the swap runs.
+
+Quotes on one pool in one direction share a tick traversal: the swap states that
+sit on a tick boundary (the next initialized tick or the edge of a bitmap word),
+each with the step to the following boundary, its amounts and the liquidity after
+crossing. None of this depends on the amount being swapped, so each step is
+computed once, by the first quote that needs it. Every other quote only works out
+where its own input moves the price (one `get_next_sqrt_price_from_input`): if
+that stays within the boundary, it takes the shared step as is. Steps that end
+anywhere else (the input overshoots the boundary, which compute_swap_step allows,
+or the price limit comes first) run the loop of `Pool._swap`, and the quote picks
+the traversal up again at the next boundary it stops at.
+
+Exact output quotes (negative `amount_specified`) follow the contract's
+`exact_input == false` branch, which passes abs(amount_specified_remaining) to
+compute_swap_step as an input and adds the (negative) output to the remaining
+amount; the remaining amount only grows, so these swaps run on until the price
+limit, a clamp to MIN_I128 or a revert, usually through thousands of steps. They
+take the shared steps in runs: the steps computed so far are chained into paths
+with running totals of their amounts and, for each step, the largest remaining
+amount that still ends the step at its boundary. One bounded search over a path
+finds how far a quote can follow it before its remaining amount overshoots a
+boundary, the price limit comes up, a sum would be clamped or `max_steps` would
+run out, and the quote moves there with its amounts from the running totals.
+
+Pools with a swap fee quote the way `Pool.simulate_swap` swaps them: a step to its
+boundary adds the fee to its input, a step whose input overshoots takes the whole
+remaining amount, and only the input net of the fee moves the price, so a step's
+slack is the largest remaining amount whose net input stays within the boundary.
+
+Where the contract would loop until it runs out of gas, a quote raises ValueError
+instead: after `max_steps` steps, or at once if a step changes nothing.
+
+    quoter = Quoter({pool_address: pool})
+    quoter.quote(QuoteParams(amount_specified, zero_for_one, pool_address, sqrt_price_limit))
+    quoter.quote_batch(params_list, return_exceptions=True)
+    quoter.quote_exact_output_batch(pool_address, amounts_out, zero_for_one, sqrt_price_limit)
+"""
+from bisect import bisect_left, bisect_right
+from operator import neg
+
+from py_utils.fullmath import checked_mul, div_rounding_up
+from py_utils.liquidity_math import calc_amount0_delta, calc_amount1_delta
+from py_utils.pool import (
+    DEFAULT_MAX_STEPS,
+    MAX_I128,
+    accumulate_swap_step,
+    beyond_limit,
+    check_sqrt_price_limit,
+    signed_step_amounts,
+    swap_amounts,
+)
+from py_utils.sqrtprice_math import MAX_U64, get_next_sqrt_price_from_input
+from py_utils.swap_math import FEE_PIPS_DENOMINATOR
+from py_utils.tick_math import get_tick_at_sqrt_ratio
+
+Q96 = 2**96
+# Nodes kept per traversal; quotes past a full traversal run the plain swap loop
+MAX_TRAVERSAL_NODES = 1 << 16
+# Steps per block of a path's minimum slack
+PATH_BLOCK = 64
+
+
+class QuoteParams:
+    """The Cairo `QuoteParams` struct; `pool` is the key of a pool snapshot in the `Quoter`"""
+
+    def __init__(self, amount_specified, zero_for_one, pool, sqrt_price_limit):
+        self.amount_specified = amount_specified
+        self.zero_for_one = zero_for_one
+        self.pool = pool
+        self.sqrt_price_limit = sqrt_price_limit
+
+    def __repr__(self):
+        return (
+            f"QuoteParams(amount_specified={self.amount_specified}, zero_for_one={self.zero_for_one}, "
+            f"pool={self.pool!r}, sqrt_price_limit={self.sqrt_price_limit})"
+        )
+
+
+class _Node:
+    """A swap state on a traversal and, once computed, the step to the next boundary"""
+
+    __slots__ = ("sqrt_price_x96", "tick", "liquidity", "step", "next", "path", "index")
+
+    def __init__(self, sqrt_price_x96, tick, liquidity):
+        self.sqrt_price_x96 = sqrt_price_x96
+        self.tick = tick
+        self.liquidity = liquidity
+        # (next_tick, initialized, next_sqrt_price_x96, amount_in, amount_out)
+        self.step = None
+        # The node after the step; None while not computed, when the traversal is full or
+        # when the step fails (a quote then runs the step itself and raises the same error)
+        self.next = None
+        # The _Path whose steps start at this node, and the node's position in it
+        self.path = None
+        self.index = None
+
+
+def _max_input_within(sqrt_price_x96, sqrt_price_next_x96, liquidity, zero_for_one):
+    """The largest input for which `compute_swap_step` ends at `sqrt_price_next_x96`, or -1
+
+    That is the largest amount whose `get_next_sqrt_price_from_input` does not pass the
+    boundary. -1 stands for "work it out step by step": no liquidity, or a price low
+    enough for the token0 formula to depend on the amount.
+    """
+    if liquidity == 0 or (zero_for_one and sqrt_price_x96 <= MAX_U64):
+        return -1
+    numerator = liquidity * Q96
+    if zero_for_one:
+        # ceil(numerator / (numerator // sqrt_price + amount)) >= sqrt_price_next
+        amount = div_rounding_up(numerator, sqrt_price_next_x96 - 1) - numerator // sqrt_price_x96 - 1
+    else:
+        # sqrt_price + amount * 2**96 // liquidity <= sqrt_price_next
+        amount = div_rounding_up((sqrt_price_next_x96 - sqrt_price_x96 + 1) * liquidity, Q96) - 1
+    if amount < 1:
+        return -1
+    # Check the closed forms against the code they stand for
+    try:
+        within = get_next_sqrt_price_from_input(sqrt_price_x96, liquidity, amount, zero_for_one)
+        beyond = get_next_sqrt_price_from_input(sqrt_price_x96, liquidity, amount + 1, zero_for_one)
+    except (ValueError, ArithmeticError):
+        return -1
+    if beyond_limit(within, sqrt_price_next_x96, zero_for_one) or not beyond_limit(beyond, sqrt_price_next_x96,
+                                                                                  zero_for_one):
+        return -1
+    return amount
+
+
+def _less_fee(amount_remaining, fee_pips):
+    """The part of an input that moves the price, as `compute_swap_step` works it out"""
+    return amount_remaining * (FEE_PIPS_DENOMINATOR - fee_pips) // FEE_PIPS_DENOMINATOR
+
+
+def _max_remaining_within(max_input, fee_pips):
+    """The largest remaining amount whose input less the fee is at most `max_input` (-1 stays -1)"""
+    if max_input < 0 or not fee_pips:
+        return max_input
+    return ((max_input + 1) * FEE_PIPS_DENOMINATOR - 1) // (FEE_PIPS_DENOMINATOR - fee_pips)
+
+
+class _Path:
+    """A chain of computed traversal steps, with running totals for taking them in one go
+
+    Step k starts at nodes[k]; the last node is where the last step ends and may start
+    another path. For exact output, the remaining amount at step k is -(x + amounts_out[k])
+    for a quote-specific x, and the step ends at its boundary while that is at most
+    slack[k] + amounts_out[k].
+    """
+
+    def __init__(self, node, zero_for_one, fee_pips):
+        self.zero_for_one = zero_for_one
+        self.fee_pips = fee_pips
+        self.nodes = [node]
+        node.path = self
+        node.index = 0
+        self.boundaries = []
+        # Running totals of the steps before k: amount in, and amount out as a positive number
+        self.amounts_in = [0]
+        self.amounts_out = [0]
+        self.slack = []
+        self.block_slack = []
+
+    def extend(self):
+        """Take in the steps computed since the last call"""
+        node = self.nodes[-1]
+        # The last node may belong to another path, or be its own next node at MIN/MAX_TICK
+        while node.path is self and node.index == len(self.nodes) - 1 and node.next is not None:
+            _, _, next_sqrt_price_x96, amount_in, amount_out = node.step
+            amount_out = -amount_out
+            max_input = _max_input_within(node.sqrt_price_x96, next_sqrt_price_x96, node.liquidity,
+                                          self.zero_for_one)
+            slack = _max_remaining_within(max_input, self.fee_pips) - self.amounts_out[-1]
+            self.boundaries.append(next_sqrt_price_x96)
+            self.amounts_in.append(self.amounts_in[-1] + amount_in)
+            self.amounts_out.append(self.amounts_out[-1] + amount_out)
+            if len(self.slack) % PATH_BLOCK:
+                self.block_slack[-1] = min(self.block_slack[-1], slack)
+            else:
+                self.block_slack.append(slack)
+            self.slack.append(slack)
+
+            node = node.next
+            self.nodes.append(node)
+            if node.path is None:
+                node.path = self
+                node.index = len(self.nodes) - 1
+
+    def first_overshoot(self, start, x):
+        """The first step from `start` on whose slack is below `x` (len(slack) if none)"""
+        slack = self.slack
+        block = start // PATH_BLOCK
+        for k in range(start, min((block + 1) * PATH_BLOCK, len(slack))):
+            if slack[k] < x:
+                return k
+        for later in range(block + 1, len(self.block_slack)):
+            if self.block_slack[later] < x:
+                for k in range(later * PATH_BLOCK, (later + 1) * PATH_BLOCK):
+                    if slack[k] < x:
+                        return k
+        return len(slack)
+
+    def first_at_limit(self, start, sqrt_price_limit_x96):
+        """The first step from `start` on whose boundary is at or beyond the price limit"""
+        if self.zero_for_one:
+            return bisect_left(self.boundaries, -sqrt_price_limit_x96, start, key=neg)
+        return bisect_left(self.boundaries, sqrt_price_limit_x96, start)
+
+
+class _Traversal:
+    """Boundary-to-boundary swap steps of one pool in one direction, computed on first use
+
+    Nodes are keyed by their state, so a quote that left the traversal picks it up again
+    at the first boundary it stops at that another quote has passed through.
+    """
+
+    def __init__(self, pool, zero_for_one):
+        self.pool = pool
+        self.zero_for_one = zero_for_one
+        self.nodes = {}
+        self.root = self.node(pool.sqrt_price_x96, pool.tick, pool.liquidity)
+
+    def node(self, sqrt_price_x96, tick, liquidity):
+        """The node of this state, None if it is new and the traversal is full"""
+        key = (sqrt_price_x96, tick, liquidity)
+        node = self.nodes.get(key)
+        if node is None and len(self.nodes) < MAX_TRAVERSAL_NODES:
+            node = self.nodes[key] = _Node(sqrt_price_x96, tick, liquidity)
+        return node
+
+    def step(self, node):
+        if node.step is not None:
+            return node.step
+
+        zero_for_one = self.zero_for_one
+        next_tick, initialized, next_sqrt_price_x96 = self.pool.next_boundary(node.tick, zero_for_one)
+        node.step = (next_tick, initialized, next_sqrt_price_x96, None, None)
+        try:
+            amount_in, amount_out = signed_step_amounts(*_step_amounts(
+                node.sqrt_price_x96, next_sqrt_price_x96, node.liquidity, zero_for_one, self.pool.fee_pips
+            ))
+            liquidity = node.liquidity
+            if initialized:
+                liquidity = self.pool.cross(next_tick, liquidity, zero_for_one)
+        except (ValueError, ArithmeticError):
+            # Only a quote whose step does end at the boundary fails, and it does so itself
+            return node.step
+
+        node.step = (next_tick, initialized, next_sqrt_price_x96, amount_in, amount_out)
+        node.next = self.node(next_sqrt_price_x96, next_tick - 1 if zero_for_one else next_tick, liquidity)
+        if node.path is not None:
+            node.path.extend()
+        return node.step
+
+    def path(self, node):
+        """The path starting at or running through `node`, with every computed step taken in"""
+        path = node.path
+        if path is None:
+            path = _Path(node, self.zero_for_one, self.pool.fee_pips)
+        path.extend()
+        return path
+
+
+def _step_amounts(sqrt_price_x96, sqrt_price_next_x96, liquidity, zero_for_one, fee_pips=0):
+    """(amount_in, amount_out) of a `compute_swap_step` that ends on its target `sqrt_price_next_x96`
+
+    `amount_in` includes the fee, as `process_swap_step` returns it.
+    """
+    if zero_for_one:
+        amount_in = calc_amount0_delta(sqrt_price_x96, sqrt_price_next_x96, liquidity)
+        amount_out = calc_amount1_delta(sqrt_price_x96, sqrt_price_next_x96, liquidity)
+    else:
+        amount_in = calc_amount1_delta(sqrt_price_x96, sqrt_price_next_x96, liquidity)
+        amount_out = calc_amount0_delta(sqrt_price_x96, sqrt_price_next_x96, liquidity)
+    if fee_pips:
+        amount_in += -(-amount_in * fee_pips // (FEE_PIPS_DENOMINATOR - fee_pips))
+    return amount_in, amount_out
+
+
+class Quoter:
+    """Quotes against snapshots of pools, taken when the quoter is created.
+
+    `pools` maps pool addresses (any hashable key) to `Pool` objects. A quote that
+    takes more than `max_steps` swap steps raises ValueError.
+    """
+
+    def __init__(self, pools, max_steps=DEFAULT_MAX_STEPS):
+        self.pools = {address: pool.copy() for address, pool in pools.items()}
+        self.max_steps = max_steps
+        # (address, zero_for_one) -> _Traversal
+        self._traversals = {}
+
+    def _traversal(self, address, zero_for_one):
+        key = (address, zero_for_one)
+        traversal = self._traversals.get(key)
+        if traversal is None:
+            try:
+                pool = self.pools[address]
+            except KeyError:
+                raise ValueError(f"no snapshot of pool {address!r}") from None
+            traversal = self._traversals[key] = _Traversal(pool, zero_for_one)
+        return traversal
+
+    def quote(self, params):
+        """`UniswapV3Quoter::quote`: (amount0, amount1, sqrt_price_after, tick_after)"""
+        zero_for_one = params.zero_for_one
+        amount_specified = params.amount_specified
+        traversal = self._traversal(params.pool, zero_for_one)
+        pool = traversal.pool
+        sqrt_price_limit_x96 = checked_mul(params.sqrt_price_limit, Q96)
+
+        if amount_specified == 0:
+            raise ValueError("AS")
+        check_sqrt_price_limit(pool.sqrt_price_x96, sqrt_price_limit_x96, zero_for_one, "SPL_underflow", "SPL_overflow")
+
+        exact_input = amount_specified > 0
+        amount_specified_remaining = amount_specified
+        amount_calculated = 0
+        node = traversal.root
+        sqrt_price_x96 = node.sqrt_price_x96
+        tick = node.tick
+        liquidity = node.liquidity
+        fee_pips = pool.fee_pips
+        steps = 0
+
+        while amount_specified_remaining != 0 and sqrt_price_x96 != sqrt_price_limit_x96:
+            if node is not None and not exact_input:
+                path = traversal.path(node)
+                start = node.index
+                x = -amount_specified_remaining - path.amounts_out[start]
+                amounts_in, amounts_out = path.amounts_in, path.amounts_out
+                # Stop before a step that overshoots, meets the price limit or would clamp a sum,
+                # and within max_steps
+                end = min(
+                    path.first_overshoot(start, x),
+                    path.first_at_limit(start, sqrt_price_limit_x96),
+                    bisect_right(amounts_out, MAX_I128 - x, start + 1) - 1,
+                    bisect_right(amounts_in, amounts_in[start] + amount_calculated + MAX_I128, start + 1) - 1,
+                    start + self.max_steps - steps,
+                )
+                if end > start:
+                    steps += end - start
+                    amount_specified_remaining -= amounts_out[end] - amounts_out[start]
+                    amount_calculated -= amounts_in[end] - amounts_in[start]
+                    node = path.nodes[end]
+                    sqrt_price_x96 = node.sqrt_price_x96
+                    tick = node.tick
+                    liquidity = node.liquidity
+                    continue
+
+            steps += 1
+            if steps > self.max_steps:
+                raise ValueError(f"quote takes more than {self.max_steps} swap steps")
+
+            # compute_swap_step, with the amounts of a step to the boundary taken from the node
+            step_sqrt_price_start_x96 = sqrt_price_x96
+            if node is not None:
+                next_tick, initialized, next_sqrt_price_x96, amount_in, amount_out = traversal.step(node)
+            else:
+                next_tick, initialized, next_sqrt_price_x96 = pool.next_boundary(tick, zero_for_one)
+            if beyond_limit(next_sqrt_price_x96, sqrt_price_limit_x96, zero_for_one):
+                target_sqrt_price_x96 = sqrt_price_limit_x96
+            else:
+                target_sqrt_price_x96 = next_sqrt_price_x96
+            input_sqrt_price_x96 = get_next_sqrt_price_from_input(
+                sqrt_price_x96, liquidity, _less_fee(abs(amount_specified_remaining), fee_pips), zero_for_one
+            )
+
+            overshoot = beyond_limit(input_sqrt_price_x96, target_sqrt_price_x96, zero_for_one)
+            if overshoot:
+                sqrt_price_x96 = input_sqrt_price_x96
+            elif node is not None and node.next is not None and target_sqrt_price_x96 == next_sqrt_price_x96:
+                amount_specified_remaining, amount_calculated, clamped = accumulate_swap_step(
+                    exact_input, amount_specified_remaining, amount_calculated, amount_in, amount_out
+                )
+                node = node.next
+                sqrt_price_x96 = node.sqrt_price_x96
+                tick = node.tick
+                liquidity = node.liquidity
+                if clamped:
+                    break
+                continue
+            else:
+                sqrt_price_x96 = target_sqrt_price_x96
+            amount_in, amount_out = _step_amounts(step_sqrt_price_start_x96, sqrt_price_x96, liquidity, zero_for_one,
+                                                  0 if overshoot else fee_pips)
+            if overshoot and fee_pips:
+                # The fee is whatever of the input did not go into the step
+                amount_in = abs(amount_specified_remaining)
+            amount_in, amount_out = signed_step_amounts(amount_in, amount_out)
+            amount_specified_remaining, amount_calculated, clamped = accumulate_swap_step(
+                exact_input, amount_specified_remaining, amount_calculated, amount_in, amount_out
+            )
+
+            node = None
+            if sqrt_price_x96 == next_sqrt_price_x96:
+                if initialized:
+                    liquidity = pool.cross(next_tick, liquidity, zero_for_one)
+                tick = next_tick - 1 if zero_for_one else next_tick
+                node = traversal.node(sqrt_price_x96, tick, liquidity)
+            elif sqrt_price_x96 != step_sqrt_price_start_x96:
+                tick = get_tick_at_sqrt_ratio(sqrt_price_x96)
+            elif amount_in == 0 and amount_out == 0:
+                # Nothing changed, so every following step would be the same one
+                raise ValueError("swap step makes no progress")
+
+            if clamped:
+                break
+
+        return swap_amounts(
+            zero_for_one, exact_input, amount_specified, amount_specified_remaining, amount_calculated
+        ) + (sqrt_price_x96, tick)
+
+    def quote_exact_output_batch(self, pool, amounts_out, zero_for_one, sqrt_price_limit, return_exceptions=False):
+        """`quote` of an exact output swap for each of `amounts_out` (positive), in the order given"""
+        return self.quote_batch(
+            [QuoteParams(-amount_out, zero_for_one, pool, sqrt_price_limit) for amount_out in amounts_out],
+            return_exceptions,
+        )
+
+    def quote_batch(self, params_list, return_exceptions=False):
+        """`quote` for every QuoteParams, returned in the order given
+
+        Quotes run grouped by pool and direction, largest amount first, so each group
+        walks its traversal while it is hot. A quote the contract would revert raises;
+        with `return_exceptions` its exception is put in its place instead.
+        """
+        params_list = list(params_list)
+        groups = {}
+        for i, params in enumerate(params_list):
+            groups.setdefault((params.pool, params.zero_for_one), []).append(i)
+        order = []
+        for indices in groups.values():
+            order += sorted(indices, key=lambda i: -abs(params_list[i].amount_specified))
+
+        results = [None] * len(params_list)
+        for i in order:
+            try:
+                results[i] = self.quote(params_list[i])
+            except (ValueError, ArithmeticError) as e:
+                if not return_exceptions:
+                    raise
+                results[i] = e
+        return results
@@ -0,0 +1,358 @@
+"""Rebuild a pool's state offline from its Mint and Swap events.
+
+The log is a JSONL file with one event of univ3pool.cairo per line, under the
+field names of the Cairo structs; integers may be JSON numbers or decimal / 0x
+strings, as indexers often write u128 and u256 values:
+
+    {"event": "Mint", "sender": "0x5678", "upper_tick": 887220, "lower_tick": -887220, "amount": "1000"}
+    {"event": "Swap", "sender": "0x5678", "recipient": "0x9abc", "amount0": "-99", "amount1": "100",
+     "sqrt_pricex96": "79228162514264337593543950336", "liquidity": "1000", "tick": 0}
+
+Mint events go through `Pool.add_liquidity`, which is `Pool.mint` without the amounts
+owed. A Swap event already carries the state the swap left behind (sqrt price, tick,
+active liquidity), so by default it is applied as is and the swap loop does not run.
+A run of swaps only leaves the state of its last one, so only that one is applied:
+the others are counted but not decoded any further.
+
+With `run_swaps`, every swap runs through `Pool.swap` instead (`run_swap`), from the
+state before it. The event does not say what the swap was called with; indexers that
+record the call can add its "amount_specified" and "sqrt_price_limit_x96" to the
+event, and those are used. Otherwise the call is guessed: an exact input of the
+positive amount of the event, else an exact output of the negative one, each with
+the logged sqrt price or the furthest price as the limit. The result must match the
+log, amounts, price, tick and liquidity, or the replay stops with ValueError. That
+checks the model against the chain and keeps the fee growth of pools with a fee up to
+date, at the cost of the swap loop. Swaps that the contract ran past their input
+(every step of univ3pool.cairo ends at least at its target) cannot be guessed and
+need the recorded call.
+
+To see what the swaps cost, pass `counters` (a `pool.SwapCounters`): every swap is
+then also run with `simulate_swap` from the state before it, with the positive
+amount of the event as its exact input and the logged sqrt price as the limit, and
+the loop counters are summed over the replay. Swaps that did not move the price are
+not counted. With `run_swaps`, the counters are those of the swaps it runs.
+
+The file is read in blocks and decoded in batches of lines, so memory stays bounded
+by the batch size and the pool itself. Every `checkpoint_every` events the pool is written with
+`pool_snapshot.write_snapshot` next to a small JSON file holding the byte offset
+of the next event, and a replay started with the same checkpoint path resumes
+from there. A line without its trailing newline (a log still being written) is
+left for the next run.
+
+    python -m py_utils.replay events.jsonl --sqrt-price-x96 79228162514264337593543950336 --tick 0 \\
+        --checkpoint state/pool
+    python -m py_utils.replay events.jsonl --checkpoint state/pool   # resume
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from py_utils.pool import Pool, SwapCounters
+from py_utils.pool_snapshot import PoolSnapshot, write_snapshot
+from py_utils.tick_math import MAX_SQRT_RATIO, MIN_SQRT_RATIO
+
+BATCH_LINES = 4096
+READ_BYTES = 1 << 20
+DEFAULT_CHECKPOINT_EVERY = 1000000
+
+
+def _int(value):
+    return value if isinstance(value, int) else int(value, 0)
+
+
+def count_swap(pool, event, counters):
+    """Run the swap loop of a Swap event on `pool` (unchanged) into `counters`"""
+    amount0 = _int(event["amount0"])
+    amount1 = _int(event["amount1"])
+    sqrt_price_x96 = _int(event["sqrt_pricex96"])
+    zero_for_one = sqrt_price_x96 < pool.sqrt_price_x96
+    amount_in = amount0 if zero_for_one else amount1
+    if sqrt_price_x96 == pool.sqrt_price_x96 or amount_in <= 0:
+        return
+    try:
+        pool.simulate_swap(zero_for_one, amount_in, sqrt_price_x96, counters)
+    except (ValueError, ArithmeticError):
+        pass
+
+
+def run_swap(pool, event, counters=None):
+    """Run a Swap event through `pool.swap` and check the outcome against the log"""
+    amount0 = _int(event["amount0"])
+    amount1 = _int(event["amount1"])
+    sqrt_price_x96 = _int(event["sqrt_pricex96"])
+    tick = _int(event["tick"])
+    liquidity = _int(event["liquidity"])
+    if sqrt_price_x96 == pool.sqrt_price_x96:
+        # A swap that ends where it started has no limit the pool would accept
+        if (amount0, amount1, tick, liquidity) != (0, 0, pool.tick, pool.liquidity):
+            raise ValueError(f"swap at sqrt price {sqrt_price_x96} does not match the pool")
+        return
+
+    zero_for_one = sqrt_price_x96 < pool.sqrt_price_x96
+    if "amount_specified" in event:
+        calls = [(_int(event["amount_specified"]), _int(event.get("sqrt_price_limit_x96", sqrt_price_x96)))]
+    else:
+        amount_in, amount_out = (amount0, -amount1) if zero_for_one else (amount1, -amount0)
+        furthest = MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+        calls = [(amount, limit) for amount in (amount_in, -amount_out) if amount
+                 for limit in (sqrt_price_x96, furthest)]
+    logged = (amount0, amount1, sqrt_price_x96, tick)
+    for amount_specified, sqrt_price_limit_x96 in calls:
+        try:
+            if pool.simulate_swap(zero_for_one, amount_specified, sqrt_price_limit_x96) == logged:
+                break
+        except (ValueError, ArithmeticError):
+            pass
+    else:
+        raise ValueError(f"swap to sqrt price {sqrt_price_x96} does not give the logged amounts "
+                         f"({amount0}, {amount1}) and tick {tick}")
+    pool.swap(zero_for_one, amount_specified, sqrt_price_limit_x96, counters)
+    if pool.liquidity != liquidity:
+        raise ValueError(f"swap to sqrt price {sqrt_price_x96} leaves liquidity {pool.liquidity}, "
+                         f"the log has {liquidity}")
+
+
+def apply_event(pool, event, counters=None, run_swaps=False):
+    """Apply one decoded event to `pool`; returns its kind"""
+    kind = event.get("event")
+    if kind == "Swap":
+        if run_swaps:
+            run_swap(pool, event, counters)
+            return kind
+        if counters is not None:
+            count_swap(pool, event, counters)
+        pool.sqrt_price_x96 = _int(event["sqrt_pricex96"])
+        pool.tick = _int(event["tick"])
+        pool.liquidity = _int(event["liquidity"])
+    elif kind == "Mint":
+        pool.add_liquidity(_int(event["lower_tick"]), _int(event["upper_tick"]), _int(event["amount"]),
+                           owner=_int(event["sender"]))
+    else:
+        raise ValueError(f"unknown event {kind!r}")
+    return kind
+
+
+def read_batches(path, offset=0, batch_lines=BATCH_LINES):
+    """Complete lines of `path` from byte `offset`, as (first line number, lines, end offset) batches
+
+    Lines come without their newline. Line numbers count from the start of the read,
+    not of the file.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        line_number = 1
+        lines = []
+        rest = b""
+        while True:
+            block = f.read(READ_BYTES)
+            if not block:
+                break
+            lines += (rest + block).split(b"\n")
+            # Whatever follows the last newline is not a complete line (yet)
+            rest = lines.pop()
+            while len(lines) >= batch_lines:
+                batch = lines[:batch_lines]
+                del lines[:batch_lines]
+                offset += sum(map(len, batch)) + len(batch)
+                yield line_number, batch, offset
+                line_number += len(batch)
+        if lines:
+            offset += sum(map(len, lines)) + len(lines)
+            yield line_number, lines, offset
+
+
+def _decode(lines, first_line):
+    """The events of a batch of lines, skipping blank ones"""
+    try:
+        return json.loads(b"[" + b",".join(lines) + b"]")
+    except ValueError:
+        pass
+    numbered = [(number, line) for number, line in enumerate(lines, first_line) if line.strip()]
+    try:
+        return json.loads(b"[" + b",".join(line for _, line in numbered) + b"]")
+    except ValueError:
+        # Find the offending line for the error message
+        for number, line in numbered:
+            try:
+                json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"line {number}: {e}") from None
+        raise
+
+
+class ReplayStats:
+    """Counts and timing of one replay run"""
+
+    def __init__(self, counters=None):
+        self.events = 0
+        self.mints = 0
+        self.swaps = 0
+        self.seconds = 0.0
+        self.counters = counters
+
+    @property
+    def events_per_second(self):
+        return self.events / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        text = (f"{self.events} events ({self.mints} mints, {self.swaps} swaps) in {self.seconds:.2f}s, "
+                f"{self.events_per_second:,.0f} events/s")
+        if self.counters is not None:
+            text += "\n" + ", ".join(f"{name} {value}" for name, value in self.counters.as_dict().items())
+        return text
+
+
+def save_checkpoint(checkpoint, pool, log_path, offset, events):
+    """Write the pool and the position in the log under the `checkpoint` path prefix
+
+    The snapshot gets a new name each time and the JSON file is replaced only once it
+    is written, so a crash at any point leaves the previous checkpoint usable.
+    """
+    snapshot_path = f"{checkpoint}.{events}.snap"
+    write_snapshot(pool, snapshot_path)
+    state_path = f"{checkpoint}.json"
+    previous = _read_checkpoint(checkpoint)
+
+    tmp_path = f"{state_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"log": os.path.abspath(log_path), "offset": offset, "events": events,
+                   "snapshot": os.path.basename(snapshot_path)}, f, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, state_path)
+
+    if previous is not None and previous["snapshot"] != os.path.basename(snapshot_path):
+        old_path = os.path.join(os.path.dirname(os.path.abspath(checkpoint)), previous["snapshot"])
+        if os.path.exists(old_path):
+            os.remove(old_path)
+
+
+def _read_checkpoint(checkpoint):
+    try:
+        with open(f"{checkpoint}.json") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def load_checkpoint(checkpoint):
+    """(pool, log path, offset, events) saved under `checkpoint`, or None if there is none"""
+    state = _read_checkpoint(checkpoint)
+    if state is None:
+        return None
+    snapshot_path = os.path.join(os.path.dirname(os.path.abspath(checkpoint)), state["snapshot"])
+    with PoolSnapshot(snapshot_path) as snapshot:
+        pool = snapshot.to_pool()
+    return pool, state["log"], state["offset"], state["events"]
+
+
+def _apply_batch(pool, events, stats):
+    """Apply decoded events, skipping every swap that another one follows before the next mint"""
+    last_swap = None
+    for event in events:
+        if event.get("event") == "Swap":
+            last_swap = event
+            stats.swaps += 1
+            continue
+        if last_swap is not None:
+            apply_event(pool, last_swap)
+            last_swap = None
+        apply_event(pool, event)
+        stats.mints += 1
+    if last_swap is not None:
+        apply_event(pool, last_swap)
+
+
+def replay(log_path, pool, offset=0, events=0, checkpoint=None, checkpoint_every=DEFAULT_CHECKPOINT_EVERY,
+           log=None, counters=None, run_swaps=False):
+    """Apply the events of `log_path` from byte `offset` to `pool`; returns (offset, stats)
+
+    `events` is the number of events applied before `offset`, used to number checkpoints.
+    With `checkpoint`, the state is saved every `checkpoint_every` events and at the end.
+    `log` receives a progress line at every checkpoint. With `counters`, the swap loop
+    counters of every swap are added to it, and with `run_swaps` every swap runs
+    through `Pool.swap` and is checked against the log (see the module docstring).
+    """
+    stats = ReplayStats(counters)
+    start = time.perf_counter()
+    next_checkpoint = checkpoint_every
+
+    for first_line, lines, end_offset in read_batches(log_path, offset):
+        events_in_batch = _decode(lines, first_line)
+        if counters is None and not run_swaps:
+            _apply_batch(pool, events_in_batch, stats)
+        else:
+            for event in events_in_batch:
+                if apply_event(pool, event, counters, run_swaps) == "Swap":
+                    stats.swaps += 1
+                else:
+                    stats.mints += 1
+        offset = end_offset
+        stats.events = stats.mints + stats.swaps
+        if checkpoint is not None and stats.events >= next_checkpoint:
+            next_checkpoint += checkpoint_every
+            save_checkpoint(checkpoint, pool, log_path, offset, events + stats.events)
+            stats.seconds = time.perf_counter() - start
+            if log is not None:
+                log(str(stats))
+
+    stats.seconds = time.perf_counter() - start
+    if checkpoint is not None:
+        save_checkpoint(checkpoint, pool, log_path, offset, events + stats.events)
+    return offset, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay Mint and Swap events from a JSONL log into the pool model")
+    parser.add_argument("log", help="JSONL file of events")
+    parser.add_argument("--checkpoint", default=None,
+                        help="path prefix of the checkpoint files; an existing checkpoint is resumed")
+    parser.add_argument("--checkpoint-every", type=int, default=DEFAULT_CHECKPOINT_EVERY)
+    parser.add_argument("--snapshot", default=None, help="start from this pool snapshot")
+    parser.add_argument("--sqrt-price-x96", type=int, default=None, help="initial sqrt price of a new pool")
+    parser.add_argument("--tick", type=int, default=None, help="initial tick of a new pool")
+    parser.add_argument("--tick-spacing", type=int, default=1)
+    parser.add_argument("--fee-pips", type=int, default=0, help="swap fee of a new pool, in hundredths of a bip")
+    parser.add_argument("--out", default=None, help="write the final pool state to this snapshot")
+    parser.add_argument("--count-swaps", action="store_true",
+                        help="also run every swap through the swap loop and report its counters")
+    parser.add_argument("--run-swaps", action="store_true",
+                        help="run every swap through Pool.swap and check it against the logged state")
+    args = parser.parse_args(argv)
+
+    offset = events = 0
+    saved = load_checkpoint(args.checkpoint) if args.checkpoint else None
+    try:
+        if saved is not None:
+            pool, log_path, offset, events = saved
+            if log_path != os.path.abspath(args.log):
+                print(f"checkpoint {args.checkpoint} belongs to {log_path}")
+                return 1
+            print(f"resuming after {events} events (byte {offset})")
+        elif args.snapshot is not None:
+            with PoolSnapshot(args.snapshot) as snapshot:
+                pool = snapshot.to_pool()
+        elif args.sqrt_price_x96 is not None and args.tick is not None:
+            pool = Pool(args.sqrt_price_x96, args.tick, tick_spacing=args.tick_spacing, fee_pips=args.fee_pips)
+        else:
+            print("a new replay needs --snapshot or --sqrt-price-x96 and --tick")
+            return 1
+
+        counters = SwapCounters() if args.count_swaps else None
+        offset, stats = replay(args.log, pool, offset, events, args.checkpoint, args.checkpoint_every, log=print,
+                               counters=counters, run_swaps=args.run_swaps)
+    except (OSError, ValueError, KeyError, ArithmeticError) as e:
+        print(f"replay failed: {type(e).__name__}: {e}")
+        return 1
+
+    if args.out is not None:
+        write_snapshot(pool, args.out)
+    print(stats)
+    print(f"tick {pool.tick}, sqrt price {pool.sqrt_price_x96}, liquidity {pool.liquidity}, "
+          f"{len(pool.initialized_ticks)} initialized ticks, {len(pool.positions)} positions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""Best-route quoting across several pools, by chaining exact-input swaps.
+
+Every pool is described by a `RoutePool`: a name, its two tokens, the path of a
+snapshot written by `pool_snapshot.write_snapshot` and optionally its fee tier.
+Pools on the same token pair with other fee tiers are separate pools, each swapping
+with the fee its snapshot holds; a fee tier given with the pool must match it. A
+route is a sequence of pools leading from `token_in` to `token_out` without
+visiting a token twice; each hop swaps the whole output of the previous one in,
+with `simulate_swap` and no price limit (MIN_SQRT_RATIO + 1 or MAX_SQRT_RATIO - 1).
+
+Hops are quoted on the snapshots themselves: `PoolSnapshot.simulate_swap` runs the
+swap loop of `Pool` on the mapped columns, so no `Pool` is ever built. Routes are
+quoted in chunks by a process pool. Workers receive the `RoutePool` list, which
+only holds snapshot paths, and map the snapshots themselves; tasks carry route
+names and amounts, never pool state. Hops that routes share (the first hop out of
+`token_in`, mostly) are quoted once per worker.
+
+    python -m py_utils.router pools.json WETH USDC 1000000000000000000 --max-hops 3
+
+with pools.json a list of {"name": ..., "token0": ..., "token1": ..., "snapshot": ...},
+each with an optional "fee" in hundredths of a basis point (3000 for 0.3%).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from py_utils.pool_snapshot import PoolSnapshot
+from py_utils.tick_math import MAX_SQRT_RATIO, MIN_SQRT_RATIO
+
+DEFAULT_MAX_HOPS = 3
+CHUNK_ROUTES = 64
+# Hop quotes kept per worker
+MAX_CACHED_HOPS = 1 << 16
+
+
+class RoutePool:
+    """A pool routes can go through: its tokens and the snapshot holding its state"""
+
+    def __init__(self, name, token0, token1, snapshot, fee_pips=None):
+        if token0 == token1:
+            raise ValueError(f"pool {name!r} has the same token on both sides")
+        self.name = name
+        self.token0 = token0
+        self.token1 = token1
+        self.snapshot = snapshot
+        # The fee tier the pool should have, checked against its snapshot; None takes the snapshot's
+        self.fee_pips = fee_pips
+
+    def __repr__(self):
+        return f"RoutePool({self.name!r}, {self.token0!r}, {self.token1!r}, {self.snapshot!r}, {self.fee_pips!r})"
+
+
+class Hop:
+    """One swap of a route: `amount_in` of `token_in` for `amount_out` of `token_out`"""
+
+    def __init__(self, pool, fee_pips, token_in, token_out, amount_in, amount_out, sqrt_price_x96, tick):
+        self.pool = pool
+        self.fee_pips = fee_pips
+        self.token_in = token_in
+        self.token_out = token_out
+        self.amount_in = amount_in
+        self.amount_out = amount_out
+        self.sqrt_price_x96 = sqrt_price_x96
+        self.tick = tick
+
+    def __repr__(self):
+        return (f"Hop({self.pool!r} ({self.fee_pips} pips): {self.amount_in} {self.token_in} -> "
+                f"{self.amount_out} {self.token_out}, tick after {self.tick})")
+
+
+class RouteQuote:
+    """The hops of a quoted route, or the error that stopped it"""
+
+    def __init__(self, route, hops=None, error=None):
+        self.route = route
+        self.hops = hops
+        self.error = error
+
+    @property
+    def amount_out(self):
+        return self.hops[-1].amount_out if self.hops else None
+
+    def __repr__(self):
+        if self.error is not None:
+            return f"RouteQuote({' -> '.join(self.route)}: {type(self.error).__name__}: {self.error})"
+        return f"RouteQuote({' -> '.join(self.route)}: {self.amount_out})"
+
+
+def find_routes(pools, token_in, token_out, max_hops=DEFAULT_MAX_HOPS):
+    """Every route from `token_in` to `token_out` of at most `max_hops` pools, as tuples of pool names"""
+    names = [pool.name for pool in pools]
+    if len(set(names)) != len(names):
+        raise ValueError("pool names must be unique")
+    if token_in == token_out:
+        raise ValueError("token_in and token_out are the same token")
+    by_token = {}
+    for pool in pools:
+        by_token.setdefault(pool.token0, []).append((pool.name, pool.token1))
+        by_token.setdefault(pool.token1, []).append((pool.name, pool.token0))
+
+    routes = []
+    # (token reached, pool names so far, tokens visited)
+    stack = [(token_in, (), {token_in})]
+    while stack:
+        token, route, visited = stack.pop()
+        for name, other in by_token.get(token, ()):
+            if other == token_out:
+                routes.append(route + (name,))
+            elif other not in visited and len(route) + 1 < max_hops:
+                stack.append((other, route + (name,), visited | {other}))
+    routes.sort(key=lambda route: (len(route), route))
+    return routes
+
+
+class _RouteQuoter:
+    """The mapped snapshots of the pools, with the hop quotes computed so far"""
+
+    def __init__(self, pools):
+        self.pools = {}
+        try:
+            for pool in pools:
+                snapshot = PoolSnapshot(pool.snapshot)
+                self.pools[pool.name] = (pool, snapshot)
+                if pool.fee_pips is not None and pool.fee_pips != snapshot.fee_pips:
+                    raise ValueError(f"pool {pool.name!r} has a fee of {pool.fee_pips} pips "
+                                     f"but its snapshot {snapshot.fee_pips}")
+        except BaseException:
+            self.close()
+            raise
+        # (pool name, zero_for_one, amount_in) -> Hop or exception
+        self.hops = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for _, snapshot in self.pools.values():
+            snapshot.close()
+        self.pools = {}
+
+    def hop(self, name, token_in, amount_in):
+        route_pool, snapshot = self.pools[name]
+        zero_for_one = token_in == route_pool.token0
+        key = (name, zero_for_one, amount_in)
+        hop = self.hops.get(key)
+        if hop is None:
+            try:
+                hop = self._swap(route_pool, snapshot, zero_for_one, amount_in)
+            except (ValueError, ArithmeticError) as e:
+                hop = e
+            if len(self.hops) >= MAX_CACHED_HOPS:
+                self.hops.clear()
+            self.hops[key] = hop
+        if isinstance(hop, Exception):
+            raise hop
+        return hop
+
+    @staticmethod
+    def _swap(route_pool, snapshot, zero_for_one, amount_in):
+        if zero_for_one:
+            amount0, amount1, sqrt_price_x96, tick = snapshot.simulate_swap(True, amount_in, MIN_SQRT_RATIO + 1)
+            token_in, token_out, used, amount_out = route_pool.token0, route_pool.token1, amount0, -amount1
+        else:
+            amount0, amount1, sqrt_price_x96, tick = snapshot.simulate_swap(False, amount_in, MAX_SQRT_RATIO - 1)
+            token_in, token_out, used, amount_out = route_pool.token1, route_pool.token0, amount1, -amount0
+        if amount_out <= 0:
+            raise ValueError(f"swap through {route_pool.name!r} gives no {token_out}")
+        return Hop(route_pool.name, snapshot.fee_pips, token_in, token_out, used, amount_out, sqrt_price_x96, tick)
+
+    def quote(self, route, token_in, amount_in):
+        hops = []
+        try:
+            for name in route:
+                hop = self.hop(name, token_in, amount_in)
+                hops.append(hop)
+                token_in, amount_in = hop.token_out, hop.amount_out
+        except (ValueError, ArithmeticError) as e:
+            return RouteQuote(route, error=e)
+        return RouteQuote(route, hops)
+
+
+_worker_quoter = None
+
+
+def _init_worker(pools):
+    global _worker_quoter
+    _worker_quoter = _RouteQuoter(pools)
+
+
+def _quote_chunk(routes, token_in, amount_in):
+    return [_worker_quoter.quote(route, token_in, amount_in) for route in routes]
+
+
+class RouteResult:
+    """Quotes of every route, the best one and how long quoting took"""
+
+    def __init__(self, quotes, seconds):
+        self.quotes = quotes
+        self.seconds = seconds
+        quoted = [quote for quote in quotes if quote.error is None]
+        self.best = max(quoted, key=lambda quote: quote.amount_out) if quoted else None
+
+    @property
+    def ms_per_1000_routes(self):
+        return 1e6 * self.seconds / len(self.quotes) if self.quotes else 0.0
+
+
+def quote_routes(pools, token_in, token_out, amount_in, max_hops=DEFAULT_MAX_HOPS, jobs=None,
+                 chunk_routes=CHUNK_ROUTES):
+    """Quote every route of at most `max_hops` pools for `amount_in` of `token_in`; returns a RouteResult
+
+    `jobs` is the number of worker processes (default: one per CPU); with 1 the routes
+    are quoted in this process. The time reported covers quoting only, not mapping
+    the snapshots. A pool whose fee tier does not match its snapshot raises ValueError.
+    """
+    if amount_in <= 0:
+        raise ValueError("amount_in must be positive")
+    routes = find_routes(pools, token_in, token_out, max_hops)
+    chunks = [routes[i:i + chunk_routes] for i in range(0, len(routes), chunk_routes)]
+    jobs = min(jobs or os.cpu_count() or 1, max(len(chunks), 1))
+
+    # Mapping the snapshots here too checks every pool before any worker starts
+    with _RouteQuoter(pools) as quoter:
+        if jobs == 1:
+            start = time.perf_counter()
+            quotes = [quoter.quote(route, token_in, amount_in) for route in routes]
+            return RouteResult(quotes, time.perf_counter() - start)
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(pools,)) as executor:
+        # Start the workers, which map the snapshots as they start, before the clock does
+        list(executor.map(_quote_chunk, [()] * jobs, [token_in] * jobs, [amount_in] * jobs))
+        start = time.perf_counter()
+        futures = [executor.submit(_quote_chunk, chunk, token_in, amount_in) for chunk in chunks]
+        quotes = [quote for future in futures for quote in future.result()]
+        seconds = time.perf_counter() - start
+    return RouteResult(quotes, seconds)
+
+
+def load_pools(path):
+    """`RoutePool`s from a JSON list; snapshot paths are relative to the file"""
+    with open(path) as f:
+        specs = json.load(f)
+    directory = os.path.dirname(os.path.abspath(path))
+    return [RoutePool(spec["name"], spec["token0"], spec["token1"], os.path.join(directory, spec["snapshot"]),
+                      spec.get("fee")) for spec in specs]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Quote every route between two tokens and print the best one")
+    parser.add_argument("pools", help="JSON list of pools: name, token0, token1, snapshot and optionally fee")
+    parser.add_argument("token_in")
+    parser.add_argument("token_out")
+    parser.add_argument("amount_in", type=int)
+    parser.add_argument("--max-hops", type=int, default=DEFAULT_MAX_HOPS)
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    try:
+        pools = load_pools(args.pools)
+        result = quote_routes(pools, args.token_in, args.token_out, args.amount_in, args.max_hops, args.jobs)
+    except (OSError, KeyError, ValueError) as e:
+        print(e)
+        return 1
+
+    failed = sum(1 for quote in result.quotes if quote.error is not None)
+    print(f"{len(result.quotes)} routes ({failed} failed) in {result.seconds:.3f}s, "
+          f"{result.ms_per_1000_routes:.1f} ms per 1000 routes")
+    if result.best is None:
+        print(f"no route from {args.token_in} to {args.token_out} gives any output")
+        return 1
+    print(f"best: {' -> '.join(result.best.route)}, {result.best.amount_out} {args.token_out}")
+    for hop in result.best.hops:
+        print(f"  {hop.pool} ({hop.fee_pips / 10000:g}% fee): {hop.amount_in} {hop.token_in} -> "
+              f"{hop.amount_out} {hop.token_out}, tick after {hop.tick}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
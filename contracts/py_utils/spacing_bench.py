@@ -0,0 +1,178 @@
+"""Replay one trade set at several tick spacings and compare what the swap loop does.
+
+Positions are drawn once, as tick ranges around the starting tick, and snapped
+outwards to each spacing (lower tick down, upper tick up), so every pool holds the
+same liquidity over nearly the same prices. The trades are a random walk of price
+limits, and each pool moves its price to every limit in turn through the swap loop
+of `Pool._swap`: `next_initialized_tick_within_one_word`, a step to the nearer of
+the boundary and the limit, a crossing when the boundary is an initialized tick.
+A wider spacing means fewer initialized ticks to cross and 256 * spacing ticks per
+bitmap word, so fewer loop iterations per trade. The report gives the iterations
+(steps), the crossings, the empty word hops and the wall time of each replay:
+
+    python -m py_utils.spacing_bench
+    python -m py_utils.spacing_bench --spacings 1 10 60 200 --trades 5000 --output spacing.json
+
+Each step takes exactly the input that brings the price to its target rather than
+going through `Pool.swap`: compute_swap_step in this contract ends a step at
+whichever of the target and the price the input reaches lies further, so a swap
+through several boundaries overshoots its limit, and replaying trades through it
+would compare runaway swaps. The loop structure, and so the iteration counts, are
+the contract's for a swap that stops at its limit.
+
+`Pool.mint` stores the last position's liquidity in slot0, as the contract does, so
+the pools get the active liquidity their ticks add up to before the replay starts.
+Position ticks are also kept off the first and last tick of each bitmap word: when
+the rest of the word is empty, the contract's search returns the edge tick of the
+neighbouring word as not initialized, so a swap would step onto it without crossing
+and carry the wrong liquidity from there on.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+from py_utils.liquidity_math import calc_amount0_delta, calc_amount1_delta
+from py_utils.pool import Pool, SwapCounters, beyond_limit
+from py_utils.tick_bitmap import WORD_BITS
+from py_utils.tick_math import get_sqrt_ratio_at_tick, get_tick_at_sqrt_ratio
+
+DEFAULT_SPACINGS = (1, 10, 60, 200)
+DEFAULT_POSITIONS = 500
+DEFAULT_TRADES = 2000
+# The pools start at this tick; positions spread over RANGE ticks on either side
+START_TICK = 80000
+RANGE = 40000
+
+
+def trade_set(seed=0, positions=DEFAULT_POSITIONS, trades=DEFAULT_TRADES):
+    """(positions, trades): [(lower_tick, upper_tick, liquidity)] and [(zero_for_one, limit_tick)]"""
+    rng = random.Random(seed)
+    drawn = []
+    for _ in range(positions):
+        width = int(rng.lognormvariate(6, 1.2)) + 1
+        lower = START_TICK + int(rng.gauss(0, RANGE / 8))
+        lower = min(max(lower, START_TICK - RANGE), START_TICK + RANGE - width)
+        drawn.append((lower, lower + width, rng.randrange(10**15, 10**19)))
+
+    walk = []
+    tick = START_TICK
+    while len(walk) < trades:
+        # Mostly small moves with the odd large one
+        distance = int(rng.lognormvariate(4, 1.5)) + 1
+        limit_tick = tick - distance if rng.random() < 0.5 else tick + distance
+        limit_tick = min(max(limit_tick, START_TICK - RANGE + 1), START_TICK + RANGE - 1)
+        if limit_tick != tick:
+            walk.append((limit_tick < tick, limit_tick))
+            tick = limit_tick
+    return drawn, walk
+
+
+def build_pool(positions, tick_spacing):
+    """A pool at START_TICK holding `positions`, their ticks snapped outwards to `tick_spacing`
+
+    A tick that would land on the first or last tick of a bitmap word moves further out.
+    """
+    pool = Pool(get_sqrt_ratio_at_tick(START_TICK), START_TICK, tick_spacing=tick_spacing)
+    for lower, upper, liquidity in positions:
+        lower = lower // tick_spacing
+        upper = -(-upper // tick_spacing)
+        while lower % WORD_BITS in (0, WORD_BITS - 1):
+            lower -= 1
+        while upper % WORD_BITS in (0, WORD_BITS - 1):
+            upper += 1
+        pool.mint(lower * tick_spacing, upper * tick_spacing, liquidity)
+    pool.liquidity = sum(info[1] for tick, info in pool.ticks.items() if tick <= pool.tick)
+    return pool
+
+
+def move_price(pool, zero_for_one, sqrt_price_limit_x96, counters):
+    """Run the swap loop from the pool's price to the limit; returns (amount_in, amount_out)"""
+    counters.swaps += 1
+    sqrt_price_x96, tick, liquidity = pool.sqrt_price_x96, pool.tick, pool.liquidity
+    amount_in = amount_out = 0
+    while sqrt_price_x96 != sqrt_price_limit_x96:
+        next_tick, initialized, next_sqrt_price_x96 = pool.next_boundary(tick, zero_for_one)
+        if beyond_limit(next_sqrt_price_x96, sqrt_price_limit_x96, zero_for_one):
+            target_sqrt_price_x96 = sqrt_price_limit_x96
+        else:
+            target_sqrt_price_x96 = next_sqrt_price_x96
+        if zero_for_one:
+            amount_in += calc_amount0_delta(sqrt_price_x96, target_sqrt_price_x96, liquidity)
+            amount_out += calc_amount1_delta(sqrt_price_x96, target_sqrt_price_x96, liquidity)
+        else:
+            amount_in += calc_amount1_delta(sqrt_price_x96, target_sqrt_price_x96, liquidity)
+            amount_out += calc_amount0_delta(sqrt_price_x96, target_sqrt_price_x96, liquidity)
+        sqrt_price_x96 = target_sqrt_price_x96
+
+        reached_boundary = sqrt_price_x96 == next_sqrt_price_x96
+        counters.count_step(reached_boundary, initialized, True)
+        if reached_boundary:
+            if initialized:
+                liquidity = pool.cross(next_tick, liquidity, zero_for_one)
+            tick = next_tick - 1 if zero_for_one else next_tick
+        else:
+            tick = get_tick_at_sqrt_ratio(sqrt_price_x96)
+
+    pool.sqrt_price_x96, pool.tick, pool.liquidity = sqrt_price_x96, tick, liquidity
+    return amount_in, amount_out
+
+
+def replay(pool, trades):
+    """Move `pool` through `trades`: (SwapCounters, seconds)"""
+    counters = SwapCounters()
+    limits = [(zero_for_one, get_sqrt_ratio_at_tick(limit_tick)) for zero_for_one, limit_tick in trades]
+    start = time.perf_counter()
+    for zero_for_one, sqrt_price_limit_x96 in limits:
+        move_price(pool, zero_for_one, sqrt_price_limit_x96, counters)
+    return counters, time.perf_counter() - start
+
+
+def run(spacings=DEFAULT_SPACINGS, seed=0, positions=DEFAULT_POSITIONS, trades=DEFAULT_TRADES):
+    """Replay the trade set drawn from `seed` at every spacing; returns the JSON report"""
+    drawn, walk = trade_set(seed, positions, trades)
+    results = {}
+    for tick_spacing in spacings:
+        pool = build_pool(drawn, tick_spacing)
+        counters, seconds = replay(pool, walk)
+        result = counters.as_dict()
+        result.update({
+            "initialized_ticks": len(pool.initialized_ticks),
+            "seconds": seconds,
+            "steps_per_swap": counters.steps / max(counters.swaps, 1),
+            "swaps_per_sec": counters.swaps / seconds if seconds else 0.0,
+        })
+        results[str(tick_spacing)] = result
+    return {"seed": seed, "positions": positions, "trades": trades, "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the swap loop across tick spacings")
+    parser.add_argument("--spacings", type=int, nargs="+", default=list(DEFAULT_SPACINGS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--positions", type=int, default=DEFAULT_POSITIONS)
+    parser.add_argument("--trades", type=int, default=DEFAULT_TRADES)
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    report = run(args.spacings, args.seed, args.positions, args.trades)
+    print(f"{'spacing':>8} {'ticks':>7} {'steps':>10} {'steps/swap':>11} {'crossings':>10} "
+          f"{'word hops':>10} {'seconds':>9}")
+    for tick_spacing, result in report["results"].items():
+        print(f"{tick_spacing:>8} {result['initialized_ticks']:>7} {result['steps']:>10} "
+              f"{result['steps_per_swap']:>11.2f} {result['crossings']:>10} {result['empty_word_hops']:>10} "
+              f"{result['seconds']:>9.3f}")
+
+    if args.output:
+        tmp_path = f"{args.output}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+        os.replace(tmp_path, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""Next-price computations mirroring `SqrtPriceMath` in sqrtprice_math.cairo.
+
+Each function follows the branch structure of its Cairo counterpart (including
+the formula switch for large amounts in the token0 case) and does the same u256
+operations through `fullmath`, so the rounding is the same and so are the
+failures: Cairo asserts surface as ValueError with the Cairo message, u256
+overflows as OverflowError.
+"""
+from py_utils.fullmath import checked_add, checked_mul, div_rounding_up, mul_div, mul_div_rounding_up
+from py_utils.tick_math import MAX_SQRT_RATIO, MIN_SQRT_RATIO
+
+Q96 = 2**96
+MAX_U64 = 0xffffffffffffffff
+MAX_U128 = 2**128 - 1
+
+
+def new_sqrt_price(value):
+    """Range check of `IFixedQ64x96Impl::new`"""
+    if value >= MAX_SQRT_RATIO:
+        raise ValueError("sqrt ratio overflow")
+    if value < MIN_SQRT_RATIO:
+        raise ValueError("sqrt ratio underflow")
+    return value
+
+
+def get_next_sqrt_price_from_amount0_rounding_up(sqrt_price_x96, liquidity, amount, add):
+    if amount == 0:
+        return sqrt_price_x96
+
+    numerator = liquidity * Q96
+    if add:
+        if amount > MAX_U64 or sqrt_price_x96 > MAX_U64:
+            return new_sqrt_price(div_rounding_up(numerator, checked_add(numerator // sqrt_price_x96, amount)))
+        return new_sqrt_price(mul_div_rounding_up(numerator, sqrt_price_x96, numerator + amount * sqrt_price_x96))
+
+    product = mul_div(amount, sqrt_price_x96, 1)
+    if product > numerator:
+        raise ValueError("liquidity underflow")
+    return new_sqrt_price(mul_div_rounding_up(numerator, sqrt_price_x96, numerator - product))
+
+
+def get_next_sqrt_price_from_amount1_rounding_down(sqrt_price_x96, liquidity, amount, add):
+    if amount == 0:
+        return sqrt_price_x96
+
+    if add:
+        if amount <= MAX_U128:
+            quotient = amount * Q96 // liquidity
+        else:
+            quotient = mul_div(amount, Q96, liquidity)
+        return new_sqrt_price(checked_add(sqrt_price_x96, quotient))
+
+    if amount <= MAX_U128:
+        quotient = div_rounding_up(amount * Q96, liquidity)
+    else:
+        quotient = mul_div_rounding_up(amount, Q96, liquidity)
+    if sqrt_price_x96 <= quotient:
+        raise ValueError("price underflow")
+    return new_sqrt_price(sqrt_price_x96 - quotient)
+
+
+def get_next_sqrt_price_from_input(sqrt_price_x96, liquidity, amount_in, zero_for_one):
+    """The price after swapping `amount_in` of token0 (zero_for_one) or token1 into the pool"""
+    if sqrt_price_x96 <= 0:
+        raise ValueError("invalid sqrtPrice")
+    if liquidity <= 0:
+        raise ValueError("invalid liquidity")
+
+    if zero_for_one:
+        return get_next_sqrt_price_from_amount0_rounding_up(sqrt_price_x96, liquidity, amount_in, True)
+    return get_next_sqrt_price_from_amount1_rounding_down(sqrt_price_x96, liquidity, amount_in, True)
+
+
+def get_next_sqrt_price_from_output(sqrt_price_x96, liquidity, amount_out, zero_for_one):
+    """The price after taking `amount_out` of token1 (zero_for_one) or token0 out of the pool"""
+    if amount_out <= 0:
+        raise ValueError("amount_out must be positive")
+
+    if zero_for_one:
+        product = mul_div(amount_out, Q96, liquidity)
+        if product > sqrt_price_x96:
+            raise ValueError("price below minimum")
+        return new_sqrt_price(sqrt_price_x96 - product)
+
+    amount_scaled = div_rounding_up(checked_mul(amount_out, sqrt_price_x96), Q96)
+    if amount_scaled >= liquidity:
+        raise ValueError("insufficient liquidity")
+    return new_sqrt_price(div_rounding_up(checked_mul(sqrt_price_x96, liquidity), liquidity - amount_scaled))
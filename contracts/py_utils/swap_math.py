@@ -0,0 +1,47 @@
+"""Single swap step mirroring `SwapMath` in swap_math.cairo, with an optional swap fee."""
+from py_utils.liquidity_math import calc_amount0_delta, calc_amount1_delta
+from py_utils.sqrtprice_math import get_next_sqrt_price_from_input
+
+# Fees are in hundredths of a basis point, as Uniswap v3's fee tiers
+FEE_PIPS_DENOMINATOR = 10**6
+
+
+def compute_swap_step(sqrt_ratio_current_x96, sqrt_ratio_target_x96, liquidity, amount_remaining, zero_for_one,
+                      fee_pips=0):
+    """Returns (sqrt_ratio_next_x96, amount_in, amount_out, fee_amount), all non-negative.
+
+    Like the Cairo version, `abs(amount_remaining)` is always treated as an input amount,
+    and the step ends at whichever of the price that input reaches and the target lies
+    further from the current price.
+
+    swap_math.cairo takes no fee, and with `fee_pips` at 0 the step is the contract's
+    and `fee_amount` is 0. Otherwise the fee comes off the input before it moves the
+    price, as in Uniswap v3's SwapMath, and `fee_amount` is what the step pays on top
+    of `amount_in`: the rest of the input when the step ends past the target, else
+    amount_in * fee_pips / (1e6 - fee_pips) rounded up.
+    """
+    if not 0 <= fee_pips < FEE_PIPS_DENOMINATOR:
+        raise ValueError("fee_pips out of range")
+    amount_remaining = abs(amount_remaining)
+    amount_remaining_less_fee = amount_remaining * (FEE_PIPS_DENOMINATOR - fee_pips) // FEE_PIPS_DENOMINATOR
+    next_sqrt_price = get_next_sqrt_price_from_input(
+        sqrt_ratio_current_x96, liquidity, amount_remaining_less_fee, zero_for_one
+    )
+
+    if zero_for_one:
+        sqrt_ratio_next_x96 = min(next_sqrt_price, sqrt_ratio_target_x96)
+        amount_in = calc_amount0_delta(sqrt_ratio_current_x96, sqrt_ratio_next_x96, liquidity)
+        amount_out = calc_amount1_delta(sqrt_ratio_current_x96, sqrt_ratio_next_x96, liquidity)
+    else:
+        sqrt_ratio_next_x96 = max(next_sqrt_price, sqrt_ratio_target_x96)
+        amount_in = calc_amount1_delta(sqrt_ratio_current_x96, sqrt_ratio_next_x96, liquidity)
+        amount_out = calc_amount0_delta(sqrt_ratio_current_x96, sqrt_ratio_next_x96, liquidity)
+
+    if not fee_pips:
+        fee_amount = 0
+    elif sqrt_ratio_next_x96 != sqrt_ratio_target_x96:
+        fee_amount = amount_remaining - amount_in
+    else:
+        fee_amount = -(-amount_in * fee_pips // (FEE_PIPS_DENOMINATOR - fee_pips))
+
+    return sqrt_ratio_next_x96, amount_in, amount_out, fee_amount
@@ -0,0 +1,298 @@
+"""Randomized `SwapMath::compute_swap_step` vectors, sharded into Cairo test modules.
+
+Vectors are drawn in blocks of BLOCK_SIZE, each block from its own RNG seeded by
+(seed, block index), and the regime of every vector is fixed by its index:
+
+    typical            ticks around realistic prices, any liquidity and amount
+    tiny_liquidity     liquidity below 2**16 with small amounts
+    near_min_price     both prices within 2000 ticks of MIN_SQRT_RATIO
+    near_max_price     both prices within 2000 ticks of MAX_SQRT_RATIO
+    exact_hit          amount_remaining is the exact input that reaches the target (+-1)
+    overflow_adjacent  amounts and liquidity close to the i128 / u128 limits
+
+Inputs the Cairo function would reject (a failed assert or a u256 overflow) are
+redrawn. Expected values come from `py_utils.swap_math`, which mirrors the Cairo
+rounding exactly, so the tests assert equality. Blocks are sampled and rendered in
+worker processes; the results are consumed in block order, so the output only
+depends on the seed, the count and the shard options, never on the job count.
+
+Test functions are packed into shards of at most `--max-shard-bytes` each:
+
+    <out-dir>/math_tests/swap_step_vectors.cairo            mod shard_0000; ...
+    <out-dir>/math_tests/swap_step_vectors/shard_0000.cairo
+
+The output directory defaults to the test crate, tests/. When the output
+directory is a test crate (it has a lib.cairo), `mod swap_step_vectors;` is added
+to its `math_tests` module, so `snforge test` compiles and runs the shards:
+
+    python -m py_utils.swap_step_vectors --count 200000 --seed 7
+
+`generate_tests` runs gen_math_tests/generate_swap_step_vectors.py with the other
+generators, which writes DRIVER_COUNT vectors into the driver's output directory.
+"""
+import argparse
+import glob
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from py_utils.cairo_writer import declare_module, emit
+from py_utils.liquidity_math import calc_amount0_delta, calc_amount1_delta
+from py_utils.paths import TESTS_DIR
+from py_utils.swap_math import compute_swap_step
+from py_utils.tick_math import MAX_SQRT_RATIO, MAX_TICK, MIN_SQRT_RATIO, MIN_TICK, tick_to_sqrt_ratio
+
+REGIMES = ("typical", "tiny_liquidity", "near_min_price", "near_max_price", "exact_hit", "overflow_adjacent")
+# Changing the block size changes every vector after the first block
+BLOCK_SIZE = 1024
+DEFAULT_COUNT = 100000
+# What `generate_tests` writes, next to the hand-picked cases of the other generators
+DRIVER_COUNT = 10000
+DEFAULT_CASES_PER_TEST = 32
+DEFAULT_MAX_SHARD_BYTES = 512 * 1024
+MODULE_NAME = "swap_step_vectors"
+MAX_I128 = 2**127 - 1
+MAX_U128 = 2**128 - 1
+EDGE_TICKS = 2000
+
+SHARD_PRELUDE = """use contracts::libraries::math::numbers::fixed_point::FixedQ64x96;
+use contracts::libraries::math::swap_math::SwapMath;
+
+fn check_step(
+    sqrt_ratio_current_x96: u256,
+    sqrt_ratio_target_x96: u256,
+    liquidity: u128,
+    amount_remaining: i128,
+    zero_for_one: bool,
+    expected_sqrt_ratio_next_x96: u256,
+    expected_amount_in: u256,
+    expected_amount_out: u256,
+) {
+    let (sqrt_ratio_next_x96, amount_in, amount_out) = SwapMath::compute_swap_step(
+        FixedQ64x96 { value: sqrt_ratio_current_x96 },
+        FixedQ64x96 { value: sqrt_ratio_target_x96 },
+        liquidity,
+        amount_remaining,
+        zero_for_one
+    );
+    assert(sqrt_ratio_next_x96.value == expected_sqrt_ratio_next_x96, 'incorrect sqrt_ratio_next_x96');
+    assert(amount_in == expected_amount_in, 'incorrect amount_in');
+    assert(amount_out == expected_amount_out, 'incorrect amount_out');
+}
+"""
+
+
+def _shard_header(seed, number):
+    return f"// AUTO-GENERATED compute_swap_step VECTORS (seed {seed}, shard {number})\n" + SHARD_PRELUDE
+
+
+def _sqrt_price(rng, lower_tick, upper_tick):
+    """Any sqrt price between two ticks, not only the ones at tick boundaries"""
+    low = max(tick_to_sqrt_ratio(lower_tick), MIN_SQRT_RATIO)
+    high = min(tick_to_sqrt_ratio(upper_tick), MAX_SQRT_RATIO - 1)
+    return rng.randint(low, high)
+
+
+def _prices(rng, lower_tick, upper_tick, zero_for_one):
+    """(current, target), the target on the side the swap moves the price towards"""
+    a = _sqrt_price(rng, lower_tick, upper_tick)
+    b = _sqrt_price(rng, lower_tick, upper_tick)
+    return (max(a, b), min(a, b)) if zero_for_one else (min(a, b), max(a, b))
+
+
+def _signed(rng, magnitude):
+    return -magnitude if rng.random() < 0.5 else magnitude
+
+
+def _draw(rng, regime):
+    """(current, target, liquidity, amount_remaining, zero_for_one) for one regime"""
+    zero_for_one = rng.random() < 0.5
+
+    if regime == "tiny_liquidity":
+        current, target = _prices(rng, -200000, 200000, zero_for_one)
+        liquidity = rng.randint(1, 2**16)
+        amount = _signed(rng, rng.randint(0, 2**rng.randint(1, 40)))
+    elif regime == "near_min_price":
+        current, target = _prices(rng, MIN_TICK, MIN_TICK + EDGE_TICKS, zero_for_one)
+        liquidity = rng.randint(1, 2**rng.randint(1, 128) - 1)
+        amount = _signed(rng, rng.randint(1, 2**rng.randint(1, 127) - 1))
+    elif regime == "near_max_price":
+        current, target = _prices(rng, MAX_TICK - EDGE_TICKS, MAX_TICK, zero_for_one)
+        liquidity = rng.randint(1, 2**rng.randint(1, 128) - 1)
+        amount = _signed(rng, rng.randint(1, 2**rng.randint(1, 127) - 1))
+    elif regime == "exact_hit":
+        current, target = _prices(rng, -400000, 400000, zero_for_one)
+        liquidity = rng.randint(1, 2**rng.randint(1, 128) - 1)
+        if zero_for_one:
+            amount = calc_amount0_delta(target, current, liquidity)
+        else:
+            amount = calc_amount1_delta(current, target, liquidity)
+        amount += rng.choice((-1, 0, 0, 1))
+        if not 0 <= amount <= MAX_I128:
+            return None
+    elif regime == "overflow_adjacent":
+        current, target = _prices(rng, MIN_TICK, MAX_TICK, zero_for_one)
+        liquidity = MAX_U128 - rng.randint(0, 2**64) if rng.random() < 0.5 else rng.randint(1, MAX_U128)
+        amount = _signed(rng, MAX_I128 - rng.randint(0, 2**64))
+    else:
+        current, target = _prices(rng, -200000, 200000, zero_for_one)
+        liquidity = rng.randint(1, 2**rng.randint(1, 128) - 1)
+        amount = _signed(rng, rng.randint(1, 2**rng.randint(1, 127) - 1))
+
+    return current, target, liquidity, amount, zero_for_one
+
+
+def sample_block(seed, block):
+    """The BLOCK_SIZE vectors of one block, as (regime, inputs..., expected...) tuples
+
+    Each tuple is (regime, current, target, liquidity, amount_remaining, zero_for_one,
+    sqrt_ratio_next, amount_in, amount_out).
+    """
+    rng = random.Random(f"{seed}:{block}")
+    vectors = []
+    for index in range(block * BLOCK_SIZE, (block + 1) * BLOCK_SIZE):
+        regime = REGIMES[index % len(REGIMES)]
+        while True:
+            inputs = _draw(rng, regime)
+            if inputs is None:
+                continue
+            try:
+                expected = compute_swap_step(*inputs)[:3]
+            except (ValueError, ArithmeticError):
+                continue
+            vectors.append((regime,) + inputs + expected)
+            break
+    return vectors
+
+
+def _render_check(vector):
+    regime, current, target, liquidity, amount, zero_for_one, next_price, amount_in, amount_out = vector
+    return (
+        f"    check_step({current}, {target}, {liquidity}, {amount}, {'true' if zero_for_one else 'false'}, "
+        f"{next_price}, {amount_in}, {amount_out}); // {regime}\n"
+    )
+
+
+def render_block(seed, block, count, cases_per_test=DEFAULT_CASES_PER_TEST):
+    """Cairo test functions for the vectors of `block` below index `count`, one string each"""
+    vectors = sample_block(seed, block)[:max(count - block * BLOCK_SIZE, 0)]
+    first = block * BLOCK_SIZE
+    functions = []
+    for start in range(0, len(vectors), cases_per_test):
+        index = (first + start) // cases_per_test
+        checks = "".join(_render_check(vector) for vector in vectors[start:start + cases_per_test])
+        functions.append(f"\n#[test]\nfn test_compute_swap_step_vectors_{index:06d}() {{\n{checks}}}\n")
+    return functions
+
+
+def _rendered_blocks(seed, count, cases_per_test, jobs):
+    """Test functions of every block in block order, at most a few blocks per worker in flight
+
+    `jobs=1` renders in this process, which is what generators run by the driver use:
+    the driver already runs one per CPU.
+    """
+    blocks = range((count + BLOCK_SIZE - 1) // BLOCK_SIZE)
+    if jobs == 1:
+        for block in blocks:
+            yield from render_block(seed, block, count, cases_per_test)
+        return
+    window = 4 * (jobs or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = []
+        for block in blocks:
+            pending.append(pool.submit(render_block, seed, block, count, cases_per_test))
+            if len(pending) >= window:
+                yield from pending.pop(0).result()
+        for future in pending:
+            yield from future.result()
+
+
+def _shards(functions, header_size, max_shard_bytes):
+    """Groups of test functions that fit in `max_shard_bytes` with the header (unless one alone does not)"""
+    shard = []
+    size = header_size
+    for function in functions:
+        if shard and size + len(function) > max_shard_bytes:
+            yield shard
+            shard = []
+            size = header_size
+        shard.append(function)
+        size += len(function)
+    if shard:
+        yield shard
+
+
+def write_shards(shard_dir, count=DEFAULT_COUNT, seed=0, jobs=None, cases_per_test=DEFAULT_CASES_PER_TEST,
+                 max_shard_bytes=DEFAULT_MAX_SHARD_BYTES):
+    """Write the shard files into `shard_dir` and remove stale ones; returns the shard paths"""
+    if BLOCK_SIZE % cases_per_test:
+        raise ValueError(f"cases_per_test must divide the block size ({BLOCK_SIZE})")
+    os.makedirs(shard_dir, exist_ok=True)
+
+    paths = []
+    functions = _rendered_blocks(seed, count, cases_per_test, jobs)
+    # Shard numbers are at most four digits, so the header size is known up front
+    header_size = len(_shard_header(seed, 9999))
+    for number, shard in enumerate(_shards(functions, header_size, max_shard_bytes)):
+        path = os.path.join(shard_dir, f"shard_{number:04d}.cairo")
+        emit([_shard_header(seed, number)] + shard, path)
+        paths.append(path)
+
+    # Shards left over from a larger earlier run would still be picked up by a glob
+    for path in glob.glob(os.path.join(shard_dir, "shard_*.cairo")):
+        if path not in paths:
+            os.remove(path)
+    return paths
+
+
+def module_source(seed, count, shards):
+    """Chunks of the module file that declares `shards` shard modules"""
+    yield f"// AUTO-GENERATED compute_swap_step VECTORS (seed {seed}, {count} vectors)\n"
+    for number in range(shards):
+        yield f"mod shard_{number:04d};\n"
+
+
+def declare_in_crate(out_dir):
+    """Declare the module in `out_dir`/lib.cairo if `out_dir` is a test crate"""
+    lib_path = os.path.join(out_dir, "lib.cairo")
+    if os.path.exists(lib_path):
+        declare_module(lib_path, ("math_tests",), MODULE_NAME)
+
+
+def write_vectors(out_dir=TESTS_DIR, count=DEFAULT_COUNT, seed=0, jobs=None,
+                  cases_per_test=DEFAULT_CASES_PER_TEST, max_shard_bytes=DEFAULT_MAX_SHARD_BYTES):
+    """Write the shards and their module file and declare it in `out_dir`/lib.cairo if there is one
+
+    Returns the shard paths.
+    """
+    paths = write_shards(os.path.join(out_dir, "math_tests", MODULE_NAME), count, seed, jobs, cases_per_test,
+                         max_shard_bytes)
+    emit(module_source(seed, count, len(paths)), os.path.join(out_dir, "math_tests", f"{MODULE_NAME}.cairo"))
+    declare_in_crate(out_dir)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write randomized compute_swap_step test vectors as Cairo test shards")
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT, help="number of vectors")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out-dir", default=TESTS_DIR)
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--cases-per-test", type=int, default=DEFAULT_CASES_PER_TEST,
+                        help="vectors checked by each Cairo test function")
+    parser.add_argument("--max-shard-bytes", type=int, default=DEFAULT_MAX_SHARD_BYTES)
+    args = parser.parse_args(argv)
+
+    try:
+        paths = write_vectors(args.out_dir, args.count, args.seed, args.jobs, args.cases_per_test,
+                              args.max_shard_bytes)
+    except ValueError as e:
+        print(e)
+        return 1
+    print(f"{args.count} vectors in {len(paths)} shards under {os.path.join(args.out_dir, 'math_tests')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
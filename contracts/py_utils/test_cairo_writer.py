@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+from py_utils.cairo_writer import CairoWriter, declare_module, emit
+
+LIB = """#[cfg(test)]
+mod contract_tests {
+    mod pool_contract_tests {
+        mod mint_tests;
+        mod swap_tests;
+    }
+    mod position_tests;
+    mod tick_tests;
+}
+
+#[cfg(test)]
+mod math_tests {
+    mod fullmath_test;
+    mod tick_math_test;
+    mod number {
+        mod fixed_point_test;
+    }
+}
+"""
+
+
+class _Recorder:
+    def __init__(self):
+        self.writes = []
+        self.flushes = 0
+
+    def write(self, text):
+        self.writes.append(text)
+
+    def flush(self):
+        self.flushes += 1
+
+
+def test_writes_in_order_once_the_buffer_fills():
+    stream = _Recorder()
+    with CairoWriter(stream, buffer_size=10) as writer:
+        writer.write_all(["abc", "def", "ghij"])
+        assert stream.writes == ["abcdefghij"]
+        writer.write("kl")
+        writer.write("m")
+        assert stream.writes == ["abcdefghij"]
+    assert stream.writes == ["abcdefghij", "klm"]
+    assert writer.written == 13
+
+    stream = _Recorder()
+    with pytest.raises(RuntimeError):
+        with CairoWriter(stream, buffer_size=10) as writer:
+            writer.write("abc")
+            raise RuntimeError
+    # A failed block does not flush what it buffered
+    assert stream.writes == [] and stream.flushes == 0
+
+
+def test_emit_replaces_the_file_only_when_done(tmp_path):
+    path = tmp_path / "out.cairo"
+    path.write_text("// previous\n")
+
+    def failing():
+        yield "// partial\n"
+        raise ValueError("bad case")
+
+    with pytest.raises(ValueError):
+        emit(failing(), str(path), buffer_size=1)
+    assert path.read_text() == "// previous\n"
+    assert os.listdir(tmp_path) == ["out.cairo"]
+
+    assert emit((f"// {i}\n" for i in range(1000)), str(path), buffer_size=64) == len(path.read_text())
+    assert path.read_text().splitlines() == [f"// {i}" for i in range(1000)]
+    assert os.listdir(tmp_path) == ["out.cairo"]
+
+
+def test_declare_module(tmp_path):
+    lib = tmp_path / "lib.cairo"
+    lib.write_text(LIB)
+    assert declare_module(str(lib), ("math_tests",), "swap_step_vectors")
+    assert declare_module(str(lib), ("math_tests", "number"), "a_test")
+    assert declare_module(str(lib), ("contract_tests", "pool_contract_tests"), "zz_tests")
+    expected = (LIB.replace("    mod tick_math_test;\n", "    mod swap_step_vectors;\n    mod tick_math_test;\n")
+                .replace("        mod fixed_point_test;\n", "        mod a_test;\n        mod fixed_point_test;\n")
+                .replace("        mod swap_tests;\n", "        mod swap_tests;\n        mod zz_tests;\n"))
+    assert lib.read_text() == expected
+
+    # Declaring again, or a module the file already has, changes nothing
+    mtime = os.stat(lib).st_mtime_ns
+    assert not declare_module(str(lib), ("math_tests",), "swap_step_vectors")
+    assert not declare_module(str(lib), ("contract_tests",), "tick_tests")
+    assert lib.read_text() == expected and os.stat(lib).st_mtime_ns == mtime
+    assert sorted(os.listdir(tmp_path)) == ["lib.cairo"]
+
+    with pytest.raises(ValueError, match="no `mod missing"):
+        declare_module(str(lib), ("missing",), "x")
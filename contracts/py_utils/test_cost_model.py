@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from py_utils.cost_model import OPERATIONS, SETUP_COLUMNS, CostModel, operations, parse_gas_report, scenario_counts
+from py_utils.pool import Pool, SwapCounters
+from py_utils.tick_math import get_sqrt_ratio_at_tick
+
+# Made-up weights the synthetic reports are built from
+WEIGHTS = {"tests": 900000, "mints": 150000, "swaps": 200000, "storage_reads": 2000, "storage_writes": 5000,
+           "dispatcher_calls": 30000, "mul_div_calls": 800, "sqrt_ratio_computations": 1500,
+           "tick_computations": 1400}
+
+# (zero_for_one, amount_specified, limit tick): single-step swaps and swaps that take
+# several steps and cross ticks before they stop at their limit
+SWAPS = [(True, 10**12, -40), (True, -10**9, -205), (False, 10**11, 227), (False, -10**7, 251),
+         (True, -10**12, -229), (True, -10**14, -228), (False, 10**11, 510), (False, 10**15, 300)]
+
+
+def _scenario(name, mints, swaps):
+    return {"test": name, "sqrt_price_x96": str(get_sqrt_ratio_at_tick(0)), "tick": 0,
+            "mints": [[-50 + 5 * k, -45 + 5 * k, str(10**18)] for k in range(mints)],
+            "swaps": [[zero_for_one, str(amount), str(get_sqrt_ratio_at_tick(tick))]
+                      for zero_for_one, amount, tick in swaps]}
+
+
+def _report(scenarios):
+    lines = []
+    for scenario in scenarios:
+        counts = scenario_counts(scenario)
+        gas = sum(WEIGHTS[name] * counts[name] for name in SETUP_COLUMNS + OPERATIONS)
+        lines.append(f"[PASS] contracts_tests::pool_contract_tests::{scenario['test']} "
+                     f"(l1_gas: ~0, l1_data_gas: ~192, l2_gas: ~{gas})")
+        lines.append(f"        steps: {gas // 10}")
+        lines.append("        memory holes: 12")
+    lines.append("[IGNORE] contracts_tests::pool_contract_tests::test_ignored")
+    return "\n".join(lines) + "\n"
+
+
+def _scenarios():
+    scenarios = [_scenario(f"test_mint_{mints}", mints, []) for mints in (11, 15, 20)]
+    scenarios += [_scenario(f"test_swap_{i}", 20, [swap]) for i, swap in enumerate(SWAPS[:-1])]
+    scenarios.append(_scenario("test_two_swaps", 20, [SWAPS[0], SWAPS[2]]))
+    return scenarios
+
+
+def test_parse_gas_report():
+    report = parse_gas_report(
+        "[PASS] a::b::test_old (gas: ~1234)\n"
+        "[PASS] a::b::test_new (l1_gas: ~0, l1_data_gas: ~96, l2_gas: ~56789)\n"
+        "        steps: 4321\n"
+        "[FAIL] a::b::test_failed\n"
+        "        steps: 1\n"
+    )
+    assert report == {"test_old": {"gas": 1234, "steps": None}, "test_new": {"gas": 56789, "steps": 4321}}
+
+
+def test_fit_predicts_held_out_swaps(tmp_path):
+    scenarios = _scenarios()
+    model = CostModel.fit(parse_gas_report(_report(scenarios)), scenarios)
+    assert model.tests == len(scenarios)
+
+    # The last swap is not in any scenario
+    pool = Pool(get_sqrt_ratio_at_tick(0), 0)
+    for k in range(20):
+        pool.mint(-50 + 5 * k, -45 + 5 * k, 10**18)
+    for zero_for_one, amount, tick in SWAPS[-1:] + SWAPS[2:4]:
+        counters = SwapCounters()
+        pool.simulate_swap(zero_for_one, amount, get_sqrt_ratio_at_tick(tick), counters)
+        expected = sum(WEIGHTS[name] * count for name, count in operations(counters).items())
+        gas, steps = model.predict(counters)
+        assert gas == pytest.approx(expected, rel=1e-9)
+        assert steps == pytest.approx(expected / 10, rel=1e-4)
+
+    path = tmp_path / "model.json"
+    model.save(path)
+    assert CostModel.load(path).to_dict() == json.loads(json.dumps(model.to_dict()))
+
+
+def test_fit_needs_a_matching_test():
+    with pytest.raises(ValueError):
+        CostModel.fit(parse_gas_report("[PASS] a::test_other (gas: ~1)\n"), _scenarios())
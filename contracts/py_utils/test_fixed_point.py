@@ -0,0 +1,75 @@
+import math
+import random
+from decimal import Decimal, localcontext
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from py_utils import fixed_point
+from py_utils.fixed_point import HALF, ONE, FixedQ64x96
+from py_utils.tick_math import MAX_SQRT_RATIO, MIN_SQRT_RATIO
+
+
+def test_operations_follow_the_cairo_impl():
+    two, three = FixedQ64x96.new_unscaled(2), FixedQ64x96.new_unscaled(3)
+    assert (two + three).value == 5 * ONE and (three - two).value == ONE
+    assert (two * three).value == 6 * ONE and (three / two).value == ONE + HALF
+    assert (FixedQ64x96(HALF) * FixedQ64x96(HALF)).value == HALF // 2
+    assert FixedQ64x96(ONE + HALF).floor().value == ONE and FixedQ64x96(ONE + HALF).ceil().value == 2 * ONE
+    assert FixedQ64x96.new_unscaled(4).sqrt().value == 2 * ONE
+    assert FixedQ64x96(0).sqrt().value == 0 and FixedQ64x96(1).sqrt().value == 2**48
+    assert two < three and two == FixedQ64x96.new_unscaled(2) and len({two, FixedQ64x96(2 * ONE)}) == 1
+
+    with pytest.raises(ValueError, match="sqrt price underflow"):
+        two - three
+    with pytest.raises(ValueError, match="sqrt ratio overflow"):
+        FixedQ64x96.new(MAX_SQRT_RATIO)
+    with pytest.raises(ValueError, match="sqrt ratio underflow"):
+        FixedQ64x96.new(MIN_SQRT_RATIO - 1)
+    with pytest.raises(OverflowError):
+        FixedQ64x96(2**200) * FixedQ64x96(2**100)
+    with pytest.raises(ZeroDivisionError):
+        two / FixedQ64x96(0)
+
+
+def test_sqrt_matches_the_u256_sqrt_formula():
+    rng = random.Random(0)
+    for _ in range(1000):
+        value = rng.randrange(2 ** rng.randrange(1, 256))
+        # root * ONE / u256_sqrt(ONE), clamped up to MIN_SQRT_RATIO
+        expected = math.isqrt(value) * ONE // math.isqrt(ONE)
+        if 0 < expected < MIN_SQRT_RATIO:
+            expected = MIN_SQRT_RATIO
+        assert FixedQ64x96(value).sqrt().value == expected
+
+
+def test_price_conversions_are_exact():
+    rng = random.Random(1)
+    prices = [2000, 1850.75, 2000 * 0.985, 10**30, 1e-30]
+    prices += [rng.random() * 10**rng.randrange(-20, 20) for _ in range(200)]
+    for price in prices:
+        sqrt_price = fixed_point.price_to_sqrt_price_x96(price)
+        assert fixed_point.sqrt_price_x96_to_price(sqrt_price) <= Fraction(price)
+        assert fixed_point.sqrt_price_x96_to_price(sqrt_price + 1) > Fraction(price)
+        with localcontext() as context:
+            # Decimal gets there too, given enough digits
+            context.prec = 100
+            assert int(Decimal(price).sqrt() * 2**96) == sqrt_price
+    assert fixed_point.price_to_sqrt_price_x96(Fraction(1, 4)) == HALF
+    assert fixed_point.price_to_sqrt_price_x96(Decimal('0.25')) == HALF
+    expected = [2 * ONE, 3543191142285914205922034323214]
+    assert fixed_point.price_to_sqrt_price_x96_batch(np.array([4.0, 2000.0])) == expected
+
+
+def test_batches_match_the_scalar_methods():
+    rng = random.Random(2)
+    a = [rng.randrange(2**160) for _ in range(500)]
+    b = [rng.randrange(1, 2**64) for _ in range(500)]
+    assert fixed_point.mul_batch(a, b) == [(FixedQ64x96(x) * FixedQ64x96(y)).value for x, y in zip(a, b)]
+    assert fixed_point.div_batch(a, b) == [(FixedQ64x96(x) / FixedQ64x96(y)).value for x, y in zip(a, b)]
+    assert fixed_point.sqrt_batch(a) == [FixedQ64x96(x).sqrt().value for x in a]
+    assert fixed_point.floor_batch(a) == [FixedQ64x96(x).floor().value for x in a]
+    assert fixed_point.ceil_batch(np.array(b, dtype=np.uint64)) == [FixedQ64x96(x).ceil().value for x in b]
+    with pytest.raises(ValueError, match="same length"):
+        fixed_point.mul_batch(a, b[1:])
@@ -0,0 +1,99 @@
+import random
+
+import numpy as np
+import pytest
+
+from py_utils.fullmath import (
+    MAX_U256,
+    div_rounding_up,
+    div_rounding_up_batch,
+    mul_div,
+    mul_div_batch,
+    mul_div_rounding_up,
+    mul_div_rounding_up_batch,
+)
+
+
+def _operand(rng):
+    return rng.choice([0, 1, 2, MAX_U256, rng.randrange(2**32), rng.randrange(2**rng.randrange(1, 257))])
+
+
+def _call(function, *args):
+    try:
+        return function(*args)
+    except OverflowError:
+        return OverflowError
+
+
+def test_against_exact_integer_math():
+    rng = random.Random(10)
+    for _ in range(20000):
+        a, b, denominator = _operand(rng), _operand(rng), _operand(rng) or 1
+        floor, remainder = divmod(a * b, denominator)
+        ceil = floor + (remainder != 0)
+        # Cairo multiplies the remainder of a by b in u256, so those rows may overflow too
+        beyond_u256 = (a % denominator) * b > MAX_U256
+
+        result = _call(mul_div, a, b, denominator)
+        if result is OverflowError:
+            assert floor > MAX_U256 or beyond_u256
+        else:
+            assert result == floor
+
+        result = _call(mul_div_rounding_up, a, b, denominator)
+        if result is OverflowError:
+            assert ceil > MAX_U256 or beyond_u256
+        elif (a % denominator) * (b % denominator) > MAX_U256:
+            # The approximated branch: the remainder term is replaced by 1
+            assert result <= ceil
+        else:
+            assert result == ceil
+
+        assert div_rounding_up(a, denominator) == -(-a // denominator)
+
+
+def test_512_bit_product():
+    # a * b needs more than 256 bits, the result does not
+    a, b, denominator = 2**200 + 5, 2**100 + 3, 2**60 + 1
+    assert a * b > MAX_U256
+    assert mul_div(a, b, denominator) == a * b // denominator
+    assert mul_div_rounding_up(a, b, denominator) == -(-a * b // denominator)
+
+
+def test_result_beyond_u256():
+    # floor(a * b / denominator) is MAX_U256 + 1: the denominator is not above the high half
+    with pytest.raises(OverflowError, match="u256_add Overflow"):
+        mul_div(MAX_U256, MAX_U256, MAX_U256 - 1)
+    with pytest.raises(OverflowError, match="u256_mul Overflow"):
+        mul_div(MAX_U256, 2, 1)
+
+
+def test_rounding_up_past_max_u256():
+    a, b, denominator = MAX_U256 - MAX_U256 // 6, 6, 5
+    floor, remainder = divmod(a * b, denominator)
+    assert floor == MAX_U256 and remainder
+    assert mul_div(a, b, denominator) == MAX_U256
+    with pytest.raises(OverflowError, match="u256_add Overflow"):
+        mul_div_rounding_up(a, b, denominator)
+
+
+def test_division_by_zero():
+    for function in (mul_div, mul_div_rounding_up):
+        with pytest.raises(ZeroDivisionError):
+            function(1, 1, 0)
+    with pytest.raises(ZeroDivisionError):
+        div_rounding_up(1, 0)
+
+
+def test_batches():
+    rng = random.Random(11)
+    a = [rng.randrange(2**128) for _ in range(500)]
+    b = [rng.randrange(2**128) for _ in range(500)]
+    denominator = [rng.randrange(1, 2**128) for _ in range(500)]
+    assert mul_div_batch(a, b, denominator) == [mul_div(*row) for row in zip(a, b, denominator)]
+    assert mul_div_rounding_up_batch(a, b, denominator) == \
+        [mul_div_rounding_up(*row) for row in zip(a, b, denominator)]
+    numerators = np.arange(1000, dtype=np.uint64)
+    assert div_rounding_up_batch(numerators, np.full(1000, 7)) == [-(-n // 7) for n in range(1000)]
+    with pytest.raises(ValueError, match="same length"):
+        mul_div_batch(a, b, denominator[:-1])
@@ -0,0 +1,61 @@
+import os
+
+from py_utils import generate_tests
+from py_utils.generate_tests import CACHE_FILE, Generator, generate_all
+
+
+def _read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def test_second_run_skips_everything(tmp_path):
+    out_dir = str(tmp_path / "out")
+    memo_path = str(tmp_path / "memo.sqlite")
+    generators, _ = generate_tests.discover_generators()
+    names = sorted(generator.name for generator in generators)
+
+    written, skipped, failed = generate_all(out_dir, jobs=2, log=lambda line: None, memo_path=memo_path)
+    assert (sorted(written), skipped, failed) == (names, [], [])
+    outputs = {generator.output: _read(os.path.join(out_dir, generator.output)) for generator in generators}
+
+    log = []
+    written, skipped, failed = generate_all(out_dir, jobs=2, log=log.append, memo_path=memo_path)
+    assert (written, sorted(skipped), failed) == ([], names, [])
+    assert log == []
+
+    # An edited output is stale; a forced run rewrites it from the memo cache, unchanged
+    first = generators[0]
+    with open(os.path.join(out_dir, first.output), "a") as f:
+        f.write("// edited\n")
+    written, skipped, failed = generate_all(out_dir, jobs=1, log=log.append, memo_path=memo_path)
+    assert written == [first.name] and len(skipped) == len(names) - 1
+    written, _, _ = generate_all(out_dir, jobs=2, force=True, log=log.append, memo_path=memo_path)
+    assert sorted(written) == names
+    assert {output: _read(os.path.join(out_dir, output)) for output in outputs} == outputs
+    assert any(line.startswith("memo cache: tick_to_sqrt_ratio") and "100% hit rate" in line for line in log)
+
+
+def test_failures_leave_no_output(tmp_path, monkeypatch):
+    scripts = tmp_path / "scripts"
+    scripts.mkdir()
+    (scripts / "good_generator.py").write_text('print("// good")\n')
+    (scripts / "exiting_generator.py").write_text('import sys\nprint("// partial")\nsys.exit("no cases")\n')
+    (scripts / "raising_generator.py").write_text('print("// partial")\nassert False, "bad case"\n')
+    generators = [Generator(path.stem, str(path), f"{path.stem}.cairo") for path in sorted(scripts.iterdir())]
+    monkeypatch.setattr(generate_tests, "discover_generators", lambda: (generators, []))
+    # Workers are forked, so they see the scripts directory too
+    monkeypatch.syspath_prepend(str(scripts))
+
+    out_dir = tmp_path / "out"
+    log = []
+    written, skipped, failed = generate_all(str(out_dir), jobs=2, log=log.append, memo_path=None)
+    assert (written, skipped, sorted(failed)) == (["good_generator"], [], ["exiting_generator", "raising_generator"])
+    assert sorted(os.listdir(out_dir)) == [CACHE_FILE, "good_generator.cairo"]
+    assert (out_dir / "good_generator.cairo").read_text() == "// good\n"
+    assert "FAILED exiting_generator: SystemExit: no cases" in log
+    assert "FAILED raising_generator: AssertionError: bad case" in log
+
+    # Failed generators stay stale
+    written, skipped, failed = generate_all(str(out_dir), jobs=1, log=log.append, memo_path=None)
+    assert (written, skipped, sorted(failed)) == ([], ["good_generator"], ["exiting_generator", "raising_generator"])
@@ -0,0 +1,46 @@
+import random
+
+from py_utils.liquidity_index import LiquidityIndex
+from py_utils.tick_math import get_sqrt_ratio_at_tick
+
+
+def _outcome(function, *args):
+    try:
+        return function(*args)
+    except ValueError as e:
+        return str(e)
+
+
+def test_mints_match_an_index_built_from_the_final_ticks():
+    rng = random.Random(14)
+    ticks = {}
+    index = LiquidityIndex()
+    for _ in range(200):
+        lower = rng.randrange(-3000, 3000)
+        upper = lower + rng.randrange(1, 1500)
+        amount = rng.randrange(1, 10**20)
+        index.mint(lower, upper, amount)
+        ticks[lower] = ticks.get(lower, 0) + amount
+        ticks[upper] = ticks.get(upper, 0) - amount
+    rebuilt = LiquidityIndex(ticks)
+    assert index.liquidity == rebuilt.liquidity
+    assert index.amounts0 == rebuilt.amounts0
+
+    for _ in range(300):
+        a = get_sqrt_ratio_at_tick(rng.randrange(-5000, 5000))
+        b = get_sqrt_ratio_at_tick(rng.randrange(-5000, 5000))
+        assert index.amounts_between(a, b) == rebuilt.amounts_between(a, b)
+        amount_in, zero_for_one = rng.randrange(10**24), rng.random() < 0.5
+        assert (_outcome(index.sqrt_price_after_input, a, amount_in, zero_for_one)
+                == _outcome(rebuilt.sqrt_price_after_input, a, amount_in, zero_for_one))
+
+
+def test_input_that_reaches_a_boundary_stops_on_it():
+    index = LiquidityIndex({-600: 10**18, -100: 10**18, 100: -10**18, 600: -10**18})
+    start = get_sqrt_ratio_at_tick(0)
+    for boundary in (-600, -100, 100, 600):
+        sqrt_price = get_sqrt_ratio_at_tick(boundary)
+        amount0, amount1 = index.amounts_between(start, sqrt_price)
+        zero_for_one = boundary < 0
+        amount_in = amount0 if zero_for_one else amount1
+        assert index.sqrt_price_after_input(start, amount_in, zero_for_one) == sqrt_price
@@ -0,0 +1,69 @@
+import random
+
+import numpy as np
+import pytest
+
+from py_utils import limbs
+from py_utils.liquidity_math import (
+    CHUNK_ROWS,
+    LIQUIDITY_LIMBS,
+    SQRT_PRICE_LIMBS,
+    calc_amount0_batch,
+    calc_amount0_delta,
+    calc_amount0_limbs,
+    calc_amount1_batch,
+    calc_amount1_delta,
+    calc_amount1_limbs,
+)
+from py_utils.tick_math import MAX_SQRT_RATIO, MIN_SQRT_RATIO, to_records
+
+MAX_U128 = 2**128 - 1
+
+
+def _rows(rng, count):
+    edges = [MIN_SQRT_RATIO, MIN_SQRT_RATIO + 1, 2**96, MAX_SQRT_RATIO - 1]
+    liquidity, sqrt_price_a, sqrt_price_b = [], [], []
+    for _ in range(count):
+        liquidity.append(rng.choice([0, 1, MAX_U128, rng.randrange(2**64), rng.randrange(MAX_U128)]))
+        a = rng.choice(edges + [rng.randrange(MIN_SQRT_RATIO, MAX_SQRT_RATIO)])
+        b = rng.choice([a, a + rng.randrange(-2**40, 2**40), rng.randrange(MIN_SQRT_RATIO, MAX_SQRT_RATIO)])
+        sqrt_price_a.append(a)
+        sqrt_price_b.append(min(max(b, MIN_SQRT_RATIO), MAX_SQRT_RATIO - 1))
+    return liquidity, sqrt_price_a, sqrt_price_b
+
+
+def test_batches_match_the_scalar_functions():
+    rng = random.Random(3)
+    # More than one chunk, plus rows too wide for the limbs (patched with the scalar results)
+    liquidity, sqrt_price_a, sqrt_price_b = _rows(rng, CHUNK_ROWS + 500)
+    liquidity[7] = 2**200
+    sqrt_price_b[9] = 2**170
+    for batch, scalar in ((calc_amount0_batch, calc_amount0_delta), (calc_amount1_batch, calc_amount1_delta)):
+        expected = [scalar(a, b, liq) for liq, a, b in zip(liquidity, sqrt_price_a, sqrt_price_b)]
+        assert batch(liquidity, sqrt_price_a, sqrt_price_b) == expected
+
+
+def test_batches_take_arrays():
+    rng = random.Random(4)
+    liquidity, sqrt_price_a, sqrt_price_b = _rows(rng, 1000)
+    small = [liq % 2**63 for liq in liquidity]
+    for batch, scalar in ((calc_amount0_batch, calc_amount0_delta), (calc_amount1_batch, calc_amount1_delta)):
+        expected = [scalar(a, b, liq) for liq, a, b in zip(small, sqrt_price_a, sqrt_price_b)]
+        assert batch(np.array(small, dtype=np.int64), to_records(sqrt_price_a), to_records(sqrt_price_b)) == expected
+
+
+def test_limb_columns():
+    rng = random.Random(5)
+    liquidity, sqrt_price_a, sqrt_price_b = _rows(rng, CHUNK_ROWS + 500)
+    columns = (limbs.from_ints(liquidity, LIQUIDITY_LIMBS)[0], limbs.from_ints(sqrt_price_a, SQRT_PRICE_LIMBS)[0],
+               limbs.from_ints(sqrt_price_b, SQRT_PRICE_LIMBS)[0])
+    for batch, scalar in ((calc_amount0_limbs, calc_amount0_delta), (calc_amount1_limbs, calc_amount1_delta)):
+        expected = [scalar(a, b, liq) for liq, a, b in zip(liquidity, sqrt_price_a, sqrt_price_b)]
+        assert limbs.to_ints(batch(*columns)) == expected
+
+    with pytest.raises(ValueError):
+        calc_amount0_limbs(columns[1], columns[1], columns[2])
+    zero = columns[1].copy()
+    zero[:, 3] = 0
+    with pytest.raises(ZeroDivisionError):
+        calc_amount0_limbs(columns[0], zero, columns[2])
@@ -0,0 +1,91 @@
+import random
+
+from py_utils import memo_cache, swap_math, tick_math
+from py_utils.memo_cache import MemoCache
+
+
+def _swap_steps(rng, count):
+    steps = []
+    for _ in range(count):
+        current, target = (rng.randrange(tick_math.MIN_SQRT_RATIO, 2**160) for _ in range(2))
+        steps.append((current, target, rng.randrange(0, 2**100), rng.randrange(-2**100, 2**100), current >= target))
+    return steps
+
+
+def _results(function, steps):
+    results = []
+    for args in steps:
+        try:
+            results.append(function(*args))
+        except memo_cache.CACHED_ERRORS as e:
+            results.append((type(e), str(e)))
+    return results
+
+
+def test_results_and_failures_persist(tmp_path):
+    path = str(tmp_path / "memo.sqlite")
+    steps = _swap_steps(random.Random(0), 300) + [(tick_math.MIN_SQRT_RATIO, tick_math.MAX_SQRT_RATIO, 0, 0, True)]
+    expected = _results(swap_math.compute_swap_step, steps)
+    assert any(isinstance(result[0], type) for result in expected)
+
+    with MemoCache(path) as cache:
+        memoized = cache.memoize(swap_math.compute_swap_step)
+        assert _results(memoized, steps) == expected
+        assert _results(memoized, steps[:100]) == expected[:100]
+        assert cache.stats() == {"compute_swap_step": {"hits": 100, "misses": len(steps)}}
+
+    with MemoCache(path) as cache:
+        memoized = cache.memoize(swap_math.compute_swap_step)
+        assert _results(memoized, steps) == expected
+        assert cache.stats() == {"compute_swap_step": {"hits": len(steps), "misses": 0}}
+        assert len(cache) == len(steps)
+
+
+def test_model_change_invalidates(tmp_path, monkeypatch):
+    path = str(tmp_path / "memo.sqlite")
+    with MemoCache(path) as cache:
+        memoized = cache.memoize(tick_math.tick_to_sqrt_ratio)
+        for tick in range(-50, 50):
+            memoized(tick)
+
+    monkeypatch.setattr(memo_cache, "model_version", lambda function: "edited")
+    with MemoCache(path) as cache:
+        memoized = cache.memoize(tick_math.tick_to_sqrt_ratio)
+        assert len(cache) == 0
+        assert memoized(0) == tick_math.tick_to_sqrt_ratio(0)
+        assert cache.stats()["tick_to_sqrt_ratio"] == {"hits": 0, "misses": 1}
+
+
+def test_least_recently_used_chunks_are_evicted(tmp_path, monkeypatch):
+    monkeypatch.setattr(memo_cache, "FLUSH_ROWS", 10)
+    path = str(tmp_path / "memo.sqlite")
+    with MemoCache(path, max_entries=30) as cache:
+        memoized = cache.memoize(tick_math.tick_to_sqrt_ratio)
+        for tick in range(50):
+            memoized(tick)
+            if tick >= 10:
+                # Keep the first chunk in use
+                memoized(0)
+        assert len(cache) == 30
+
+    with MemoCache(path) as cache:
+        memoized = cache.memoize(tick_math.tick_to_sqrt_ratio)
+        for tick in [*range(10), *range(30, 50)]:
+            assert memoized(tick) == tick_math.tick_to_sqrt_ratio(tick)
+        memoized(10)
+        assert cache.stats()["tick_to_sqrt_ratio"] == {"hits": 30, "misses": 1}
+
+
+def test_install_reaches_modules_that_imported_by_name():
+    from py_utils import pool
+
+    original = swap_math.compute_swap_step
+    with MemoCache(":memory:") as cache, cache.install():
+        assert swap_math.compute_swap_step is not original
+        assert pool.compute_swap_step is swap_math.compute_swap_step
+        args = (2**96, 2**95, 10**18, 10**15, True)
+        assert swap_math.compute_swap_step(*args) == swap_math.compute_swap_step(*args) == original(*args)
+        stats = cache.stats()
+    assert swap_math.compute_swap_step is pool.compute_swap_step is original
+    assert stats["compute_swap_step"] == {"hits": 1, "misses": 1}
+    assert stats["get_next_sqrt_price_from_amount0_rounding_up"]["misses"] == 1
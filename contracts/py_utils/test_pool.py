@@ -0,0 +1,149 @@
+import random
+
+import pytest
+
+from py_utils import pool as pool_module
+from py_utils.pool import Pool
+from py_utils.swap_math import compute_swap_step
+from py_utils.tick_math import get_sqrt_ratio_at_tick
+
+
+def _ranges_pool():
+    pool = Pool(get_sqrt_ratio_at_tick(0), 0)
+    for k in range(20):
+        pool.mint(-50 + 5 * k, -45 + 5 * k, 10**18)
+    return pool
+
+
+def test_exact_output_past_the_liquidity_raises_after_max_steps():
+    pool = _ranges_pool()
+    with pytest.raises(ValueError, match="more than 1000 swap steps"):
+        pool.simulate_swap(True, -10**14, get_sqrt_ratio_at_tick(-40), max_steps=1000)
+    pool = Pool(get_sqrt_ratio_at_tick(1311), 1311, 657)
+    with pytest.raises(ValueError, match="more than 1000 swap steps"):
+        pool.swap(False, -1000, 3 * 2**96, max_steps=1000)
+    assert pool.tick == 1311
+
+
+def test_swap_stops_at_its_limit_within_max_steps():
+    pool = _ranges_pool()
+    limit = get_sqrt_ratio_at_tick(-205)
+    amount0, amount1, sqrt_price_x96, tick = pool.simulate_swap(True, -10**9, limit, max_steps=10)
+    assert (sqrt_price_x96, tick) == (limit, -205)
+    assert amount0 < 0 < amount1
+
+
+def _scan_word(initialized, tick, tick_spacing, lte):
+    """`next_initialized_tick_within_one_word` by looking at every initialized tick"""
+    compressed = abs(tick) // tick_spacing * (1 if tick >= 0 else -1)
+    word_pos = compressed >> 8
+    in_word = [t // tick_spacing for t in initialized if (t // tick_spacing) >> 8 == word_pos]
+    if lte:
+        below = [c for c in in_word if c <= compressed]
+        return (max(below) * tick_spacing, True) if below else ((word_pos * 256 - 1) * tick_spacing, False)
+    above = [c for c in in_word if c > compressed]
+    return (min(above) * tick_spacing, True) if above else ((word_pos + 1) * 256 * tick_spacing, False)
+
+
+@pytest.mark.parametrize("tick_spacing", [1, 10, 60, 200])
+def test_next_initialized_tick_within_one_word(tick_spacing):
+    rng = random.Random(tick_spacing)
+    pool = Pool(get_sqrt_ratio_at_tick(0), 0, tick_spacing=tick_spacing)
+    for _ in range(50):
+        lower = rng.randrange(-1000, 1000) * tick_spacing
+        upper = lower + rng.randrange(1, 50) * tick_spacing
+        pool.mint(lower, upper, rng.randrange(1, 10**18))
+    initialized = pool.initialized_ticks
+    for _ in range(500):
+        tick = rng.randrange(-1100, 1100) * tick_spacing + rng.randrange(tick_spacing)
+        lte = rng.random() < 0.5
+        assert pool.next_initialized_tick_within_one_word(tick, lte) == _scan_word(initialized, tick, tick_spacing, lte)
+
+
+def test_tick_index_follows_flips():
+    rng = random.Random(7)
+    pool = Pool(get_sqrt_ratio_at_tick(0), 0, tick_spacing=10)
+    for _ in range(200):
+        if pool.initialized_ticks and rng.random() < 0.3:
+            # Clear a tick, as burning its last liquidity would
+            tick = rng.choice(pool.initialized_ticks)
+            pool.update_tick(tick, -pool.ticks[tick][0], False)
+        else:
+            lower = rng.randrange(-3000, 3000) * 10
+            pool.mint(lower, lower + rng.randrange(1, 300) * 10, 10**18)
+        initialized = sorted(tick for tick, info in pool.ticks.items() if info[0] > 0)
+        assert pool.initialized_ticks == initialized
+        # Walk towards the answer, as a swap does, so the remembered lookups get reused and then dropped
+        tick = rng.randrange(-3100, 3100) * 10
+        for lte in (True, False):
+            for step in range(0, 2000, 97):
+                query = tick - step if lte else tick + step
+                assert pool.next_boundary(query, lte)[:2] == _scan_word(initialized, query, 10, lte)
+
+
+def test_mint_rejects_ticks_off_the_spacing():
+    pool = Pool(get_sqrt_ratio_at_tick(0), 0, tick_spacing=60)
+    with pytest.raises(ValueError, match="tick not divisible by spacing"):
+        pool.mint(-60, 50, 10**18)
+    pool.mint(-60, 60, 10**18)
+    assert pool.initialized_ticks == [-60, 60]
+
+
+def _fee_pool(fee_pips):
+    # Adjacent ranges clear of the bitmap word edges, with the price in just one of them,
+    # so that the active liquidity always is the liquidity of the range around the tick
+    pool = Pool(get_sqrt_ratio_at_tick(102), 102, fee_pips=fee_pips)
+    for k in range(20):
+        pool.mint(50 + 5 * k, 55 + 5 * k, 10**18 + k, owner=k)
+    return pool
+
+
+def test_fees_owed_match_the_fees_paid_in_range(monkeypatch):
+    pool = _fee_pool(3000)
+    paid = {}
+    original = pool_module.process_swap_step
+
+    def process_swap_step(*args):
+        result = original(*args)
+        fees = paid.setdefault(args[2], [0, 0])
+        fees[0 if args[4] else 1] += result[3]
+        return result
+
+    monkeypatch.setattr(pool_module, "process_swap_step", process_swap_step)
+    # Small inputs run every step up to its target: limits on initialized ticks cross
+    # exactly one of them, and the price never turns back on an initialized tick
+    tick = pool.tick
+    for limit in [100, 97, 100, 103, 105, 108, 105, 102, 100, 96, 95, 93, 95, 99]:
+        pool.swap(limit < tick, 1000, get_sqrt_ratio_at_tick(limit))
+        tick = limit
+    monkeypatch.undo()
+
+    assert len(paid) == 4
+    for liquidity, fees in paid.items():
+        k = liquidity - 10**18
+        owed = pool.fees_owed(k, 50 + 5 * k, 55 + 5 * k)
+        # Fee growth rounds down once per step
+        assert [fee - 14 <= o <= fee for o, fee in zip(owed, fees)] == [True, True]
+    assert pool.fees_owed(0, 50, 55) == (0, 0)
+
+    # Adding liquidity credits the fees and restarts from the current growth
+    owed = pool.fees_owed(9, 95, 100)
+    pool.mint(95, 100, 1, owner=9)
+    assert pool.position_fees[9, 95, 100][2:] == list(owed)
+    assert pool.fees_owed(9, 95, 100) == owed
+
+
+def test_fee_amount():
+    current, target = get_sqrt_ratio_at_tick(0), get_sqrt_ratio_at_tick(-10)
+    assert compute_swap_step(current, target, 10**18, 10**16, True, 0)[3] == 0
+    # Past the target the rest of the input is the fee
+    sqrt_price, amount_in, _, fee = compute_swap_step(current, target, 10**18, 10**16, True, 3000)
+    assert sqrt_price < target and amount_in + fee == 10**16
+    assert fee >= 10**16 * 3000 // 10**6
+    # Stopping on the target, the fee is charged on top of the amount in
+    sqrt_price, amount_in, _, fee = compute_swap_step(current, target, 10**18, 10**3, True, 3000)
+    assert sqrt_price == target and fee == -(-amount_in * 3000 // 997000)
+    with pytest.raises(ValueError):
+        compute_swap_step(current, target, 10**18, 10**3, True, 10**6)
+    with pytest.raises(ValueError):
+        Pool(current, 0, fee_pips=-1)
@@ -0,0 +1,91 @@
+import random
+
+import pytest
+
+from py_utils.pool import Pool
+from py_utils.pool_snapshot import PoolSnapshot, write_snapshot
+from py_utils.tick_math import get_sqrt_ratio_at_tick
+
+
+def _snapshot_path(tmp_path):
+    pool = Pool(get_sqrt_ratio_at_tick(0), 0, tick_spacing=10)
+    pool.mint(-100, 200, 10**18)
+    pool.mint(-50, 50, 10**17)
+    return write_snapshot(pool, str(tmp_path / "pool.snap"))
+
+
+def test_close_keeps_the_snapshot_open_while_a_column_is_in_use(tmp_path):
+    snapshot = PoolSnapshot(_snapshot_path(tmp_path))
+    ticks = snapshot.ticks[:]
+    with pytest.raises(BufferError):
+        snapshot.close()
+    assert list(snapshot.ticks) == list(ticks) == [-100, -50, 50, 200]
+    assert snapshot.is_initialized(-50)
+
+    del ticks
+    snapshot.close()
+    assert snapshot.ticks is None
+
+
+def _state(pool):
+    return (pool.sqrt_price_x96, pool.tick, pool.liquidity, pool.tick_spacing, pool.fee_pips, pool.ticks,
+            pool.bitmap.words, pool.positions, pool.fee_growth_global0_x128, pool.fee_growth_global1_x128,
+            pool.fee_growth_outside, pool.position_fees)
+
+
+def test_fee_state_round_trips(tmp_path):
+    pool = Pool(get_sqrt_ratio_at_tick(102), 102, tick_spacing=1, fee_pips=3000)
+    for k in range(20):
+        pool.mint(50 + 5 * k, 55 + 5 * k, 10**18 + k, owner=2**200 + k)
+    tick = pool.tick
+    for limit in [100, 97, 100, 103, 105, 108, 105, 102, 100, 96, 95]:
+        pool.swap(limit < tick, 1000, get_sqrt_ratio_at_tick(limit))
+        tick = limit
+    # Owed tokens that were credited, next to growth that was not yet
+    pool.mint(95, 100, 1, owner=2**200 + 9)
+    assert pool.fee_growth_global0_x128 and pool.fee_growth_global1_x128
+    assert any(outside != [0, 0] for outside in pool.fee_growth_outside.values())
+    assert pool.position_fees[2**200 + 9, 95, 100][2:] != [0, 0]
+
+    with PoolSnapshot(write_snapshot(pool, str(tmp_path / "pool.snap"))) as snapshot:
+        assert (snapshot.fee_pips, snapshot.fee_growth_global0_x128) == (3000, pool.fee_growth_global0_x128)
+        restored = snapshot.to_pool()
+    assert _state(restored) == _state(pool)
+    for key in pool.positions:
+        assert restored.fees_owed(*key) == pool.fees_owed(*key)
+
+    # Both go on the same way
+    for each in (pool, restored):
+        each.swap(True, 1000, get_sqrt_ratio_at_tick(90))
+        each.mint(60, 65, 5, owner=2**200 + 2)
+    assert _state(restored) == _state(pool)
+
+
+def _outcome(pool, *args):
+    try:
+        return pool.simulate_swap(*args)
+    except (ValueError, ArithmeticError) as e:
+        return type(e), str(e)
+
+
+@pytest.mark.parametrize("tick_spacing, fee_pips", [(1, 0), (10, 500), (60, 3000)])
+def test_swaps_on_the_columns_match_the_pool(tmp_path, tick_spacing, fee_pips):
+    rng = random.Random(tick_spacing)
+    pool = Pool(get_sqrt_ratio_at_tick(-7 * tick_spacing), -7 * tick_spacing, 10**18, tick_spacing, fee_pips)
+    for _ in range(40):
+        lower = rng.randrange(-1200, 1100) * tick_spacing
+        pool.mint(lower, lower + rng.randrange(1, 300) * tick_spacing, rng.randrange(1, 10**19))
+    # A tick the Tick contract keeps without liquidity_gross is not initialized
+    pool.ticks[3 * tick_spacing + 1] = [0, 0]
+
+    with PoolSnapshot(write_snapshot(pool, str(tmp_path / "pool.snap"))) as snapshot:
+        assert list(snapshot.initialized_ticks) == pool.initialized_ticks
+        for _ in range(300):
+            zero_for_one = rng.random() < 0.5
+            limit = pool.tick + rng.randrange(1, 2000) * tick_spacing * (-1 if zero_for_one else 1)
+            amount = rng.choice([1, -1]) * rng.randrange(1, 10**19)
+            # Exact output swaps run on to the limit; a few steps are enough to compare them
+            args = (zero_for_one, amount, get_sqrt_ratio_at_tick(limit), None, 50)
+            assert _outcome(snapshot, *args) == _outcome(pool, *args)
+            for tick in (rng.randrange(-2**16, 2**16), limit):
+                assert snapshot.next_boundary(tick, zero_for_one) == pool.next_boundary(tick, zero_for_one)
@@ -0,0 +1,37 @@
+import random
+
+from py_utils import position_fees
+from py_utils.pool import MAX_U256, Pool
+from py_utils.position_fees import uncollected_fees
+from py_utils.tick_math import get_sqrt_ratio_at_tick
+
+
+def test_matches_fees_owed(monkeypatch):
+    rng = random.Random(3)
+    pool = Pool(get_sqrt_ratio_at_tick(102), 102, fee_pips=3000)
+    for k in range(20):
+        pool.mint(50 + 5 * k, 55 + 5 * k, rng.randrange(1, 2**128), owner=k)
+    tick = pool.tick
+    for limit in [100, 97, 100, 103, 105, 108, 105, 102, 100, 96, 95, 93, 95, 99]:
+        pool.swap(limit < tick, 1000, get_sqrt_ratio_at_tick(limit))
+        tick = limit
+    # Positions nobody minted, some with a last growth past the current one
+    keys = list(pool.position_fees) + [(20, 60, 100), (21, 95, 105), (22, 90, 95)]
+    last = [pool.position_fees[key][:2] if key in pool.position_fees else
+            [rng.randrange(MAX_U256), rng.randrange(MAX_U256)] for key in keys]
+    liquidity = [pool.positions.get(key, 10**30) for key in keys]
+
+    expected = ([], [])
+    for key, (last0, last1), amount in zip(keys, last, liquidity):
+        inside = pool.fee_growth_inside(key[1], key[2])
+        for token, last_growth in enumerate((last0, last1)):
+            expected[token].append((((inside[token] - last_growth) & MAX_U256) * amount >> 128) & (2**128 - 1))
+    for key, fees0, fees1 in zip(keys, *expected):
+        if key in pool.positions:
+            assert pool.fees_owed(*key) == (fees0, fees1)
+
+    monkeypatch.setattr(position_fees, "CHUNK_ROWS", 4)
+    fees = uncollected_fees(pool, [key[1] for key in keys], [key[2] for key in keys], liquidity,
+                            [row[0] for row in last], [row[1] for row in last])
+    assert fees == expected
+    assert any(fees[0]) and any(fees[1])
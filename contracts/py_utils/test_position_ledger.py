@@ -0,0 +1,79 @@
+import random
+
+import numpy as np
+import pytest
+
+from py_utils.position_ledger import MAX_LIQUIDITY, PositionLedger
+
+
+def _update(positions, key, delta):
+    """`Position::update` on a dict"""
+    liquidity = max(positions.get(key, 0) + delta, 0)
+    if liquidity > MAX_LIQUIDITY:
+        raise OverflowError
+    positions[key] = liquidity
+
+
+def test_bulk_and_scalar_updates_match_the_contract():
+    rng = random.Random(0)
+    owners = [0x123, 2**200 + 7, 5]
+    ledger, scalar, expected = PositionLedger(), PositionLedger(), {}
+    for _ in range(30):
+        keys = [(rng.choice(owners), rng.randrange(-4, 4), rng.randrange(4, 8)) for _ in range(rng.randrange(1, 200))]
+        deltas = [rng.choice((1, -1)) * rng.randrange(2 ** rng.randrange(1, 127)) for _ in keys]
+        for key, delta in zip(keys, deltas):
+            _update(expected, key, delta)
+            scalar.update(*key, delta)
+        ledger.update_many(*zip(*keys), deltas)
+
+    assert len(ledger) == len(expected)
+    assert dict(zip(ledger.keys(), ledger.liquidity())) == expected
+    assert dict(zip(scalar.keys(), scalar.liquidity())) == expected
+    assert [ledger.get(*key) for key in expected] == list(expected.values())
+    assert ledger.get(0x123, -100, 100) == 0 and ledger.get(99, 0, 4) == 0
+
+
+def test_overflow_changes_nothing():
+    ledger = PositionLedger()
+    ledger.update(1, 0, 10, 2**127 - 1)
+    ledger.update(1, 0, 10, 2**127 - 5)
+    with pytest.raises(OverflowError):
+        ledger.update_many([2, 1, 1], [0, 0, 0], [10, 10, 10], [3, 3, 3])
+    assert ledger.keys() == [(1, 0, 10)] and ledger.get(1, 0, 10) == MAX_LIQUIDITY - 5
+    assert ledger.liquidity_by_owner() == {1: MAX_LIQUIDITY - 5}
+    with pytest.raises(OverflowError):
+        ledger.update(1, 0, 10, 6)
+    ledger.update(1, 0, 10, -2**127)
+    assert ledger.get(1, 0, 10) == 2**127 - 6
+    ledger.update(1, 0, 10, -2**127)
+    assert ledger.get(1, 0, 10) == 0
+
+
+def test_group_by_owner_and_range():
+    rng = np.random.default_rng(1)
+    n = 100_000
+    owners = rng.integers(0, 1000, n)
+    lower_ticks = rng.integers(-887000, 0, n)
+    upper_ticks = lower_ticks + rng.integers(1, 50, n)
+    deltas = rng.integers(1, 2**62, n)
+    ledger = PositionLedger()
+    ledger.update_many(owners, lower_ticks, upper_ticks, deltas)
+    # Columns sized to the batch and a hash table at most half full
+    assert ledger.nbytes / len(ledger) < 40
+
+    expected = {}
+    for key, delta in zip(zip(owners.tolist(), lower_ticks.tolist(), upper_ticks.tolist()), deltas.tolist()):
+        expected[key] = expected.get(key, 0) + delta
+    by_owner, by_range = {}, {}
+    for (owner, lower, upper), liquidity in expected.items():
+        by_owner[owner] = by_owner.get(owner, 0) + liquidity
+        by_range[lower, upper] = by_range.get((lower, upper), 0) + liquidity
+    assert ledger.liquidity_by_owner() == by_owner
+    assert ledger.liquidity_by_range() == by_range
+
+    owner = int(owners[0])
+    rows = ledger.rows_for_owner(owner)
+    assert sorted(ledger.keys(rows)) == sorted(key for key in expected if key[0] == owner)
+    tick = int(lower_ticks[0])
+    active = ledger.rows_active_at(tick)
+    assert sum(ledger.liquidity(active)) == sum(v for (_, lower, upper), v in expected.items() if lower <= tick < upper)
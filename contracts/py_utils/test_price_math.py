@@ -0,0 +1,66 @@
+import math
+import random
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from py_utils import price_math, tick_math, uniswap_v3_math
+from py_utils.fixed_point import price_to_sqrt_price_x96, price_to_sqrt_price_x96_batch
+from py_utils.price_math import price_to_tick, prices_to_ticks
+from py_utils.tick_math import MAX_TICK, MIN_TICK, TickTable, build_tick_table, tick_to_sqrt_ratio
+
+
+@pytest.fixture(scope="module")
+def table(tmp_path_factory):
+    with TickTable(build_tick_table(str(tmp_path_factory.mktemp("table") / "ticks.bin"))) as table:
+        yield table
+
+
+def test_batches_match_the_exact_scalar_conversions(table, monkeypatch):
+    monkeypatch.setattr(tick_math, "_default_table", table)
+    rng = random.Random(4)
+    prices = [rng.random() * 10 ** rng.randrange(-20, 20) for _ in range(3000)]
+    # The prices at which ticks start, where the float formula goes wrong
+    boundaries = [Fraction(tick_to_sqrt_ratio(tick) ** 2, 2**192) for tick in range(-300, 300)]
+    for decimals0, decimals1 in [(0, 0), (18, 6), (6, 18)]:
+        sqrt_prices = price_to_sqrt_price_x96_batch(np.array(prices), decimals0, decimals1)
+        assert sqrt_prices == [price_to_sqrt_price_x96(price, decimals0, decimals1) for price in prices]
+        expected = [price_to_tick(price, decimals0, decimals1) for price in prices]
+        assert prices_to_ticks(np.array(prices), decimals0, decimals1).tolist() == expected
+        # Settling every row exactly gives the same ticks
+        monkeypatch.setattr(price_math, "TICK_MARGIN", 1.0)
+        assert prices_to_ticks(prices, decimals0, decimals1).tolist() == expected
+        monkeypatch.undo()
+        monkeypatch.setattr(tick_math, "_default_table", table)
+
+    assert prices_to_ticks(boundaries).tolist() == list(range(-300, 300))
+    assert prices_to_ticks([price * Fraction(999999, 10**6) for price in boundaries]).tolist() == list(range(-301, 299))
+    assert [uniswap_v3_math.price_to_tick(float(price)) for price in boundaries] != list(range(-300, 300))
+
+
+def test_decimals_scale_like_scale_amount():
+    # 2000 USDC (6 decimals) per ETH (18 decimals)
+    assert price_to_sqrt_price_x96(2000, 18, 6) == math.isqrt(2000 * 10**6 * 2**192 // 10**18)
+    assert price_to_sqrt_price_x96(Fraction(1, 4)) == price_to_sqrt_price_x96(0.25) == 2**95
+    assert price_to_tick(1) == 0 and price_to_tick(0.99999) == -1
+    assert price_to_tick(10**40, 30, 0) == price_to_tick(10**10)
+    with pytest.raises(ValueError, match="negative"):
+        price_to_tick(-1.0)
+    for price in (0, 10**40):
+        with pytest.raises(ValueError, match="out of bounds"):
+            price_to_tick(price)
+
+
+def test_prices_outside_the_tick_range_raise(table, monkeypatch):
+    monkeypatch.setattr(tick_math, "_default_table", table)
+    edges = [Fraction(tick_to_sqrt_ratio(MIN_TICK) ** 2, 2**192), Fraction(tick_to_sqrt_ratio(MAX_TICK) ** 2, 2**192)]
+    assert prices_to_ticks([edges[0], edges[1] * Fraction(999999, 10**6)]).tolist() == [MIN_TICK, MAX_TICK - 1]
+    with pytest.raises(ValueError, match="out of bounds"):
+        prices_to_ticks([1.0, edges[0] / 2])
+    with pytest.raises(ValueError, match="out of bounds"):
+        prices_to_ticks([edges[1]])
+    with pytest.raises(ValueError, match="price at index 1 out of bounds"):
+        prices_to_ticks(np.array([1.0, 0.0]))
+    # Ints past the float range, scaled back into the tick range by the decimals
+    assert prices_to_ticks([10**400, 2 * 10**399], decimals0=399).tolist() == [price_to_tick(10), price_to_tick(2)]
@@ -0,0 +1,48 @@
+import random
+
+from py_utils.pool import FEE_TIERS, Pool
+from py_utils.quoter import QuoteParams, Quoter
+from py_utils.tick_math import get_sqrt_ratio_at_tick
+
+Q96 = 2**96
+MAX_STEPS = 2000
+
+
+def _outcome(function, *args, **kwargs):
+    try:
+        return function(*args, **kwargs)
+    except (ValueError, ArithmeticError) as e:
+        return type(e)
+
+
+def _random_pool(rng, tick_spacing, fee_pips=0):
+    # Around tick 60000 the sqrt price is about 20, so whole-number limits fall on both sides
+    tick = 60000 + rng.randrange(-500, 500)
+    pool = Pool(get_sqrt_ratio_at_tick(tick), tick, tick_spacing=tick_spacing, fee_pips=fee_pips)
+    # A wide position under the limits, so most swaps have liquidity all the way
+    pool.mint(30000 // tick_spacing * tick_spacing, 85000 // tick_spacing * tick_spacing, 10**20)
+    for _ in range(rng.randrange(1, 30)):
+        lower = (tick + rng.randrange(-20000, 20000)) // tick_spacing * tick_spacing
+        upper = lower + rng.randrange(1, 200) * tick_spacing
+        pool.mint(lower, upper, rng.randrange(1, 10**22))
+    return pool
+
+
+def test_quotes_match_simulate_swap():
+    rng = random.Random(11)
+    for fee_pips, tick_spacing in [(0, 1), (0, 60), *FEE_TIERS.items()]:
+        pools = {f"pool_{i}": _random_pool(rng, tick_spacing, fee_pips) for i in range(3)}
+        quoter = Quoter(pools, max_steps=MAX_STEPS)
+        params_list = []
+        for _ in range(60):
+            zero_for_one = rng.random() < 0.5
+            amount = rng.choice([1, rng.randrange(10**12), rng.randrange(10**21), rng.randrange(10**24)])
+            limit = rng.randrange(5, 20) if zero_for_one else rng.randrange(21, 60)
+            params_list.append(QuoteParams(rng.choice([amount, -amount]), zero_for_one, rng.choice(list(pools)), limit))
+
+        quotes = quoter.quote_batch(params_list, return_exceptions=True)
+        for params, quote in zip(params_list, quotes):
+            expected = _outcome(pools[params.pool].simulate_swap, params.zero_for_one, params.amount_specified,
+                                params.sqrt_price_limit * Q96, max_steps=MAX_STEPS)
+            assert (type(quote) if isinstance(quote, Exception) else quote) == expected, params
+
@@ -0,0 +1,144 @@
+import json
+import os
+
+import pytest
+
+from py_utils import replay
+from py_utils.pool import Pool
+from py_utils.replay import load_checkpoint, read_batches, save_checkpoint
+from py_utils.tick_math import MAX_SQRT_RATIO, MIN_SQRT_RATIO, get_sqrt_ratio_at_tick
+
+START_TICK = 102
+
+
+def _new_pool(fee_pips=0):
+    return Pool(get_sqrt_ratio_at_tick(START_TICK), START_TICK, fee_pips=fee_pips)
+
+
+def _events(fee_pips=0):
+    """Mints and swaps run on a pool, logged the way univ3pool.cairo emits them, and the pool after them"""
+    pool = _new_pool(fee_pips)
+    events = []
+    for k in range(20):
+        lower = 50 + 5 * k
+        pool.mint(lower, lower + 5, 10**18 + k, owner=k)
+        events.append({"event": "Mint", "sender": hex(k), "upper_tick": lower + 5, "lower_tick": lower,
+                       "amount": str(10**18 + k)})
+    tick = pool.tick
+    # Small inputs run every step to its target, as in the pool tests, which gives amounts far
+    # from the input: these swaps only replay with the call recorded
+    for limit in [100, 97, 100, 103, 105, 108, 105, 102, 100, 96, 95, 93, 95, 99]:
+        sqrt_price_limit_x96 = get_sqrt_ratio_at_tick(limit)
+        amount0, amount1 = pool.swap(limit < tick, 1000, sqrt_price_limit_x96)
+        tick = limit
+        events.append({"event": "Swap", "sender": "0x1", "recipient": "0x2", "amount0": str(amount0),
+                       "amount1": amount1, "sqrt_pricex96": str(pool.sqrt_price_x96),
+                       "liquidity": str(pool.liquidity), "tick": pool.tick,
+                       "amount_specified": 1000, "sqrt_price_limit_x96": str(sqrt_price_limit_x96)})
+    # Inputs that end within the first step, without a price limit, replay from the event alone
+    for zero_for_one, amount in [(True, 3 * 10**14), (False, 10**15), (True, 3 * 10**14)]:
+        furthest = MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+        amount0, amount1 = pool.swap(zero_for_one, amount, furthest)
+        events.append({"event": "Swap", "sender": "0x1", "recipient": "0x2", "amount0": str(amount0),
+                       "amount1": amount1, "sqrt_pricex96": str(pool.sqrt_price_x96),
+                       "liquidity": str(pool.liquidity), "tick": pool.tick})
+    return events, pool
+
+
+def _write_log(path, events):
+    path.write_text("".join(json.dumps(event) + "\n" for event in events))
+    return str(path)
+
+
+def _state(pool):
+    return (pool.sqrt_price_x96, pool.tick, pool.liquidity, pool.ticks, pool.positions,
+            pool.fee_growth_global0_x128, pool.fee_growth_global1_x128, pool.fee_growth_outside, pool.position_fees)
+
+
+def test_read_batches_leaves_a_partial_line(tmp_path):
+    path = tmp_path / "events.jsonl"
+    path.write_bytes(b'{"a": 1}\n\n{"a": 2}\n{"a": 3}\n{"a": ')
+    batches = list(read_batches(str(path), batch_lines=2))
+    assert batches == [(1, [b'{"a": 1}', b""], 10), (3, [b'{"a": 2}', b'{"a": 3}'], 28)]
+
+    # Once the writer finishes the line, the next read starts with it
+    with open(path, "ab") as f:
+        f.write(b'4}\n{"a": 5}')
+    assert list(read_batches(str(path), offset=28)) == [(1, [b'{"a": 4}'], 37)]
+    assert list(read_batches(str(path), offset=10)) == [(1, [b'{"a": 2}', b'{"a": 3}', b'{"a": 4}'], 37)]
+
+
+def test_read_batches_in_small_reads(tmp_path, monkeypatch):
+    monkeypatch.setattr(replay, "READ_BYTES", 3)
+    path = tmp_path / "events.jsonl"
+    path.write_bytes(b'{"a": 1}\n{"a": 2}\n{"a": 3')
+    assert list(read_batches(str(path), batch_lines=1)) == [(1, [b'{"a": 1}'], 9), (2, [b'{"a": 2}'], 18)]
+
+
+@pytest.mark.parametrize("fee_pips", [0, 3000])
+def test_replay_matches_the_pool(tmp_path, fee_pips):
+    events, pool = _events(fee_pips)
+    log_path = _write_log(tmp_path / "events.jsonl", events[:25])
+    # A blank line in the middle is skipped
+    with open(log_path, "a") as f:
+        f.write("\n" + "".join(json.dumps(event) + "\n" for event in events[25:]))
+
+    replayed = _new_pool(fee_pips)
+    offset, stats = replay.replay(log_path, replayed)
+    assert (offset, stats.mints, stats.swaps) == (os.path.getsize(log_path), 20, 17)
+    assert (replayed.sqrt_price_x96, replayed.tick, replayed.liquidity) == \
+        (pool.sqrt_price_x96, pool.tick, pool.liquidity)
+    assert (replayed.ticks, replayed.positions) == (pool.ticks, pool.positions)
+
+    # Running the swaps also brings the fee state along
+    replayed = _new_pool(fee_pips)
+    replay.replay(log_path, replayed, run_swaps=True)
+    assert _state(replayed) == _state(pool)
+
+
+def test_run_swaps_checks_the_log(tmp_path):
+    events, _ = _events()
+    events[-1]["amount1"] = str(int(events[-1]["amount1"]) + 1)
+    log_path = _write_log(tmp_path / "events.jsonl", events)
+    with pytest.raises(ValueError, match="logged amounts"):
+        replay.replay(log_path, _new_pool(), run_swaps=True)
+
+    events, _ = _events()
+    events[-1]["liquidity"] = "1"
+    _write_log(tmp_path / "events.jsonl", events)
+    with pytest.raises(ValueError, match="leaves liquidity"):
+        replay.replay(log_path, _new_pool(), run_swaps=True)
+
+
+def test_resume_from_a_checkpoint_mid_file(tmp_path):
+    events, pool = _events(3000)
+    log_path = tmp_path / "events.jsonl"
+    # The writer is in the middle of line 31
+    _write_log(log_path, events[:30])
+    with open(log_path, "a") as f:
+        f.write(json.dumps(events[30])[:20])
+    checkpoint = str(tmp_path / "state" / "pool")
+    start = ["--fee-pips", "3000", "--sqrt-price-x96", str(get_sqrt_ratio_at_tick(START_TICK)),
+             "--tick", str(START_TICK)]
+    assert replay.main([str(log_path), "--checkpoint", checkpoint, "--run-swaps", *start]) == 0
+    _, saved_log, offset, events_done = load_checkpoint(checkpoint)
+    assert (saved_log, events_done) == (str(log_path), 30)
+    assert offset == sum(len(json.dumps(event)) + 1 for event in events[:30])
+    # Only the latest snapshot is kept
+    assert sorted(path.name for path in (tmp_path / "state").iterdir()) == ["pool.30.snap", "pool.json"]
+
+    _write_log(log_path, events)
+    assert replay.main([str(log_path), "--checkpoint", checkpoint, "--run-swaps"]) == 0
+    resumed, _, offset, events_done = load_checkpoint(checkpoint)
+    assert (offset, events_done) == (log_path.stat().st_size, len(events))
+    assert _state(resumed) == _state(pool)
+
+
+def test_checkpoint_of_another_log_is_refused(tmp_path, capsys):
+    events, pool = _events()
+    log_path = _write_log(tmp_path / "events.jsonl", events)
+    checkpoint = str(tmp_path / "pool")
+    save_checkpoint(checkpoint, pool, str(tmp_path / "other.jsonl"), 0, 0)
+    assert replay.main([log_path, "--checkpoint", checkpoint]) == 1
+    assert f"belongs to {tmp_path / 'other.jsonl'}" in capsys.readouterr().out
+    assert load_checkpoint(str(tmp_path / "missing")) is None
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+from py_utils import router
+from py_utils.pool import FEE_TIERS, Pool
+from py_utils.pool_snapshot import write_snapshot
+from py_utils.router import RoutePool, find_routes, quote_routes
+from py_utils.tick_math import MAX_SQRT_RATIO, MIN_SQRT_RATIO, get_sqrt_ratio_at_tick
+
+# (name, token0, token1, fee_pips): two fee tiers of A/B and a second way round through D
+POOLS = [
+    ("ab_low", "A", "B", 500),
+    ("ab_mid", "A", "B", 3000),
+    ("bc", "B", "C", 3000),
+    ("ac", "A", "C", 10000),
+    ("cd", "C", "D", 100),
+    ("bd", "B", "D", 0),
+]
+
+
+def _route_pools(tmp_path, fee_check=True):
+    rng = random.Random(16)
+    pools, route_pools = {}, []
+    for name, token0, token1, fee_pips in POOLS:
+        tick_spacing = FEE_TIERS.get(fee_pips, 1)
+        tick = rng.randrange(-2000, 2000) // tick_spacing * tick_spacing
+        pool = Pool(get_sqrt_ratio_at_tick(tick), tick, tick_spacing=tick_spacing, fee_pips=fee_pips)
+        pool.mint(-50000 // tick_spacing * tick_spacing, 50000 // tick_spacing * tick_spacing, 10**22)
+        for _ in range(30):
+            lower = (tick + rng.randrange(-20000, 20000)) // tick_spacing * tick_spacing
+            pool.mint(lower, lower + rng.randrange(1, 300) * tick_spacing, rng.randrange(1, 10**23))
+        pools[name] = pool
+        path = write_snapshot(pool, str(tmp_path / f"{name}.snap"))
+        route_pools.append(RoutePool(name, token0, token1, path, fee_pips if fee_check else None))
+    return pools, route_pools
+
+
+def _chained(pools, by_name, route, token_in, amount_in):
+    """The hops of `route` swapped one after the other with Pool.simulate_swap"""
+    hops = []
+    for name in route:
+        zero_for_one = token_in == by_name[name].token0
+        limit = MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+        try:
+            amount0, amount1 = pools[name].simulate_swap(zero_for_one, amount_in, limit)[:2]
+        except (ValueError, ArithmeticError) as e:
+            return type(e)
+        used, amount_out = (amount0, -amount1) if zero_for_one else (amount1, -amount0)
+        if amount_out <= 0:
+            return ValueError
+        token_in = by_name[name].token1 if zero_for_one else by_name[name].token0
+        hops.append((name, used, amount_out))
+        amount_in = amount_out
+    return hops
+
+
+def _summary(quote):
+    if quote.error is not None:
+        return type(quote.error)
+    return [(hop.pool, hop.amount_in, hop.amount_out) for hop in quote.hops]
+
+
+def test_find_routes(tmp_path):
+    _, pools = _route_pools(tmp_path)
+    assert find_routes(pools, "A", "C", max_hops=1) == [("ac",)]
+    assert find_routes(pools, "A", "C", max_hops=2) == [("ac",), ("ab_low", "bc"), ("ab_mid", "bc")]
+    routes = find_routes(pools, "A", "C", max_hops=3)
+    assert routes[:3] == find_routes(pools, "A", "C", max_hops=2)
+    assert sorted(routes[3:]) == [("ab_low", "bd", "cd"), ("ab_mid", "bd", "cd")]
+    # No route visits a token twice, so none goes A -> B -> A or A -> C -> B -> A -> ...
+    assert find_routes(pools, "A", "D", max_hops=len(pools)) == [
+        ("ab_low", "bd"), ("ab_mid", "bd"), ("ac", "cd"),
+        ("ab_low", "bc", "cd"), ("ab_mid", "bc", "cd"), ("ac", "bc", "bd"),
+    ]
+
+    with pytest.raises(ValueError, match="unique"):
+        find_routes(pools + pools[:1], "A", "C")
+    with pytest.raises(ValueError, match="same token"):
+        find_routes(pools, "A", "A")
+
+
+def test_routes_chain_simulate_swap(tmp_path):
+    pools, route_pools = _route_pools(tmp_path)
+    by_name = {pool.name: pool for pool in route_pools}
+    for token_in, token_out, amount_in in [("A", "D", 10**18), ("D", "A", 3 * 10**20), ("C", "B", 12345)]:
+        result = quote_routes(route_pools, token_in, token_out, amount_in, max_hops=4, jobs=1)
+        assert [quote.route for quote in result.quotes] == find_routes(route_pools, token_in, token_out, 4)
+        summaries = [_summary(quote) for quote in result.quotes]
+        assert summaries == [_chained(pools, by_name, quote.route, token_in, amount_in) for quote in result.quotes]
+        assert result.best.amount_out == max(hops[-1][2] for hops in summaries if isinstance(hops, list))
+        assert all(hop.fee_pips == by_name[hop.pool].fee_pips for hop in result.best.hops)
+
+
+def test_workers_quote_the_same(tmp_path):
+    _, route_pools = _route_pools(tmp_path, fee_check=False)
+    in_process = quote_routes(route_pools, "A", "D", 10**19, max_hops=4, jobs=1)
+    in_workers = quote_routes(route_pools, "A", "D", 10**19, max_hops=4, jobs=2, chunk_routes=3)
+    assert [_summary(quote) for quote in in_workers.quotes] == [_summary(quote) for quote in in_process.quotes]
+    assert in_workers.best.route == in_process.best.route
+
+
+def test_fee_tier_must_match_the_snapshot(tmp_path, capsys):
+    _, route_pools = _route_pools(tmp_path)
+    route_pools[0].fee_pips = 3000
+    with pytest.raises(ValueError, match="'ab_low' has a fee of 3000 pips but its snapshot 500"):
+        quote_routes(route_pools, "A", "C", 10**18, jobs=2)
+
+    specs = tmp_path / "pools.json"
+    specs.write_text('[{"name": "bc", "token0": "B", "token1": "C", "snapshot": "bc.snap", "fee": 3000}]')
+    assert router.main([str(specs), "B", "C", "1000000", "--jobs", "1"]) == 0
+    assert "bc (0.3% fee): 1000000 B -> " in capsys.readouterr().out
@@ -0,0 +1,17 @@
+from py_utils.pool import SwapCounters
+from py_utils.spacing_bench import build_pool, move_price, run, trade_set
+from py_utils.tick_math import get_sqrt_ratio_at_tick
+
+
+def test_replay_keeps_active_liquidity_and_wider_spacing_takes_fewer_steps():
+    positions, trades = trade_set(seed=1, positions=100, trades=200)
+    for tick_spacing in (1, 60):
+        pool = build_pool(positions, tick_spacing)
+        for zero_for_one, limit_tick in trades:
+            move_price(pool, zero_for_one, get_sqrt_ratio_at_tick(limit_tick), SwapCounters())
+            assert pool.liquidity == sum(info[1] for tick, info in pool.ticks.items() if tick <= pool.tick)
+        assert pool.tick == trades[-1][1]
+
+    results = run((1, 10, 60, 200), seed=1, positions=100, trades=200)["results"]
+    steps = [results[str(tick_spacing)]["steps"] for tick_spacing in (1, 10, 60, 200)]
+    assert steps == sorted(steps, reverse=True)
@@ -0,0 +1,50 @@
+import os
+import re
+
+from py_utils import swap_step_vectors
+from py_utils.swap_math import compute_swap_step
+from py_utils.swap_step_vectors import BLOCK_SIZE, MODULE_NAME, write_vectors
+
+CHECK = re.compile(r"check_step\((\d+), (\d+), (\d+), (-?\d+), (true|false), (\d+), (\d+), (\d+)\); // (\w+)")
+
+
+def _files(out_dir):
+    files = {}
+    for root, _, names in os.walk(out_dir):
+        for name in names:
+            with open(os.path.join(root, name)) as f:
+                files[os.path.relpath(os.path.join(root, name), out_dir)] = f.read()
+    return files
+
+
+def test_output_depends_only_on_the_seed_and_count(tmp_path):
+    count = 2 * BLOCK_SIZE + 100
+    one_job, two_jobs = str(tmp_path / "one"), str(tmp_path / "two")
+    paths = write_vectors(one_job, count, seed=5, jobs=1, cases_per_test=16, max_shard_bytes=64 * 1024)
+    write_vectors(two_jobs, count, seed=5, jobs=2, cases_per_test=16, max_shard_bytes=64 * 1024)
+    files = _files(one_job)
+    assert files == _files(two_jobs)
+    assert len(paths) > 1 and all(os.path.getsize(path) <= 64 * 1024 for path in paths)
+    assert files[f"math_tests/{MODULE_NAME}.cairo"].count("mod shard_") == len(paths)
+
+    checks = [match for text in files.values() for match in CHECK.findall(text)]
+    assert len(checks) == count
+    assert {check[-1] for check in checks} == set(swap_step_vectors.REGIMES)
+    for check in checks[::37]:
+        current, target, liquidity, amount = (int(value) for value in check[:4])
+        expected = compute_swap_step(current, target, liquidity, amount, check[4] == "true")[:3]
+        assert expected == tuple(int(value) for value in check[5:8])
+
+    # Another seed changes the vectors; a smaller rerun drops the shards it no longer needs
+    assert write_vectors(two_jobs, count, seed=6, jobs=1, cases_per_test=16, max_shard_bytes=64 * 1024)
+    assert _files(two_jobs) != files
+    assert len(write_vectors(one_job, 64, seed=5, jobs=1, cases_per_test=16)) == 1
+    assert sorted(os.listdir(os.path.join(one_job, "math_tests", MODULE_NAME))) == ["shard_0000.cairo"]
+
+
+def test_declared_in_a_test_crate(tmp_path):
+    (tmp_path / "lib.cairo").write_text("#[cfg(test)]\nmod math_tests {\n    mod fullmath_test;\n}\n")
+    write_vectors(str(tmp_path), 64, jobs=1)
+    write_vectors(str(tmp_path), 64, jobs=1)
+    assert (tmp_path / "lib.cairo").read_text() == \
+        "#[cfg(test)]\nmod math_tests {\n    mod fullmath_test;\n    mod swap_step_vectors;\n}\n"
@@ -0,0 +1,117 @@
+import random
+from bisect import bisect_right
+
+import pytest
+
+from py_utils.pool import Pool
+from py_utils.tick_bitmap import WORD_BITS, TickBitmap
+from py_utils.tick_math import MAX_TICK, MIN_TICK, get_sqrt_ratio_at_tick
+
+
+def _compress(tick, tick_spacing):
+    return int(tick / tick_spacing)
+
+
+def _reference(initialized, tick, tick_spacing, lte):
+    """`next_initialized_tick` by bisecting the sorted initialized ticks"""
+    compressed = sorted(t // tick_spacing for t in initialized)
+    index = bisect_right(compressed, _compress(tick, tick_spacing))
+    if lte:
+        return (compressed[index - 1] * tick_spacing, True) if index else (MIN_TICK, False)
+    return (compressed[index] * tick_spacing, True) if index < len(compressed) else (MAX_TICK, False)
+
+
+def _reference_within_one_word(initialized, tick, tick_spacing, lte):
+    word_pos = _compress(tick, tick_spacing) >> 8
+    next_tick, found = _reference(initialized, tick, tick_spacing, lte)
+    if found and (next_tick // tick_spacing) >> 8 == word_pos:
+        return next_tick, True
+    return ((word_pos * WORD_BITS - 1) if lte else (word_pos + 1) * WORD_BITS) * tick_spacing, False
+
+
+def _random_ticks(rng, tick_spacing, count):
+    low, high = -(-MIN_TICK // tick_spacing), MAX_TICK // tick_spacing
+    ticks = set()
+    while len(ticks) < count:
+        kind = rng.random()
+        if kind < 0.3:
+            # Around word edges, negative ones included
+            compressed = rng.randrange(-40, 40) * WORD_BITS + rng.choice([-1, 0, 1, WORD_BITS - 1])
+        elif kind < 0.6:
+            compressed = rng.randrange(-3000, 3000)
+        else:
+            compressed = rng.randrange(low, high + 1)
+        ticks.add(min(max(compressed, low), high) * tick_spacing)
+    return ticks
+
+
+@pytest.mark.parametrize("tick_spacing", [1, 10, 60, 200])
+def test_next_initialized_tick_against_a_sorted_set(tick_spacing):
+    rng = random.Random(tick_spacing)
+    bitmap = TickBitmap()
+    initialized = set()
+    for tick in sorted(_random_ticks(rng, tick_spacing, 400)):
+        bitmap.flip_tick(tick, tick_spacing)
+        initialized.add(tick)
+
+    for round_ in range(4):
+        for _ in range(500):
+            tick = rng.choice([
+                rng.randrange(MIN_TICK, MAX_TICK),
+                rng.randrange(-3000, 3000) * tick_spacing + rng.randrange(-tick_spacing + 1, tick_spacing),
+                rng.choice(sorted(initialized)) + rng.choice([-1, 0, 1]) if initialized else 0,
+            ])
+            for lte in (True, False):
+                assert bitmap.next_initialized_tick(tick, tick_spacing, lte) == \
+                    _reference(initialized, tick, tick_spacing, lte)
+                assert bitmap.next_initialized_tick_within_one_word(tick, tick_spacing, lte) == \
+                    _reference_within_one_word(initialized, tick, tick_spacing, lte)
+            assert bitmap.is_initialized(tick - tick % tick_spacing, tick_spacing) == \
+                (tick - tick % tick_spacing in initialized)
+
+        # Clear most of the ticks, whole words and summary words with them, then add a few back
+        for tick in rng.sample(sorted(initialized), len(initialized) * 3 // 4):
+            bitmap.flip_tick(tick, tick_spacing)
+            initialized.remove(tick)
+        for tick in _random_ticks(rng, tick_spacing, 20 * round_) - initialized:
+            bitmap.flip_tick(tick, tick_spacing)
+            initialized.add(tick)
+
+
+def test_flip_tick_compresses_by_the_spacing():
+    bitmap = TickBitmap()
+    for tick in (-600, -60, 0, 60, 256 * 60, -256 * 60, -257 * 60):
+        bitmap.flip_tick(tick, 60)
+    assert sorted(bitmap.words) == [-2, -1, 0, 1]
+    assert bitmap.words[-1] == 1 << 255 | 1 << 246 | 1 << 0
+    assert bitmap.words[-2] == 1 << 255
+    # Like Cairo's signed division, compression rounds towards zero
+    assert bitmap.next_initialized_tick(-1, 60, True) == (0, True)
+    assert bitmap.next_initialized_tick(-61, 60, True) == (-60, True)
+    assert bitmap.next_initialized_tick(-121, 60, True) == (-600, True)
+    assert bitmap.next_initialized_tick(61, 60, False) == (256 * 60, True)
+
+    with pytest.raises(ValueError, match="undivisible"):
+        bitmap.flip_tick(-59, 60)
+
+    for tick in (-600, -60, 0, 60, 256 * 60, -256 * 60, -257 * 60):
+        bitmap.flip_tick(tick, 60)
+    assert (bitmap.words, bitmap.summary, bitmap.top) == ({}, {}, 0)
+    assert bitmap.next_initialized_tick(0, 60, True) == (MIN_TICK, False)
+    assert bitmap.next_initialized_tick(0, 60, False) == (MAX_TICK, False)
+
+
+@pytest.mark.parametrize("tick_spacing", [1, 60])
+def test_pool_boundaries_stop_at_word_edges(tick_spacing):
+    rng = random.Random(tick_spacing + 1)
+    pool = Pool(get_sqrt_ratio_at_tick(0), 0, tick_spacing=tick_spacing)
+    for _ in range(30):
+        lower = rng.randrange(-2000, 2000) * tick_spacing
+        pool.mint(lower, lower + rng.randrange(1, 600) * tick_spacing, 10**18)
+    initialized = set(pool.initialized_ticks)
+    for _ in range(2000):
+        tick = rng.randrange(-2200, 2200) * tick_spacing + rng.randrange(tick_spacing)
+        for zero_for_one in (True, False):
+            next_tick, found = _reference_within_one_word(initialized, tick, tick_spacing, zero_for_one)
+            next_tick = min(max(next_tick, MIN_TICK), MAX_TICK)
+            assert pool.next_boundary(tick, zero_for_one) == (next_tick, found, get_sqrt_ratio_at_tick(next_tick))
@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from py_utils import tick_math
+from py_utils.tick_math import (
+    MAX_SQRT_RATIO,
+    MAX_TICK,
+    MIN_SQRT_RATIO,
+    MIN_TICK,
+    TickTable,
+    build_tick_table,
+    get_tick_at_sqrt_ratio,
+    sqrt_ratios_to_ticks,
+    tick_to_sqrt_ratio,
+)
+
+
+@pytest.fixture(scope="module")
+def table(tmp_path_factory):
+    with TickTable(build_tick_table(str(tmp_path_factory.mktemp("table") / "ticks.bin"))) as table:
+        yield table
+
+
+def test_sqrt_ratios_to_ticks_matches_get_tick_at_sqrt_ratio(table, monkeypatch):
+    monkeypatch.setattr(tick_math, "_default_table", table)
+    rng = random.Random(2)
+    sqrt_ratios = [MIN_SQRT_RATIO, MAX_SQRT_RATIO - 1]
+    for _ in range(2000):
+        sqrt_ratio = tick_to_sqrt_ratio(rng.randrange(MIN_TICK, MAX_TICK + 1))
+        sqrt_ratios += [sqrt_ratio, sqrt_ratio + rng.choice([-1, 1]), rng.randrange(MIN_SQRT_RATIO, MAX_SQRT_RATIO)]
+    sqrt_ratios = [min(max(value, MIN_SQRT_RATIO), MAX_SQRT_RATIO - 1) for value in sqrt_ratios]
+
+    assert sqrt_ratios_to_ticks(sqrt_ratios).tolist() == [get_tick_at_sqrt_ratio(value) for value in sqrt_ratios]
+    with pytest.raises(ValueError):
+        sqrt_ratios_to_ticks([MAX_SQRT_RATIO])
+
+
+def test_table_lookups_match_tick_to_sqrt_ratio(table):
+    rng = random.Random(5)
+    for tick in [MIN_TICK, 0, MAX_TICK] + [rng.randrange(MIN_TICK, MAX_TICK + 1) for _ in range(500)]:
+        assert table[tick] == tick_to_sqrt_ratio(tick)
+
+
+def test_estimates_are_corrected(table):
+    rng = random.Random(6)
+    ticks = [rng.randrange(MIN_TICK + 2, MAX_TICK - 2) for _ in range(1000)]
+    sqrt_ratios = [tick_to_sqrt_ratio(tick) + rng.randrange(2) for tick in ticks]
+    estimates = [tick + rng.randrange(-2, 3) for tick in ticks]
+    assert table.ticks_at_sqrt_ratios(sqrt_ratios, estimates).tolist() == ticks
+    with pytest.raises(ValueError, match="different lengths"):
+        table.ticks_at_sqrt_ratios(sqrt_ratios, estimates[1:])
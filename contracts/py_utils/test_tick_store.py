@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from py_utils.pool import Pool
+from py_utils.tick_math import get_sqrt_ratio_at_tick
+from py_utils.tick_store import DenseTicks, SparseTicks, from_pool, tick_store
+
+
+@pytest.mark.parametrize("tick_spacing", [1, 60])
+def test_backends_match_the_pool(tick_spacing):
+    rng = random.Random(tick_spacing)
+    dense, sparse = DenseTicks(0, 0, tick_spacing), SparseTicks(tick_spacing)
+    pool = Pool(get_sqrt_ratio_at_tick(0), 0, tick_spacing=tick_spacing)
+    for _ in range(20):
+        ticks, deltas, upper = [], [], []
+        for _ in range(rng.randrange(1, 50)):
+            lower = rng.randrange(-50, 50) * tick_spacing
+            amount = rng.randrange(1, 2 ** rng.randrange(1, 100))
+            ticks += [lower, lower + rng.randrange(1, 20) * tick_spacing]
+            deltas += [amount, amount]
+            upper += [False, True]
+        expected = [pool.update_tick(tick, delta, is_upper) for tick, delta, is_upper in zip(ticks, deltas, upper)]
+        assert dense.update_many(ticks, deltas, upper).tolist() == expected
+        assert sparse.update_many(ticks, deltas, upper).tolist() == expected
+        # Take one position out again
+        for tick, delta, is_upper in zip(ticks[:2], deltas[:2], upper[:2]):
+            assert dense.update(tick, -delta, is_upper) == sparse.update(tick, -delta, is_upper) \
+                == pool.update_tick(tick, -delta, is_upper)
+
+    ticks = list(range(-80 * tick_spacing, 80 * tick_spacing, tick_spacing))
+    assert dense.initialized_ticks().tolist() == sparse.initialized_ticks().tolist() == pool.initialized_ticks
+    assert dense.cross_many(ticks) == sparse.cross_many(ticks) == [pool.liquidity_net(tick) for tick in ticks]
+    assert [dense.is_init(tick) for tick in ticks] == [pool.is_initialized(tick) for tick in ticks]
+    assert from_pool(pool).initialized_ticks().tolist() == pool.initialized_ticks
+
+    crossed = pool.initialized_ticks[::-1]
+    expected, liquidity = [], 0
+    for tick in crossed:
+        liquidity = pool.cross(tick, liquidity, True)
+        expected.append(liquidity)
+    assert dense.liquidity_after_crossing(0, crossed, True) == expected
+    assert sparse.liquidity_after_crossing(0, crossed, True) == expected
+
+
+def test_wide_values_and_failed_batches():
+    updates = [(0, 2**100, False), (1, 5, True), (3, 2**63, True), (4, 2**63, False), (5, 2**64, True),
+               (6, 2**64 - 1, False)]
+    dense, sparse = DenseTicks(0, 10), SparseTicks()
+    for store in (dense, sparse):
+        for update in updates:
+            store.update(*update)
+        with pytest.raises(ValueError, match="underflow at tick 1"):
+            store.update_many([0, 1], [7, -6], [False, True])
+        with pytest.raises(OverflowError):
+            store.update_many([0, 2], [2**127 - 1, 1], [False, False])
+    assert dense.info(0) == sparse.info(0) == (2**100, 2**100)
+    assert dense.cross_many(range(-2, 9)) == sparse.cross_many(range(-2, 9))
+    crossed = [6, 5, 4, 3, 1, 0]
+    expected = sparse.liquidity_after_crossing(2**100, crossed, True)
+    assert dense.liquidity_after_crossing(2**100, crossed, True) == expected
+    with pytest.raises(OverflowError, match="after crossing tick 6"):
+        dense.liquidity_after_crossing(0, crossed, True)
+
+
+def test_backend_follows_density():
+    assert isinstance(tick_store([-600, 600], [1, 1], [False, True], 60), DenseTicks)
+    assert isinstance(tick_store([-887220, 887220], [1, 1], [False, True], 60), DenseTicks)
+    assert isinstance(tick_store([-887272, 0, 887272], [1, 1, 2], [False, False, True]), SparseTicks)
+    ticks = list(range(-800000, 800000, 4))
+    assert isinstance(tick_store(ticks, [1] * len(ticks), [False] * len(ticks)), DenseTicks)
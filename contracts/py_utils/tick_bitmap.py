@@ -0,0 +1,151 @@
+"""Python model of the `TickBitmap` contract in univ3tick_bitmap.cairo.
+
+Words are Python ints keyed by word position, and bit scans use `int.bit_length`
+instead of looping over the 256 bits. Next to the words sits a two-level summary
+of the non-empty ones: `summary[word_pos >> 8]` has bit `word_pos & 255` set for
+every non-empty word, and `top` has one bit per non-empty summary word. That is
+enough to cover the whole i16 word range, so `next_initialized_tick` finds the
+next set bit in any word with a constant number of bit scans (O(log words) with
+base 256), however far apart the initialized ticks are.
+"""
+from py_utils.tick_math import MAX_TICK, MIN_TICK
+
+WORD_BITS = 256
+# word positions are i16, summary positions therefore fit in [-128, 127]
+SUMMARY_OFFSET = 128
+
+
+def position(tick):
+    """(word_pos, bit_pos) of a compressed tick, same as `TickBitmap::position`"""
+    return tick >> 8, tick & 0xff
+
+
+def most_significant_bit(x):
+    """Index of the highest set bit of x > 0"""
+    return x.bit_length() - 1
+
+
+def least_significant_bit(x):
+    """Index of the lowest set bit of x > 0"""
+    return (x & -x).bit_length() - 1
+
+
+def compress(tick, tick_spacing):
+    """tick / tick_spacing rounding towards zero, like Cairo's signed `/`"""
+    compressed = abs(tick) // tick_spacing
+    return compressed if tick >= 0 else -compressed
+
+
+def word_edge(tick, tick_spacing, lte):
+    """Where `next_initialized_tick_within_one_word` stops when the rest of the word is empty:
+    the last tick of the previous word (lte) or the first tick of the next one
+    """
+    word_pos = compress(tick, tick_spacing) >> 8
+    if lte:
+        return (word_pos * WORD_BITS - 1) * tick_spacing
+    return (word_pos + 1) * WORD_BITS * tick_spacing
+
+
+def _next_bit(word, bit_pos, lte):
+    """Nearest set bit at or below `bit_pos` (lte) or strictly above it, or None"""
+    if lte:
+        masked = word & ((2 << bit_pos) - 1)
+        return most_significant_bit(masked) if masked else None
+    masked = word >> (bit_pos + 1)
+    return bit_pos + 1 + least_significant_bit(masked) if masked else None
+
+
+class TickBitmap:
+    """Bitmap of initialized ticks with `flip_tick` / `next_initialized_tick_within_one_word`."""
+
+    def __init__(self):
+        self.words = {}
+        self.summary = {}
+        self.top = 0
+
+    def copy(self):
+        bitmap = TickBitmap()
+        bitmap.words = dict(self.words)
+        bitmap.summary = dict(self.summary)
+        bitmap.top = self.top
+        return bitmap
+
+    def flip_tick(self, tick, tick_spacing=1):
+        if tick % tick_spacing:
+            raise ValueError("undivisible by tick_spacing")
+        word_pos, bit_pos = position(compress(tick, tick_spacing))
+        word = self.words.get(word_pos, 0) ^ (1 << bit_pos)
+        if word:
+            self.words[word_pos] = word
+        else:
+            del self.words[word_pos]
+
+        if bool(word) != bool(word ^ (1 << bit_pos)):
+            self._flip_word(word_pos)
+
+    def _flip_word(self, word_pos):
+        summary_pos, summary_bit = position(word_pos)
+        summary_word = self.summary.get(summary_pos, 0) ^ (1 << summary_bit)
+        if summary_word:
+            self.summary[summary_pos] = summary_word
+        else:
+            del self.summary[summary_pos]
+        if bool(summary_word) != bool(summary_word ^ (1 << summary_bit)):
+            self.top ^= 1 << (summary_pos + SUMMARY_OFFSET)
+
+    def is_initialized(self, tick, tick_spacing=1):
+        word_pos, bit_pos = position(compress(tick, tick_spacing))
+        return bool(self.words.get(word_pos, 0) >> bit_pos & 1)
+
+    def next_initialized_tick_within_one_word(self, tick, tick_spacing, lte):
+        """Same (tick, initialized) result as the Cairo function.
+
+        With nothing initialized in the rest of the word, the lte search returns the
+        last tick of the previous word and the gt search the first tick of the next one.
+        """
+        word_pos, bit_pos = position(compress(tick, tick_spacing))
+        bit = _next_bit(self.words.get(word_pos, 0), bit_pos, lte)
+        if bit is not None:
+            return (word_pos * WORD_BITS + bit) * tick_spacing, True
+        return word_edge(tick, tick_spacing, lte), False
+
+    def _next_word(self, word_pos, lte):
+        """Nearest non-empty word strictly below (lte) or above `word_pos`, or None"""
+        summary_pos, summary_bit = position(word_pos)
+        if lte:
+            if summary_bit:
+                bit = _next_bit(self.summary.get(summary_pos, 0), summary_bit - 1, True)
+                if bit is not None:
+                    return summary_pos * WORD_BITS + bit
+            top_bit = summary_pos + SUMMARY_OFFSET - 1
+            if top_bit < 0:
+                return None
+        else:
+            bit = _next_bit(self.summary.get(summary_pos, 0), summary_bit, False)
+            if bit is not None:
+                return summary_pos * WORD_BITS + bit
+            top_bit = summary_pos + SUMMARY_OFFSET
+
+        summary_index = _next_bit(self.top, top_bit, lte)
+        if summary_index is None:
+            return None
+        summary_pos = summary_index - SUMMARY_OFFSET
+        summary_word = self.summary[summary_pos]
+        bit = most_significant_bit(summary_word) if lte else least_significant_bit(summary_word)
+        return summary_pos * WORD_BITS + bit
+
+    def next_initialized_tick(self, tick, tick_spacing, lte):
+        """Nearest initialized tick <= tick (lte) or > tick, in any word.
+
+        Returns (tick, True), or (MIN_TICK, False) / (MAX_TICK, False) when there is
+        no initialized tick in that direction.
+        """
+        word_pos, bit_pos = position(compress(tick, tick_spacing))
+        bit = _next_bit(self.words.get(word_pos, 0), bit_pos, lte)
+        if bit is None:
+            word_pos = self._next_word(word_pos, lte)
+            if word_pos is None:
+                return (MIN_TICK if lte else MAX_TICK), False
+            word = self.words[word_pos]
+            bit = most_significant_bit(word) if lte else least_significant_bit(word)
+        return (word_pos * WORD_BITS + bit) * tick_spacing, True
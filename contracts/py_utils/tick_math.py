@@ -0,0 +1,344 @@
+"""Tick <-> sqrtPriceX96 conversions, mirroring `TickMath` in tick_math.cairo.
+
+`tick_to_sqrt_ratio` is the bit-by-bit reference implementation and
+`get_tick_at_sqrt_ratio` the exact, integer-only inverse. Code that converts
+ticks in a hot loop should build the precomputed table once:
+
+    python -m py_utils.tick_math build
+    python -m py_utils.tick_math verify
+
+and then go through `get_sqrt_ratio_at_tick` (or a `TickTable` directly). The table is a
+fixed-width binary file that readers memory-map, so a lookup is a single slice of the
+mapping and any number of processes share the same pages. `sqrt_ratios_to_ticks` maps
+whole arrays of sqrt prices to ticks with one binary search over the table.
+
+The scalar conversions only need the standard library; NumPy is imported by the
+table views and batch lookups that use it.
+"""
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+
+# Constants from the original Uniswap V3 implementation
+MIN_TICK = -887272
+MAX_TICK = 887272
+MIN_SQRT_RATIO = 4295128739
+MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
+
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "tick_sqrt_ratio.bin")
+
+# Header: magic, format version, record size, min tick, max tick, record count
+TABLE_MAGIC = b"UV3TICKS"
+TABLE_VERSION = 1
+TABLE_HEADER = struct.Struct("<8sIIiiI4x")
+# sqrt ratios are < 2**160, stored as 20-byte big-endian unsigned integers so that
+# byte-wise ordering of records matches numeric ordering
+RECORD_SIZE = 20
+RECORD_DTYPE = f"S{RECORD_SIZE}"
+# The same 20 bytes split into big-endian words, for converting records to float64
+RECORD_WORDS = [("hi", ">u4"), ("mid", ">u8"), ("lo", ">u8")]
+
+
+def tick_to_sqrt_ratio(tick):
+    """Calculates sqrt(1.0001^tick) * 2^96"""
+    assert MIN_TICK <= tick <= MAX_TICK, f"Tick {tick} out of bounds"
+    abs_tick = abs(tick)
+
+    # Start with the base value
+    ratio = 0xfffcb933bd6fad37aa2d162d1a594001 if abs_tick & 0x1 else 0x100000000000000000000000000000000
+
+    # Apply each bit adjustment
+    if abs_tick & 0x2: ratio = (ratio * 0xfff97272373d413259a46990580e213a) >> 128
+    if abs_tick & 0x4: ratio = (ratio * 0xfff2e50f5f656932ef12357cf3c7fdcc) >> 128
+    if abs_tick & 0x8: ratio = (ratio * 0xffe5caca7e10e4e61c3624eaa0941cd0) >> 128
+    if abs_tick & 0x10: ratio = (ratio * 0xffcb9843d60f6159c9db58835c926644) >> 128
+    if abs_tick & 0x20: ratio = (ratio * 0xff973b41fa98c081472e6896dfb254c0) >> 128
+    if abs_tick & 0x40: ratio = (ratio * 0xff2ea16466c96a3843ec78b326b52861) >> 128
+    if abs_tick & 0x80: ratio = (ratio * 0xfe5dee046a99a2a811c461f1969c3053) >> 128
+    if abs_tick & 0x100: ratio = (ratio * 0xfcbe86c7900a88aedcffc83b479aa3a4) >> 128
+    if abs_tick & 0x200: ratio = (ratio * 0xf987a7253ac413176f2b074cf7815e54) >> 128
+    if abs_tick & 0x400: ratio = (ratio * 0xf3392b0822b70005940c7a398e4b70f3) >> 128
+    if abs_tick & 0x800: ratio = (ratio * 0xe7159475a2c29b7443b29c7fa6e889d9) >> 128
+    if abs_tick & 0x1000: ratio = (ratio * 0xd097f3bdfd2022b8845ad8f792aa5825) >> 128
+    if abs_tick & 0x2000: ratio = (ratio * 0xa9f746462d870fdf8a65dc1f90e061e5) >> 128
+    if abs_tick & 0x4000: ratio = (ratio * 0x70d869a156d2a1b890bb3df62baf32f7) >> 128
+    if abs_tick & 0x8000: ratio = (ratio * 0x31be135f97d08fd981231505542fcfa6) >> 128
+    if abs_tick & 0x10000: ratio = (ratio * 0x9aa508b5b7a84e1c677de54f3e99bc9) >> 128
+    if abs_tick & 0x20000: ratio = (ratio * 0x5d6af8dedb81196699c329225ee604) >> 128
+    if abs_tick & 0x40000: ratio = (ratio * 0x2216e584f5fa1ea926041bedfe98) >> 128
+    if abs_tick & 0x80000: ratio = (ratio * 0x48a170391f7dc42444e8fa2) >> 128
+
+    # Invert if tick is positive
+    if tick > 0:
+        ratio = (2**256 - 1) // ratio
+
+    # Convert to Q64.96
+    sqrt_ratio_x96 = (ratio >> 32) + (1 if ratio % (1 << 32) else 0)
+
+    return sqrt_ratio_x96
+
+
+def get_tick_at_sqrt_ratio(sqrt_ratio_x96):
+    """Calculates the greatest tick such that tick_to_sqrt_ratio(tick) <= sqrt_ratio_x96
+
+    Integer port of `TickMath::get_tick_at_sqrt_ratio`: msb of the Q128.128 ratio, then
+    14 squaring steps for the fractional bits of log2, scaled to log base sqrt(1.0001).
+    """
+    if not MIN_SQRT_RATIO <= sqrt_ratio_x96 < MAX_SQRT_RATIO:
+        raise ValueError(f"Sqrt ratio {sqrt_ratio_x96} out of bounds")
+
+    ratio = sqrt_ratio_x96 << 32
+    msb = ratio.bit_length() - 1
+    r = ratio >> (msb - 127) if msb >= 128 else ratio << (127 - msb)
+
+    log_2 = (msb - 128) << 64
+    for bit in range(63, 49, -1):
+        r = (r * r) >> 127
+        f = r >> 128
+        log_2 |= f << bit
+        r >>= f
+
+    log_sqrt10001 = log_2 * 255738958999603826347141
+
+    # Arithmetic shifts floor towards -inf, as in the Solidity original
+    tick_low = (log_sqrt10001 - 3402992956809132418596140100660247210) >> 128
+    tick_high = (log_sqrt10001 + 291339464771989622907027621153398088495) >> 128
+
+    if tick_low == tick_high:
+        return tick_low
+    return tick_high if get_sqrt_ratio_at_tick(tick_high) <= sqrt_ratio_x96 else tick_low
+
+
+def to_records(sqrt_ratios):
+    """Pack sqrt ratios into an array of table records (20-byte big-endian)
+
+    Arrays that already have the record dtype are returned unchanged.
+    """
+    import numpy as np
+
+    if isinstance(sqrt_ratios, np.ndarray) and sqrt_ratios.dtype == np.dtype(RECORD_DTYPE):
+        return sqrt_ratios
+    try:
+        packed = b"".join([int(value).to_bytes(RECORD_SIZE, "big") for value in sqrt_ratios])
+    except OverflowError:
+        raise ValueError(f"sqrt ratios must be in [0, 2**{8 * RECORD_SIZE})") from None
+    return np.frombuffer(packed, dtype=RECORD_DTYPE)
+
+
+def records_to_float(records):
+    """Nearest float64 of each record (relative error below 2**-52)"""
+    import numpy as np
+
+    words = records.view(np.dtype(RECORD_WORDS))
+    return words["hi"] * 2.0**128 + words["mid"] * 2.0**64 + words["lo"].astype(np.float64)
+
+
+def build_tick_table(path=DEFAULT_TABLE_PATH):
+    """Precompute `tick_to_sqrt_ratio` for every tick in [MIN_TICK, MAX_TICK] into `path`.
+
+    The file is written next to its destination and renamed into place, so readers that
+    already mapped an older table keep a consistent view.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    count = MAX_TICK - MIN_TICK + 1
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+
+    with open(tmp_path, "wb") as f:
+        f.write(TABLE_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, RECORD_SIZE, MIN_TICK, MAX_TICK, count))
+        chunk = bytearray()
+        for tick in range(MIN_TICK, MAX_TICK + 1):
+            chunk += tick_to_sqrt_ratio(tick).to_bytes(RECORD_SIZE, "big")
+            if len(chunk) >= 1 << 20:
+                f.write(chunk)
+                chunk.clear()
+        f.write(chunk)
+
+    os.replace(tmp_path, path)
+    return path
+
+
+class TickTable:
+    """Read-only, memory-mapped view of a table written by `build_tick_table`."""
+
+    def __init__(self, path=DEFAULT_TABLE_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, record_size, min_tick, max_tick, count = TABLE_HEADER.unpack_from(self._mm, 0)
+        if magic != TABLE_MAGIC or version != TABLE_VERSION or record_size != RECORD_SIZE:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {TABLE_VERSION} tick table")
+        if (min_tick, max_tick) != (MIN_TICK, MAX_TICK) or count != max_tick - min_tick + 1:
+            self._mm.close()
+            raise ValueError(f"{path} does not cover [{MIN_TICK}, {MAX_TICK}]")
+        if len(self._mm) != TABLE_HEADER.size + count * RECORD_SIZE:
+            self._mm.close()
+            raise ValueError(f"{path} is truncated")
+
+        self.min_tick = min_tick
+        self.max_tick = max_tick
+        self.count = count
+        self._records = None
+        self._float_keys = None
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Unmap the file
+
+        Raises BufferError, leaving the table open, while an array taken from `records`
+        is still alive. `records` itself is rebuilt on the next access.
+        """
+        self._records = None
+        self._mm.close()
+        self._float_keys = None
+
+    def sqrt_ratio_at_tick(self, tick):
+        """O(1) lookup of `tick_to_sqrt_ratio(tick)`"""
+        if not MIN_TICK <= tick <= MAX_TICK:
+            raise ValueError(f"Tick {tick} out of bounds")
+        offset = TABLE_HEADER.size + (tick - MIN_TICK) * RECORD_SIZE
+        return int.from_bytes(self._mm[offset:offset + RECORD_SIZE], "big")
+
+    __getitem__ = sqrt_ratio_at_tick
+
+    @property
+    def records(self):
+        """Zero-copy NumPy view of every entry, indexed by `tick - MIN_TICK`"""
+        if self._records is None:
+            import numpy as np
+
+            self._records = np.frombuffer(self._mm, dtype=RECORD_DTYPE, count=self.count, offset=TABLE_HEADER.size)
+        return self._records
+
+    def ticks_at_sqrt_ratios(self, sqrt_ratios, estimates=None):
+        """Vectorized `get_tick_at_sqrt_ratio`: one binary search over the table
+
+        `sqrt_ratios` is any sequence of ints (or an array from `to_records`);
+        returns an int32 array of ticks. Callers that can guess the ticks (from a
+        float formula, say) pass the guesses as `estimates` instead of paying for
+        the search; each is then corrected one tick at a time, so guesses should be
+        off by a tick or two at most.
+        """
+        import numpy as np
+
+        records = to_records(sqrt_ratios)
+        low = MIN_SQRT_RATIO.to_bytes(RECORD_SIZE, "big")
+        high = MAX_SQRT_RATIO.to_bytes(RECORD_SIZE, "big")
+        out_of_bounds = (records < low) | (records >= high)
+        if out_of_bounds.any():
+            index = int(np.argmax(out_of_bounds))
+            value = int.from_bytes(records[index], "big")
+            raise ValueError(f"Sqrt ratio {value} at index {index} out of bounds")
+
+        # Adjacent ticks are a factor of 1.00005 apart, far more than float64 resolution,
+        # so searching the float keys lands on the right entry or a neighbour of it.
+        # Exact byte-wise comparisons then settle the rows the rounding got wrong.
+        table = self.records
+        if estimates is not None:
+            index = np.asarray(estimates, dtype=np.int64).reshape(-1) - MIN_TICK
+            if index.shape != records.shape:
+                raise ValueError("estimates and sqrt ratios have different lengths")
+        else:
+            if self._float_keys is None:
+                self._float_keys = records_to_float(table)
+            index = np.searchsorted(self._float_keys, records_to_float(records), side="right") - 1
+        np.clip(index, 0, self.count - 1, out=index)
+        while True:
+            too_high = records < table[index]
+            index[too_high] -= 1
+            following = np.minimum(index + 1, self.count - 1)
+            too_low = (records >= table[following]) & (following > index)
+            index[too_low] += 1
+            if not (too_high.any() or too_low.any()):
+                break
+
+        return (index + MIN_TICK).astype(np.int32)
+
+
+_default_table = None
+
+
+def default_table():
+    """The table at DEFAULT_TABLE_PATH, opened once per process, or None if it was not built"""
+    global _default_table
+    if _default_table is None and os.path.exists(DEFAULT_TABLE_PATH):
+        _default_table = TickTable(DEFAULT_TABLE_PATH)
+    return _default_table
+
+
+def get_sqrt_ratio_at_tick(tick):
+    """`tick_to_sqrt_ratio`, served from the default table when it is available"""
+    table = default_table()
+    if table is None:
+        return tick_to_sqrt_ratio(tick)
+    return table.sqrt_ratio_at_tick(tick)
+
+
+def sqrt_ratios_to_ticks(sqrt_ratios, estimates=None):
+    """Batched `get_tick_at_sqrt_ratio` over the default table"""
+    table = default_table()
+    if table is None:
+        raise FileNotFoundError(f"{DEFAULT_TABLE_PATH} not found, run `python -m py_utils.tick_math build`")
+    return table.ticks_at_sqrt_ratios(sqrt_ratios, estimates)
+
+
+def verify_tick_table(path=DEFAULT_TABLE_PATH, sample=None, seed=0):
+    """Compare table entries against `tick_to_sqrt_ratio`.
+
+    Checks every tick, or `sample` random ticks plus both ends of the range.
+    Returns a list of (tick, table_value, expected) mismatches.
+    """
+    if sample is None:
+        ticks = range(MIN_TICK, MAX_TICK + 1)
+    else:
+        rng = random.Random(seed)
+        ticks = [MIN_TICK, 0, MAX_TICK] + [rng.randint(MIN_TICK, MAX_TICK) for _ in range(sample)]
+
+    mismatches = []
+    with TickTable(path) as table:
+        for tick in ticks:
+            value = table.sqrt_ratio_at_tick(tick)
+            expected = tick_to_sqrt_ratio(tick)
+            if value != expected:
+                mismatches.append((tick, value, expected))
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or verify the tick -> sqrtPriceX96 table")
+    parser.add_argument("command", choices=["build", "verify"])
+    parser.add_argument("--path", default=DEFAULT_TABLE_PATH)
+    parser.add_argument("--sample", type=int, default=None,
+                        help="verify only this many random ticks instead of the full range")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        build_tick_table(args.path)
+        print(f"Wrote {MAX_TICK - MIN_TICK + 1} entries to {args.path}")
+        return 0
+
+    mismatches = verify_tick_table(args.path, sample=args.sample)
+    for tick, value, expected in mismatches[:20]:
+        print(f"tick {tick}: table has {value}, expected {expected}")
+    if mismatches:
+        print(f"{len(mismatches)} mismatching entries in {args.path}")
+        return 1
+    print(f"{args.path} matches tick_to_sqrt_ratio")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,366 @@
+"""The Tick contract's per-tick state, with a dense and a sparse backend.
+
+Both backends keep, for every tick, the (liquidity_gross, liquidity_net) of
+`tick.cairo` and share one API:
+
+    update(tick, liquidity_delta, upper)    `Tick::update`, returns whether the tick flipped
+    cross(tick)                             `Tick::cross`, returns its liquidity_net
+    is_init(tick)                           `Tick::is_init`
+    update_many(ticks, deltas, upper)       `update` over arrays, in order; returns the flips
+    cross_many(ticks)                       `cross` over a sequence of ticks
+    liquidity_after_crossing(liquidity, ticks, zero_for_one)
+                                            active liquidity after crossing each tick in turn
+
+`update` follows the contract: liquidity_gross going below 0 is a ValueError (the
+message of `Pool.update_tick`), out of u128 an OverflowError, and liquidity_net
+out of i128 an OverflowError too. A batch that fails writes nothing.
+
+`DenseTicks` holds the ticks of a range at one tick spacing in NumPy columns
+indexed by (tick - lower_tick) // tick_spacing, 32 bytes per tick whether it is
+used or not, so lookups and batches are array indexing; it widens its range when
+an update falls outside it. `SparseTicks` is a dict like `Pool.ticks`, a few
+hundred bytes per initialized tick and nothing for the rest, for pools whose
+positions spread over the full tick range. `tick_store` builds one from arrays of
+updates and picks the backend by how many of the spanned ticks are initialized.
+
+u128 and i128 values sit in two uint64 halves; liquidity_net is stored plus
+2**127, so both columns are unsigned and the batch arithmetic runs on 32-bit limbs
+(`py_utils.limbs`).
+
+    store = tick_store(ticks, liquidity_deltas, upper, tick_spacing=60)
+    flipped = store.update(-600, 10**18, False)
+    liquidity = store.liquidity_after_crossing(pool.liquidity, ticks_crossed, zero_for_one)[-1]
+"""
+import numpy as np
+
+from py_utils import limbs
+
+MAX_U128 = 2**128 - 1
+NET_BIAS = 2**127
+# A span of at most this many spacings is always dense
+DENSE_MAX_SMALL_SPAN = 2**16
+# Otherwise dense once this share of the spanned ticks is initialized: 32 bytes a tick
+# against the ~200 a dict entry costs
+DENSE_MIN_DENSITY = 1 / 8
+
+_BIAS_HIGH = np.uint64(1 << 63)
+_HALF = 2**64 - 1
+
+
+def _check_net(liquidity_net, tick):
+    if not -NET_BIAS <= liquidity_net < NET_BIAS:
+        raise OverflowError(f"liquidity_net out of i128 range at tick {tick}")
+
+
+def _updated(gross, net, liquidity_delta, upper, tick):
+    """`Tick::update` on one tick's (gross, net): the new pair"""
+    gross_after = gross + liquidity_delta
+    if gross_after < 0:
+        raise ValueError(f"liquidity_gross underflow at tick {tick}")
+    if gross_after > MAX_U128:
+        raise OverflowError(f"liquidity_gross out of u128 range at tick {tick}")
+    net += -liquidity_delta if upper else liquidity_delta
+    _check_net(net, tick)
+    return gross_after, net
+
+
+def _crossed(liquidity, liquidity_net, zero_for_one, tick):
+    """`Pool.cross` with the liquidity_net already read"""
+    liquidity += -liquidity_net if zero_for_one else liquidity_net
+    if not 0 <= liquidity <= MAX_U128:
+        raise OverflowError(f"liquidity out of u128 range after crossing tick {tick}")
+    return liquidity
+
+
+class SparseTicks:
+    """Ticks in a dict: tick -> [liquidity_gross, liquidity_net]"""
+
+    def __init__(self, tick_spacing=1):
+        self.tick_spacing = tick_spacing
+        self.ticks = {}
+
+    def __len__(self):
+        return sum(1 for gross, _ in self.ticks.values() if gross)
+
+    def __repr__(self):
+        return f"SparseTicks({len(self)} initialized ticks, tick_spacing={self.tick_spacing})"
+
+    def _check_tick(self, tick):
+        if tick % self.tick_spacing:
+            raise ValueError("tick not divisible by spacing")
+
+    def info(self, tick):
+        """(liquidity_gross, liquidity_net) of `tick`"""
+        return tuple(self.ticks.get(tick, (0, 0)))
+
+    def is_init(self, tick):
+        return self.ticks.get(tick, (0, 0))[0] != 0
+
+    def cross(self, tick):
+        return self.ticks.get(tick, (0, 0))[1]
+
+    def update(self, tick, liquidity_delta, upper):
+        self._check_tick(tick)
+        gross, net = self.ticks.get(tick, (0, 0))
+        gross_after, net = _updated(gross, net, liquidity_delta, upper, tick)
+        if gross_after or net:
+            self.ticks[tick] = [gross_after, net]
+        else:
+            self.ticks.pop(tick, None)
+        return (gross_after == 0) != (gross == 0)
+
+    def update_many(self, ticks, liquidity_deltas, upper):
+        ticks, upper = np.asarray(ticks).tolist(), np.asarray(upper, dtype=bool).tolist()
+        liquidity_deltas = [int(delta) for delta in np.asarray(liquidity_deltas).reshape(-1)]
+        if not len(ticks) == len(liquidity_deltas) == len(upper):
+            raise ValueError("ticks, deltas and upper flags have different lengths")
+        # Work on copies of the touched ticks so that a failing update leaves the store as it was
+        touched = {}
+        flipped = np.zeros(len(ticks), dtype=bool)
+        for i, (tick, liquidity_delta, is_upper) in enumerate(zip(ticks, liquidity_deltas, upper)):
+            self._check_tick(tick)
+            gross, net = touched.get(tick) or self.ticks.get(tick, (0, 0))
+            touched[tick] = _updated(gross, net, liquidity_delta, is_upper, tick)
+            flipped[i] = (touched[tick][0] == 0) != (gross == 0)
+        for tick, (gross, net) in touched.items():
+            if gross or net:
+                self.ticks[tick] = [gross, net]
+            else:
+                self.ticks.pop(tick, None)
+        return flipped
+
+    def cross_many(self, ticks):
+        get = self.ticks.get
+        return [get(tick, (0, 0))[1] for tick in np.asarray(ticks).tolist()]
+
+    def liquidity_after_crossing(self, liquidity, ticks, zero_for_one):
+        result = []
+        for tick, liquidity_net in zip(np.asarray(ticks).tolist(), self.cross_many(ticks)):
+            liquidity = _crossed(liquidity, liquidity_net, zero_for_one, tick)
+            result.append(liquidity)
+        return result
+
+    def initialized_ticks(self):
+        return np.array(sorted(tick for tick, (gross, _) in self.ticks.items() if gross), dtype=np.int64)
+
+
+class DenseTicks:
+    """Ticks of [lower_tick, upper_tick] at `tick_spacing`, one row of NumPy columns each"""
+
+    def __init__(self, lower_tick, upper_tick, tick_spacing=1):
+        if lower_tick % tick_spacing or upper_tick % tick_spacing:
+            raise ValueError("tick not divisible by spacing")
+        if upper_tick < lower_tick:
+            raise ValueError("lower tick must be lower or equal to upper tick")
+        self.tick_spacing = tick_spacing
+        self.lower_tick = lower_tick
+        rows = (upper_tick - lower_tick) // tick_spacing + 1
+        self._gross_low = np.zeros(rows, dtype=np.uint64)
+        self._gross_high = np.zeros(rows, dtype=np.uint64)
+        self._net_low = np.zeros(rows, dtype=np.uint64)
+        self._net_high = np.full(rows, _BIAS_HIGH, dtype=np.uint64)
+
+    @property
+    def upper_tick(self):
+        return self.lower_tick + (len(self._gross_low) - 1) * self.tick_spacing
+
+    def __len__(self):
+        return int(np.count_nonzero(self._gross_low | self._gross_high))
+
+    def __repr__(self):
+        return (f"DenseTicks([{self.lower_tick}, {self.upper_tick}], tick_spacing={self.tick_spacing}, "
+                f"{len(self)} initialized ticks)")
+
+    @property
+    def nbytes(self):
+        return self._gross_low.nbytes * 4
+
+    def _row(self, tick):
+        """Row of `tick`, -1 outside the range"""
+        offset, rest = divmod(tick - self.lower_tick, self.tick_spacing)
+        if rest:
+            raise ValueError("tick not divisible by spacing")
+        return offset if 0 <= offset < len(self._gross_low) else -1
+
+    def _rows(self, ticks):
+        """Rows of an array of ticks, -1 outside the range"""
+        offsets = np.asarray(ticks, dtype=np.int64).reshape(-1) - self.lower_tick
+        if (offsets % self.tick_spacing).any():
+            raise ValueError("tick not divisible by spacing")
+        rows = offsets // self.tick_spacing
+        return np.where((rows >= 0) & (rows < len(self._gross_low)), rows, -1)
+
+    def _cover(self, lower_tick, upper_tick):
+        """Widen the range to hold [lower_tick, upper_tick], with room to spare on the side that grows"""
+        rows = len(self._gross_low)
+        before = max(0, (self.lower_tick - lower_tick) // self.tick_spacing)
+        after = max(0, (upper_tick - self.upper_tick) // self.tick_spacing)
+        if not before and not after:
+            return
+        before += before and rows // 2
+        after += after and rows // 2
+        for name in ("_gross_low", "_gross_high", "_net_low", "_net_high"):
+            column = getattr(self, name)
+            fill = _BIAS_HIGH if name == "_net_high" else 0
+            setattr(self, name, np.concatenate([np.full(before, fill, dtype=np.uint64), column,
+                                                np.full(after, fill, dtype=np.uint64)]))
+        self.lower_tick -= before * self.tick_spacing
+
+    def _info(self, row):
+        gross = int(self._gross_low[row]) | int(self._gross_high[row]) << 64
+        net = (int(self._net_low[row]) | int(self._net_high[row]) << 64) - NET_BIAS
+        return gross, net
+
+    def _set(self, row, gross, net):
+        net += NET_BIAS
+        self._gross_low[row], self._gross_high[row] = gross & _HALF, gross >> 64
+        self._net_low[row], self._net_high[row] = net & _HALF, net >> 64
+
+    def info(self, tick):
+        row = self._row(tick)
+        return self._info(row) if row >= 0 else (0, 0)
+
+    def is_init(self, tick):
+        row = self._row(tick)
+        return row >= 0 and bool(self._gross_low[row] or self._gross_high[row])
+
+    def cross(self, tick):
+        return self.info(tick)[1]
+
+    def update(self, tick, liquidity_delta, upper):
+        row = self._row(tick)
+        if row < 0:
+            self._cover(tick, tick)
+            row = self._row(tick)
+        gross, net = self._info(row)
+        gross_after, net = _updated(gross, net, liquidity_delta, upper, tick)
+        self._set(row, gross_after, net)
+        return (gross_after == 0) != (gross == 0)
+
+    def update_many(self, ticks, liquidity_deltas, upper):
+        ticks = np.asarray(ticks, dtype=np.int64).reshape(-1)
+        upper = np.asarray(upper, dtype=bool).reshape(-1)
+        negative, magnitudes = limbs.from_signed(liquidity_deltas, 128)
+        if not len(ticks) == len(negative) == len(upper):
+            raise ValueError("ticks, deltas and upper flags have different lengths")
+        if not len(ticks):
+            return np.zeros(0, dtype=bool)
+        if (ticks % self.tick_spacing).any():
+            raise ValueError("tick not divisible by spacing")
+        self._cover(int(ticks.min()), int(ticks.max()))
+
+        targets, key_index = np.unique(self._rows(ticks), return_inverse=True)
+        key_index = key_index.reshape(-1)
+        gross = limbs.from_halves(self._gross_low[targets], self._gross_high[targets])
+        net = limbs.from_halves(self._net_low[targets], self._net_high[targets])
+        flipped = np.zeros(len(ticks), dtype=bool)
+
+        # Round r applies the r-th update of every tick, so each round touches a tick once
+        order = np.argsort(key_index, kind="stable")
+        sorted_keys = key_index[order]
+        group_start = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        group_sizes = np.diff(np.r_[group_start, len(order)])
+        occurrence = np.arange(len(order)) - np.repeat(group_start, group_sizes)
+        for round_ in range(int(group_sizes.max())):
+            updates = order[occurrence == round_]
+            keys = key_index[updates]
+            delta, down = magnitudes[:, updates], negative[updates]
+            gross_before = gross[:, keys]
+            added = limbs.add(gross_before, delta)
+            below = down & (limbs.compare(delta, gross_before) > 0)
+            if below.any():
+                raise ValueError(f"liquidity_gross underflow at tick {ticks[updates][below][0]}")
+            if (added[4] & ~down).any():
+                tick = ticks[updates][(added[4] != 0) & ~down][0]
+                raise OverflowError(f"liquidity_gross out of u128 range at tick {tick}")
+            gross_after = np.where(down, limbs.sub(gross_before, delta), added[:4])
+
+            # liquidity_net grows by the delta at a lower tick and shrinks by it at an upper one
+            net_before, net_down = net[:, keys], down != upper[updates]
+            net_added = limbs.add(net_before, delta)
+            out = np.where(net_down, limbs.compare(delta, net_before) > 0, net_added[4] != 0)
+            if out.any():
+                raise OverflowError(f"liquidity_net out of i128 range at tick {ticks[updates][out][0]}")
+            net[:, keys] = np.where(net_down, limbs.sub(net_before, delta), net_added[:4])
+
+            gross[:, keys] = gross_after
+            flipped[updates] = limbs.is_zero(gross_after) != limbs.is_zero(gross_before)
+
+        self._gross_low[targets], self._gross_high[targets] = limbs.to_halves(gross)
+        self._net_low[targets], self._net_high[targets] = limbs.to_halves(net)
+        return flipped
+
+    def _net_halves(self, ticks):
+        """Biased (low, high) halves of the liquidity_net of every tick, and whether it fits in an int64"""
+        rows = self._rows(ticks)
+        inside = rows >= 0
+        rows = np.where(inside, rows, 0)
+        low = np.where(inside, self._net_low[rows], np.uint64(0))
+        high = np.where(inside, self._net_high[rows], _BIAS_HIGH)
+        # high is the bias for nets in [0, 2**64) and one below it for nets in [-2**64, 0)
+        small = (((high == _BIAS_HIGH) & (low < _BIAS_HIGH))
+                 | ((high == _BIAS_HIGH - np.uint64(1)) & (low >= _BIAS_HIGH)))
+        return low, high, small
+
+    def cross_many(self, ticks):
+        low, high, small = self._net_halves(ticks)
+        nets = low.view(np.int64).tolist()
+        for i in np.flatnonzero(~small).tolist():
+            nets[i] = (int(low[i]) | int(high[i]) << 64) - NET_BIAS
+        return nets
+
+    def liquidity_after_crossing(self, liquidity, ticks, zero_for_one):
+        ticks = np.asarray(ticks, dtype=np.int64).reshape(-1)
+        low, high, small = self._net_halves(ticks)
+        nets = low.view(np.int64)
+        if small.all() and liquidity + np.abs(nets.astype(np.float64)).sum() < 2**62:
+            # Every running total fits in an int64
+            result = (np.cumsum(-nets if zero_for_one else nets) + liquidity).tolist()
+        else:
+            # Sum base 2**32 digits instead, each exact in an int64 for up to 2**31 ticks
+            digits = limbs.from_halves(low, high).astype(np.int64)
+            digits[3] -= 1 << 31
+            sums = np.cumsum(-digits if zero_for_one else digits, axis=1).tolist()
+            result = [liquidity + a + (b << 32) + (c << 64) + (d << 96) for a, b, c, d in zip(*sums)]
+        bad = next((i for i, value in enumerate(result) if not 0 <= value <= MAX_U128), None)
+        if bad is not None:
+            raise OverflowError(f"liquidity out of u128 range after crossing tick {ticks[bad]}")
+        return result
+
+    def initialized_ticks(self):
+        rows = np.flatnonzero(self._gross_low | self._gross_high)
+        return self.lower_tick + rows * self.tick_spacing
+
+
+def _empty_store(ticks, tick_spacing):
+    """An empty `DenseTicks` or `SparseTicks` for `ticks`, whichever suits their density"""
+    if not len(ticks):
+        return SparseTicks(tick_spacing)
+    lower_tick, upper_tick = int(ticks.min()), int(ticks.max())
+    if lower_tick % tick_spacing or upper_tick % tick_spacing:
+        raise ValueError("tick not divisible by spacing")
+    span = (upper_tick - lower_tick) // tick_spacing + 1
+    if span <= DENSE_MAX_SMALL_SPAN or len(np.unique(ticks)) >= DENSE_MIN_DENSITY * span:
+        return DenseTicks(lower_tick, upper_tick, tick_spacing)
+    return SparseTicks(tick_spacing)
+
+
+def tick_store(ticks=(), liquidity_deltas=(), upper=(), tick_spacing=1):
+    """A tick store holding the given updates, dense or sparse by how many of the spanned ticks they touch"""
+    ticks = np.asarray(ticks, dtype=np.int64).reshape(-1)
+    store = _empty_store(ticks, tick_spacing)
+    store.update_many(ticks, liquidity_deltas, upper)
+    return store
+
+
+def from_pool(pool):
+    """A tick store holding the ticks of a `Pool`"""
+    ticks = np.array(sorted(pool.ticks), dtype=np.int64)
+    store = _empty_store(ticks, pool.tick_spacing)
+    for tick in ticks.tolist():
+        gross, net = pool.ticks[tick]
+        if isinstance(store, SparseTicks):
+            store.ticks[tick] = [gross, net]
+        else:
+            store._set(store._row(tick), gross, net)
+    return store
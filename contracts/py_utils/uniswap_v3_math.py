@@ -4,7 +4,10 @@ import math
 ## Looks simple in python...
 
 q96 = 2**96
+# univ3pool.cairo hard-codes its tick spacing for now
+TICK_SPACING = 1
 
+# Float approximations; py_utils.fixed_point and py_utils.price_math convert prices exactly, and in batches
 def price_to_tick(p):
     return math.floor(math.log(p, 1.0001))
 
@@ -106,23 +106,23 @@ def generate_calc_amount1_test_cases():
     
     return test_cases
 
-def print_cairo_test_code(test_cases, function_name):
+def cairo_test_code(test_cases, function_name):
     """Generate Cairo test code from test cases"""
     for case in test_cases:
-        print(f"#[test]")
-        print(f"fn test_{function_name}_{case['name']}() {{")
-        print(f"    // Create sqrt prices")
-        print(f"    let sqrt_price_a = IFixedQ64x96Impl::new({case['sqrtp_a']}_u256);")
-        print(f"    let sqrt_price_b = IFixedQ64x96Impl::new({case['sqrtp_b']}_u256);")
-        print(f"    let liquidity = {case['liquidity']}_u128;")
-        print(f"")
-        print(f"    let result = LiquidityMath::{function_name}(sqrt_price_a, sqrt_price_b, liquidity);")
-        print(f"")
-        print(f"    println!(\"Result: {{}}\", result);")
-        print(f"    let expected = {case['expected']}_u256;")
-        print(f"    let tolerance = expected / 100_u256; // 1% tolerance")
-        print(f"    assert(result >= expected - tolerance && result <= expected + tolerance, \'{function_name} incorrect\');")
-        print(f"}}\n")
+        yield f"#[test]\n"
+        yield f"fn test_{function_name}_{case['name']}() {{\n"
+        yield f"    // Create sqrt prices\n"
+        yield f"    let sqrt_price_a = IFixedQ64x96Impl::new({case['sqrtp_a']}_u256);\n"
+        yield f"    let sqrt_price_b = IFixedQ64x96Impl::new({case['sqrtp_b']}_u256);\n"
+        yield f"    let liquidity = {case['liquidity']}_u128;\n"
+        yield f"\n"
+        yield f"    let result = LiquidityMath::{function_name}(sqrt_price_a, sqrt_price_b, liquidity);\n"
+        yield f"\n"
+        yield f"    println!(\"Result: {{}}\", result);\n"
+        yield f"    let expected = {case['expected']}_u256;\n"
+        yield f"    let tolerance = expected / 100_u256; // 1% tolerance\n"
+        yield f"    assert(result >= expected - tolerance && result <= expected + tolerance, \'{function_name} incorrect\');\n"
+        yield f"}}\n\n"
 
 def generate_swap_test_case():
     """Generate a test case for swap calculation"""
@@ -137,40 +137,40 @@ def generate_swap_test_case():
     amount_in_calculated = calc_amount1(liquidity, price_next, current_sqrtp)
     amount_out_calculated = calc_amount0(liquidity, price_next, current_sqrtp)
     
-    print(f"#[test]")
-    print(f"fn test_swap_calculation() {{")
-    print(f"    // Test swapping 42 USDC for ETH")
-    print(f"    let current_sqrtp = FixedQ64x96 {{ value: {current_sqrtp}_u256 }};")
-    print(f"    let liquidity = {liquidity}_u128;")
-    print(f"    let amount_in = {amount_in}_u128;  // 42 USDC")
-    print(f"")
-    print(f"    // Calculate price impact")
-    print(f"    let price_diff = (amount_in.into() * ONE) / liquidity.into();")
-    print(f"    let price_next = FixedQ64x96 {{ value: current_sqrtp.value + price_diff }};")
-    print(f"")
-    print(f"    // Verify expected values")
-    print(f"    let expected_price_next = {price_next}_u256;")
-    print(f"    println!(\"Price next: {{}}, Expected: {{}}\", price_next.value, expected_price_next);")
-    print(f"    assert(price_next.value >= expected_price_next - 100 && price_next.value <= expected_price_next + 100, \'Price calculation incorrect\');")
-    print(f"")
-    print(f"    // Calculate amounts")
-    print(f"    let amount_in_calculated = LiquidityMath::calc_amount1_delta(current_sqrtp, price_next, liquidity);")
-    print(f"    let amount_out_calculated = LiquidityMath::calc_amount0_delta(current_sqrtp, price_next, liquidity);")
-    print(f"")
-    print(f"    // Verify calculated amounts")
-    print(f"    let expected_amount_in = {amount_in_calculated}_u256;  // 42 USDC")
-    print(f"    let expected_amount_out = {amount_out_calculated}_u256;  // ~0.0084 ETH")
-    print(f"    println!(\"Amount in calculated: {{}}, Expected: {{}}\", amount_in_calculated, expected_amount_in);")
-    print(f"    println!(\"Amount out calculated: {{}}, Expected: {{}}\", amount_out_calculated, expected_amount_out);")
-    print(f"")
-    print(f"    let tolerance_in = expected_amount_in / 100_u256;  // 1% tolerance")
-    print(f"    let tolerance_out = expected_amount_out / 100_u256;  // 1% tolerance")
-    print(f"    assert(amount_in_calculated >= expected_amount_in - tolerance_in && amount_in_calculated <= expected_amount_in + tolerance_in, \'Amount in calculation incorrect\');")
-    print(f"    assert(amount_out_calculated >= expected_amount_out - tolerance_out && amount_out_calculated <= expected_amount_out + tolerance_out, \'Amount out calculation incorrect\');")
-    print(f"}}")
+    yield f"#[test]\n"
+    yield f"fn test_swap_calculation() {{\n"
+    yield f"    // Test swapping 42 USDC for ETH\n"
+    yield f"    let current_sqrtp = FixedQ64x96 {{ value: {current_sqrtp}_u256 }};\n"
+    yield f"    let liquidity = {liquidity}_u128;\n"
+    yield f"    let amount_in = {amount_in}_u128;  // 42 USDC\n"
+    yield f"\n"
+    yield f"    // Calculate price impact\n"
+    yield f"    let price_diff = (amount_in.into() * ONE) / liquidity.into();\n"
+    yield f"    let price_next = FixedQ64x96 {{ value: current_sqrtp.value + price_diff }};\n"
+    yield f"\n"
+    yield f"    // Verify expected values\n"
+    yield f"    let expected_price_next = {price_next}_u256;\n"
+    yield f"    println!(\"Price next: {{}}, Expected: {{}}\", price_next.value, expected_price_next);\n"
+    yield f"    assert(price_next.value >= expected_price_next - 100 && price_next.value <= expected_price_next + 100, \'Price calculation incorrect\');\n"
+    yield f"\n"
+    yield f"    // Calculate amounts\n"
+    yield f"    let amount_in_calculated = LiquidityMath::calc_amount1_delta(current_sqrtp, price_next, liquidity);\n"
+    yield f"    let amount_out_calculated = LiquidityMath::calc_amount0_delta(current_sqrtp, price_next, liquidity);\n"
+    yield f"\n"
+    yield f"    // Verify calculated amounts\n"
+    yield f"    let expected_amount_in = {amount_in_calculated}_u256;  // 42 USDC\n"
+    yield f"    let expected_amount_out = {amount_out_calculated}_u256;  // ~0.0084 ETH\n"
+    yield f"    println!(\"Amount in calculated: {{}}, Expected: {{}}\", amount_in_calculated, expected_amount_in);\n"
+    yield f"    println!(\"Amount out calculated: {{}}, Expected: {{}}\", amount_out_calculated, expected_amount_out);\n"
+    yield f"\n"
+    yield f"    let tolerance_in = expected_amount_in / 100_u256;  // 1% tolerance\n"
+    yield f"    let tolerance_out = expected_amount_out / 100_u256;  // 1% tolerance\n"
+    yield f"    assert(amount_in_calculated >= expected_amount_in - tolerance_in && amount_in_calculated <= expected_amount_in + tolerance_in, \'Amount in calculation incorrect\');\n"
+    yield f"    assert(amount_out_calculated >= expected_amount_out - tolerance_out && amount_out_calculated <= expected_amount_out + tolerance_out, \'Amount out calculation incorrect\');\n"
+    yield f"}}\n"
 
-def print_test_values():
-    """Print exact test values for all test cases"""
+def exact_test_values():
+    """Exact test values for all test cases, as Cairo comments"""
     # Basic test values
     price_a = 1.0
     price_b = 2.0
@@ -178,22 +178,22 @@ def print_test_values():
     sqrtp_a = price_to_sqrtp(price_a)
     sqrtp_b = price_to_sqrtp(price_b)
     
-    print("// Test values for basic case:")
-    print(f"// sqrtp_a = {sqrtp_a}")
-    print(f"// sqrtp_b = {sqrtp_b}")
-    print(f"// liquidity = {liquidity}")
-    print(f"// expected_amount0 = {calc_amount0(liquidity, sqrtp_a, sqrtp_b)}")
-    print(f"// expected_amount1 = {calc_amount1(liquidity, sqrtp_a, sqrtp_b)}")
-    print()
+    yield "// Test values for basic case:\n"
+    yield f"// sqrtp_a = {sqrtp_a}\n"
+    yield f"// sqrtp_b = {sqrtp_b}\n"
+    yield f"// liquidity = {liquidity}\n"
+    yield f"// expected_amount0 = {calc_amount0(liquidity, sqrtp_a, sqrtp_b)}\n"
+    yield f"// expected_amount1 = {calc_amount1(liquidity, sqrtp_a, sqrtp_b)}\n"
+    yield "\n"
     
     # ETH/USDC example
     sqrtp_low = price_to_sqrtp(1500)
     sqrtp_high = price_to_sqrtp(2500)
     liquidity = 2 * 10**18  # 2 ETH worth
     
-    print("// Test values for ETH/USDC range:")
-    print(f"// sqrtp_low = {sqrtp_low}")
-    print(f"// sqrtp_high = {sqrtp_high}")
-    print(f"// liquidity = {liquidity}")
-    print(f"// expected_amount0 = {calc_amount0(liquidity, sqrtp_low, sqrtp_high)}")
-    print(f"// expected_amount1 = {calc_amount1(liquidity, sqrtp_low, sqrtp_high)}")
+    yield "// Test values for ETH/USDC range:\n"
+    yield f"// sqrtp_low = {sqrtp_low}\n"
+    yield f"// sqrtp_high = {sqrtp_high}\n"
+    yield f"// liquidity = {liquidity}\n"
+    yield f"// expected_amount0 = {calc_amount0(liquidity, sqrtp_low, sqrtp_high)}\n"
+    yield f"// expected_amount1 = {calc_amount1(liquidity, sqrtp_low, sqrtp_high)}\n"
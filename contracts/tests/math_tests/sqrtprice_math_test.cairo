@@ -15,12 +15,7 @@ fn test_get_next_sqrt_price_from_amount0_zero_amount() {
         sqrt_price_x96.clone(), liquidity, amount, add,
     );
 
-    let expected = 79228162514264337593543950336_u256;
-    let tolerance = expected / 10000_u256; // 0.01% tolerance
-    assert(
-        result.value >= expected - tolerance && result.value <= expected + tolerance,
-        'Price calculation incorrect',
-    );
+    assert(result.value == 79228162514264337593543950336_u256, 'Price calculation incorrect');
 }
 
 #[test]
@@ -35,12 +30,7 @@ fn test_get_next_sqrt_price_from_amount0_adding_token0() {
         sqrt_price_x96.clone(), liquidity, amount, add,
     );
 
-    let expected = 7922024049021531606193775_u256;
-    let tolerance = expected / 10000_u256; // 0.01% tolerance
-    assert(
-        result.value >= expected - tolerance && result.value <= expected + tolerance,
-        'Price calculation incorrect',
-    );
+    assert(result.value == 7922024049021531606193776_u256, 'Price calculation incorrect');
 }
 
 #[test]
@@ -55,12 +45,7 @@ fn test_get_next_sqrt_price_from_amount0_removing_token0() {
         sqrt_price_x96.clone(), liquidity, amount, add,
     );
 
-    let expected = 396140812571321687967719751680_u256;
-    let tolerance = expected / 10000_u256; // 0.01% tolerance
-    assert(
-        result.value >= expected - tolerance && result.value <= expected + tolerance,
-        'Price calculation incorrect',
-    );
+    assert(result.value == 396140812571321687967719751680_u256, 'Price calculation incorrect');
 }
 
 #[test]
@@ -75,12 +60,7 @@ fn test_get_next_sqrt_price_from_amount0_real_example() {
         sqrt_price_x96.clone(), liquidity, amount, add,
     );
 
-    let expected = 633825139767628305526620771_u256;
-    let tolerance = expected / 10000_u256; // 0.01% tolerance
-    assert(
-        result.value >= expected - tolerance && result.value <= expected + tolerance,
-        'Price calculation incorrect',
-    );
+    assert(result.value == 633825139767628305824738171_u256, 'Price calculation incorrect');
 }
 
 // --- Cairo Test Code for get_next_sqrt_price_from_amount1_rounding_down --- //
@@ -96,12 +76,7 @@ fn test_get_next_sqrt_price_from_amount1_zero_amount() {
         sqrt_price_x96.clone(), liquidity, amount, add,
     );
 
-    let expected = 79228162514264337593543950336_u256;
-    let tolerance = expected / 10000_u256; // 0.01% tolerance
-    assert(
-        result.value >= expected - tolerance && result.value <= expected + tolerance,
-        'Price calculation incorrect',
-    );
+    assert(result.value == 79228162514264337593543950336_u256, 'Price calculation incorrect');
 }
 
 #[test]
@@ -116,12 +91,7 @@ fn test_get_next_sqrt_price_from_amount1_adding_token1() {
         sqrt_price_x96.clone(), liquidity, amount, add,
     );
 
-    let expected = 792360853305157640273033047310336_u256;
-    let tolerance = expected / 10000_u256; // 0.01% tolerance
-    assert(
-        result.value >= expected - tolerance && result.value <= expected + tolerance,
-        'Price calculation incorrect',
-    );
+    assert(result.value == 792360853305157640273033047310336_u256, 'Price calculation incorrect');
 }
 
 #[test]
@@ -136,12 +106,7 @@ fn test_get_next_sqrt_price_from_amount1_removing_token1() {
         sqrt_price_x96.clone(), liquidity, amount, add,
     );
 
-    let expected = 15845632502860790334960216501_u256;
-    let tolerance = expected / 10000_u256; // 0.01% tolerance
-    assert(
-        result.value >= expected - tolerance && result.value <= expected + tolerance,
-        'Price calculation incorrect',
-    );
+    assert(result.value == 15845632502860790334960216500_u256, 'Price calculation incorrect');
 }
 
 #[test]
@@ -156,12 +121,7 @@ fn test_get_next_sqrt_price_from_amount1_real_example() {
         sqrt_price_x96.clone(), liquidity, amount, add,
     );
 
-    let expected = 2505414483770286352492704099597171_u256;
-    let tolerance = expected / 10000_u256; // 0.01% tolerance
-    assert(
-        result.value >= expected - tolerance && result.value <= expected + tolerance,
-        'Price calculation incorrect',
-    );
+    assert(result.value == 2505414483770286352492704099597171_u256, 'Price calculation incorrect');
 }
 
 // --- Cairo Test Code for get_next_sqrt_price_from_input --- //
@@ -177,12 +137,7 @@ fn test_get_next_sqrt_price_from_input_token0() {
         sqrt_price_x96.clone(), liquidity, amount_in, zero_for_one,
     );
 
-    let expected = 7922024049021531606193775_u256;
-    let tolerance = expected / 10000_u256; // 0.01% tolerance
-    assert(
-        result.value >= expected - tolerance && result.value <= expected + tolerance,
-        'Price calculation incorrect',
-    );
+    assert(result.value == 7922024049021531606193776_u256, 'Price calculation incorrect');
 }
 
 #[test]
@@ -197,12 +152,7 @@ fn test_get_next_sqrt_price_from_input_token1() {
         sqrt_price_x96.clone(), liquidity, amount_in, zero_for_one,
     );
 
-    let expected = 792360853305157640273033047310336_u256;
-    let tolerance = expected / 10000_u256; // 0.01% tolerance
-    assert(
-        result.value >= expected - tolerance && result.value <= expected + tolerance,
-        'Price calculation incorrect',
-    );
+    assert(result.value == 792360853305157640273033047310336_u256, 'Price calculation incorrect');
 }
 
 #[test]
@@ -217,12 +167,7 @@ fn test_get_next_sqrt_price_from_input_eth_to_usdc() {
         sqrt_price_x96.clone(), liquidity, amount_in, zero_for_one,
     );
 
-    let expected = 1267649958842446079763463034_u256;
-    let tolerance = expected / 10000_u256; // 0.01% tolerance
-    assert(
-        result.value >= expected - tolerance && result.value <= expected + tolerance,
-        'Price calculation incorrect',
-    );
+    assert(result.value == 1267649958842446080955932026_u256, 'Price calculation incorrect');
 }
 
 #[test]
@@ -237,12 +182,7 @@ fn test_get_next_sqrt_price_from_input_usdc_to_eth() {
         sqrt_price_x96.clone(), liquidity, amount_in, zero_for_one,
     );
 
-    let expected = 2505414483760382832178421057397978_u256;
-    let tolerance = expected / 10000_u256; // 0.01% tolerance
-    assert(
-        result.value >= expected - tolerance && result.value <= expected + tolerance,
-        'Price calculation incorrect',
-    );
+    assert(result.value == 2505414483760382832178421057397978_u256, 'Price calculation incorrect');
 }
 
 // --- Cairo Test Code for get_next_sqrt_price_from_output --- //
@@ -258,12 +198,7 @@ fn test_get_next_sqrt_price_from_output_token1_out() {
         sqrt_price_x96.clone(), liquidity, amount_out, zero_for_one,
     );
 
-    let expected = 71305346262845826650440981737_u256;
-    let tolerance = expected / 10000_u256; // 0.01% tolerance
-    assert(
-        result.value >= expected - tolerance && result.value <= expected + tolerance,
-        'Price calculation incorrect',
-    );
+    assert(result.value == 71305346262845826650440981737_u256, 'Price calculation incorrect');
 }
 
 #[test]
@@ -278,12 +213,7 @@ fn test_get_next_sqrt_price_from_output_token0_out() {
         sqrt_price_x96.clone(), liquidity, amount_out, zero_for_one,
     );
 
-    let expected = 88031291682515930659493278151_u256;
-    let tolerance = expected / 10000_u256; // 0.01% tolerance
-    assert(
-        result.value >= expected - tolerance && result.value <= expected + tolerance,
-        'Price calculation incorrect',
-    );
+    assert(result.value == 88031291682515930659493278152_u256, 'Price calculation incorrect');
 }
 
 #[test]
@@ -298,12 +228,7 @@ fn test_get_next_sqrt_price_from_output_exact_eth_out() {
         sqrt_price_x96.clone(), liquidity, amount_out, zero_for_one,
     );
 
-    let expected = 2783793870829622859151062823560918_u256;
-    let tolerance = expected / 10000_u256; // 0.01% tolerance
-    assert(
-        result.value >= expected - tolerance && result.value <= expected + tolerance,
-        'Price calculation incorrect',
-    );
+    assert(result.value == 2783793870829622936246474977706656_u256, 'Price calculation incorrect');
 }
 
 #[test]
@@ -318,10 +243,6 @@ fn test_get_next_sqrt_price_from_output_exact_usdc_out() {
         sqrt_price_x96.clone(), liquidity, amount_out, zero_for_one,
     );
 
-    let expected = 2505414483745527551706996494099190_u256;
-    let tolerance = expected / 10000_u256; // 0.01% tolerance
-    assert(
-        result.value >= expected - tolerance && result.value <= expected + tolerance,
-        'Price calculation incorrect',
-    );
+    assert(result.value == 2505414483745527551706996494099190_u256, 'Price calculation incorrect');
 }
+